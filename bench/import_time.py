@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+"""
+## Import Time Benchmark
+
+measure how long the command line tools take to
+import **client_aic** using ``python -X importtime``
+and exit with a non-zero status if the import
+pulls in a heavy dependency before the first
+request
+
+each import time is compared with a standard
+library module imported in the same run so the
+budgets hold on slow and fast machines. a slow
+import also fails the run unless ``-w`` is set
+(like on a noisy shared runner)
+
+## Examples
+
+```bash
+./bench/import_time.py
+```
+
+```bash
+./bench/import_time.py -b 1.5 -n 11
+```
+
+```bash
+./bench/import_time.py -w
+```
+
+"""
+
+import os
+import sys
+import logging
+import argparse
+import statistics
+import subprocess
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format=(
+        "%(asctime)s.%(msecs)03d %(levelname)s "
+        "%(funcName)s - %(message)s"
+    ),
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+log = logging.getLogger(__name__)
+
+repo_dir = os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)
+
+# standard library module timed in the same run
+# as the baseline for the budgets
+reference_module = "email.message"
+
+# modules the cli imports before sending a request
+# mapped to the budget as a multiple of the
+# reference module's import time (about twice the
+# measured ratio)
+default_budgets = {
+    "client_aic": 0.5,
+    "client_aic.ask": 6.0,
+}
+
+# dependencies that must only load on first use
+heavy_modules = [
+    "requests",
+    "urllib3",
+    "asyncio",
+    "httpx",
+    "numpy",
+    "sqlite3",
+    "pyarrow",
+]
+
+
+def measure(module_name: str):
+    """
+    measure
+
+    import a module in a fresh interpreter
+    with ``-X importtime``
+
+    :param module_name: module to import
+
+    :returns: tuple of (cumulative microseconds
+        for the module, set of imported module names)
+    :rtype: tuple
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [repo_dir, env.get("PYTHONPATH", "")]
+    )
+    r = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import {module_name}",
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if r.returncode != 0:
+        log.error(
+            f"failed to import {module_name}:\n{r.stderr}"
+        )
+        return (None, set())
+    total_us = None
+    imported = set()
+    for line in r.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        imported.add(name)
+        if name == module_name:
+            total_us = int(parts[1].strip())
+    return (total_us, imported)
+
+
+def get_median_ms(
+    module_name: str,
+    num_runs: int,
+):
+    """
+    get_median_ms
+
+    :param module_name: module to import
+    :param num_runs: fresh interpreters to
+        import the module in
+
+    :returns: tuple of (median milliseconds, set
+        of top-level heavy modules it imported)
+    :rtype: tuple
+    """
+    times_ms = []
+    heavy = set()
+    for _ in range(num_runs):
+        (total_us, imported) = measure(module_name)
+        if total_us is None:
+            sys.exit(1)
+        times_ms.append(total_us / 1000.0)
+        heavy.update(
+            name
+            for name in imported
+            if name.split(".")[0] in heavy_modules
+            and name.split(".")[0] == name
+        )
+    return (statistics.median(times_ms), heavy)
+
+
+def run_bench():
+    """
+    run_bench
+
+    exit with status 1 if a module imports a
+    heavy dependency or its median import time
+    is over its budget (only logged with
+    **--warn-only**)
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "fail if importing client_aic loads "
+            "heavy dependencies or gets slower"
+        )
+    )
+    parser.add_argument(
+        "-n",
+        "--num-runs",
+        help="int - runs per module and defaults to 7",
+        default=7,
+        type=int,
+        dest="num_runs",
+    )
+    parser.add_argument(
+        "-b",
+        "--budget-scale",
+        help=(
+            "float - multiply every budget and "
+            "defaults to 1.0"
+        ),
+        default=1.0,
+        type=float,
+        dest="budget_scale",
+    )
+    parser.add_argument(
+        "-s",
+        "--strict",
+        help=(
+            "flag - fail when an import is over "
+            "budget (the default)"
+        ),
+        action="store_true",
+        default=True,
+        dest="strict",
+    )
+    parser.add_argument(
+        "-w",
+        "--warn-only",
+        help=(
+            "flag - only log an import that is "
+            "over budget"
+        ),
+        action="store_false",
+        dest="strict",
+    )
+    args = parser.parse_args()
+
+    (reference_ms, _) = get_median_ms(
+        reference_module, args.num_runs
+    )
+    log.info(
+        f"import {reference_module} "
+        f"median={reference_ms:.1f}ms (reference)"
+    )
+    failed = False
+    for module_name, budget in default_budgets.items():
+        budget_ms = (
+            budget * args.budget_scale * reference_ms
+        )
+        (median_ms, heavy) = get_median_ms(
+            module_name, args.num_runs
+        )
+        log.info(
+            f"import {module_name} "
+            f"median={median_ms:.1f}ms "
+            f"budget={budget_ms:.1f}ms"
+        )
+        if median_ms > budget_ms:
+            msg = (
+                f"import {module_name} took "
+                f"{median_ms:.1f}ms over the "
+                f"{budget_ms:.1f}ms budget"
+            )
+            if args.strict:
+                log.error(msg)
+                failed = True
+            else:
+                log.warning(msg)
+        if heavy:
+            log.error(
+                f"import {module_name} loaded heavy "
+                f"dependencies={sorted(heavy)} - please "
+                "import them on first use"
+            )
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_bench()
@@ -0,0 +1,84 @@
+"""
+python client for redten - a platform for building
+and testing distributed, self-hosted llms with
+native rag and reinforcement learning with
+human feedback (rlhf)
+
+submodules and their dependencies are imported
+on first attribute access so ``import client_aic``
+stays fast for command line tools:
+
+```python
+import client_aic
+
+client = client_aic.Client(collection_id="embed-security")
+```
+
+"""
+import importlib
+
+
+# public names -> (module, attribute)
+lazy_attrs = {
+    "AdaptiveLimiter": (
+        "client_aic.concurrency_limiter",
+        "AdaptiveLimiter",
+    ),
+    "Client": ("client_aic.client", "Client"),
+    "AsyncClient": (
+        "client_aic.async_client",
+        "AsyncClient",
+    ),
+    "PollPolicy": ("client_aic.poll_policy", "PollPolicy"),
+    "ResultCache": (
+        "client_aic.cache.result_cache",
+        "ResultCache",
+    ),
+    "ResultUploader": (
+        "client_aic.result_uploader",
+        "ResultUploader",
+    ),
+    "SimilarityIndex": (
+        "client_aic.cache.similarity_index",
+        "SimilarityIndex",
+    ),
+}
+
+__all__ = sorted(lazy_attrs)
+
+
+def __getattr__(name: str):
+    """
+    __getattr__
+
+    import a public class or a submodule
+    the first time it is used (pep 562)
+
+    :param name: attribute name
+
+    :returns: the class or submodule
+    """
+    if name in lazy_attrs:
+        (module_name, attr) = lazy_attrs[name]
+        value = getattr(
+            importlib.import_module(module_name), attr
+        )
+        globals()[name] = value
+        return value
+    if name.startswith("__"):
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}"
+        )
+    module_name = f"{__name__}.{name}"
+    try:
+        return importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        if e.name != module_name:
+            raise
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}"
+        ) from None
+
+
+def __dir__():
+    return sorted(set(globals()) | set(lazy_attrs))
@@ -1,17 +1,409 @@
 import os
-import time
 import logging
 import client_aic.get_cfg as get_cfg
 import client_aic.authenticate as auth
 import client_aic.req.ai.run_job_ask as run_job_ask
 import client_aic.req.ai.get_ai_result as get_ai_result
 import client_aic.req.job.get_job_result as get_job_result
+import client_aic.models.core_user as core_user
 import client_aic.models.core_result_job as core_result_job
 import client_aic.ppj as ppj
+import client_aic.poll_policy as poll_policy
+import client_aic.deadline as deadline_mod
+import client_aic.circuit_breaker as circuit_breaker
+import client_aic.single_flight as single_flight
+import client_aic.cache.result_cache as result_cache
 
 
 log = logging.getLogger(__name__)
 
+# in-flight asks shared by all threads
+ask_flights = single_flight.SingleFlight()
+
+
+def get_user_creds(
+    cfg: dict,
+    username: str = None,
+    password: str = None,
+    email: str = None,
+):
+    """
+    get_user_creds
+
+    fill in any missing credentials from the
+    environment variables and then the
+    **CoreConfig** dictionary
+
+    :param cfg: **CoreConfig** dictionary
+    :param username: optional - username for the rest api
+    :param password: optional - user password for the rest api
+    :param email: optional - user email for the rest api
+
+    :returns: tuple of (**username**, **password**,
+        **email**)
+    :rtype: tuple
+    """
+    cfg_user = cfg.get("user", {})
+    if not username:
+        username = os.getenv(
+            "AI_USERNAME", cfg_user.get("u", None)
+        )
+    if not password:
+        password = os.getenv(
+            "AI_PASSWORD", cfg_user.get("p", None)
+        )
+    if not email:
+        email = os.getenv(
+            "AI_EMAIL", cfg_user.get("e", None)
+        )
+    return (username, password, email)
+
+
+def build_prior_reply(
+    res_ai,
+    email: str = None,
+):
+    """
+    build_prior_reply
+
+    build the **ask** return tuple for a
+    **CoreResultAI** found in a local cache or
+    similarity index without logging in
+
+    :param res_ai: prior **CoreResultAI**
+    :param email: optional - user email for the rest api
+
+    :returns: (**CoreUser**, **CoreResultJob**,
+        **CoreResultAI**) where the **CoreUser**
+        has no **token**
+    :rtype: (CoreUser, CoreResultJob, CoreResultAI)
+    """
+    user = core_user.CoreUser(
+        id=res_ai.user_id,
+        email=email,
+        state=None,
+        verified=None,
+        role=None,
+        token=None,
+        msg="cached",
+    )
+    res_job = core_result_job.CoreResultJob(
+        job_id=res_ai.job_id,
+        user_id=res_ai.user_id,
+        state=res_ai.state,
+    )
+    return (user, res_job, res_ai)
+
+
+def get_prior_reply(
+    question: str,
+    job_params: dict,
+    cache=None,
+    similar=None,
+    email: str = None,
+):
+    """
+    get_prior_reply
+
+    look up a question in the **cache** and then
+    the **similar** index before logging in (both
+    skip answers older than their **ttl**)
+
+    :param question: question to ask the llm
+    :param job_params: **run_job_ask** arguments
+        including the **collection_id**
+    :param cache: optional - **ResultCache**
+    :param similar: optional - **SimilarityIndex**
+    :param email: optional - user email for the rest api
+
+    :returns: **build_prior_reply** tuple for a
+        prior **CoreResultAI** or **None** if the
+        question has to be asked
+    :rtype: (CoreUser, CoreResultJob, CoreResultAI)
+        or None
+    """
+    if cache is not None:
+        res_ai = cache.get(
+            result_cache.build_key(
+                question=question,
+                **job_params,
+            )
+        )
+        if res_ai:
+            log.debug(
+                f"cache hit ai_result_id={res_ai.id} "
+                f"for question='{question}'"
+            )
+            return build_prior_reply(res_ai, email)
+    if similar is not None:
+        (res_ai, score) = similar.query(
+            question,
+            **job_params,
+        )
+        if res_ai:
+            log.debug(
+                f"similar question score={score:.2f} "
+                f"ai_result_id={res_ai.id} "
+                f"for question='{question}'"
+            )
+            return build_prior_reply(res_ai, email)
+    return None
+
+
+def ask_as_user(
+    question: str,
+    user,
+    cfg: dict,
+    job_params: dict,
+    wait_for_result: bool = True,
+    policy: poll_policy.PollPolicy = None,
+    cache=None,
+    similar=None,
+    coalesce: bool = True,
+    deadline: deadline_mod.Deadline = None,
+):
+    """
+    ask_as_user
+
+    start a job for a logged in user (shared with
+    concurrent identical asks when **coalesce** is
+    set), wait for the **CoreResultAI** and add it
+    to the **cache** and the **similar** index
+
+    shared by **ask** and **Client.ask** after
+    **get_prior_reply** missed
+
+    :param question: question to ask the llm
+    :param user: authenticated **CoreUser**
+    :param cfg: **CoreConfig** dictionary
+    :param job_params: **run_job_ask** arguments
+        including the **collection_id**
+    :param wait_for_result: flag to wait
+        for the **CoreResultAI**
+    :param policy: optional - **PollPolicy**
+    :param cache: optional - **ResultCache**
+    :param similar: optional - **SimilarityIndex**
+    :param coalesce: flag to share one job with
+        concurrent identical asks
+    :param deadline: optional - **Deadline** for
+        submitting, polling and fetching
+
+    :returns: (**CoreResultJob**, **CoreResultAI**)
+        where either can be **None** on non-success
+    :rtype: (CoreResultJob, CoreResultAI)
+    """
+    cache_key = None
+    if cache is not None or (coalesce and wait_for_result):
+        cache_key = result_cache.build_key(
+            question=question,
+            **job_params,
+        )
+    if coalesce and wait_for_result:
+        flight_key = (
+            cfg.get("endpoint", None),
+            user.id,
+            cache_key,
+        )
+        ((res_job, res_ai), shared) = ask_flights.do(
+            flight_key,
+            submit_and_wait,
+            question=question,
+            user=user,
+            cfg=cfg,
+            job_params=job_params,
+            wait_for_result=wait_for_result,
+            policy=policy,
+            deadline=deadline,
+        )
+        if shared:
+            log.debug(
+                "shared in-flight job for "
+                f"question='{question}'"
+            )
+    else:
+        (res_job, res_ai) = submit_and_wait(
+            question=question,
+            user=user,
+            cfg=cfg,
+            job_params=job_params,
+            wait_for_result=wait_for_result,
+            policy=policy,
+            deadline=deadline,
+        )
+    if res_ai:
+        if cache is not None:
+            cache.put(cache_key, res_ai)
+        if similar is not None:
+            similar.add(question, res_ai, **job_params)
+    return (res_job, res_ai)
+
+
+def wait_for_ai_result(
+    job_id: int,
+    user,
+    cfg: dict = None,
+    policy: poll_policy.PollPolicy = None,
+    cancel=None,
+    deadline: deadline_mod.Deadline = None,
+):
+    """
+    wait_for_ai_result
+
+    poll for a job's result using the **policy**
+    and then get the job's **CoreResultAI**
+
+    :param job_id: **CoreJob.id** to wait on
+    :param user: authenticated **CoreUser**
+    :param cfg: optional - **CoreConfig** dictionary
+    :param policy: optional - **PollPolicy** with
+        the default backoff if not set
+    :param cancel: optional - **threading.Event**
+        to stop waiting on this job
+    :param deadline: optional - **Deadline** for
+        polling and fetching the result (stops
+        before the **policy** deadline if
+        it is earlier)
+
+    :returns: (**CoreResultJob**, **CoreResultAI**)
+        where the **CoreResultJob.num_polls** is the
+        number of polls it took or (**None**, **None**)
+        if the job hit the deadline or was cancelled
+    :rtype: (CoreResultJob, CoreResultAI)
+    """
+    res_job = None
+    res_ai = None
+    if not job_id or job_id < 1:
+        log.error(
+            "please use a positive integer "
+            f"job_id={job_id} value"
+        )
+        return (res_job, res_ai)
+    if not policy:
+        policy = poll_policy.PollPolicy()
+    log.debug(
+        "getting account.ai_result where "
+        f"job.id = {job_id}"
+    )
+    poller = policy.start(cancel=cancel, deadline=deadline)
+    try:
+        while not res_job:
+            if not poller.wait():
+                log.error(
+                    f"stopped waiting for job_id={job_id} "
+                    f"after polls={poller.polls}"
+                )
+                return (res_job, res_ai)
+            res_job = get_job_result.get_job_result(
+                id=job_id,
+                user=user,
+                cfg=cfg,
+                deadline=deadline,
+            )
+        res_job.num_polls = poller.polls
+        # get by the new result's parent job id
+        # that should be the same as job_id
+        res_ai = get_ai_result.get_ai_result(
+            id=res_job.job_id,
+            user=user,
+            cfg=cfg,
+            deadline=deadline,
+        )
+    except (
+        deadline_mod.DeadlineExceeded,
+        circuit_breaker.CircuitOpen,
+    ) as e:
+        log.error(
+            f"stopped waiting for job_id={job_id} "
+            f"after polls={poller.polls} with ex={e}"
+        )
+        return (res_job, res_ai)
+    if not res_ai:
+        log.error(
+            "failed getting ai result: "
+            f"job_id={res_job.id}"
+        )
+    return (res_job, res_ai)
+
+
+def submit_and_wait(
+    question: str,
+    user,
+    cfg: dict,
+    job_params: dict = None,
+    wait_for_result: bool = True,
+    policy: poll_policy.PollPolicy = None,
+    deadline: deadline_mod.Deadline = None,
+):
+    """
+    submit_and_wait
+
+    start one llm job and (optionally) wait
+    for the job's **CoreResultAI**
+
+    :param question: question to ask the llm
+    :param user: authenticated **CoreUser**
+    :param cfg: **CoreConfig** dictionary
+    :param job_params: optional - **run_job_ask**
+        arguments like **collection_id**
+    :param wait_for_result: flag to wait
+        for the **CoreResultAI**
+    :param policy: optional - **PollPolicy** with
+        the default backoff if not set
+    :param deadline: optional - **Deadline** for
+        submitting, polling and fetching
+
+    :returns: (**CoreResultJob**, **CoreResultAI**)
+        where either can be **None** on non-success
+    :rtype: (CoreResultJob, CoreResultAI)
+    """
+    res_job = None
+    res_ai = None
+    try:
+        create_job_res = run_job_ask.run_job_ask(
+            question=question,
+            user=user,
+            cfg=cfg,
+            deadline=deadline,
+            **(job_params or {}),
+        )
+    except (
+        deadline_mod.DeadlineExceeded,
+        circuit_breaker.CircuitOpen,
+    ) as e:
+        log.error(f"failed to start job with ex={e}")
+        return (res_job, res_ai)
+    if not create_job_res:
+        log.error("failed to start job ")
+        return (res_job, res_ai)
+    job_id = int(create_job_res.id)
+    if not wait_for_result:
+        log.debug(f"not waiting for job_id={job_id}")
+        res_job = core_result_job.CoreResultJob(
+            job_id=job_id,
+            user_id=user.id,
+            state=create_job_res.state,
+        )
+        return (res_job, res_ai)
+    (res_job, res_ai) = wait_for_ai_result(
+        job_id=job_id,
+        user=user,
+        cfg=cfg,
+        policy=policy,
+        deadline=deadline,
+    )
+    if not res_job:
+        res_job = core_result_job.CoreResultJob(
+            job_id=job_id,
+            user_id=user.id,
+            state=create_job_res.state,
+        )
+        return (res_job, res_ai)
+    if not res_ai:
+        log.error(
+            "failed getting ai result: " f"job_id={job_id}"
+        )
+    return (res_job, res_ai)
+
 
 def ask(
     question: str,
@@ -22,7 +414,13 @@ def ask(
     job_params: dict = None,
     cfg_core: dict = None,
     wait_for_result: bool = True,
-    wait_interval: float = 2.0,
+    wait_interval: float = None,
+    policy: poll_policy.PollPolicy = None,
+    cache=None,
+    similar=None,
+    coalesce: bool = True,
+    timeout: float = None,
+    deadline: deadline_mod.Deadline = None,
 ):
     """
     ask
@@ -54,6 +452,43 @@ def ask(
     :param wait_interval: float - optional - how
         many seconds to wait before trying to get the
         **CoreResultAI** record from the rest api
+        (a fixed interval that replaces the
+        default backoff in **policy**)
+    :param policy: optional - **PollPolicy**
+        for how often and how long to poll for
+        the job result. the number of polls
+        is stored in the returned
+        **CoreResultJob.num_polls**
+    :param cache: optional - **ResultCache** to
+        check before logging in and starting a job.
+        a cache hit returns the cached **CoreResultAI**
+        with no network round trips (the returned
+        **CoreUser** is not logged in and
+        has no **token**) and new results
+        are added to the cache
+    :param similar: optional - **SimilarityIndex**
+        to check after the **cache**. a question that
+        is a near-duplicate of a prior question (same
+        code with different whitespace, variable names
+        or line order) returns the prior
+        **CoreResultAI** the same way as a cache hit
+        and new results are added to the index
+    :param coalesce: optional flag - with default
+        set to **True**. When **True** concurrent
+        calls (from other threads) asking the same
+        question with the same **job_params** share one
+        job and one polling loop and all get the
+        same **CoreResultAI**
+    :param timeout: optional - overall seconds for
+        logging in, submitting the job, polling
+        and fetching the **CoreResultAI** (each
+        request only waits for the remaining
+        budget so a caller with a 30 second sla
+        gets an answer or an error in 30 seconds)
+    :param deadline: optional - **Deadline** shared
+        with the caller (replaces the **timeout**).
+        a coalesced ask uses the deadline of the
+        caller that started the shared job
 
     :returns: on success (**CoreUser**, **CoreResultAI**,
         **CoreResultAI**) versus non-success can return
@@ -67,25 +502,30 @@ def ask(
     cfg = cfg_core
     if not cfg_core:
         cfg = get_cfg.get_cfg()
-    cfg_user = cfg.get("user", {})
-    if not username:
-        username = os.getenv(
-            "AI_USERNAME", cfg_user.get("u", None)
-        )
-    if not password:
-        password = os.getenv(
-            "AI_PASSWORD", cfg_user.get("p", None)
-        )
-    if not email:
-        email = os.getenv(
-            "AI_EMAIL", cfg_user.get("e", None)
-        )
+    deadline = deadline_mod.get_deadline(deadline, timeout)
+    (username, password, email) = get_user_creds(
+        cfg=cfg,
+        username=username,
+        password=password,
+        email=email,
+    )
     missing_env_vars = []
     if not question or len(question) < 4:
         log.error(
             "please ask a question more than 4 characters"
         )
         return (user, res_job, res_ai)
+    use_params = dict(job_params or {})
+    use_params["collection_id"] = collection_id
+    prior_reply = get_prior_reply(
+        question=question,
+        job_params=use_params,
+        cache=cache,
+        similar=similar,
+        email=email,
+    )
+    if prior_reply:
+        return prior_reply
     if not email:
         missing_env_vars.append("AI_EMAIL")
     if not password:
@@ -104,6 +544,7 @@ def ask(
         email=email,
         password=password,
         cfg=cfg,
+        deadline=deadline,
     )
     if not user:
         log.error(f"failed to login as user: {username}")
@@ -115,91 +556,35 @@ def ask(
         "there could be a lot of users on the system "
         "at this time"
     )
-    create_job_res = run_job_ask.run_job_ask(
+    if not policy:
+        if wait_interval:
+            policy = poll_policy.PollPolicy.fixed(
+                wait_interval
+            )
+        else:
+            policy = poll_policy.PollPolicy()
+    (res_job, res_ai) = ask_as_user(
         question=question,
         user=user,
-        collection_id=collection_id,
         cfg=cfg,
+        job_params=use_params,
+        wait_for_result=wait_for_result,
+        policy=policy,
+        cache=cache,
+        similar=similar,
+        coalesce=coalesce,
+        deadline=deadline,
     )
-    if not create_job_res:
-        log.error("failed to start job ")
-        return (user, res_job, res_ai)
-    job_id = int(create_job_res.id)
-    if wait_for_result:
-        log.debug(
-            f"waiting for job_id={job_id} "
-            f"to finish sleeping {wait_interval}s "
-            "per retry"
-        )
-    else:
-        log.debug(f"not waiting for job_id={job_id}")
-        res_job = core_result_job.CoreResultJob(
-            job_id=job_id,
-            user_id=user.id,
-            state=create_job_res.state,
-        )
+    if not res_ai:
         return (user, res_job, res_ai)
-
-    if job_id:
-        if job_id < 1:
-            log.error(
-                "please use a positive integer "
-                f"job_id={job_id} value"
-            )
-            return (user, res_job, res_ai)
+    if debug:
         log.debug(
-            "getting account.ai_result where "
-            f"job.id = {job_id}"
-        )
-        not_done = True
-        while not_done:
-            res_job = get_job_result.get_job_result(
-                id=job_id, user=user, cfg=cfg
-            )
-            if not res_job:
-                if wait_for_result:
-                    log.debug(
-                        f"waiting job_id={job_id} "
-                        f"{wait_interval}s"
-                    )
-                    time.sleep(wait_interval)
-                    continue
-                else:
-                    log.error(
-                        f"did not find the job_id={job_id}"
-                    )
-                    return (user, res_job, res_ai)
-            # get by the new result's parent job id
-            # that should be the same as job_id
-            res_ai = get_ai_result.get_ai_result(
-                id=res_job.job_id,
-                user=user,
-                cfg=cfg,
-            )
-            if not res_ai:
-                log.error(
-                    "failed getting ai result: "
-                    f"job_id={res_job.id}"
-                )
-                return (user, res_job, res_ai)
-            if debug:
-                log.debug(
-                    f"got ai result id={res_ai.id} "
-                    f"answer={res_ai.answer} "
-                    f"job_id={res_job.job_id}"
-                    f"job_result_id={res_job.id}"
-                    f"answer: {res_ai.answer}"
-                )
-            not_done = False
-        # end of while
-    else:
-        log.error("no job_id detected on command line")
-
-    if not res_ai:
-        log.error(
-            "failed getting ai result: " f"job_id={job_id}"
+            f"got ai result id={res_ai.id} "
+            f"answer={res_ai.answer} "
+            f"job_id={res_job.job_id}"
+            f"job_result_id={res_job.id}"
+            f"answer: {res_ai.answer}"
         )
-        return (user, res_job, res_ai)
     if user and res_job and res_ai:
         if debug:
             log.debug(
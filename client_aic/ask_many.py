@@ -0,0 +1,464 @@
+import time
+import heapq
+import logging
+import concurrent.futures
+import client_aic.get_cfg as get_cfg
+import client_aic.ask as ask
+import client_aic.poll_policy as poll_policy
+import client_aic.concurrency_limiter as concurrency_limiter
+import client_aic.cache.result_cache as result_cache
+import client_aic.authenticate as auth
+import client_aic.req.ai.run_job_ask as run_job_ask
+import client_aic.req.ai.get_ai_result as get_ai_result
+import client_aic.req.job.get_job_result as get_job_result
+import client_aic.models.core_result_job as core_result_job
+
+
+log = logging.getLogger(__name__)
+
+
+def ask_many(
+    questions,
+    collection_id: str,
+    email: str = None,
+    password: str = None,
+    username: str = None,
+    job_params: dict = None,
+    cfg_core: dict = None,
+    concurrency: int = 10,
+    max_workers: int = None,
+    wait_interval: float = None,
+    policy: poll_policy.PollPolicy = None,
+    cache=None,
+    limiter: concurrency_limiter.AdaptiveLimiter = None,
+):
+    """
+    ask_many
+
+    ask the llm many questions with at most
+    **concurrency** jobs in flight at a time
+
+    the user is authenticated once, then one
+    scheduler submits new jobs as older ones finish
+    and polls all outstanding job ids from a shared
+    thread pool over the pooled transport
+
+    results are yielded as each job completes
+    (not in the order of **questions**):
+
+    ```python
+    import client_aic.ask_many as ask_many
+
+    for (question, res_job, res_ai) in ask_many.ask_many(
+        questions=questions,
+        collection_id="embed-security",
+        concurrency=50,
+    ):
+        if res_ai:
+            print(res_ai.answer)
+    ```
+
+    :param questions: iterable of questions to ask
+    :param collection_id: embedding alias name
+        to use for the rag source data
+    :param email: optional - user email for the rest api
+    :param password: optional - user password for the rest api
+    :param username: optional - username for the rest api
+    :param job_params: optional - llm question
+        properties and attributes for every job
+    :param cfg_core: optional - **CoreConfig** dictionary
+    :param concurrency: max number of jobs in
+        flight at the same time
+    :param max_workers: optional - max threads sending
+        requests at the same time (defaults to
+        **concurrency** up to 32). please size the
+        connection pool (**AI_POOL_MAXSIZE**) to match
+    :param wait_interval: float - optional - how
+        many seconds to wait between polls
+        for each job (a fixed interval that
+        replaces the default backoff in **policy**)
+    :param policy: optional - **PollPolicy** shared
+        by all jobs. a job that hits the policy's
+        deadline yields (**question**,
+        **CoreResultJob**, **None**)
+    :param cache: optional - **ResultCache** where
+        cached answers are yielded without starting
+        a job and new results are added
+    :param limiter: optional - **AdaptiveLimiter**
+        that adjusts the jobs in flight (up to
+        **concurrency**) from the submit latency,
+        job completion time and errors
+
+    :returns: generator of (**question**,
+        **CoreResultJob**, **CoreResultAI**) tuples
+        where a failed question yields
+        (**question**, **None**, **None**) or
+        (**question**, **CoreResultJob**, **None**)
+    :rtype: generator
+    """
+    cfg = cfg_core
+    if not cfg_core:
+        cfg = get_cfg.get_cfg()
+    (username, password, email) = ask.get_user_creds(
+        cfg=cfg,
+        username=username,
+        password=password,
+        email=email,
+    )
+    user = auth.authenticate(
+        username=username,
+        email=email,
+        password=password,
+        cfg=cfg,
+    )
+    if not user:
+        log.error(f"failed to login as user: {username}")
+        return
+    use_params = dict(job_params or {})
+    use_params["collection_id"] = collection_id
+    if not policy and wait_interval:
+        policy = poll_policy.PollPolicy.fixed(wait_interval)
+    yield from run_questions(
+        questions=questions,
+        user=user,
+        cfg=cfg,
+        job_params=use_params,
+        concurrency=concurrency,
+        max_workers=max_workers,
+        policy=policy,
+        cache=cache,
+        limiter=limiter,
+    )
+
+
+def run_questions(
+    questions,
+    user,
+    cfg: dict,
+    job_params: dict,
+    **kwargs,
+):
+    """
+    run_questions
+
+    ask each question with **run_jobs** keyed by
+    its (index, question) so a question that is in
+    **questions** more than once is tracked as
+    its own job
+
+    :param questions: iterable of questions to ask
+    :param user: authenticated **CoreUser**
+    :param cfg: **CoreConfig** dictionary
+    :param job_params: **run_job_ask** arguments
+        for every job
+    :param kwargs: passed to **run_jobs**
+
+    :returns: generator of (**question**,
+        **CoreResultJob**, **CoreResultAI**) tuples
+    :rtype: generator
+    """
+    jobs = (
+        (
+            (idx, question),
+            dict(job_params, question=question),
+            None,
+        )
+        for idx, question in enumerate(questions)
+    )
+    for (_, question), res_job, res_ai in run_jobs(
+        jobs=jobs,
+        user=user,
+        cfg=cfg,
+        **kwargs,
+    ):
+        yield (question, res_job, res_ai)
+
+
+def run_jobs(
+    jobs,
+    user,
+    cfg: dict = None,
+    concurrency: int = 10,
+    max_workers: int = None,
+    policy: poll_policy.PollPolicy = None,
+    on_submit=None,
+    cache=None,
+    limiter: concurrency_limiter.AdaptiveLimiter = None,
+):
+    """
+    run_jobs
+
+    scheduler for running many **run_job_ask** jobs
+    with at most **concurrency** jobs in flight
+
+    each job is a (**key**, **job_params**, **job_id**)
+    tuple where the **key** is unique per job (like
+    a line number) and **job_params** are the
+    **run_job_ask.run_job_ask** arguments
+    (including the **question**). set the
+    **job_id** to resume polling a job that was
+    already submitted instead of submitting it again
+
+    :param jobs: iterable of (**key**,
+        **job_params**, **job_id** or **None**) tuples
+    :param user: authenticated **CoreUser**
+    :param cfg: optional - **CoreConfig** dictionary
+    :param concurrency: max number of jobs in
+        flight at the same time
+    :param max_workers: optional - max threads sending
+        requests at the same time (defaults to
+        **concurrency** up to 32)
+    :param policy: optional - **PollPolicy** shared
+        by all jobs
+    :param on_submit: optional - callback
+        **on_submit(key, CoreJob)** that runs as soon as
+        a job is created and before it is polled
+    :param cache: optional - **ResultCache** to check
+        before submitting each new job. a hit yields
+        (**key**, **CoreResultJob**, **CoreResultAI**)
+        right away and new results are added
+    :param limiter: optional - **AdaptiveLimiter**
+        for the max jobs in flight (capped at
+        **concurrency**). each submit, finished job
+        and timeout is reported to it
+
+    :returns: generator of (**key**,
+        **CoreResultJob**, **CoreResultAI**) tuples
+    :rtype: generator
+    """
+    if concurrency < 1:
+        concurrency = 1
+    if not max_workers:
+        max_workers = min(concurrency, 32)
+    if not policy:
+        policy = poll_policy.PollPolicy()
+
+    pending = iter(jobs)
+    no_more_jobs = False
+    num_in_flight = 0
+    # heap of (next poll time, seq, key, job_id, poller)
+    polls = []
+    seq = 0
+    # future -> (kind, key, value for the next step)
+    futures = {}
+    # key -> cache key for jobs that missed the cache
+    cache_keys = {}
+    # key -> submit time for jobs started by this run
+    submitted_at = {}
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers,
+        thread_name_prefix="run_jobs",
+    )
+    try:
+        while True:
+            max_in_flight = concurrency
+            if limiter is not None:
+                max_in_flight = min(
+                    concurrency, limiter.get_limit()
+                )
+            while (
+                not no_more_jobs
+                and num_in_flight < max_in_flight
+            ):
+                job = next(pending, None)
+                if job is None:
+                    no_more_jobs = True
+                    break
+                (key, job_params, job_id) = job
+                num_in_flight += 1
+                if job_id:
+                    # resume polling an existing job
+                    poller = policy.start()
+                    seq += 1
+                    heapq.heappush(
+                        polls,
+                        (
+                            time.monotonic()
+                            + (poller.next_delay() or 0.0),
+                            seq,
+                            key,
+                            int(job_id),
+                            poller,
+                        ),
+                    )
+                    continue
+                question = job_params.get("question", None)
+                if not question or len(question) < 4:
+                    log.error(
+                        "please ask a question "
+                        "more than 4 characters"
+                    )
+                    num_in_flight -= 1
+                    yield (key, None, None)
+                    continue
+                if cache is not None:
+                    cache_key = result_cache.build_key(
+                        **job_params
+                    )
+                    res_ai = cache.get(cache_key)
+                    if res_ai:
+                        num_in_flight -= 1
+                        yield (
+                            key,
+                            core_result_job.CoreResultJob(
+                                job_id=res_ai.job_id,
+                                user_id=res_ai.user_id,
+                                state=res_ai.state,
+                            ),
+                            res_ai,
+                        )
+                        continue
+                    cache_keys[key] = cache_key
+                fut = executor.submit(
+                    run_job_ask.run_job_ask,
+                    user=user,
+                    cfg=cfg,
+                    **job_params,
+                )
+                futures[fut] = (
+                    "submit",
+                    key,
+                    time.monotonic(),
+                )
+            now = time.monotonic()
+            while polls and polls[0][0] <= now:
+                (
+                    _,
+                    _,
+                    key,
+                    job_id,
+                    poller,
+                ) = heapq.heappop(polls)
+                fut = executor.submit(
+                    get_job_result.get_job_result,
+                    id=job_id,
+                    user=user,
+                    cfg=cfg,
+                )
+                futures[fut] = (
+                    "poll",
+                    key,
+                    (job_id, poller),
+                )
+            if not futures and not polls:
+                break
+            timeout = None
+            if polls:
+                timeout = max(0.0, polls[0][0] - now)
+            if not futures:
+                time.sleep(timeout)
+                continue
+            (done, _) = concurrent.futures.wait(
+                futures,
+                timeout=timeout,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for fut in done:
+                (kind, key, val) = futures.pop(fut)
+                error = None
+                try:
+                    res = fut.result()
+                except Exception as e:
+                    log.error(
+                        f"failed {kind} for "
+                        f'key="{key}" with ex="{e}"'
+                    )
+                    res = None
+                    error = e
+                if limiter is not None:
+                    if kind == "submit":
+                        limiter.on_submit(
+                            latency=time.monotonic() - val,
+                            ok=bool(res),
+                            error=error,
+                        )
+                    elif error is not None and isinstance(
+                        error,
+                        concurrency_limiter.get_timeout_errors(),
+                    ):
+                        limiter.on_timeout()
+                if kind == "submit":
+                    if not res:
+                        num_in_flight -= 1
+                        cache_keys.pop(key, None)
+                        yield (key, None, None)
+                        continue
+                    submitted_at[key] = val
+                    if on_submit:
+                        on_submit(key, res)
+                    # schedule the first poll for the new
+                    # job the same way as a missed poll
+                    job_id = int(res.id)
+                    val = (job_id, policy.start())
+                    kind = "poll"
+                    res = None
+                if kind == "poll":
+                    (job_id, poller) = val
+                    if not res:
+                        delay = poller.next_delay()
+                        if delay is None:
+                            log.error(
+                                "stopped waiting for "
+                                f"job_id={job_id} after "
+                                f"polls={poller.polls}"
+                            )
+                            num_in_flight -= 1
+                            cache_keys.pop(key, None)
+                            submitted_at.pop(key, None)
+                            if limiter is not None:
+                                limiter.on_timeout()
+                            yield (
+                                key,
+                                core_result_job.CoreResultJob(
+                                    job_id=job_id,
+                                    user_id=user.id,
+                                    num_polls=poller.polls,
+                                ),
+                                None,
+                            )
+                            continue
+                        seq += 1
+                        heapq.heappush(
+                            polls,
+                            (
+                                time.monotonic() + delay,
+                                seq,
+                                key,
+                                job_id,
+                                poller,
+                            ),
+                        )
+                        continue
+                    res.num_polls = poller.polls
+                    started_at = submitted_at.pop(key, None)
+                    if (
+                        limiter is not None
+                        and started_at is not None
+                    ):
+                        limiter.on_complete(
+                            time.monotonic() - started_at
+                        )
+                    fetch = executor.submit(
+                        get_ai_result.get_ai_result,
+                        id=res.job_id,
+                        user=user,
+                        cfg=cfg,
+                    )
+                    futures[fetch] = (
+                        "fetch",
+                        key,
+                        res,
+                    )
+                elif kind == "fetch":
+                    num_in_flight -= 1
+                    cache_key = cache_keys.pop(key, None)
+                    if res and cache_key:
+                        cache.put(cache_key, res)
+                    yield (key, val, res)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if limiter is not None:
+            log.info(
+                "adaptive concurrency "
+                f"stats={limiter.get_stats()}"
+            )
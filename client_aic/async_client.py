@@ -0,0 +1,1270 @@
+"""
+asyncio client for asking the llm questions
+and tracking jobs without blocking the event loop
+
+requires the optional **httpx** dependency:
+
+```bash
+pip install llama-client-aic[async]
+```
+
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+import ujson as json
+import client_aic.get_cfg as get_cfg
+import client_aic.token_manager as token_manager
+import client_aic.req.auth.login as login
+import client_aic.tls.utils as tls_utils
+import client_aic.poll_policy as poll_policy
+import client_aic.retry_policy as retry_policy
+import client_aic.rate_limiter as rate_limiter
+import client_aic.concurrency_limiter as concurrency_limiter
+import client_aic.circuit_breaker as circuit_breaker
+import client_aic.config.get_breaker as get_breaker
+import client_aic.config.get_hedge as get_hedge
+import client_aic.config.get_retry as get_retry
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.deadline as deadline_mod
+import client_aic.single_flight as single_flight
+import client_aic.transport.attempts as attempts
+import client_aic.cache.result_cache as result_cache
+import client_aic.req.ai.run_job_ask as run_job_ask
+import client_aic.req.ai.update_ai_result as update_ai_result
+import client_aic.models.core_job as core_job
+import client_aic.models.core_result_ai as core_result_ai
+import client_aic.models.core_result_job as core_result_job
+import client_aic.models.core_search_result_ai as core_search_result_ai
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+log = logging.getLogger(__name__)
+
+
+class AsyncClient:
+    """AsyncClient"""
+
+    def __init__(
+        self,
+        email: str = None,
+        password: str = None,
+        username: str = None,
+        cfg: dict = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        retry: retry_policy.RetryPolicy = None,
+        adaptive_limiter: concurrency_limiter.AdaptiveLimiter = None,
+    ):
+        """
+        __init__
+
+        non-blocking rest api client that shares
+        one keep-alive connection pool across all
+        coroutines so a single event loop can
+        track thousands of in-flight jobs
+
+        ```python
+        async with AsyncClient() as client:
+            (user, res_job, res_ai) = await client.ask(
+                question=question,
+                collection_id="embed-security",
+            )
+        ```
+
+        :param email: optional - user email for the rest api
+        :param password: optional - user password
+            for the rest api
+        :param username: optional - username for the rest api
+        :param cfg: optional - **CoreConfig** dictionary
+        :param max_connections: max concurrent
+            connections in the pool
+        :param max_keepalive_connections: max idle
+            keep-alive connections to hold open
+        :param retry: optional - **RetryPolicy** for
+            all requests (defaults to the
+            **cfg["retry"]** or the **AI_RETRY_***
+            environment variables)
+        :param adaptive_limiter: optional -
+            **AdaptiveLimiter** for the max jobs in
+            **submit_and_wait** at the same time
+            (coroutines past the limit wait for a slot)
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncClient requires httpx - please "
+                "pip install llama-client-aic[async]"
+            )
+        if not cfg:
+            cfg = get_cfg.get_cfg()
+        cfg_user = cfg.get("user", {})
+        self.cfg = cfg
+        self.username = username or os.getenv(
+            "AI_USERNAME", cfg_user.get("u", None)
+        )
+        self.password = password or os.getenv(
+            "AI_PASSWORD", cfg_user.get("p", None)
+        )
+        self.email = email or os.getenv(
+            "AI_EMAIL", cfg_user.get("e", None)
+        )
+        self.base_url = f'https://{cfg["endpoint"]}'
+        self.max_connections = max_connections
+        self.max_keepalive_connections = (
+            max_keepalive_connections
+        )
+        self.retry = retry or get_retry.get_retry_policy(
+            cfg
+        )
+        self.limiter = rate_limiter.get_rate_limiter(cfg)
+        self.breakers = get_breaker.get_circuit_breakers(
+            cfg
+        )
+        self.hedge = get_hedge.get_hedge_policy(cfg)
+        self.adaptive_limiter = adaptive_limiter
+        self.num_in_flight = 0
+        self.slots = asyncio.Condition()
+        self.user = None
+        self.refresh_at = 0.0
+        self.client = None
+        self.login_lock = asyncio.Lock()
+        self.flights = single_flight.AsyncSingleFlight()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def get_client(self):
+        """
+        get_client
+
+        get (or lazily build) the shared
+        **httpx.AsyncClient** connection pool
+
+        :returns: shared **httpx.AsyncClient**
+        :rtype: httpx.AsyncClient
+        """
+        if self.client is None:
+            (cert_file, key_file) = tls_utils.get_certs(
+                self.cfg
+            )
+            verify = tls_utils.get_verify(self.cfg)
+            cert = None
+            if cert_file and key_file:
+                cert = (cert_file, key_file)
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                verify=verify or True,
+                cert=cert,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=(
+                        self.max_keepalive_connections
+                    ),
+                ),
+            )
+        return self.client
+
+    async def close(self):
+        """
+        close
+
+        close all pooled connections
+        """
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def login(
+        self,
+        deadline: deadline_mod.Deadline = None,
+        stale_token: str = None,
+    ):
+        """
+        login
+
+        authenticate once over the shared
+        connection pool and reuse the **CoreUser**
+        for all later requests until its token is
+        about to expire (the refresh timing is the
+        same as the **TokenManager**)
+
+        like **authenticate.authenticate** the first
+        login uses the locally-saved credentials file
+        when there is no email and password, and
+        creates the user if the login fails
+
+        :param deadline: optional - **Deadline**
+            for logging in
+        :param stale_token: optional - token that got
+            a **401** and must not be reused
+
+        :returns: **CoreUser** on success
+            **None** on non-success
+        :rtype: CoreUser or None
+        """
+        if stale_token is None and self.is_fresh():
+            return self.user
+        async with self.login_lock:
+            if self.is_fresh() and (
+                stale_token is None
+                or self.user.token != stale_token
+            ):
+                # another coroutine already logged in
+                return self.user
+            new_user = await self.login_user(
+                force=self.user is not None,
+                deadline=deadline,
+            )
+            if not new_user:
+                return None
+            if self.user is None:
+                self.user = new_user
+            else:
+                # objects holding the user pick
+                # up the new token
+                self.user.id = new_user.id
+                self.user.token = new_user.token
+                self.user.auth_header = None
+            (_, self.refresh_at) = self.get_refresh_at(
+                self.user.token
+            )
+        return self.user
+
+    def is_fresh(self):
+        """
+        is_fresh
+
+        :returns: **True** if the user's token is
+            not about to expire
+        :rtype: bool
+        """
+        return (
+            self.user is not None
+            and time.time() < self.refresh_at
+        )
+
+    def get_refresh_at(
+        self,
+        token: str,
+    ):
+        """
+        get_refresh_at
+
+        :param token: auth token
+
+        :returns: (expires_at, refresh_at)
+            epoch times from the **TokenManager**
+            settings in the **cfg**
+        :rtype: tuple
+        """
+        return token_manager.get_token_manager(
+            self.cfg
+        ).get_refresh_at(token)
+
+    async def login_user(
+        self,
+        force: bool = False,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        login_user
+
+        log in (creating the user if needed)
+        without blocking the event loop (please
+        see **authenticate.login_user**)
+
+        :param force: flag to skip the
+            locally-saved credentials file
+        :param deadline: optional - **Deadline**
+            shared by the login requests
+
+        :returns: **CoreUser** on success
+            **None** on non-success
+        :rtype: CoreUser or None
+        """
+        if not force and not (self.email or self.password):
+            user = login.get_saved_user(self.cfg)
+            if user:
+                (_, refresh_at) = self.get_refresh_at(
+                    user.token
+                )
+                if refresh_at > time.time():
+                    return user
+                log.debug("saved token expired")
+        if not (self.email and self.password):
+            log.error(
+                "token expired - please set the "
+                "AI_EMAIL and AI_PASSWORD "
+                "environment variables to "
+                "log in again"
+            )
+            return None
+        try:
+            user = await self.post_login(deadline=deadline)
+            if user or force:
+                return user
+            username = self.username
+            if not username:
+                use_uuid = str(uuid.uuid4()).replace(
+                    "-", ""
+                )
+                username = f"rt.2023.{use_uuid}"
+            log.debug(f"creating user email={self.email}")
+            await self.send(
+                "POST",
+                "/user",
+                route="user",
+                deadline=deadline,
+                auth=False,
+                content=json.dumps(
+                    {
+                        "username": username,
+                        "email": self.email,
+                        "password": self.password,
+                    }
+                ),
+            )
+            user = await self.post_login(deadline=deadline)
+            if not user:
+                return None
+            log.debug("validating access with token")
+            r = await self.send(
+                "GET",
+                f"/user/{user.id}",
+                route="user_by_id",
+                deadline=deadline,
+                user=user,
+            )
+            if r.status_code != 200:
+                log.error(
+                    f"failed to get user.id={user.id}"
+                )
+                return None
+            return user
+        except (
+            deadline_mod.DeadlineExceeded,
+            circuit_breaker.CircuitOpen,
+        ):
+            raise
+        except Exception as e:
+            log.error(
+                f"failed to auth user={self.email} "
+                f'with e="{e}"'
+            )
+        return None
+
+    async def post_login(
+        self,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        post_login
+
+        get a new token for the email
+        and password
+
+        :param deadline: optional - **Deadline**
+            for the request
+
+        :returns: **CoreUser** on success
+            **None** on non-success
+        :rtype: CoreUser or None
+        """
+        r = await self.send(
+            "POST",
+            "/login",
+            route="login",
+            deadline=deadline,
+            auth=False,
+            # a login only issues a new token
+            idempotent=True,
+            content=json.dumps(
+                {
+                    "email": self.email,
+                    "password": self.password,
+                }
+            ),
+        )
+        return login.load_login_response(
+            r,
+            email=self.email,
+            url=f"{self.base_url}/login",
+            debug=self.cfg.get("debug", False),
+        )
+
+    async def send(
+        self,
+        method: str,
+        path: str,
+        route: str = "default",
+        timeout=None,
+        headers: dict = None,
+        idempotent: bool = None,
+        deadline: deadline_mod.Deadline = None,
+        hedge: bool = False,
+        **kwargs,
+    ):
+        """
+        send
+
+        send an authenticated request over the
+        shared connection pool and retry once
+        with a new token after a **401** response
+
+        connection errors, timeouts and transient
+        responses are retried with the client's
+        **RetryPolicy** when the request is
+        idempotent. requests fail fast while the
+        endpoint's circuit is open and idempotent
+        reads sent with **hedge=True** are hedged
+        (please see **CoreTransport.request**)
+
+        :param method: http method
+        :param path: url path under the api endpoint
+        :param route: route name for the
+            (**connect**, **read**) timeout profile
+            and the rate limit
+        :param timeout: optional - seconds or a
+            (**connect**, **read**) tuple that
+            replaces the **route** profile
+        :param headers: optional - extra headers
+        :param idempotent: optional - flag to
+            override if the request is safe to
+            send again
+        :param deadline: optional - **Deadline** that
+            caps the **timeout** of every attempt
+        :param hedge: optional - flag to hedge
+            this idempotent read
+        :param kwargs: passed to
+            **AsyncClient.send_once** (like **user**
+            and **auth**) and
+            **httpx.AsyncClient.request**
+
+        :returns: **httpx.Response**
+        :rtype: httpx.Response
+        :raises DeadlineExceeded: if the **deadline**
+            passed before an attempt was sent or
+            the rate limit would pass it
+        :raises CircuitOpen: if the endpoint's
+            circuit is open
+        """
+        if timeout is None:
+            timeout = get_timeouts.get_timeout(
+                self.cfg, route
+            )
+        retry = self.retry
+        if idempotent is None:
+            idempotent = retry.is_idempotent(
+                method, headers
+            )
+        breaker = None
+        if self.breakers is not None:
+            breaker = self.breakers.get(
+                self.base_url, route=route
+            )
+        hedge = hedge and self.hedge is not None
+        tries = attempts.Attempts(
+            retry=retry,
+            idempotent=idempotent,
+            breaker=breaker,
+            deadline=deadline,
+        )
+        while True:
+            if (
+                self.limiter is not None
+                and not await self.limiter.async_acquire(
+                    route, max_wait=tries.get_max_wait()
+                )
+            ):
+                tries.on_rate_limited(route)
+            use_timeout = tries.start(timeout)
+            if isinstance(use_timeout, (tuple, list)):
+                use_timeout = httpx.Timeout(
+                    use_timeout[1], connect=use_timeout[0]
+                )
+            try:
+                if hedge:
+                    r = await self.send_hedged(
+                        method,
+                        path,
+                        route=route,
+                        breaker=breaker,
+                        deadline=deadline,
+                        timeout=use_timeout,
+                        headers=headers,
+                        **kwargs,
+                    )
+                else:
+                    r = await self.send_once(
+                        method,
+                        path,
+                        timeout=use_timeout,
+                        headers=headers,
+                        **kwargs,
+                    )
+            except Exception as e:
+                delay = tries.on_error(e)
+                if delay is None:
+                    raise
+                log.debug(
+                    f"retrying {method} {path} "
+                    f"attempt={tries.attempt} "
+                    f"in {delay:.2f}s after ex={e}"
+                )
+                await asyncio.sleep(delay)
+                continue
+            delay = tries.on_response(r)
+            if delay is None:
+                return r
+            log.debug(
+                f"retrying {method} {path} "
+                f"attempt={tries.attempt} in {delay:.2f}s "
+                f"after code={r.status_code}"
+            )
+            await asyncio.sleep(delay)
+
+    async def send_hedged(
+        self,
+        method: str,
+        path: str,
+        route: str,
+        breaker: circuit_breaker.CircuitBreaker = None,
+        deadline: deadline_mod.Deadline = None,
+        **kwargs,
+    ):
+        """
+        send_hedged
+
+        send one attempt of an idempotent read and
+        send it again if there is no response after
+        the **hedge** delay for the route. the first
+        response wins and the other one is cancelled
+        (please see **CoreTransport.send_hedged**)
+
+        :param method: http method
+        :param path: url path under the api endpoint
+        :param route: route name from **ROUTES**
+        :param breaker: optional - **CircuitBreaker**
+            for the endpoint
+        :param deadline: optional - **Deadline**
+            for the request
+        :param kwargs: see **AsyncClient.send_once**
+
+        :returns: **httpx.Response**
+        :rtype: httpx.Response
+        """
+        delay = self.hedge.get_delay(route)
+        if delay is None or (
+            deadline is not None
+            and not deadline.has_budget(delay)
+        ):
+            return await self.send_timed(
+                method, path, route=route, **kwargs
+            )
+        first = asyncio.ensure_future(
+            self.send_timed(
+                method, path, route=route, **kwargs
+            )
+        )
+        (done, _) = await asyncio.wait(
+            {first}, timeout=delay
+        )
+        if (
+            done
+            or (
+                breaker is not None
+                and not breaker.is_closed()
+            )
+            or (
+                self.limiter is not None
+                and not await self.limiter.async_acquire(
+                    route, max_wait=0.0
+                )
+            )
+        ):
+            return await first
+        log.debug(
+            f"hedging {method} {path} after {delay:.3f}s"
+        )
+        second = asyncio.ensure_future(
+            self.send_timed(
+                method, path, route=route, **kwargs
+            )
+        )
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                (done, pending) = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge.on_hedge(
+                            won=task is second
+                        )
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        self.hedge.on_hedge(won=False)
+        raise error
+
+    async def send_timed(
+        self,
+        method: str,
+        path: str,
+        route: str,
+        **kwargs,
+    ):
+        """
+        send_timed
+
+        send one attempt of a request and add its
+        latency to the **hedge** history for the
+        route (5xx responses are not added)
+
+        :param method: http method
+        :param path: url path under the api endpoint
+        :param route: route name from **ROUTES**
+        :param kwargs: see **AsyncClient.send_once**
+
+        :returns: **httpx.Response**
+        :rtype: httpx.Response
+        """
+        started_at = time.monotonic()
+        r = await self.send_once(method, path, **kwargs)
+        if r.status_code < 500:
+            self.hedge.record(
+                route, time.monotonic() - started_at
+            )
+        return r
+
+    async def send_once(
+        self,
+        method: str,
+        path: str,
+        timeout=5,
+        headers: dict = None,
+        user=None,
+        auth: bool = True,
+        **kwargs,
+    ):
+        """
+        send_once
+
+        send one attempt of a request with a token
+        that is refreshed before it expires and
+        retry once with a new token after a
+        **401** response
+
+        :param method: http method
+        :param path: url path under the api endpoint
+        :param timeout: seconds or **httpx.Timeout**
+            to wait for the response
+        :param headers: optional - extra headers
+        :param user: optional - **CoreUser** to send
+            the token for instead of the client's
+            user (like when validating a login)
+        :param auth: flag to send the client's
+            token (**False** for the login requests)
+        :param kwargs: passed to
+            **httpx.AsyncClient.request**
+
+        :returns: **httpx.Response**
+        :rtype: httpx.Response
+        """
+        refresh = auth and user is None
+        if refresh:
+            user = await self.login()
+        use_headers = {}
+        if user:
+            use_headers["Bearer"] = f"{user.token}"
+        if headers:
+            use_headers.update(headers)
+        r = await self.get_client().request(
+            method,
+            path,
+            headers=use_headers,
+            timeout=timeout,
+            **kwargs,
+        )
+        if (
+            r.status_code == 401
+            and refresh
+            and user
+            and await self.login(
+                stale_token=use_headers["Bearer"]
+            )
+        ):
+            log.debug(
+                f"retrying after refreshing token: {path}"
+            )
+            use_headers["Bearer"] = f"{user.token}"
+            r = await self.get_client().request(
+                method,
+                path,
+                headers=use_headers,
+                timeout=timeout,
+                **kwargs,
+            )
+        return r
+
+    async def run_job_ask(
+        self,
+        question: str,
+        deadline: deadline_mod.Deadline = None,
+        **job_params,
+    ):
+        """
+        run_job_ask
+
+        ask the llm a question and get a **CoreJob**
+        for tracking the progress
+
+        :param question: question to ask the llm
+        :param deadline: optional - **Deadline**
+            for the request
+        :param job_params: optional - llm question
+            properties and attributes (please see
+            **run_job_ask.run_job_ask**)
+
+        :returns: **CoreJob** on success
+            **None** on non-success
+        :rtype: CoreJob or None
+        """
+        user = await self.login()
+        if not user:
+            return None
+        use_params = dict(job_params)
+        idempotency_key = use_params.pop(
+            "idempotency_key", None
+        )
+        if not idempotency_key:
+            idempotency_key = uuid.uuid4().hex
+        use_req = run_job_ask.build_job_ask_req(
+            question=question,
+            user=user,
+            idempotency_key=idempotency_key,
+            **use_params,
+        )
+        r = await self.send(
+            "POST",
+            "/job",
+            route="job",
+            deadline=deadline,
+            content=json.dumps(use_req),
+            headers={
+                retry_policy.IDEMPOTENCY_HEADER: idempotency_key,
+            },
+        )
+        if r.status_code not in (200, 201):
+            log.error(
+                "non-201 response: "
+                f"code: {r.status_code} text: {r.text}"
+            )
+            return None
+        try:
+            cur_json = json.loads(r.text)
+            return core_job.CoreJob.from_dict(cur_json)
+        except Exception as e:
+            log.error(
+                f'failed to run ask job with ex="{e}"'
+            )
+        return None
+
+    async def get_job_result(
+        self,
+        id: int,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        get_job_result
+
+        get the user's job result by the **CoreJob.id**
+
+        :param id: CoreJob.id for an existing user job
+        :param deadline: optional - **Deadline**
+            for the request
+
+        :returns: **CoreResultJob** on success
+            **None** on non-success
+        :rtype: CoreResultJob or None
+        """
+        user = await self.login()
+        if not user:
+            return None
+        data = {"user_id": user.id, "job_id": id}
+        r = await self.send(
+            "GET",
+            f"/job/result/{id}",
+            route="job_result",
+            deadline=deadline,
+            hedge=True,
+            content=json.dumps(data),
+        )
+        if r.status_code != 200:
+            return None
+        try:
+            cur_json = json.loads(r.text)
+            return core_result_job.CoreResultJob.from_dict(
+                cur_json
+            )
+        except Exception as e:
+            log.error(
+                f'failed to get job_result.id={id} with ex="{e}"'
+            )
+        return None
+
+    async def get_ai_result(
+        self,
+        id: int,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        get_ai_result
+
+        get the ai result by the **CoreJob.id** value
+
+        :param id: look up this **CoreJob.id**'s
+            ai results
+        :param deadline: optional - **Deadline**
+            for the request
+
+        :returns: **CoreResultAI** on success
+            **None** on non-success
+        :rtype: CoreResultAI or None
+        """
+        user = await self.login()
+        if not user:
+            return None
+        data = {"user_id": user.id, "job_id": id}
+        r = await self.send(
+            "GET",
+            f"/ai/result/{id}",
+            route="ai_result_by_id",
+            deadline=deadline,
+            hedge=True,
+            content=json.dumps(data),
+        )
+        if r.status_code != 200:
+            log.error(
+                "non-200 response: "
+                f"job_id: {id} "
+                f"code: {r.status_code} text: {r.text}"
+            )
+            return None
+        try:
+            cur_o = core_result_ai.CoreResultAI()
+            cur_o.load_response_dict(
+                rec_dict=json.loads(r.text)
+            )
+            return cur_o
+        except Exception as e:
+            log.error(
+                f'failed to get ai_result.id={id} with ex="{e}"'
+            )
+        return None
+
+    async def search_ai_results(
+        self,
+        data: dict,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        search_ai_results
+
+        search for ai results within the database
+
+        :param data: request values dictionary
+        :param deadline: optional - **Deadline**
+            for the request
+
+        :returns: **CoreSearchResultAI** on success
+            **None** on non-success
+        :rtype: CoreSearchResultAI or None
+        """
+        r = await self.send(
+            "POST",
+            "/ai/result/search",
+            route="ai_result_search",
+            deadline=deadline,
+            json=data,
+            idempotent=True,
+        )
+        if r.status_code != 200:
+            log.error(
+                "non-200 response: "
+                f"code: {r.status_code} text: {r.text}"
+            )
+            return None
+        try:
+            cur_o = (
+                core_search_result_ai.CoreSearchResultAI()
+            )
+            cur_o.load_response_dict(
+                rec_dict=json.loads(r.text)
+            )
+            return cur_o
+        except Exception as e:
+            log.error(
+                f'failed to search ai results with ex="{e}"'
+            )
+        return None
+
+    async def update_ai_result(
+        self,
+        ai_result: core_result_ai.CoreResultAI,
+        partial: bool = True,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        update_ai_result
+
+        update an existing ai result like for
+        submitting the **reviewed_answer**
+        and **reviewed_score**
+
+        only the changed fields are sent with
+        a PATCH when the **ai_result** was loaded
+        from the rest api (please see
+        **update_ai_result.update_ai_result**)
+
+        :param ai_result: in-memory object with
+            values to send to the database
+        :param partial: flag to only send the
+            changed fields
+        :param deadline: optional - **Deadline**
+            for the request
+
+        :returns: **CoreResultAI** on success
+            **None** on non-success
+        :rtype: CoreResultAI or None
+        """
+        url = f"{self.base_url}/ai/result"
+        patch_data = update_ai_result.get_update_data(
+            url, ai_result, partial
+        )
+        if patch_data == {}:
+            return ai_result
+        if patch_data:
+            r = await self.send(
+                "PATCH",
+                "/ai/result",
+                route="ai_result",
+                deadline=deadline,
+                json=patch_data,
+                idempotent=True,
+            )
+            (
+                done,
+                cur_o,
+            ) = update_ai_result.on_patch_response(
+                url, ai_result, r
+            )
+            if done:
+                return cur_o
+        r = await self.send(
+            "PUT",
+            "/ai/result",
+            route="ai_result",
+            deadline=deadline,
+            json=ai_result.get_dict(),
+        )
+        return update_ai_result.on_put_response(
+            url, ai_result, r
+        )
+
+    async def ask(
+        self,
+        question: str,
+        collection_id: str,
+        job_params: dict = None,
+        wait_for_result: bool = True,
+        wait_interval: float = None,
+        policy: poll_policy.PollPolicy = None,
+        coalesce: bool = True,
+        timeout: float = None,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        ask
+
+        ask the llm a question and wait for the
+        results without blocking the event loop
+
+        :param question: question to ask the llm
+        :param collection_id: embedding alias name
+            to use for the rag source data
+        :param job_params: optional - llm question
+            properties and attributes
+        :param wait_for_result: optional flag -
+            with default set to **True**.
+            When **False** this returns as soon
+            as the job is created
+        :param wait_interval: float - optional - how
+            many seconds to wait before trying to get the
+            **CoreResultAI** record from the rest api
+            (a fixed interval that replaces the
+            default backoff in **policy**)
+        :param policy: optional - **PollPolicy**
+            for how often and how long to poll for
+            the job result. the number of polls
+            is stored in the returned
+            **CoreResultJob.num_polls**
+        :param coalesce: optional flag - with default
+            set to **True**. When **True** concurrent
+            coroutines asking the same question with the
+            same **job_params** share one job and one
+            polling loop and all get the
+            same **CoreResultAI**
+        :param timeout: optional - overall seconds
+            for the login, submit, polls and fetch
+        :param deadline: optional - **Deadline**
+            shared with the caller (replaces
+            the **timeout**)
+
+        :returns: on success (**CoreUser**, **CoreResultJob**,
+            **CoreResultAI**) versus non-success can return
+            (**None**, **None**, **None**)
+        :rtype: (CoreUser, CoreResultJob, CoreResultAI)
+        """
+        res_job = None
+        res_ai = None
+        if not question or len(question) < 4:
+            log.error(
+                "please ask a question more than 4 characters"
+            )
+            return (None, res_job, res_ai)
+        deadline = deadline_mod.get_deadline(
+            deadline, timeout
+        )
+        user = await self.login(deadline=deadline)
+        if not user:
+            log.error(
+                f"failed to login as user: {self.email}"
+            )
+            return (user, res_job, res_ai)
+        use_params = dict(job_params or {})
+        use_params["collection_id"] = collection_id
+        if not policy:
+            if wait_interval:
+                policy = poll_policy.PollPolicy.fixed(
+                    wait_interval
+                )
+            else:
+                policy = poll_policy.PollPolicy()
+        if coalesce and wait_for_result:
+            flight_key = result_cache.build_key(
+                question=question,
+                **use_params,
+            )
+            ((res_job, res_ai), _) = await self.flights.do(
+                flight_key,
+                self.submit_and_wait,
+                question=question,
+                job_params=use_params,
+                wait_for_result=wait_for_result,
+                policy=policy,
+                deadline=deadline,
+            )
+        else:
+            (res_job, res_ai) = await self.submit_and_wait(
+                question=question,
+                job_params=use_params,
+                wait_for_result=wait_for_result,
+                policy=policy,
+                deadline=deadline,
+            )
+        return (user, res_job, res_ai)
+
+    async def submit_and_wait(
+        self,
+        question: str,
+        job_params: dict = None,
+        wait_for_result: bool = True,
+        policy: poll_policy.PollPolicy = None,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        submit_and_wait
+
+        start one llm job and (optionally) wait
+        for the job's **CoreResultAI**
+
+        :param question: question to ask the llm
+        :param job_params: optional - **run_job_ask**
+            arguments like **collection_id**
+        :param wait_for_result: flag to wait
+            for the **CoreResultAI**
+        :param policy: optional - **PollPolicy** with
+            the default backoff if not set
+        :param deadline: optional - **Deadline** for
+            submitting, polling and fetching
+
+        :returns: (**CoreResultJob**, **CoreResultAI**)
+            where either can be **None** on non-success
+        :rtype: (CoreResultJob, CoreResultAI)
+        """
+        limiter = self.adaptive_limiter
+        if limiter is None:
+            return await self.run_and_wait(
+                question=question,
+                job_params=job_params,
+                wait_for_result=wait_for_result,
+                policy=policy,
+                deadline=deadline,
+            )
+        async with self.slots:
+            await self.slots.wait_for(
+                lambda: self.num_in_flight
+                < limiter.get_limit()
+            )
+            self.num_in_flight += 1
+        try:
+            return await self.run_and_wait(
+                question=question,
+                job_params=job_params,
+                wait_for_result=wait_for_result,
+                policy=policy,
+                deadline=deadline,
+            )
+        finally:
+            async with self.slots:
+                self.num_in_flight -= 1
+                self.slots.notify_all()
+
+    async def run_and_wait(
+        self,
+        question: str,
+        job_params: dict = None,
+        wait_for_result: bool = True,
+        policy: poll_policy.PollPolicy = None,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        run_and_wait
+
+        **submit_and_wait** without waiting for
+        a slot from the **adaptive_limiter** (the
+        submit, the job completion time and any
+        timeouts are still reported to it)
+
+        :param question: question to ask the llm
+        :param job_params: optional - **run_job_ask**
+            arguments like **collection_id**
+        :param wait_for_result: flag to wait
+            for the **CoreResultAI**
+        :param policy: optional - **PollPolicy** with
+            the default backoff if not set
+        :param deadline: optional - **Deadline** for
+            submitting, polling and fetching
+
+        :returns: (**CoreResultJob**, **CoreResultAI**)
+            where either can be **None** on non-success
+        :rtype: (CoreResultJob, CoreResultAI)
+        """
+        res_job = None
+        res_ai = None
+        user = self.user
+        limiter = self.adaptive_limiter
+        if not policy:
+            policy = poll_policy.PollPolicy()
+        started_at = time.monotonic()
+        try:
+            create_job_res = await self.run_job_ask(
+                question=question,
+                deadline=deadline,
+                **(job_params or {}),
+            )
+        except Exception as e:
+            if limiter is not None:
+                limiter.on_submit(
+                    latency=time.monotonic() - started_at,
+                    ok=False,
+                    error=e,
+                )
+            if not isinstance(
+                e,
+                (
+                    deadline_mod.DeadlineExceeded,
+                    circuit_breaker.CircuitOpen,
+                ),
+            ):
+                raise
+            log.error(f"failed to start job with ex={e}")
+            return (res_job, res_ai)
+        if limiter is not None:
+            limiter.on_submit(
+                latency=time.monotonic() - started_at,
+                ok=bool(create_job_res),
+            )
+        if not create_job_res:
+            log.error("failed to start job")
+            return (res_job, res_ai)
+        job_id = int(create_job_res.id)
+        if not wait_for_result:
+            res_job = core_result_job.CoreResultJob(
+                job_id=job_id,
+                user_id=user.id,
+                state=create_job_res.state,
+            )
+            return (res_job, res_ai)
+        poller = policy.start(deadline=deadline)
+        try:
+            while not res_job:
+                if not await poller.async_wait():
+                    log.error(
+                        f"stopped waiting for job_id={job_id} "
+                        f"after polls={poller.polls}"
+                    )
+                    if limiter is not None:
+                        limiter.on_timeout()
+                    break
+                res_job = await self.get_job_result(
+                    id=job_id, deadline=deadline
+                )
+            if res_job:
+                res_job.num_polls = poller.polls
+                if limiter is not None:
+                    limiter.on_complete(
+                        time.monotonic() - started_at
+                    )
+                res_ai = await self.get_ai_result(
+                    id=res_job.job_id, deadline=deadline
+                )
+        except (
+            deadline_mod.DeadlineExceeded,
+            circuit_breaker.CircuitOpen,
+        ) as e:
+            log.error(
+                f"stopped waiting for job_id={job_id} "
+                f"after polls={poller.polls} with ex={e}"
+            )
+            if limiter is not None:
+                limiter.on_timeout()
+        if not res_job:
+            res_job = core_result_job.CoreResultJob(
+                job_id=job_id,
+                user_id=user.id,
+                state=create_job_res.state,
+                num_polls=poller.polls,
+            )
+            return (res_job, res_ai)
+        if not res_ai:
+            log.error(
+                "failed getting ai result: "
+                f"job_id={job_id}"
+            )
+        return (res_job, res_ai)
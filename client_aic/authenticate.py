@@ -4,6 +4,8 @@ import client_aic.get_cfg as get_cfg
 import client_aic.req.auth.login as login
 import client_aic.req.user.create_user as create_user
 import client_aic.req.user.get_user as get_user
+import client_aic.token_manager as token_manager
+import client_aic.deadline as deadline_mod
 
 
 log = logging.getLogger(__name__)
@@ -15,6 +17,8 @@ def authenticate(
     password: str = None,
     auto_create: bool = True,
     cfg: dict = None,
+    use_token_cache: bool = True,
+    deadline: deadline_mod.Deadline = None,
 ):
     """
     authenticate
@@ -25,6 +29,11 @@ def authenticate(
     cfg dictionary. requires using
     credentials from one or the other.
 
+    the **CoreUser** is kept in memory by the
+    shared **TokenManager** so later calls reuse
+    the token without any network round trips
+    until it is about to expire
+
     :param username: optional username
     :param email: optional email
     :param password: optional password
@@ -32,6 +41,68 @@ def authenticate(
         creating a user if they do not exist
         already and the default is **True**
     :param cfg: optional **CoreConfig** dictionary
+    :param use_token_cache: optional flag for
+        reusing the in-memory token and the
+        default is **True**. When **False**
+        this always logs in again
+    :param deadline: optional - **Deadline** for
+        logging in (a cached token needs
+        no requests)
+
+    :returns: **CoreUser** if success
+        **None** if non-success
+    :rtype: CoreUser
+    """
+    if not cfg:
+        cfg = get_cfg.get_cfg()
+    if not use_token_cache:
+        return login_user(
+            username=username,
+            email=email,
+            password=password,
+            auto_create=auto_create,
+            cfg=cfg,
+            deadline=deadline,
+        )
+    return token_manager.get_token_manager(cfg).get_user(
+        username=username,
+        email=email,
+        password=password,
+        auto_create=auto_create,
+        cfg=cfg,
+        deadline=deadline,
+    )
+
+
+def login_user(
+    username: str = None,
+    email: str = None,
+    password: str = None,
+    auto_create: bool = True,
+    cfg: dict = None,
+    force: bool = False,
+    deadline: deadline_mod.Deadline = None,
+):
+    """
+    login_user
+
+    log in (creating the user if needed) and
+    validate the new token with one **get_user**
+    call. please use **authenticate** to reuse
+    the token across calls
+
+    :param username: optional username
+    :param email: optional email
+    :param password: optional password
+    :param auto_create: optional flag for
+        creating a user if they do not exist
+        already and the default is **True**
+    :param cfg: optional **CoreConfig** dictionary
+    :param force: optional flag to skip the
+        locally-saved credentials file (like
+        when the saved token expired)
+    :param deadline: optional - **Deadline**
+        shared by the login requests
 
     :returns: **CoreUser** if success
         **None** if non-success
@@ -54,14 +125,16 @@ def authenticate(
 
     user = None
     try:
-        user = login.login(
-            email=email,
-            password=password,
-            cfg=cfg,
-            # force = support for saving a new token
-            # locally again in case the old one expired
-            force=False,
-        )
+        if not force:
+            user = login.login(
+                email=email,
+                password=password,
+                cfg=cfg,
+                # force = support for saving a new token
+                # locally again in case the old one expired
+                force=False,
+                deadline=deadline,
+            )
         if not user:
             if not use_username:
                 use_uuid = str(uuid.uuid4()).replace(
@@ -77,6 +150,7 @@ def authenticate(
                     password=use_password,
                     email=use_email,
                     cfg=cfg,
+                    deadline=deadline,
                 )
             log.debug(
                 "trying to login with force "
@@ -89,12 +163,14 @@ def authenticate(
                 # force = support for saving a new token
                 # locally again in case the old one expired
                 force=True,
+                deadline=deadline,
             )
             log.debug("validating access with token")
             found_user = get_user.get_user(
                 id=user.id,
                 user=user,
                 cfg=cfg,
+                deadline=deadline,
             )
             if not found_user:
                 log.error(
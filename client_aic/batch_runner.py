@@ -0,0 +1,323 @@
+"""
+durable, resumable batch runner for
+asking the llm every question in a
+json lines file
+
+each line in the input file is a dictionary
+of **run_job_ask.run_job_ask** arguments:
+
+```json
+{"question": "what is a buffer overflow?", "collection_id": "embed-security"}
+{"question": "what is a use after free?", "max_tokens": 1024}
+```
+
+(lines without a **collection_id** use the
+**collection_id** argument)
+
+every line's progress is appended to a journal
+(defaults to **INPUT_FILE.journal**) so a restarted
+batch resumes polling jobs it already submitted
+instead of submitting them again. each line's
+**idempotency_key** is journaled before its job
+is submitted so a submit that was interrupted
+is sent again with the same key
+"""
+import uuid
+import hashlib
+import logging
+import ujson as json
+import client_aic.get_cfg as get_cfg
+import client_aic.ask as ask
+import client_aic.ask_many as ask_many
+import client_aic.authenticate as auth
+import client_aic.journal as journal
+import client_aic.poll_policy as poll_policy
+import client_aic.concurrency_limiter as concurrency_limiter
+
+
+log = logging.getLogger(__name__)
+
+
+def read_jobs(
+    input_path: str,
+    entries: dict,
+    collection_id: str = None,
+    retry_failed: bool = False,
+    summary: dict = None,
+    digests: dict = None,
+):
+    """
+    read_jobs
+
+    read the input file and build the
+    (**key**, **job_params**, **job_id**) jobs
+    for **ask_many.run_jobs** skipping lines the
+    journal already finished
+
+    :param input_path: path to the json lines file
+    :param entries: latest journal entry per line
+        from **Journal.load**
+    :param collection_id: optional - default
+        **collection_id** for lines without one
+    :param retry_failed: flag to retry lines
+        that failed in an earlier run. lines with a
+        journaled **job_id** are polled again and
+        lines without one are submitted again
+        (with the journaled **idempotency_key**
+        if there is one)
+    :param summary: optional - counters dictionary
+        to update with skipped lines
+    :param digests: optional - dictionary to fill
+        with each line's sha1 digest for
+        detecting input files that changed
+        between runs
+
+    :returns: generator of (**key**,
+        **job_params**, **job_id**) tuples
+    :rtype: generator
+    """
+    if summary is None:
+        summary = {}
+    if digests is None:
+        digests = {}
+    with open(input_path, "r") as fp:
+        for line_no, line in enumerate(fp, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = entries.get(line_no, None)
+            digest = hashlib.sha1(
+                line.encode("utf-8")
+            ).hexdigest()
+            digests[line_no] = digest
+            if entry and entry.get("sha1") != digest:
+                log.error(
+                    f"line={line_no} changed since it "
+                    "was journaled - please only append "
+                    f"to the input file={input_path}"
+                )
+            state = None
+            job_id = None
+            if entry:
+                state = entry.get("state", None)
+                job_id = entry.get("job_id", None)
+            if state == "done":
+                summary["skipped"] = (
+                    summary.get("skipped", 0) + 1
+                )
+                continue
+            if state == "failed" and not retry_failed:
+                summary["skipped"] = (
+                    summary.get("skipped", 0) + 1
+                )
+                continue
+            if job_id and state in ["submitted", "failed"]:
+                # the job already exists so poll it
+                # instead of paying for a duplicate job
+                yield (line_no, {}, job_id)
+                continue
+            try:
+                job_params = json.loads(line)
+            except Exception as e:
+                log.error(
+                    f"invalid json on line={line_no} "
+                    f'with ex="{e}"'
+                )
+                yield (line_no, {}, None)
+                continue
+            if collection_id:
+                job_params.setdefault(
+                    "collection_id", collection_id
+                )
+            idempotency_key = None
+            if entry:
+                idempotency_key = entry.get(
+                    "idempotency_key", None
+                )
+            job_params.setdefault(
+                "idempotency_key",
+                idempotency_key or uuid.uuid4().hex,
+            )
+            yield (line_no, job_params, None)
+
+
+def run_batch(
+    input_path: str,
+    journal_path: str = None,
+    collection_id: str = None,
+    email: str = None,
+    password: str = None,
+    username: str = None,
+    cfg_core: dict = None,
+    concurrency: int = 10,
+    policy: poll_policy.PollPolicy = None,
+    retry_failed: bool = False,
+    limiter: concurrency_limiter.AdaptiveLimiter = None,
+):
+    """
+    run_batch
+
+    ask the llm every question in the
+    **input_path** json lines file with at most
+    **concurrency** jobs in flight and journal
+    each line's state:
+
+    - **submitting** - the job is about to be
+      submitted (with the **idempotency_key**)
+    - **submitted** - the job was created
+      (with the **job_id**)
+    - **done** - the **CoreResultAI** was found
+    - **failed** - the job could not be created
+      or finished without a result
+
+    re-running the same batch resumes from the
+    journal - finished lines are skipped,
+    submitted lines are polled
+    using the journaled **job_id** and
+    submitting lines are sent again with the
+    journaled **idempotency_key** so the rest
+    api can deduplicate them
+
+    :param input_path: path to the json lines file
+    :param journal_path: optional - path to the
+        journal file (defaults to
+        **INPUT_FILE.journal**)
+    :param collection_id: optional - default
+        **collection_id** for lines without one
+    :param email: optional - user email for the rest api
+    :param password: optional - user password for the rest api
+    :param username: optional - username for the rest api
+    :param cfg_core: optional - **CoreConfig** dictionary
+    :param concurrency: max number of jobs in
+        flight at the same time
+    :param policy: optional - **PollPolicy** shared
+        by all jobs
+    :param retry_failed: flag to retry lines
+        that failed in an earlier run. lines with a
+        journaled **job_id** are polled again and
+        lines without one are submitted again
+    :param limiter: optional - **AdaptiveLimiter**
+        that adjusts the jobs in flight (up to
+        **concurrency**)
+
+    :returns: summary dictionary with the
+        **done**, **failed** and **skipped** counts
+        or **None** if the login failed
+    :rtype: dict
+    """
+    cfg = cfg_core
+    if not cfg_core:
+        cfg = get_cfg.get_cfg()
+    if not journal_path:
+        journal_path = f"{input_path}.journal"
+    (username, password, email) = ask.get_user_creds(
+        cfg=cfg,
+        username=username,
+        password=password,
+        email=email,
+    )
+    user = auth.authenticate(
+        username=username,
+        email=email,
+        password=password,
+        cfg=cfg,
+    )
+    if not user:
+        log.error(f"failed to login as user: {username}")
+        return None
+    jrnl = journal.Journal(journal_path)
+    entries = jrnl.load()
+    summary = {
+        "done": 0,
+        "failed": 0,
+        "skipped": 0,
+    }
+    digests = {}
+
+    def on_submit(key, job):
+        jrnl.write(
+            key,
+            "submitted",
+            job_id=int(job.id),
+            sha1=digests.get(key, None),
+        )
+
+    # key -> idempotency key for jobs
+    # that are being submitted
+    idempotency_keys = {}
+
+    def journal_jobs(jobs):
+        # jobs are read right before they are
+        # submitted so the key is journaled first
+        for key, job_params, job_id in jobs:
+            if not job_id and job_params:
+                idempotency_key = job_params[
+                    "idempotency_key"
+                ]
+                idempotency_keys[key] = idempotency_key
+                jrnl.write(
+                    key,
+                    "submitting",
+                    idempotency_key=idempotency_key,
+                    sha1=digests.get(key, None),
+                )
+            yield (key, job_params, job_id)
+
+    log.info(
+        f"starting batch={input_path} "
+        f"journal={journal_path} "
+        f"concurrency={concurrency}"
+    )
+    jobs = read_jobs(
+        input_path=input_path,
+        entries=entries,
+        collection_id=collection_id,
+        retry_failed=retry_failed,
+        summary=summary,
+        digests=digests,
+    )
+    try:
+        for key, res_job, res_ai in ask_many.run_jobs(
+            jobs=journal_jobs(jobs),
+            user=user,
+            cfg=cfg,
+            concurrency=concurrency,
+            policy=policy,
+            on_submit=on_submit,
+            limiter=limiter,
+        ):
+            job_id = None
+            if res_job:
+                job_id = res_job.job_id
+            idempotency_key = idempotency_keys.pop(
+                key, None
+            )
+            if res_ai:
+                summary["done"] += 1
+                jrnl.write(
+                    key,
+                    "done",
+                    job_id=job_id,
+                    ai_result_id=res_ai.id,
+                    sha1=digests.get(key, None),
+                )
+            else:
+                summary["failed"] += 1
+                # keep the key so a retried submit
+                # can still be deduplicated
+                jrnl.write(
+                    key,
+                    "failed",
+                    job_id=job_id,
+                    idempotency_key=idempotency_key,
+                    sha1=digests.get(key, None),
+                )
+    finally:
+        jrnl.close()
+    log.info(
+        f"finished batch={input_path} "
+        f"done={summary['done']} "
+        f"failed={summary['failed']} "
+        f"skipped={summary['skipped']}"
+    )
+    return summary
@@ -0,0 +1,404 @@
+"""
+opt-in local cache for llm answers keyed by
+the normalized question and every llm/rag
+parameter in the **POST /job** **ask** payload
+
+- in-memory lru tier
+- optional on-disk sqlite tier
+- ttl and size-based eviction
+- hit/miss counters
+
+"""
+import time
+import hashlib
+import logging
+import threading
+import collections
+import ujson as json
+import client_aic.req.ai.run_job_ask as run_job_ask
+import client_aic.models.core_result_ai as core_result_ai
+
+
+log = logging.getLogger(__name__)
+
+
+def normalize_question(question: str):
+    """
+    normalize_question
+
+    collapse all whitespace runs in the question
+    to one space so formatting-only changes
+    map to the same cache key
+
+    :param question: question for the llm
+
+    :returns: normalized question
+    :rtype: str
+    """
+    if not question:
+        return ""
+    return " ".join(question.split())
+
+
+def build_key(
+    question: str,
+    **job_params,
+):
+    """
+    build_key
+
+    build the cache key for a question using the
+    same **ask** payload that **run_job_ask** sends
+    so every llm and rag parameter (including the
+    defaults) is part of the key (except the
+    **idempotency_key**)
+
+    :param question: question for the llm
+    :param job_params: optional - **run_job_ask**
+        arguments like **collection_id**
+        and **model_name**
+
+    :returns: sha256 hex digest
+    :rtype: str
+    """
+    use_req = run_job_ask.build_job_ask_req(
+        question=normalize_question(question),
+        **job_params,
+    )
+    use_ask = use_req["ask"]
+    # the idempotency key is unique per submit
+    # so it is not part of the question's key
+    use_ask["data"].pop("idempotency_key", None)
+    return hashlib.sha256(
+        json.dumps(
+            use_ask,
+            sort_keys=True,
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+class ResultCache:
+    """ResultCache"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 86400.0,
+        db_path: str = None,
+        max_db_entries: int = 100000,
+    ):
+        """
+        __init__
+
+        two-tier **CoreResultAI** cache that is safe
+        to share across threads. lookups check
+        the in-memory lru first and then the
+        sqlite file (if **db_path** is set)
+        and disk hits are promoted back into memory
+
+        ```python
+        import client_aic.ask as ask
+        import client_aic.cache.result_cache as result_cache
+
+        cache = result_cache.ResultCache(
+            db_path="/tmp/llm-results.db"
+        )
+        (user, res_job, res_ai) = ask.ask(
+            question=question,
+            collection_id="embed-security",
+            cache=cache,
+        )
+        log.info(cache.get_stats())
+        ```
+
+        :param max_entries: max results to
+            keep in memory
+        :param ttl: seconds a result stays valid
+            (**None** to never expire)
+        :param db_path: optional - path to a sqlite
+            file for the on-disk tier
+        :param max_db_entries: max results to keep
+            on disk (least recently used
+            are removed first)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.max_db_entries = max_db_entries
+        self.lock = threading.Lock()
+        self.memory = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.db = None
+        self.num_db_entries = 0
+        if db_path:
+            # only load sqlite for the on-disk tier
+            import sqlite3
+
+            self.db = sqlite3.connect(
+                db_path,
+                check_same_thread=False,
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS ai_result_cache ("
+                "key TEXT PRIMARY KEY, "
+                "expires_at REAL, "
+                "accessed_at REAL, "
+                "value TEXT)"
+            )
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS "
+                "ai_result_cache_accessed_at "
+                "ON ai_result_cache (accessed_at)"
+            )
+            self.db.commit()
+            self.num_db_entries = self.db.execute(
+                "SELECT COUNT(*) FROM ai_result_cache"
+            ).fetchone()[0]
+
+    def get(
+        self,
+        key: str,
+    ):
+        """
+        get
+
+        get a cached result without any
+        network round trips
+
+        :param key: cache key from **build_key**
+
+        :returns: **CoreResultAI** on a hit
+            or **None** on a miss
+        :rtype: CoreResultAI or None
+        """
+        now = time.time()
+        rec_dict = None
+        with self.lock:
+            node = self.memory.get(key, None)
+            if node:
+                (expires_at, rec_dict) = node
+                if (
+                    expires_at is not None
+                    and expires_at <= now
+                ):
+                    del self.memory[key]
+                    rec_dict = None
+                else:
+                    self.memory.move_to_end(key)
+                    self.memory_hits += 1
+            if rec_dict is None and self.db:
+                rec_dict = self.get_from_db(key, now)
+                if rec_dict is not None:
+                    self.disk_hits += 1
+            if rec_dict is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        cur_o = core_result_ai.CoreResultAI.from_dict(
+            rec_dict
+        )
+        return cur_o
+
+    def get_from_db(
+        self,
+        key: str,
+        now: float,
+    ):
+        """
+        get_from_db
+
+        look up the sqlite tier and promote
+        a hit into memory (call with the **lock**)
+
+        :param key: cache key
+        :param now: current epoch time
+
+        :returns: result dictionary or **None**
+        :rtype: dict or None
+        """
+        row = self.db.execute(
+            "SELECT expires_at, value FROM ai_result_cache "
+            "WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if not row:
+            return None
+        (expires_at, value) = row
+        if expires_at is not None and expires_at <= now:
+            self.db.execute(
+                "DELETE FROM ai_result_cache WHERE key = ?",
+                (key,),
+            )
+            self.db.commit()
+            self.num_db_entries -= 1
+            return None
+        self.db.execute(
+            "UPDATE ai_result_cache SET accessed_at = ? "
+            "WHERE key = ?",
+            (now, key),
+        )
+        self.db.commit()
+        rec_dict = json.loads(value)
+        self.put_in_memory(key, expires_at, rec_dict)
+        return rec_dict
+
+    def put(
+        self,
+        key: str,
+        res_ai: core_result_ai.CoreResultAI,
+    ):
+        """
+        put
+
+        cache a **CoreResultAI** in every tier
+
+        :param key: cache key from **build_key**
+        :param res_ai: **CoreResultAI** to cache
+        """
+        if not res_ai:
+            return
+        now = time.time()
+        expires_at = None
+        if self.ttl is not None:
+            expires_at = now + self.ttl
+        rec_dict = res_ai.get_dict()
+        with self.lock:
+            self.put_in_memory(key, expires_at, rec_dict)
+            if self.db:
+                # rowcount is 1 for an insert and for
+                # a replace so check for the key first
+                exists = self.db.execute(
+                    "SELECT 1 FROM ai_result_cache "
+                    "WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                self.db.execute(
+                    "INSERT OR REPLACE INTO ai_result_cache "
+                    "(key, expires_at, accessed_at, value) "
+                    "VALUES (?, ?, ?, ?)",
+                    (
+                        key,
+                        expires_at,
+                        now,
+                        json.dumps(rec_dict),
+                    ),
+                )
+                if not exists:
+                    self.num_db_entries += 1
+                self.evict_db()
+                self.db.commit()
+
+    def put_in_memory(
+        self,
+        key: str,
+        expires_at: float,
+        rec_dict: dict,
+    ):
+        """
+        put_in_memory
+
+        add to the lru tier and evict the least
+        recently used results (call with the **lock**)
+
+        :param key: cache key
+        :param expires_at: epoch time the
+            result expires or **None**
+        :param rec_dict: result dictionary
+        """
+        self.memory[key] = (expires_at, rec_dict)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.evictions += 1
+
+    def evict_db(self):
+        """
+        evict_db
+
+        remove expired and then least recently
+        used results from the sqlite tier
+        (call with the **lock**)
+        """
+        if self.num_db_entries <= self.max_db_entries:
+            return
+        self.db.execute(
+            "DELETE FROM ai_result_cache "
+            "WHERE expires_at IS NOT NULL "
+            "AND expires_at <= ?",
+            (time.time(),),
+        )
+        num_over = (
+            self.db.execute(
+                "SELECT COUNT(*) FROM ai_result_cache"
+            ).fetchone()[0]
+            - self.max_db_entries
+        )
+        if num_over > 0:
+            self.db.execute(
+                "DELETE FROM ai_result_cache WHERE key IN ("
+                "SELECT key FROM ai_result_cache "
+                "ORDER BY accessed_at LIMIT ?)",
+                (num_over,),
+            )
+            self.evictions += num_over
+        self.num_db_entries = self.db.execute(
+            "SELECT COUNT(*) FROM ai_result_cache"
+        ).fetchone()[0]
+
+    def clear(self):
+        """
+        clear
+
+        remove every cached result and
+        reset the counters
+        """
+        with self.lock:
+            self.memory.clear()
+            if self.db:
+                self.db.execute(
+                    "DELETE FROM ai_result_cache"
+                )
+                self.db.commit()
+                self.num_db_entries = 0
+            self.hits = 0
+            self.misses = 0
+            self.memory_hits = 0
+            self.disk_hits = 0
+            self.evictions = 0
+
+    def get_stats(self):
+        """
+        get_stats
+
+        get the cache counters
+
+        :returns: dictionary with the **hits**,
+            **misses**, **memory_hits**, **disk_hits**,
+            **evictions** and entry counts
+        :rtype: dict
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "memory_entries": len(self.memory),
+                "db_entries": self.num_db_entries,
+            }
+
+    def close(self):
+        """
+        close
+
+        close the sqlite tier
+        """
+        with self.lock:
+            if self.db:
+                self.db.close()
+                self.db = None
@@ -0,0 +1,914 @@
+"""
+local near-duplicate question index using
+shingling and minhash locality-sensitive hashing
+
+questions that only differ by whitespace,
+comments or local variable names map to the
+same shingles so a new question can reuse a
+prior **CoreResultAI**. called functions, types,
+macros and the prose around the code are kept
+so a question about different code does not
+match
+
+signatures are computed with **numpy** when
+it is installed:
+
+```bash
+pip install llama-client-aic[numpy]
+```
+
+"""
+import re
+import time
+import array
+import random
+import hashlib
+import logging
+import sqlite3
+import threading
+import ujson as json
+import client_aic.cache.result_cache as result_cache
+import client_aic.models.core_result_ai as core_result_ai
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+log = logging.getLogger(__name__)
+
+# mersenne prime for the universal hash functions
+# and small enough for a * h + b to fit in a uint64
+PRIME = (1 << 31) - 1
+
+# tokens kept as-is when normalizing code because
+# renaming them would change what the code does
+KEYWORDS = frozenset(
+    [
+        "auto",
+        "bool",
+        "break",
+        "case",
+        "catch",
+        "char",
+        "class",
+        "const",
+        "continue",
+        "def",
+        "default",
+        "delete",
+        "do",
+        "double",
+        "else",
+        "enum",
+        "except",
+        "false",
+        "False",
+        "float",
+        "fn",
+        "for",
+        "from",
+        "func",
+        "if",
+        "import",
+        "in",
+        "include",
+        "int",
+        "let",
+        "long",
+        "mut",
+        "namespace",
+        "new",
+        "None",
+        "null",
+        "nullptr",
+        "private",
+        "protected",
+        "public",
+        "return",
+        "self",
+        "short",
+        "signed",
+        "sizeof",
+        "static",
+        "struct",
+        "switch",
+        "template",
+        "this",
+        "throw",
+        "true",
+        "True",
+        "try",
+        "typedef",
+        "unsigned",
+        "using",
+        "var",
+        "virtual",
+        "void",
+        "while",
+        "with",
+        "yield",
+    ]
+)
+TOKEN_RE = re.compile(
+    r'"(?:\\.|[^"\\])*"'
+    r"|'(?:\\.|[^'\\])*'"
+    r"|[A-Za-z_]\w*"
+    r"|\d+(?:\.\d+)?"
+    r"|\S"
+)
+WORD_RE = re.compile(r"\w+")
+COMMENT_RE = re.compile(r"/\*.*?\*/|//[^\n]*", re.S)
+# leading prose on a line of code like
+# "is this safe? strcpy(b, p);"
+PROSE_PREFIX_RE = re.compile(
+    r"^([^;{}()=<>\[\]]*?[?.:!])\s+(?=\S)"
+)
+# prefix that keeps prose shingles apart from
+# code shingles (code tokens are space separated)
+PROSE_MARK = "~"
+# prefix for a shingle with a whole line of code
+LINE_MARK = "="
+# expiry for answers that never expire
+INF = float("inf")
+# newest index ids kept in each lsh bucket so a
+# cluster of similar questions below the threshold
+# can not make every query score the whole cluster
+MAX_BUCKET = 1024
+
+
+def looks_like_code(text: str):
+    """
+    looks_like_code
+
+    check if the question contains source code
+    (any line ends with **;**, **{** or **}**
+    or is a preprocessor directive)
+
+    :param text: question text
+
+    :returns: **True** for code
+    :rtype: bool
+    """
+    for line in text.splitlines():
+        line = line.strip()
+        if line.endswith((";", "{", "}")):
+            return True
+        if line.startswith("#include"):
+            return True
+    return False
+
+
+def is_code_line(line: str):
+    """
+    is_code_line
+
+    :param line: stripped line of a question
+
+    :returns: **True** if the line is code
+        (see **looks_like_code**)
+    :rtype: bool
+    """
+    return line.endswith((";", "{", "}")) or (
+        line.startswith("#")
+    )
+
+
+def is_name(token: str):
+    """
+    is_name
+
+    :param token: code token
+
+    :returns: **True** for an identifier
+    :rtype: bool
+    """
+    return token[0].isalpha() or token[0] == "_"
+
+
+def normalize_code(
+    tokens: list,
+    names: dict,
+):
+    """
+    normalize_code
+
+    rename the local variables in one line of
+    code to **v0**, **v1**, ... by their first
+    occurrence in the question
+
+    keywords, called functions (followed by
+    **(**), members (after **.**, **->** or
+    **::**), type names (followed by another
+    name) and **UPPER_CASE** macros and
+    constants are kept as-is
+
+    :param tokens: tokens for the line
+    :param names: dictionary of variable
+        names to placeholders shared by every
+        line in the question
+
+    :returns: list of normalized tokens
+    :rtype: list
+    """
+    normalized = []
+    num_tokens = len(tokens)
+    for idx, token in enumerate(tokens):
+        if (
+            not is_name(token)
+            or token in KEYWORDS
+            or token.isupper()
+        ):
+            normalized.append(token)
+            continue
+        next_token = ""
+        if idx + 1 < num_tokens:
+            next_token = tokens[idx + 1]
+        start = max(0, idx - 2)
+        prev_tokens = "".join(tokens[start:idx])
+        if (
+            next_token == "("
+            or prev_tokens.endswith((".", "->", "::"))
+            or (
+                next_token
+                and is_name(next_token)
+                and next_token not in KEYWORDS
+            )
+        ):
+            normalized.append(token)
+            continue
+        name = names.get(token, None)
+        if name is None:
+            name = f"v{len(names)}"
+            names[token] = name
+        normalized.append(name)
+    return normalized
+
+
+def get_shingles(
+    text: str,
+    shingle_size: int = 3,
+):
+    """
+    get_shingles
+
+    build the set of token shingles for a question
+
+    code is stripped of comments and its local
+    variables are renamed by first occurrence (see
+    **normalize_code**) so renamed variables
+    produce the same shingles. code shingles never
+    span two lines. prose (a question without
+    code, or the prose lines and leading sentences
+    around the code) is lowercased and shingled
+    over its words separately from the code
+
+    each line of code longer than **shingle_size**
+    is also one shingle. a shingle that repeats
+    is numbered
+    (**shingle#2**) so a repeated line (like a
+    second **free(b);**) changes the set
+
+    :param text: question text
+    :param shingle_size: tokens per shingle
+
+    :returns: set of shingle strings
+    :rtype: set
+    """
+    shingles = set()
+    if not text:
+        return shingles
+    lines = []
+    prose = []
+    if looks_like_code(text):
+        text = COMMENT_RE.sub(" ", text)
+        names = {}
+        for line in text.splitlines():
+            line = line.strip()
+            if not is_code_line(line):
+                prose.append(line)
+                continue
+            match = PROSE_PREFIX_RE.match(line)
+            if match:
+                prose.append(match.group(1))
+                start = match.end()
+                line = line[start:]
+            tokens = TOKEN_RE.findall(line)
+            if not line.startswith("#"):
+                # keep the header names
+                tokens = normalize_code(tokens, names)
+            lines.append(tokens)
+    else:
+        prose.append(text)
+    words = WORD_RE.findall(" ".join(prose).lower())
+    if words:
+        lines.append([PROSE_MARK + word for word in words])
+    counts = {}
+    for tokens in lines:
+        if not tokens:
+            continue
+        if len(tokens) <= shingle_size:
+            cur_shingles = [" ".join(tokens)]
+        else:
+            cur_shingles = []
+            for idx in range(
+                len(tokens) - shingle_size + 1
+            ):
+                end = idx + shingle_size
+                cur_shingles.append(
+                    " ".join(tokens[idx:end])
+                )
+            if not tokens[0].startswith(PROSE_MARK):
+                # the whole statement so a changed or
+                # repeated line weighs more than the
+                # shingles it shares with other lines
+                cur_shingles.append(
+                    LINE_MARK + " ".join(tokens)
+                )
+        for shingle in cur_shingles:
+            count = counts.get(shingle, 0) + 1
+            counts[shingle] = count
+            if count > 1:
+                shingle = f"{shingle}#{count}"
+            shingles.add(shingle)
+    return shingles
+
+
+class SimilarityIndex:
+    """SimilarityIndex"""
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        db_path: str = None,
+        seed: int = 1,
+        ttl: float = 86400.0,
+        max_entries: int = 100000,
+    ):
+        """
+        __init__
+
+        minhash lsh index of prior questions and their
+        **CoreResultAI** answers that is safe to
+        share across threads
+
+        questions are only matched against prior
+        questions asked with the same llm and rag
+        parameters (**collection_id**, **model_name**
+        and so on). queries compute one signature
+        and check **bands** hash buckets so they stay
+        fast as the index grows to millions of
+        questions (signatures take
+        **num_perm** * 4 bytes each)
+
+        a question that already matches a live
+        entry is not added again so near-duplicate
+        buckets stay small. entries expire after
+        **ttl** seconds like the **ResultCache** and
+        the oldest entries are removed once there
+        are more than **max_entries**
+
+        ```python
+        import client_aic.ask as ask
+        import client_aic.cache.similarity_index as similarity_index
+
+        similar = similarity_index.SimilarityIndex(
+            threshold=0.9,
+            db_path="/tmp/llm-questions.db",
+        )
+        (user, res_job, res_ai) = ask.ask(
+            question=question,
+            collection_id="embed-security",
+            similar=similar,
+        )
+        ```
+
+        :param threshold: default min estimated
+            jaccard similarity for a match
+        :param num_perm: number of minhash permutations
+            in each signature
+        :param bands: number of lsh bands (must divide
+            **num_perm**). more bands find matches
+            with a lower similarity
+        :param shingle_size: tokens per shingle
+        :param db_path: optional - path to a sqlite file
+            to persist the index. the signatures are
+            loaded into memory on start and answers are
+            read from the file when a query matches
+        :param seed: random seed for the permutations
+            (must not change for an existing **db_path**)
+        :param ttl: seconds an answer stays valid
+            (**None** to never expire)
+        :param max_entries: max questions to keep
+            (the oldest are removed first)
+        """
+        if num_perm % bands != 0:
+            raise ValueError(
+                f"bands={bands} must divide "
+                f"num_perm={num_perm}"
+            )
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        rnd = random.Random(seed)
+        self.perm_a = [
+            rnd.randint(1, PRIME - 1)
+            for _ in range(num_perm)
+        ]
+        self.perm_b = [
+            rnd.randint(0, PRIME - 1)
+            for _ in range(num_perm)
+        ]
+        self.np_a = None
+        self.np_b = None
+        if np is not None:
+            self.np_a = np.array(
+                self.perm_a, dtype=np.uint64
+            ).reshape(-1, 1)
+            self.np_b = np.array(
+                self.perm_b, dtype=np.uint64
+            ).reshape(-1, 1)
+        self.lock = threading.Lock()
+        # flat array of all signatures where the
+        # signature for slot N starts
+        # at N * num_perm
+        self.sigs = array.array("I")
+        # epoch time each slot expires
+        self.expires = array.array("d")
+        # sqlite row id for each slot
+        self.row_ids = array.array("q")
+        # answers by slot when there is no db
+        self.values = []
+        # index id of slot 0 and the number of
+        # removed slots at the front of the arrays
+        self.base = 0
+        self.head = 0
+        # one dict per band of bucket hash -> array
+        # of index ids
+        self.buckets = [{} for _ in range(bands)]
+        self.evictions = 0
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(
+                db_path,
+                check_same_thread=False,
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS similarity_index ("
+                "id INTEGER PRIMARY KEY, "
+                "sig BLOB, "
+                "value TEXT, "
+                "expires_at REAL)"
+            )
+            columns = [
+                row[1]
+                for row in self.db.execute(
+                    "PRAGMA table_info(similarity_index)"
+                )
+            ]
+            if "expires_at" not in columns:
+                self.db.execute(
+                    "ALTER TABLE similarity_index "
+                    "ADD COLUMN expires_at REAL"
+                )
+            self.db.commit()
+            self.load()
+
+    def __len__(self):
+        return len(self.expires) - self.head
+
+    def load(self):
+        """
+        load
+
+        remove the expired rows from the sqlite
+        file and load the signatures of the rest
+        to rebuild the lsh buckets
+        """
+        self.db.execute(
+            "DELETE FROM similarity_index "
+            "WHERE expires_at <= ?",
+            (time.time(),),
+        )
+        self.db.commit()
+        num_loaded = 0
+        for row_id, sig, expires_at in self.db.execute(
+            "SELECT id, sig, expires_at "
+            "FROM similarity_index ORDER BY id"
+        ):
+            cur_sig = array.array("I")
+            cur_sig.frombytes(sig)
+            if len(cur_sig) != self.num_perm:
+                log.error(
+                    f"skipped similarity index "
+                    f"db_path={self.db_path} id={row_id} "
+                    "with a different num_perm"
+                )
+                continue
+            if expires_at is None:
+                expires_at = INF
+            self.add_signature(cur_sig, expires_at, row_id)
+            num_loaded += 1
+        self.evict()
+        log.debug(
+            f"loaded questions={len(self)} "
+            f"from db_path={self.db_path}"
+        )
+
+    def get_signature(
+        self,
+        question: str,
+        **job_params,
+    ):
+        """
+        get_signature
+
+        build the minhash signature for a question
+        where the shingle hashes are keyed by the
+        llm and rag parameters so questions only
+        match prior questions asked the same way
+
+        :param question: question for the llm
+        :param job_params: optional - **run_job_ask**
+            arguments like **collection_id**
+            and **model_name**
+
+        :returns: signature array or **None** if
+            the question has no tokens
+        :rtype: array.array or None
+        """
+        shingles = get_shingles(
+            question,
+            shingle_size=self.shingle_size,
+        )
+        if not shingles:
+            return None
+        params_key = result_cache.build_key(
+            question="",
+            **job_params,
+        ).encode("utf-8")
+        hashes = [
+            int.from_bytes(
+                hashlib.blake2b(
+                    shingle.encode("utf-8"),
+                    digest_size=4,
+                    key=params_key,
+                ).digest(),
+                "little",
+            )
+            % PRIME
+            for shingle in shingles
+        ]
+        sig = array.array("I")
+        if np is not None:
+            np_hashes = np.array(
+                hashes, dtype=np.uint64
+            ).reshape(1, -1)
+            sig.frombytes(
+                (
+                    (self.np_a * np_hashes + self.np_b)
+                    % PRIME
+                )
+                .min(axis=1)
+                .astype(np.uint32)
+                .tobytes()
+            )
+        else:
+            for a, b in zip(self.perm_a, self.perm_b):
+                sig.append(
+                    min((a * h + b) % PRIME for h in hashes)
+                )
+        return sig
+
+    def get_band_keys(
+        self,
+        sig: array.array,
+    ):
+        """
+        get_band_keys
+
+        hash each band of the signature
+
+        :param sig: minhash signature
+
+        :returns: list of bucket hashes
+            (one for each band)
+        :rtype: list
+        """
+        band_keys = []
+        for start in range(0, self.num_perm, self.rows):
+            end = start + self.rows
+            band_keys.append(hash(sig[start:end].tobytes()))
+        return band_keys
+
+    def add_signature(
+        self,
+        sig: array.array,
+        expires_at: float,
+        row_id: int = -1,
+    ):
+        """
+        add_signature
+
+        store the signature and add it to each
+        band's bucket (call with the **lock**)
+
+        :param sig: minhash signature
+        :param expires_at: epoch time the
+            answer expires
+        :param row_id: sqlite row id
+
+        :returns: new index id
+        :rtype: int
+        """
+        idx = self.base + len(self.expires)
+        self.sigs.extend(sig)
+        self.expires.append(expires_at)
+        self.row_ids.append(row_id)
+        for band, band_key in enumerate(
+            self.get_band_keys(sig)
+        ):
+            bucket = self.buckets[band].get(band_key, None)
+            if bucket is None:
+                self.buckets[band][band_key] = array.array(
+                    "q", [idx]
+                )
+            else:
+                bucket.append(idx)
+                if len(bucket) > MAX_BUCKET:
+                    del bucket[0]
+        return idx
+
+    def evict(self):
+        """
+        evict
+
+        remove the oldest entries while they have
+        expired or there are more than
+        **max_entries** (call with the **lock**)
+
+        slots are in insertion order so only the
+        front of the arrays is removed and the
+        arrays are compacted once most of
+        them is unused
+        """
+        now = time.time()
+        num_slots = len(self.expires)
+        last_row_id = None
+        while self.head < num_slots and (
+            len(self) > self.max_entries
+            or self.expires[self.head] <= now
+        ):
+            pos = self.head
+            idx = self.base + pos
+            start = pos * self.num_perm
+            end = start + self.num_perm
+            for band, band_key in enumerate(
+                self.get_band_keys(self.sigs[start:end])
+            ):
+                # ids are added and removed oldest first so
+                # the id is at the front unless the full
+                # bucket already dropped it
+                bucket = self.buckets[band].get(
+                    band_key, None
+                )
+                if bucket and bucket[0] == idx:
+                    del bucket[0]
+                    if not bucket:
+                        del self.buckets[band][band_key]
+            if self.db:
+                last_row_id = self.row_ids[pos]
+            else:
+                self.values[pos] = None
+            self.head += 1
+            self.evictions += 1
+        if last_row_id is not None:
+            self.db.execute(
+                "DELETE FROM similarity_index WHERE id <= ?",
+                (last_row_id,),
+            )
+            self.db.commit()
+        if self.head >= 1024 and self.head * 2 >= num_slots:
+            head = self.head
+            del self.sigs[: head * self.num_perm]
+            del self.expires[:head]
+            del self.row_ids[:head]
+            del self.values[:head]
+            self.base += head
+            self.head = 0
+
+    def find(
+        self,
+        sig: array.array,
+    ):
+        """
+        find
+
+        score every unexpired entry that shares
+        a band bucket with the signature
+        (call with the **lock**)
+
+        :param sig: minhash signature
+
+        :returns: (slot, estimated jaccard
+            similarity) for the best match or
+            (**None**, 0.0) if there is no candidate
+        :rtype: (int, float)
+        """
+        buckets = []
+        for band, band_key in enumerate(
+            self.get_band_keys(sig)
+        ):
+            bucket = self.buckets[band].get(band_key, None)
+            if bucket:
+                buckets.append(bucket)
+        if not buckets:
+            return (None, 0.0)
+        now = time.time()
+        base = self.base
+        if np is not None:
+            # a candidate can be in several buckets
+            found = np.zeros(len(self.expires), dtype=bool)
+            for bucket in buckets:
+                found[
+                    np.frombuffer(bucket, dtype=np.int64)
+                    - base
+                ] = True
+            positions = np.flatnonzero(found)
+            positions = positions[
+                np.frombuffer(
+                    self.expires, dtype=np.float64
+                )[positions]
+                > now
+            ]
+            if not len(positions):
+                return (None, 0.0)
+            matches = np.count_nonzero(
+                np.frombuffer(
+                    self.sigs, dtype=np.uint32
+                ).reshape(-1, self.num_perm)[positions]
+                == np.frombuffer(sig, dtype=np.uint32),
+                axis=1,
+            )
+            best = int(matches.argmax())
+            return (
+                int(positions[best]),
+                int(matches[best]) / self.num_perm,
+            )
+        candidates = set()
+        for bucket in buckets:
+            candidates.update(bucket)
+        positions = [
+            idx - base
+            for idx in candidates
+            if self.expires[idx - base] > now
+        ]
+        if not positions:
+            return (None, 0.0)
+        best_pos = None
+        best_matches = -1
+        for pos in positions:
+            start = pos * self.num_perm
+            end = start + self.num_perm
+            num_matches = sum(
+                1
+                for x, y in zip(sig, self.sigs[start:end])
+                if x == y
+            )
+            if num_matches > best_matches:
+                best_pos = pos
+                best_matches = num_matches
+        return (best_pos, best_matches / self.num_perm)
+
+    def add(
+        self,
+        question: str,
+        res_ai: core_result_ai.CoreResultAI,
+        **job_params,
+    ):
+        """
+        add
+
+        add a question and its answer to the index
+        unless an unexpired prior question already
+        matches it above the **threshold**
+
+        :param question: question the llm answered
+        :param res_ai: **CoreResultAI** for the question
+        :param job_params: optional - **run_job_ask**
+            arguments the question was asked with
+
+        :returns: index id (of the new entry or the
+            matching prior entry) or **None** if the
+            question has no tokens
+        :rtype: int or None
+        """
+        if not res_ai:
+            return None
+        sig = self.get_signature(question, **job_params)
+        if sig is None:
+            return None
+        expires_at = INF
+        if self.ttl is not None:
+            expires_at = time.time() + self.ttl
+        rec_dict = res_ai.get_dict()
+        with self.lock:
+            self.evict()
+            (pos, score) = self.find(sig)
+            if pos is not None and score >= self.threshold:
+                return self.base + pos
+            row_id = -1
+            if self.db:
+                row_id = self.db.execute(
+                    "INSERT INTO similarity_index "
+                    "(sig, value, expires_at) "
+                    "VALUES (?, ?, ?)",
+                    (
+                        sig.tobytes(),
+                        json.dumps(rec_dict),
+                        None
+                        if self.ttl is None
+                        else expires_at,
+                    ),
+                ).lastrowid
+                self.db.commit()
+            else:
+                self.values.append(rec_dict)
+            idx = self.add_signature(
+                sig, expires_at, row_id
+            )
+            self.evict()
+        return idx
+
+    def query(
+        self,
+        question: str,
+        threshold: float = None,
+        **job_params,
+    ):
+        """
+        query
+
+        find the most similar unexpired prior
+        question asked with the same llm and
+        rag parameters
+
+        :param question: question for the llm
+        :param threshold: optional - min estimated
+            jaccard similarity (defaults to the
+            index's **threshold**)
+        :param job_params: optional - **run_job_ask**
+            arguments like **collection_id**
+            and **model_name**
+
+        :returns: (**CoreResultAI**, similarity) for the
+            nearest prior answer above the **threshold**
+            or (**None**, 0.0) if there is no match
+        :rtype: (CoreResultAI, float)
+        """
+        if threshold is None:
+            threshold = self.threshold
+        sig = self.get_signature(question, **job_params)
+        if sig is None:
+            return (None, 0.0)
+        rec_dict = None
+        with self.lock:
+            (pos, score) = self.find(sig)
+            if pos is None or score < threshold:
+                return (None, score)
+            if self.db:
+                row = self.db.execute(
+                    "SELECT value FROM similarity_index "
+                    "WHERE id = ?",
+                    (self.row_ids[pos],),
+                ).fetchone()
+                if row:
+                    rec_dict = json.loads(row[0])
+            else:
+                rec_dict = self.values[pos]
+        if rec_dict is None:
+            return (None, score)
+        cur_o = core_result_ai.CoreResultAI.from_dict(
+            rec_dict
+        )
+        return (cur_o, score)
+
+    def close(self):
+        """
+        close
+
+        close the sqlite file
+        """
+        with self.lock:
+            if self.db:
+                self.db.close()
+                self.db = None
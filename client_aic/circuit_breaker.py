@@ -0,0 +1,250 @@
+"""
+per-endpoint circuit breaker so callers fail
+fast while the rest api is down instead of
+every caller waiting for its own timeouts.
+each route class (like **submit** or **poll**)
+on an endpoint has its own breaker
+
+- **closed** - requests are sent and consecutive
+  failures (connection errors, timeouts and
+  5xx responses) are counted
+- **open** - after **failures** in a row every
+  request fails fast with **CircuitOpen** for
+  **recovery** seconds
+- **half_open** - one probe request is sent and
+  its result closes or re-opens the circuit
+
+"""
+import time
+import logging
+import threading
+import client_aic.rate_limiter as rate_limiter
+
+
+log = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# responses that count as a failure
+FAILURE_STATUSES = (500, 502, 503, 504)
+
+
+class CircuitOpen(ConnectionError):
+    """CircuitOpen"""
+
+
+class CircuitBreaker:
+    """CircuitBreaker"""
+
+    def __init__(
+        self,
+        name: str,
+        failures: int = 5,
+        recovery: float = 10.0,
+    ):
+        """
+        __init__
+
+        circuit breaker for one endpoint
+
+        :param name: endpoint name for logging
+        :param failures: consecutive failures
+            that open the circuit
+        :param recovery: seconds the circuit stays
+            open before a probe request is sent
+        """
+        self.name = name
+        self.failures = max(1, int(failures))
+        self.recovery = recovery
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.num_failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def allow(self):
+        """
+        allow
+
+        check if a request can be sent. the first
+        caller after the **recovery** time becomes
+        the probe for the half-open circuit
+
+        :returns: **True** if the request
+            can be sent
+        :rtype: bool
+        """
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if (
+                    time.monotonic() - self.opened_at
+                    < self.recovery
+                ):
+                    return False
+                log.info(
+                    f"probing endpoint={self.name} after "
+                    f"{self.recovery}s"
+                )
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def is_closed(self):
+        """
+        is_closed
+
+        :returns: **True** if the circuit is closed
+        :rtype: bool
+        """
+        return self.state == CLOSED
+
+    def on_success(self):
+        """
+        on_success
+
+        record a request that got a response
+        and close a half-open circuit
+        """
+        with self.lock:
+            if self.state != CLOSED:
+                log.info(
+                    f"closed circuit for endpoint={self.name}"
+                )
+            self.state = CLOSED
+            self.num_failures = 0
+            self.probing = False
+
+    def on_failure(self):
+        """
+        on_failure
+
+        record a failed request and open the
+        circuit after **failures** in a row (or
+        right away for a failed probe)
+        """
+        with self.lock:
+            self.num_failures += 1
+            if (
+                self.state == HALF_OPEN
+                or self.num_failures >= self.failures
+            ):
+                if self.state != OPEN:
+                    log.error(
+                        "opened circuit for "
+                        f"endpoint={self.name} after "
+                        f"failures={self.num_failures}"
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+    def release(self):
+        """
+        release
+
+        let another caller probe the half-open
+        circuit after a request that failed for
+        a reason unrelated to the endpoint
+        """
+        with self.lock:
+            self.probing = False
+
+    def on_response(
+        self,
+        status_code: int,
+    ):
+        """
+        on_response
+
+        record a response by its status code
+
+        :param status_code: http status code
+        """
+        if status_code in FAILURE_STATUSES:
+            self.on_failure()
+        else:
+            self.on_success()
+
+
+class CircuitBreakers:
+    """CircuitBreakers"""
+
+    def __init__(
+        self,
+        failures: int = 5,
+        recovery: float = 10.0,
+    ):
+        """
+        __init__
+
+        one **CircuitBreaker** per endpoint
+        (scheme, host and port) and route class
+        (like the **RateLimiter**) so failing
+        submits do not open the circuit for
+        logins or polling
+
+        :param failures: consecutive failures
+            that open a circuit
+        :param recovery: seconds a circuit stays
+            open before a probe request is sent
+        """
+        self.failures = failures
+        self.recovery = recovery
+        self.lock = threading.Lock()
+        self.breakers = {}
+
+    def get_key(self):
+        """
+        get_key
+
+        :returns: tuple of the settings for
+            sharing transports with the same
+            breakers
+        :rtype: tuple
+        """
+        return (self.failures, self.recovery)
+
+    def get(
+        self,
+        url: str,
+        route: str = None,
+    ):
+        """
+        get
+
+        :param url: full url for a request
+        :param route: optional - route name from
+            **ROUTES** (routes without a route class
+            share the **default** breaker)
+
+        :returns: **CircuitBreaker** for the
+            url's endpoint and the route's class
+        :rtype: CircuitBreaker
+        """
+        # scheme://host:port without the path
+        endpoint = url.split("/", 3)
+        endpoint = "/".join(endpoint[:3])
+        route_class = rate_limiter.ROUTE_CLASSES.get(
+            route, "default"
+        )
+        key = (endpoint, route_class)
+        breaker = self.breakers.get(key, None)
+        if breaker:
+            return breaker
+        with self.lock:
+            breaker = self.breakers.get(key, None)
+            if not breaker:
+                breaker = CircuitBreaker(
+                    name=f"{endpoint} {route_class}",
+                    failures=self.failures,
+                    recovery=self.recovery,
+                )
+                self.breakers[key] = breaker
+        return breaker
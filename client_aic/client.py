@@ -0,0 +1,630 @@
+"""
+long-lived client that resolves the config
+and credentials once, logs in once and reuses
+one connection pool for every request
+"""
+import logging
+import threading
+import client_aic.get_cfg as get_cfg
+import client_aic.ask as ask
+import client_aic.ask_many as ask_many
+import client_aic.authenticate as auth
+import client_aic.poll_policy as poll_policy
+import client_aic.deadline as deadline_mod
+import client_aic.retry_policy as retry_policy
+import client_aic.get_transport as get_transport
+import client_aic.transport.core_transport as core_transport
+import client_aic.req.ai.run_job_ask as run_job_ask
+import client_aic.req.ai.get_ai_result as get_ai_result
+import client_aic.req.ai.create_ai_result as create_ai_result
+import client_aic.req.ai.search_ai_results as search_ai_results
+import client_aic.req.ai.iter_ai_results as iter_ai_results
+import client_aic.req.ai.update_ai_result as update_ai_result
+import client_aic.req.job.get_job_result as get_job_result
+import client_aic.models.core_result_ai as core_result_ai
+
+
+log = logging.getLogger(__name__)
+
+
+class Client:
+    """Client"""
+
+    def __init__(
+        self,
+        email: str = None,
+        password: str = None,
+        username: str = None,
+        collection_id: str = None,
+        cfg: dict = None,
+        policy: poll_policy.PollPolicy = None,
+        cache=None,
+        similar=None,
+        transport: core_transport.CoreTransport = None,
+        retry: retry_policy.RetryPolicy = None,
+    ):
+        """
+        __init__
+
+        client that owns the **CoreConfig**, the
+        **CoreTransport** connection pool, the
+        authenticated **CoreUser** and the
+        **PollPolicy** so each question only costs
+        one job POST plus the polls
+
+        ```python
+        import client_aic.client as client_aic
+
+        with client_aic.Client(
+            collection_id="embed-security"
+        ) as client:
+            for question in questions:
+                (user, res_job, res_ai) = client.ask(question)
+        ```
+
+        :param email: optional - user email for the rest api
+        :param password: optional - user password
+            for the rest api
+        :param username: optional - username for the rest api
+        :param collection_id: optional - default
+            embedding alias name for **ask** and **submit**
+        :param cfg: optional - **CoreConfig** dictionary
+        :param policy: optional - default **PollPolicy**
+            for **ask** and **wait**
+        :param cache: optional - **ResultCache**
+            for **ask**
+        :param similar: optional - **SimilarityIndex**
+            for **ask**
+        :param transport: optional - **CoreTransport**
+            to use (a new connection pool with the
+            **cfg["pool"]**, **cfg["rate_limits"]**,
+            **cfg["breaker"]** and **cfg["hedge"]**
+            settings by default)
+        :param retry: optional - **RetryPolicy** for
+            the new transport (defaults to the
+            **cfg["retry"]** or the **AI_RETRY_***
+            environment variables)
+        """
+        if not cfg:
+            cfg = get_cfg.get_cfg()
+        (username, password, email) = ask.get_user_creds(
+            cfg=cfg,
+            username=username,
+            password=password,
+            email=email,
+        )
+        self.username = username
+        self.password = password
+        self.email = email
+        self.collection_id = collection_id
+        self.policy = policy or poll_policy.PollPolicy()
+        self.cache = cache
+        self.similar = similar
+        self.own_transport = transport is None
+        if transport is None:
+            use_cfg = cfg
+            if retry is not None:
+                use_cfg = dict(cfg, retry=retry)
+            transport = get_transport.build_transport(
+                use_cfg
+            )
+        self.transport = transport
+        # every request function picks up this
+        # transport from the cfg
+        self.cfg = dict(cfg, transport=transport)
+        self.user = None
+        self.login_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """
+        close
+
+        close the connection pool if
+        this client created it
+        """
+        if self.own_transport:
+            self.transport.close()
+
+    def login(
+        self,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        login
+
+        authenticate once and reuse the **CoreUser**
+        for all later requests (the token is refreshed
+        by the **TokenManager** when it expires)
+
+        :param deadline: optional - **Deadline**
+            for logging in
+
+        :returns: **CoreUser** on success
+            **None** on non-success
+        :rtype: CoreUser or None
+        """
+        if self.user:
+            return self.user
+        with self.login_lock:
+            if not self.user:
+                self.user = auth.authenticate(
+                    username=self.username,
+                    email=self.email,
+                    password=self.password,
+                    cfg=self.cfg,
+                    deadline=deadline,
+                )
+                if not self.user:
+                    log.error(
+                        f"failed to login as user: {self.email}"
+                    )
+        return self.user
+
+    def get_job_params(
+        self,
+        collection_id: str = None,
+        job_params: dict = None,
+    ):
+        """
+        get_job_params
+
+        build the **run_job_ask** arguments
+        with the default **collection_id**
+
+        :param collection_id: optional - embedding
+            alias name
+        :param job_params: optional - llm question
+            properties and attributes
+
+        :returns: **run_job_ask** arguments
+        :rtype: dict
+        """
+        use_params = dict(job_params or {})
+        use_params["collection_id"] = (
+            collection_id or self.collection_id
+        )
+        return use_params
+
+    def ask(
+        self,
+        question: str,
+        collection_id: str = None,
+        job_params: dict = None,
+        wait_for_result: bool = True,
+        policy: poll_policy.PollPolicy = None,
+        coalesce: bool = True,
+        timeout: float = None,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        ask
+
+        ask the llm a question and wait for the results
+        (please see **ask.ask** for the cache, similarity
+        and coalescing behavior)
+
+        :param question: question to ask the llm
+        :param collection_id: optional - embedding
+            alias name (defaults to the client's
+            **collection_id**)
+        :param job_params: optional - llm question
+            properties and attributes
+        :param wait_for_result: optional flag -
+            with default set to **True**.
+            When **False** this returns as soon
+            as the job is created
+        :param policy: optional - **PollPolicy**
+            (defaults to the client's **policy**)
+        :param coalesce: optional flag - share one
+            job with concurrent identical asks
+        :param timeout: optional - overall seconds
+            for the login, submit, polls and fetch
+        :param deadline: optional - **Deadline**
+            shared with the caller (replaces
+            the **timeout**)
+
+        :returns: on success (**CoreUser**, **CoreResultJob**,
+            **CoreResultAI**) versus non-success can return
+            (**None**, **None**, **None**)
+        :rtype: (CoreUser, CoreResultJob, CoreResultAI)
+        """
+        res_job = None
+        res_ai = None
+        if not question or len(question) < 4:
+            log.error(
+                "please ask a question more than 4 characters"
+            )
+            return (None, res_job, res_ai)
+        use_params = self.get_job_params(
+            collection_id=collection_id,
+            job_params=job_params,
+        )
+        prior_reply = ask.get_prior_reply(
+            question=question,
+            job_params=use_params,
+            cache=self.cache,
+            similar=self.similar,
+            email=self.email,
+        )
+        if prior_reply:
+            return prior_reply
+        deadline = deadline_mod.get_deadline(
+            deadline, timeout
+        )
+        user = self.login(deadline=deadline)
+        if not user:
+            return (user, res_job, res_ai)
+        (res_job, res_ai) = ask.ask_as_user(
+            question=question,
+            user=user,
+            cfg=self.cfg,
+            job_params=use_params,
+            wait_for_result=wait_for_result,
+            policy=policy or self.policy,
+            cache=self.cache,
+            similar=self.similar,
+            coalesce=coalesce,
+            deadline=deadline,
+        )
+        return (user, res_job, res_ai)
+
+    def ask_many(
+        self,
+        questions,
+        collection_id: str = None,
+        job_params: dict = None,
+        concurrency: int = 10,
+        max_workers: int = None,
+        policy: poll_policy.PollPolicy = None,
+    ):
+        """
+        ask_many
+
+        ask the llm many questions with at most
+        **concurrency** jobs in flight at a time
+        (please see **ask_many.ask_many**)
+
+        :param questions: iterable of questions to ask
+        :param collection_id: optional - embedding
+            alias name (defaults to the client's
+            **collection_id**)
+        :param job_params: optional - llm question
+            properties and attributes for every job
+        :param concurrency: max number of jobs in
+            flight at the same time
+        :param max_workers: optional - max threads
+            sending requests at the same time
+        :param policy: optional - **PollPolicy**
+            (defaults to the client's **policy**)
+
+        :returns: generator of (**question**,
+            **CoreResultJob**, **CoreResultAI**) tuples
+        :rtype: generator
+        """
+        user = self.login()
+        if not user:
+            return
+        use_params = self.get_job_params(
+            collection_id=collection_id,
+            job_params=job_params,
+        )
+        yield from ask_many.run_questions(
+            questions=questions,
+            user=user,
+            cfg=self.cfg,
+            job_params=use_params,
+            concurrency=concurrency,
+            max_workers=max_workers,
+            policy=policy or self.policy,
+            cache=self.cache,
+        )
+
+    def submit(
+        self,
+        question: str,
+        collection_id: str = None,
+        **job_params,
+    ):
+        """
+        submit
+
+        start an llm job without waiting for it
+
+        :param question: question to ask the llm
+        :param collection_id: optional - embedding
+            alias name (defaults to the client's
+            **collection_id**)
+        :param job_params: optional - **run_job_ask**
+            arguments like **model_name**
+
+        :returns: **CoreJob** on success
+            **None** on non-success
+        :rtype: CoreJob or None
+        """
+        user = self.login()
+        if not user:
+            return None
+        return run_job_ask.run_job_ask(
+            question=question,
+            user=user,
+            cfg=self.cfg,
+            **self.get_job_params(
+                collection_id=collection_id,
+                job_params=job_params,
+            ),
+        )
+
+    def wait(
+        self,
+        job_id: int,
+        policy: poll_policy.PollPolicy = None,
+        cancel=None,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        wait
+
+        poll for a job's result and get
+        the job's **CoreResultAI**
+
+        :param job_id: **CoreJob.id** to wait on
+        :param policy: optional - **PollPolicy**
+            (defaults to the client's **policy**)
+        :param cancel: optional - **threading.Event**
+            to stop waiting on this job
+        :param deadline: optional - **Deadline**
+            for polling and fetching the result
+
+        :returns: (**CoreResultJob**, **CoreResultAI**)
+            or (**None**, **None**) on non-success
+        :rtype: (CoreResultJob, CoreResultAI)
+        """
+        user = self.login()
+        if not user:
+            return (None, None)
+        return ask.wait_for_ai_result(
+            job_id=job_id,
+            user=user,
+            cfg=self.cfg,
+            policy=policy or self.policy,
+            cancel=cancel,
+            deadline=deadline,
+        )
+
+    def get_job_result(
+        self,
+        id: int,
+    ):
+        """
+        get_job_result
+
+        get a job's **CoreResultJob** if it is done
+
+        :param id: **CoreJob.id**
+
+        :returns: **CoreResultJob** on success
+            **None** on non-success
+        :rtype: CoreResultJob or None
+        """
+        user = self.login()
+        if not user:
+            return None
+        return get_job_result.get_job_result(
+            id=id,
+            user=user,
+            cfg=self.cfg,
+        )
+
+    def get_ai_result(
+        self,
+        id: int,
+    ):
+        """
+        get_ai_result
+
+        get the **CoreResultAI** for a job
+
+        :param id: **CoreJob.id**
+
+        :returns: **CoreResultAI** on success
+            **None** on non-success
+        :rtype: CoreResultAI or None
+        """
+        user = self.login()
+        if not user:
+            return None
+        return get_ai_result.get_ai_result(
+            id=id,
+            user=user,
+            cfg=self.cfg,
+        )
+
+    def search(
+        self,
+        data: dict,
+    ):
+        """
+        search
+
+        search for ai results
+        (please see **search_ai_results**)
+
+        :param data: request values dictionary
+
+        :returns: **CoreSearchResultAI** on success
+            **None** on non-success
+        :rtype: CoreSearchResultAI or None
+        """
+        user = self.login()
+        if not user:
+            return None
+        return search_ai_results.search_ai_results(
+            user=user,
+            data=data,
+            cfg=self.cfg,
+        )
+
+    def iter_results(
+        self,
+        query: str,
+        data: dict = None,
+        page_size: int = 500,
+        after_id: int = None,
+    ):
+        """
+        iter_results
+
+        yield every matching ai result one
+        page at a time with the next page
+        prefetched in the background
+        (please see **iter_ai_results**)
+
+        :param query: logical name of the search
+        :param data: optional - extra search
+            values dictionary
+        :param page_size: max results per page
+        :param after_id: optional - start after
+            this **CoreResultAI.id**
+
+        :raises SearchPageError: when a page fails
+            (resume with its **after_id**)
+
+        :returns: generator of **CoreResultAI**
+        :rtype: generator
+        """
+        user = self.login()
+        if not user:
+            return
+        yield from iter_ai_results.iter_ai_results(
+            user=user,
+            query=query,
+            data=data,
+            page_size=page_size,
+            cfg=self.cfg,
+            after_id=after_id,
+        )
+
+    def update(
+        self,
+        ai_result: core_result_ai.CoreResultAI,
+    ):
+        """
+        update
+
+        save an ai result's changes
+
+        :param ai_result: **CoreResultAI** to save
+
+        :returns: **CoreResultAI** on success
+            **None** on non-success
+        :rtype: CoreResultAI or None
+        """
+        user = self.login()
+        if not user:
+            return None
+        return update_ai_result.update_ai_result(
+            user=user,
+            ai_result=ai_result,
+            cfg=self.cfg,
+        )
+
+    def review(
+        self,
+        job_id: int,
+        reviewed_answer: str,
+        reviewed_score: float,
+        reviewed_notes: str = None,
+        ai_result: core_result_ai.CoreResultAI = None,
+    ):
+        """
+        review
+
+        submit a reviewed, expert answer and
+        confidence score for a job's ai result
+
+        :param job_id: **CoreJob.id** of the ai result
+        :param reviewed_answer: expert's answer
+        :param reviewed_score: expert's confidence
+            between 0.00 and 100.00
+        :param reviewed_notes: optional - expert's notes
+        :param ai_result: optional - **CoreResultAI**
+            already fetched for the **job_id** to
+            skip getting it again
+
+        :returns: updated **CoreResultAI** on success
+            **None** on non-success
+        :rtype: CoreResultAI or None
+        """
+        if ai_result is None:
+            ai_result = self.get_ai_result(id=job_id)
+        if not ai_result:
+            log.error(
+                f"failed getting ai result: job_id={job_id}"
+            )
+            return None
+        ai_result.reviewed_answer = reviewed_answer
+        ai_result.reviewed_score = reviewed_score
+        if reviewed_notes is not None:
+            ai_result.reviewed_notes = reviewed_notes
+        return self.update(ai_result)
+
+    def create_result(
+        self,
+        ai_result: core_result_ai.CoreResultAI,
+    ):
+        """
+        create_result
+
+        store an ai result from a remote llm
+        (please see **create_ai_result**)
+
+        :param ai_result: **CoreResultAI** to store
+
+        :returns: **CoreResultAI** on success
+            **None** on non-success
+        :rtype: CoreResultAI or None
+        """
+        user = self.login()
+        if not user:
+            return None
+        return create_ai_result.create_ai_result(
+            user=user,
+            data=ai_result.get_dict(),
+            cfg=self.cfg,
+        )
+
+    def get_uploader(
+        self,
+        **kwargs,
+    ):
+        """
+        get_uploader
+
+        buffered, concurrent uploader for storing
+        many ai results from a remote llm
+        (please see **ResultUploader**)
+
+        :param kwargs: **ResultUploader** options
+            like **batch_size**, **concurrency**
+            and **spool_dir**
+
+        :returns: **ResultUploader** on success
+            **None** if the login failed
+        :rtype: ResultUploader or None
+        """
+        import client_aic.result_uploader as result_uploader
+
+        user = self.login()
+        if not user:
+            return None
+        return result_uploader.ResultUploader(
+            user=user,
+            cfg=self.cfg,
+            **kwargs,
+        )
@@ -0,0 +1,318 @@
+"""
+adaptive concurrency limit for running many
+llm jobs at the same time
+
+the limit follows additive-increase /
+multiplicative-decrease (aimd): it grows by about
+one job for every **limit** healthy jobs and is
+cut by **backoff** on a timeout, a failed submit
+(a non-201 response from **run_job_ask**) or when
+the recent average submit latency or job
+completion time rose well above its long-running
+average
+"""
+import sys
+import time
+import logging
+import threading
+
+
+log = logging.getLogger(__name__)
+
+
+def get_timeout_errors():
+    """
+    get_timeout_errors
+
+    get the exception types for a request
+    that timed out (the http libraries are only
+    checked if they were already imported)
+
+    :returns: tuple of exception types
+    :rtype: tuple
+    """
+    errors = [TimeoutError]
+    requests_exceptions = sys.modules.get(
+        "requests.exceptions", None
+    )
+    if requests_exceptions:
+        errors.append(requests_exceptions.Timeout)
+    httpx = sys.modules.get("httpx", None)
+    if httpx:
+        errors.append(httpx.TimeoutException)
+    return tuple(errors)
+
+
+class AdaptiveLimiter:
+    """AdaptiveLimiter"""
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        backoff: float = 0.5,
+        tolerance: float = 2.0,
+        smoothing: float = 0.01,
+        recent: float = 0.2,
+        warmup: int = 5,
+        cooldown: float = 1.0,
+    ):
+        """
+        __init__
+
+        aimd controller for the number of jobs in
+        flight. the scheduler reports each submit
+        and finished job and reads the current
+        limit with **get_limit()**
+
+        ```python
+        import client_aic.ask_many as ask_many
+        import client_aic.concurrency_limiter as cl
+
+        limiter = cl.AdaptiveLimiter(max_limit=100)
+        for (question, res_job, res_ai) in ask_many.ask_many(
+            questions=questions,
+            collection_id="embed-security",
+            concurrency=100,
+            limiter=limiter,
+        ):
+            ...
+        log.info(limiter.get_stats())
+        ```
+
+        :param initial: starting limit
+        :param min_limit: lowest limit after cuts
+        :param max_limit: highest limit
+        :param backoff: multiplier for each cut
+            (**0.5** halves the limit)
+        :param tolerance: a recent average above
+            **tolerance** times its baseline
+            is unhealthy
+        :param smoothing: weight of each latency
+            in the long-running baseline
+        :param recent: weight of each latency in
+            the recent average (higher follows a
+            change faster)
+        :param warmup: latencies to collect before
+            the baseline is used
+        :param cooldown: min seconds between cuts so
+            one burst of errors is only one cut
+        """
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.limit = float(
+            min(
+                self.max_limit,
+                max(self.min_limit, initial),
+            )
+        )
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.recent = recent
+        self.warmup = warmup
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        # signal name -> [baseline, recent, samples]
+        self.baselines = {}
+        self.num_increases = 0
+        self.num_decreases = 0
+        self.reasons = {}
+        self.last_reason = None
+        self.last_decrease_at = None
+
+    def get_limit(self):
+        """
+        get_limit
+
+        :returns: max jobs in flight right now
+        :rtype: int
+        """
+        return int(self.limit)
+
+    def is_healthy(
+        self,
+        name: str,
+        latency: float,
+    ):
+        """
+        is_healthy
+
+        add a latency to the recent average and
+        the long-running baseline and compare them
+
+        the recent average smooths out single slow
+        jobs so a steady spread of latencies is
+        healthy, and the baseline moves slowly so a
+        queue that builds up shows as a rising
+        recent average
+
+        :param name: signal name like **submit**
+            or **complete**
+        :param latency: seconds
+
+        :returns: **True** if the recent average is
+            under **tolerance** times the baseline
+            (always **True** during the **warmup**)
+        :rtype: bool
+        """
+        state = self.baselines.get(name, None)
+        if state is None:
+            self.baselines[name] = [latency, latency, 1]
+            return True
+        (baseline, recent, samples) = state
+        # plain average of the first latencies so
+        # neither average starts out biased by the
+        # first few jobs
+        average = 1.0 / (samples + 1)
+        baseline += max(self.smoothing, average) * (
+            latency - baseline
+        )
+        recent += max(self.recent, average) * (
+            latency - recent
+        )
+        healthy = (
+            samples < self.warmup
+            or recent <= baseline * self.tolerance
+        )
+        self.baselines[name] = [
+            baseline,
+            recent,
+            samples + 1,
+        ]
+        return healthy
+
+    def increase(self):
+        """
+        increase
+
+        add **1 / limit** so the limit grows by
+        about one job per **limit** healthy jobs
+        """
+        if self.limit < self.max_limit:
+            self.limit = min(
+                float(self.max_limit),
+                self.limit + 1.0 / self.limit,
+            )
+            self.num_increases += 1
+
+    def decrease(
+        self,
+        reason: str,
+    ):
+        """
+        decrease
+
+        cut the limit by **backoff** unless it
+        was already cut in the last **cooldown**
+        seconds
+
+        :param reason: why the limit was cut
+            (**timeout**, **submit_failed**,
+            **submit_latency** or **queue_time**)
+        """
+        now = time.monotonic()
+        if (
+            self.last_decrease_at is not None
+            and now - self.last_decrease_at < self.cooldown
+        ):
+            return
+        old_limit = self.get_limit()
+        self.limit = max(
+            float(self.min_limit),
+            self.limit * self.backoff,
+        )
+        self.last_decrease_at = now
+        self.last_reason = reason
+        self.num_decreases += 1
+        self.reasons[reason] = (
+            self.reasons.get(reason, 0) + 1
+        )
+        log.info(
+            f"cut concurrency limit from {old_limit} "
+            f"to {self.get_limit()} reason={reason}"
+        )
+
+    def on_submit(
+        self,
+        latency: float,
+        ok: bool,
+        error: Exception = None,
+    ):
+        """
+        on_submit
+
+        report one **run_job_ask** submit
+
+        :param latency: seconds the submit took
+        :param ok: **True** if the job was created
+        :param error: optional - exception raised
+            by the submit
+        """
+        with self.lock:
+            if error is not None and isinstance(
+                error, get_timeout_errors()
+            ):
+                self.decrease("timeout")
+            elif not ok:
+                self.decrease("submit_failed")
+            elif not self.is_healthy("submit", latency):
+                self.decrease("submit_latency")
+            else:
+                self.increase()
+
+    def on_complete(
+        self,
+        duration: float,
+    ):
+        """
+        on_complete
+
+        report a job that finished
+
+        :param duration: seconds from the submit
+            until the job result was found (mostly
+            the time the job waited in the queue)
+        """
+        with self.lock:
+            if not self.is_healthy("complete", duration):
+                self.decrease("queue_time")
+            else:
+                self.increase()
+
+    def on_timeout(self):
+        """
+        on_timeout
+
+        report a request that timed out or a job
+        that did not finish before its poll deadline
+        """
+        with self.lock:
+            self.decrease("timeout")
+
+    def get_stats(self):
+        """
+        get_stats
+
+        :returns: dictionary with the **limit**,
+            **increases** and **decreases** counts,
+            the cut **reasons** counts, the
+            **last_reason** and the **submit** and
+            **complete** latency baselines in seconds
+        :rtype: dict
+        """
+        with self.lock:
+            return {
+                "limit": self.get_limit(),
+                "increases": self.num_increases,
+                "decreases": self.num_decreases,
+                "reasons": dict(self.reasons),
+                "last_reason": self.last_reason,
+                "submit": self.baselines.get(
+                    "submit", [None]
+                )[0],
+                "complete": self.baselines.get(
+                    "complete", [None]
+                )[0],
+            }
@@ -6,6 +6,13 @@ import logging
 import client_aic.config.get_creds as get_creds
 import client_aic.config.get_tls as get_tls
 import client_aic.config.get_api_address as get_api_address
+import client_aic.config.get_pool as get_pool
+import client_aic.config.get_token as get_token
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.config.get_rate_limits as get_rate_limits
+import client_aic.config.get_retry as get_retry
+import client_aic.config.get_breaker as get_breaker
+import client_aic.config.get_hedge as get_hedge
 
 
 log = logging.getLogger(__name__)
@@ -24,6 +31,13 @@ class CoreConfig:
             "user": get_creds.get_creds(),
             "tls": get_tls.get_tls(),
             "endpoint": get_api_address.get_api_address(),
+            "pool": get_pool.get_pool(),
+            "token": get_token.get_token(),
+            "timeouts": get_timeouts.get_timeouts(),
+            "rate_limits": get_rate_limits.get_rate_limits(),
+            "retry": get_retry.get_retry(),
+            "breaker": get_breaker.get_breaker(),
+            "hedge": get_hedge.get_hedge(),
         }
 
     def get_cfg(self):
@@ -43,6 +57,13 @@ class CoreConfig:
                 "user": get_creds.get_creds(),
                 "tls": get_tls.get_tls(),
                 "endpoint": get_api_address.get_api_address(),
+                "pool": get_pool.get_pool(),
+                "token": get_token.get_token(),
+                "timeouts": get_timeouts.get_timeouts(),
+                "rate_limits": get_rate_limits.get_rate_limits(),
+                "retry": get_retry.get_retry(),
+                "breaker": get_breaker.get_breaker(),
+                "hedge": get_hedge.get_hedge(),
             }
 
     def get_endpoint(self):
@@ -0,0 +1,91 @@
+"""
+read-only, hashable **CoreConfig** snapshot
+"""
+import logging
+import collections.abc
+
+
+log = logging.getLogger(__name__)
+
+
+def freeze(value):
+    """
+    freeze
+
+    convert dictionaries and lists to
+    read-only, hashable values
+
+    :param value: value to convert
+
+    :returns: **FrozenConfig** for a dictionary,
+        tuple for a list or the value
+    """
+    if isinstance(value, FrozenConfig):
+        return value
+    if isinstance(value, collections.abc.Mapping):
+        return FrozenConfig(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class FrozenConfig(collections.abc.Mapping):
+    """FrozenConfig"""
+
+    __slots__ = ("data", "hash_value")
+
+    def __init__(
+        self,
+        values: dict = None,
+    ):
+        """
+        __init__
+
+        read-only dictionary for a resolved config
+        that can be shared across threads and used as
+        a cache key. nested dictionaries are frozen too
+
+        use **dict(cfg, key=value)** to build
+        a changed copy
+
+        :param values: dictionary of config values
+        """
+        object.__setattr__(
+            self,
+            "data",
+            {
+                k: freeze(v)
+                for k, v in (values or {}).items()
+            },
+        )
+        object.__setattr__(self, "hash_value", None)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __hash__(self):
+        if self.hash_value is None:
+            object.__setattr__(
+                self,
+                "hash_value",
+                hash(frozenset(self.data.items())),
+            )
+        return self.hash_value
+
+    def __setattr__(self, name, value):
+        raise TypeError("FrozenConfig is read-only")
+
+    def __repr__(self):
+        return f"FrozenConfig({self.data!r})"
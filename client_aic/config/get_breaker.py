@@ -0,0 +1,73 @@
+"""
+build the circuit breaker settings
+from environment variables:
+
+- AI_BREAKER_FAILURES=5
+- AI_BREAKER_RECOVERY=10.0
+
+set **AI_BREAKER_FAILURES=0** to turn
+off the circuit breakers
+"""
+import os
+import logging
+import client_aic.circuit_breaker as circuit_breaker
+
+
+log = logging.getLogger(__name__)
+
+
+def get_breaker():
+    """
+    get_breaker
+
+    get the circuit breaker settings shared
+    by all rest api requests
+
+    - **failures** - consecutive failures that
+      open an endpoint's circuit (**0** turns
+      off the circuit breakers)
+    - **recovery** - seconds a circuit stays
+      open before a probe request is sent
+
+    :returns: dict of **CircuitBreakers** arguments
+    :rtype: dict
+    """
+    return {
+        "failures": int(
+            os.getenv("AI_BREAKER_FAILURES", "5")
+        ),
+        "recovery": float(
+            os.getenv("AI_BREAKER_RECOVERY", "10.0")
+        ),
+    }
+
+
+def get_circuit_breakers(
+    cfg: dict = None,
+):
+    """
+    get_circuit_breakers
+
+    get the **CircuitBreakers** for a
+    **CoreConfig** dictionary
+
+    **cfg["breaker"]** can be a **CircuitBreakers**
+    or a dictionary of **CircuitBreakers** arguments
+    (defaults to **get_breaker()**)
+
+    :param cfg: optional **CoreConfig** dictionary
+
+    :returns: new **CircuitBreakers** or **None**
+        if the circuit breakers are turned off
+    :rtype: CircuitBreakers or None
+    """
+    breaker = None
+    if cfg:
+        breaker = cfg.get("breaker", None)
+    if breaker is None:
+        breaker = get_breaker()
+    if isinstance(breaker, circuit_breaker.CircuitBreakers):
+        return breaker
+    if int(breaker.get("failures", 0) or 0) <= 0:
+        return None
+    return circuit_breaker.CircuitBreakers(**breaker)
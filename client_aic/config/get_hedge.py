@@ -0,0 +1,85 @@
+"""
+build the hedged read settings
+from environment variables:
+
+- AI_HEDGE_QUANTILE=0
+- AI_HEDGE_MIN_DELAY=0.05
+- AI_HEDGE_MAX_DELAY=2.0
+- AI_HEDGE_MAX_WORKERS=8
+
+hedged reads are off by default. set
+**AI_HEDGE_QUANTILE=0.95** to turn them on
+"""
+import os
+import logging
+import client_aic.hedging as hedging
+
+
+log = logging.getLogger(__name__)
+
+
+def get_hedge():
+    """
+    get_hedge
+
+    get the hedged read settings for the
+    job result polls and ai result fetches
+
+    - **quantile** - latency quantile to wait for
+      before sending a hedge (**0** turns off
+      hedged reads, the default)
+    - **min_delay** - min seconds before
+      sending a hedge
+    - **max_delay** - max seconds before
+      sending a hedge
+    - **max_workers** - max hedged reads and
+      hedges in flight
+
+    :returns: dict of **HedgePolicy** arguments
+    :rtype: dict
+    """
+    return {
+        "quantile": float(
+            os.getenv("AI_HEDGE_QUANTILE", "0")
+        ),
+        "min_delay": float(
+            os.getenv("AI_HEDGE_MIN_DELAY", "0.05")
+        ),
+        "max_delay": float(
+            os.getenv("AI_HEDGE_MAX_DELAY", "2.0")
+        ),
+        "max_workers": int(
+            os.getenv("AI_HEDGE_MAX_WORKERS", "8")
+        ),
+    }
+
+
+def get_hedge_policy(
+    cfg: dict = None,
+):
+    """
+    get_hedge_policy
+
+    get the **HedgePolicy** for a
+    **CoreConfig** dictionary
+
+    **cfg["hedge"]** can be a **HedgePolicy** or
+    a dictionary of **HedgePolicy** arguments
+    (defaults to **get_hedge()**)
+
+    :param cfg: optional **CoreConfig** dictionary
+
+    :returns: new **HedgePolicy** or **None**
+        if hedged reads are turned off
+    :rtype: HedgePolicy or None
+    """
+    hedge = None
+    if cfg:
+        hedge = cfg.get("hedge", None)
+    if hedge is None:
+        hedge = get_hedge()
+    if isinstance(hedge, hedging.HedgePolicy):
+        return hedge
+    if float(hedge.get("quantile", 0) or 0) <= 0:
+        return None
+    return hedging.HedgePolicy(**hedge)
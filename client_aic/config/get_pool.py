@@ -0,0 +1,41 @@
+"""
+build the http connection pool settings
+from environment variables:
+
+- AI_POOL_CONNECTIONS=10
+- AI_POOL_MAXSIZE=10
+- AI_POOL_BLOCK=0
+
+"""
+import os
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+def get_pool():
+    """
+    get_pool
+
+    get the keep-alive connection pool
+    settings shared by all rest api requests
+
+    - **connections** - number of endpoint
+      (host) pools to keep open
+    - **maxsize** - max keep-alive connections
+      kept open per endpoint
+    - **block** - wait for a free connection
+      instead of opening a throwaway one when
+      all **maxsize** connections are busy
+
+    :returns: dict for the connection pool
+    :rtype: dict
+    """
+    return {
+        "connections": int(
+            os.getenv("AI_POOL_CONNECTIONS", "10")
+        ),
+        "maxsize": int(os.getenv("AI_POOL_MAXSIZE", "10")),
+        "block": os.getenv("AI_POOL_BLOCK", "0") == "1",
+    }
@@ -0,0 +1,53 @@
+"""
+build the client-side rate limits
+from environment variables:
+
+- AI_RATE_LIMITS='{"submit": [5, 10], "poll": 20}'
+- AI_RATE_LIMIT_DIR=/tmp/ai-rate-limits
+
+each limit is a [**rate**, **burst**] list (or
+just the **rate**) in requests per second for a
+route class: **auth**, **submit**, **poll**,
+**search**, **update** or **default**. set the
+**AI_RATE_LIMIT_DIR** to share the limits with
+every process on the host
+"""
+import os
+import logging
+import ujson as json
+
+
+log = logging.getLogger(__name__)
+
+
+def get_rate_limits():
+    """
+    get_rate_limits
+
+    get the rate limits shared by
+    all rest api requests
+
+    - **limits** - dictionary of route class
+      to [**rate**, **burst**] (empty when
+      there are no limits)
+    - **lock_dir** - directory for the bucket
+      files shared across processes or **None**
+      for per-process limits
+
+    :returns: dict for the **RateLimiter**
+    :rtype: dict
+    """
+    limits = {}
+    value = os.getenv("AI_RATE_LIMITS", None)
+    if value:
+        try:
+            limits = json.loads(value)
+        except Exception as e:
+            log.error(
+                f"ignoring invalid AI_RATE_LIMITS={value} "
+                f'with ex="{e}"'
+            )
+    return {
+        "limits": limits,
+        "lock_dir": os.getenv("AI_RATE_LIMIT_DIR", None),
+    }
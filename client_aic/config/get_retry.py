@@ -0,0 +1,74 @@
+"""
+build the request retry settings
+from environment variables:
+
+- AI_RETRY_ATTEMPTS=3
+- AI_RETRY_BACKOFF=0.25
+- AI_RETRY_MAX_BACKOFF=5.0
+
+"""
+import os
+import logging
+import client_aic.retry_policy as retry_policy
+
+
+log = logging.getLogger(__name__)
+
+
+def get_retry():
+    """
+    get_retry
+
+    get the retry settings shared by
+    all rest api requests
+
+    - **attempts** - max attempts per request
+      including the first one (**1** disables
+      retries)
+    - **backoff** - seconds to wait before
+      the first retry
+    - **max_backoff** - max seconds between
+      attempts
+
+    :returns: dict of **RetryPolicy** arguments
+    :rtype: dict
+    """
+    return {
+        "attempts": int(
+            os.getenv("AI_RETRY_ATTEMPTS", "3")
+        ),
+        "backoff": float(
+            os.getenv("AI_RETRY_BACKOFF", "0.25")
+        ),
+        "max_backoff": float(
+            os.getenv("AI_RETRY_MAX_BACKOFF", "5.0")
+        ),
+    }
+
+
+def get_retry_policy(
+    cfg: dict = None,
+):
+    """
+    get_retry_policy
+
+    get the **RetryPolicy** for a
+    **CoreConfig** dictionary
+
+    **cfg["retry"]** can be a **RetryPolicy** or
+    a dictionary of **RetryPolicy** arguments
+    (defaults to **get_retry()**)
+
+    :param cfg: optional **CoreConfig** dictionary
+
+    :returns: **RetryPolicy**
+    :rtype: RetryPolicy
+    """
+    retry = None
+    if cfg:
+        retry = cfg.get("retry", None)
+    if retry is None:
+        retry = get_retry()
+    if not isinstance(retry, retry_policy.RetryPolicy):
+        retry = retry_policy.RetryPolicy(**retry)
+    return retry
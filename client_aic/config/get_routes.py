@@ -0,0 +1,62 @@
+"""
+rest api routes and the full url
+for each route on an endpoint
+"""
+import logging
+
+
+log = logging.getLogger(__name__)
+
+# routes ending with a slash take an id suffix
+ROUTES = {
+    "login": "/login",
+    "user": "/user",
+    "user_by_id": "/user/",
+    "job": "/job",
+    "job_result": "/job/result/",
+    "ai_result": "/ai/result",
+    "ai_result_by_id": "/ai/result/",
+    "ai_result_search": "/ai/result/search",
+}
+
+
+def get_urls(endpoint: str):
+    """
+    get_urls
+
+    build the full url for every route
+    on the **endpoint**
+
+    :param endpoint: api endpoint address
+
+    :returns: dictionary of route name to url
+    :rtype: dict
+    """
+    return {
+        name: f"https://{endpoint}{path}"
+        for name, path in ROUTES.items()
+    }
+
+
+def get_url(
+    cfg: dict,
+    route: str,
+):
+    """
+    get_url
+
+    get the full url for a route using the
+    pre-resolved **cfg["urls"]** when the config
+    was built by **get_cfg** and building it
+    for other dictionaries
+
+    :param cfg: **CoreConfig** dictionary
+    :param route: route name from **ROUTES**
+
+    :returns: full url for the route
+    :rtype: str
+    """
+    urls = cfg.get("urls", None)
+    if urls:
+        return urls[route]
+    return f'https://{cfg["endpoint"]}{ROUTES[route]}'
@@ -0,0 +1,97 @@
+"""
+build the per-route request timeout
+profiles from environment variables:
+
+- AI_CONNECT_TIMEOUT=3.05
+- AI_READ_TIMEOUT=5.0
+- AI_TIMEOUTS='{"job_result": [3.05, 10.0]}'
+
+each profile is a (**connect**, **read**)
+tuple in seconds for one route in
+**get_routes.ROUTES**
+"""
+import os
+import logging
+import ujson as json
+
+
+log = logging.getLogger(__name__)
+
+# slower routes that need a longer read timeout
+# than the AI_READ_TIMEOUT default
+ROUTE_READ_TIMEOUTS = {
+    "login": 10.0,
+    "job_result": 10.0,
+}
+
+
+def get_timeouts():
+    """
+    get_timeouts
+
+    get the (**connect**, **read**) timeout
+    for each rest api route. the **default**
+    profile is used for routes without one
+
+    **AI_TIMEOUTS** is a json dictionary of route
+    name to a [**connect**, **read**] list (or
+    one number for both) that replaces the
+    profile for those routes
+
+    :returns: dict of route name to
+        (**connect**, **read**) tuple
+    :rtype: dict
+    """
+    connect = float(os.getenv("AI_CONNECT_TIMEOUT", "3.05"))
+    read = float(os.getenv("AI_READ_TIMEOUT", "5.0"))
+    timeouts = {"default": (connect, read)}
+    for route, route_read in ROUTE_READ_TIMEOUTS.items():
+        timeouts[route] = (connect, max(read, route_read))
+    overrides = os.getenv("AI_TIMEOUTS", None)
+    if overrides:
+        try:
+            for route, value in json.loads(
+                overrides
+            ).items():
+                if not isinstance(value, (list, tuple)):
+                    value = (value, value)
+                timeouts[route] = (
+                    float(value[0]),
+                    float(value[1]),
+                )
+        except Exception as e:
+            log.error(
+                f"ignoring invalid AI_TIMEOUTS={overrides} "
+                f'with ex="{e}"'
+            )
+    return timeouts
+
+
+def get_timeout(
+    cfg: dict,
+    route: str,
+):
+    """
+    get_timeout
+
+    get the (**connect**, **read**) timeout for
+    a route using the **cfg["timeouts"]** profiles
+    (defaults to **get_timeouts()**)
+
+    :param cfg: **CoreConfig** dictionary
+    :param route: route name from **ROUTES**
+
+    :returns: (**connect**, **read**) tuple
+    :rtype: tuple
+    """
+    timeouts = None
+    if cfg:
+        timeouts = cfg.get("timeouts", None)
+    if not timeouts:
+        timeouts = get_timeouts()
+    timeout = timeouts.get(route, None)
+    if timeout is None:
+        timeout = timeouts.get("default", (3.05, 5.0))
+    if not isinstance(timeout, (tuple, list)):
+        timeout = (timeout, timeout)
+    return tuple(timeout)
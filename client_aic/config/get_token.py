@@ -0,0 +1,36 @@
+"""
+build the token lifecycle settings
+from environment variables:
+
+- AI_TOKEN_TTL=3600
+- AI_TOKEN_REFRESH_MARGIN=60
+
+"""
+import os
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+def get_token():
+    """
+    get_token
+
+    get the settings for keeping a
+    **CoreUser** token in memory
+
+    - **ttl** - seconds a token is valid when
+      the token has no jwt **exp** claim
+    - **refresh_margin** - seconds before the
+      token expires to log in again
+
+    :returns: dict for the token settings
+    :rtype: dict
+    """
+    return {
+        "ttl": float(os.getenv("AI_TOKEN_TTL", "3600")),
+        "refresh_margin": float(
+            os.getenv("AI_TOKEN_REFRESH_MARGIN", "60")
+        ),
+    }
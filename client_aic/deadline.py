@@ -0,0 +1,164 @@
+"""
+end-to-end deadline for a chain of
+rest api requests (like **ask** logging in,
+submitting a job, polling and fetching
+the **CoreResultAI**)
+"""
+import time
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """DeadlineExceeded"""
+
+
+class Deadline:
+    """Deadline"""
+
+    def __init__(
+        self,
+        seconds: float = None,
+    ):
+        """
+        __init__
+
+        overall time budget that is passed to
+        every request in a chain so each request
+        only uses the remaining budget
+
+        ```python
+        budget = deadline.Deadline(30.0)
+        (user, res_job, res_ai) = ask.ask(
+            question=question,
+            collection_id="embed-security",
+            deadline=budget,
+        )
+        ```
+
+        :param seconds: optional - seconds from now
+            until the deadline (**None** never expires)
+        """
+        self.seconds = seconds
+        self.started_at = time.monotonic()
+        self.stop_at = None
+        if seconds is not None:
+            self.stop_at = self.started_at + seconds
+
+    def remaining(self):
+        """
+        remaining
+
+        seconds left before the deadline
+
+        :returns: seconds left or **None**
+            if there is no deadline
+        :rtype: float or None
+        """
+        if self.stop_at is None:
+            return None
+        return max(0.0, self.stop_at - time.monotonic())
+
+    def expired(self):
+        """
+        expired
+
+        :returns: **True** if the deadline passed
+        :rtype: bool
+        """
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0.0
+
+    def has_budget(
+        self,
+        delay: float,
+    ):
+        """
+        has_budget
+
+        check if there is time left to wait
+        **delay** seconds and send another request
+
+        :param delay: seconds before the
+            next request
+
+        :returns: **True** if there is budget left
+        :rtype: bool
+        """
+        remaining = self.remaining()
+        return remaining is None or remaining > delay
+
+    def get_timeout(
+        self,
+        timeout,
+    ):
+        """
+        get_timeout
+
+        cap a request's (**connect**, **read**)
+        timeout by the remaining budget
+
+        the **read** timeout is the max wait between
+        bytes so a response that keeps streaming can
+        still run past the deadline by up to one
+        **read** timeout
+
+        :param timeout: (**connect**, **read**) tuple,
+            seconds or **None**
+
+        :returns: capped (**connect**, **read**) tuple
+            or the **timeout** if there is no deadline
+        :rtype: tuple
+        :raises DeadlineExceeded: if there is no
+            budget left for another request
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if remaining <= 0.0:
+            raise DeadlineExceeded(
+                f"deadline of {self.seconds}s exceeded"
+            )
+        if timeout is None:
+            return (remaining, remaining)
+        if not isinstance(timeout, (tuple, list)):
+            timeout = (timeout, timeout)
+        (connect, read) = timeout
+        return (
+            remaining
+            if connect is None
+            else min(connect, remaining),
+            remaining
+            if read is None
+            else min(read, remaining),
+        )
+
+
+def get_deadline(
+    deadline=None,
+    timeout: float = None,
+):
+    """
+    get_deadline
+
+    get the **Deadline** for a call that
+    takes an optional **deadline** or a
+    **timeout** in seconds
+
+    :param deadline: optional - **Deadline**
+        shared with the caller
+    :param timeout: optional - seconds for a
+        new **Deadline** when there is
+        no **deadline**
+
+    :returns: **Deadline** or **None** if there
+        is no budget
+    :rtype: Deadline or None
+    """
+    if deadline is not None:
+        return deadline
+    if timeout is not None:
+        return Deadline(timeout)
+    return None
@@ -0,0 +1,689 @@
+"""
+bulk, resumable export of ai results to a
+json lines file or a parquet dataset for
+offline analysis
+
+pages are fetched concurrently with offset
+paging, handed to a background writer thread
+in order and checkpointed in a journal
+(defaults to **OUTPUT.journal**) so a restarted
+export continues after the last written row
+
+parquet output needs **pyarrow**:
+
+```bash
+pip install llama-client-aic[parquet]
+```
+
+"""
+import os
+import time
+import queue
+import shutil
+import logging
+import threading
+import concurrent.futures
+import ujson as json
+import client_aic.get_cfg as get_cfg
+import client_aic.ask as ask
+import client_aic.authenticate as auth
+import client_aic.journal as journal
+import client_aic.models.core_result_ai as core_result_ai
+import client_aic.req.ai.search_ai_results as search_ai_results
+
+
+log = logging.getLogger(__name__)
+
+# journal key for the export checkpoints
+CHECKPOINT_KEY = "export"
+
+
+class JsonlWriter:
+    """JsonlWriter"""
+
+    def __init__(
+        self,
+        path: str,
+        fields: list,
+        checkpoint: dict = None,
+        fsync: bool = True,
+    ):
+        """
+        __init__
+
+        write one json dictionary per row to
+        the **path** file. on resume the file is
+        truncated back to the checkpointed
+        size to drop rows that were written
+        after the last checkpoint
+
+        :param path: output file path
+        :param fields: list of field names
+            to write for each row
+        :param checkpoint: optional - latest
+            checkpoint from the journal
+        :param fsync: flag to flush each page
+            to disk before checkpointing
+        """
+        self.path = path
+        self.fields = fields
+        self.fsync = fsync
+        self.rows = 0
+        if checkpoint:
+            self.rows = checkpoint.get("rows", 0)
+            self.fp = open(path, "r+b")
+            self.fp.truncate(checkpoint.get("size", 0))
+            self.fp.seek(0, os.SEEK_END)
+        else:
+            self.fp = open(path, "wb")
+
+    def write(
+        self,
+        page,
+        last_id: int,
+    ):
+        """
+        write
+
+        append the rows in a page
+
+        :param page: **CoreSearchResultAI** page
+        :param last_id: last **CoreResultAI.id**
+            in the page
+
+        :returns: checkpoint dictionary
+        :rtype: dict
+        """
+        lines = "".join(
+            json.dumps(row) + "\n"
+            for row in page.to_records(self.fields)
+        )
+        self.fp.write(lines.encode("utf-8"))
+        self.fp.flush()
+        if self.fsync:
+            os.fsync(self.fp.fileno())
+        self.rows += len(page.recs)
+        return {
+            "last_id": last_id,
+            "rows": self.rows,
+            "size": self.fp.tell(),
+        }
+
+    def close(self):
+        """
+        close
+
+        close the output file
+
+        :returns: **None** because every
+            page was already checkpointed
+        """
+        self.fp.close()
+        return None
+
+
+class ParquetWriter:
+    """ParquetWriter"""
+
+    def __init__(
+        self,
+        path: str,
+        fields: list,
+        checkpoint: dict = None,
+        rows_per_file: int = 100000,
+    ):
+        """
+        __init__
+
+        write the rows into a parquet dataset
+        directory with one **part-NNNNN.parquet**
+        file per **rows_per_file** rows. each part
+        is written to a temporary file and renamed
+        so a crash never leaves a partial part,
+        and on resume any part written after
+        the last checkpoint is removed
+
+        dictionary and list values (like **data**)
+        are stored as json strings
+
+        :param path: output directory path
+        :param fields: list of field names
+        :param checkpoint: optional - latest
+            checkpoint from the journal
+        :param rows_per_file: rows per part file
+        """
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        self.fields = fields
+        self.rows_per_file = rows_per_file
+        self.rows = 0
+        self.parts = 0
+        if checkpoint:
+            self.rows = checkpoint.get("rows", 0)
+            self.parts = checkpoint.get("parts", 0)
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            if not name.startswith("part-"):
+                continue
+            start = len("part-")
+            end = start + 5
+            if (
+                not name.endswith(".parquet")
+                or int(name[start:end]) >= self.parts
+            ):
+                os.remove(os.path.join(path, name))
+        self.columns = {field: [] for field in fields}
+        self.num_buffered = 0
+        self.last_id = None
+
+    def write(
+        self,
+        page,
+        last_id: int,
+    ):
+        """
+        write
+
+        buffer the page's columns and write
+        a part file once **rows_per_file**
+        rows are buffered
+
+        :param page: **CoreSearchResultAI** page
+        :param last_id: last **CoreResultAI.id**
+            in the page
+
+        :returns: checkpoint dictionary after
+            a part was written or **None**
+        :rtype: dict
+        """
+        for field, values in self.columns.items():
+            values.extend(page.columns[field])
+        self.num_buffered += len(page.recs)
+        self.last_id = last_id
+        if self.num_buffered < self.rows_per_file:
+            return None
+        return self.write_part()
+
+    def write_part(self):
+        """
+        write_part
+
+        write the buffered rows to the
+        next part file
+
+        :returns: checkpoint dictionary
+        :rtype: dict
+        """
+        use_columns = {}
+        for field, values in self.columns.items():
+            if any(
+                isinstance(v, (dict, list)) for v in values
+            ):
+                values = [
+                    None if v is None else json.dumps(v)
+                    for v in values
+                ]
+            use_columns[field] = values
+        table = self.pa.Table.from_pydict(use_columns)
+        part_path = os.path.join(
+            self.path, f"part-{self.parts:05d}.parquet"
+        )
+        tmp_path = f"{part_path}.tmp"
+        self.pq.write_table(table, tmp_path)
+        os.replace(tmp_path, part_path)
+        self.parts += 1
+        self.rows += self.num_buffered
+        self.columns = {field: [] for field in self.fields}
+        self.num_buffered = 0
+        return {
+            "last_id": self.last_id,
+            "rows": self.rows,
+            "parts": self.parts,
+        }
+
+    def close(self):
+        """
+        close
+
+        write any buffered rows
+
+        :returns: checkpoint dictionary or
+            **None** if nothing was buffered
+        :rtype: dict
+        """
+        if not self.num_buffered:
+            return None
+        return self.write_part()
+
+
+def remove_paths(paths: list):
+    """
+    remove_paths
+
+    delete each file or directory
+    that exists
+
+    :param paths: list of paths
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def has_output(
+    path: str,
+    fmt: str,
+    checkpoint: dict,
+):
+    """
+    has_output
+
+    check the output still holds every row
+    in the **checkpoint** before resuming (like
+    after the output was deleted but the
+    journal was not)
+
+    :param path: output file or directory path
+    :param fmt: **jsonl** or **parquet**
+    :param checkpoint: latest checkpoint
+        from the journal
+
+    :returns: **True** if the export can resume
+    :rtype: bool
+    """
+    if fmt == "parquet":
+        return all(
+            os.path.isfile(
+                os.path.join(
+                    path, f"part-{idx:05d}.parquet"
+                )
+            )
+            for idx in range(checkpoint.get("parts", 0))
+        )
+    return os.path.isfile(path) and os.path.getsize(
+        path
+    ) >= checkpoint.get("size", 0)
+
+
+def export_ai_results(
+    output_path: str,
+    query: str,
+    data: dict = None,
+    fmt: str = None,
+    fields: list = None,
+    page_size: int = 1000,
+    concurrency: int = 4,
+    resume: bool = True,
+    user=None,
+    email: str = None,
+    password: str = None,
+    username: str = None,
+    cfg_core: dict = None,
+    journal_path: str = None,
+    rows_per_file: int = 100000,
+    progress_secs: float = 5.0,
+    timeout: float = 30,
+):
+    """
+    export_ai_results
+
+    export every ai result that matches a search
+    (like all results for a user, collection or
+    session) to a json lines file or a parquet
+    dataset directory
+
+    up to **concurrency** pages are fetched at the
+    same time with offset paging sorted by
+    **CoreResultAI.id**. pages are written in
+    order by a background writer thread and each
+    written page (or parquet part) is checkpointed
+    in the journal. re-running an unfinished
+    export continues after the last checkpointed
+    **id** and appends to the same output
+
+    the search api paging values are **limit**,
+    **offset**, **order_by=id** and **after_id**
+    (the checkpointed **id** on resume)
+
+    ```python
+    summary = export_ai_results(
+        output_path="results.jsonl",
+        query="by_user_id",
+        data={"user_id": user.id},
+        fields=["id", "job_id", "question", "score"],
+    )
+    print(summary["rows_per_sec"])
+    ```
+
+    :param output_path: output file (json lines)
+        or directory (parquet)
+    :param query: logical name of the search
+        (like **by_user_id**, **by_collection**
+        or **by_session_id**)
+    :param data: optional - extra search values
+        dictionary (like **user_id**)
+    :param fmt: optional - **jsonl** or **parquet**
+        (defaults to **parquet** when the
+        **output_path** ends with **.parquet**)
+    :param fields: optional - list of
+        **CoreResultAI** fields to export
+        (defaults to all fields)
+    :param page_size: results per page
+    :param concurrency: max pages fetched
+        at the same time
+    :param resume: flag to continue an
+        unfinished export (**False** starts over
+        and replaces the output, also needed to
+        export again after an export finished).
+        an export whose output is missing or
+        shorter than the journal starts over
+    :param user: optional - authenticated
+        **CoreUser** (skips the login)
+    :param email: optional - user email for the rest api
+    :param password: optional - user password for the rest api
+    :param username: optional - username for the rest api
+    :param cfg_core: optional - **CoreConfig** dictionary
+    :param journal_path: optional - path to the
+        checkpoint journal (defaults to
+        **OUTPUT.journal**)
+    :param rows_per_file: rows per parquet part file
+    :param progress_secs: seconds between
+        progress log lines
+    :param timeout: per-page request timeout
+        in seconds
+
+    :returns: summary dictionary with the
+        **status** (**done** or **failed**),
+        **rows** written by this run, **total_rows**,
+        **last_id**, **seconds** and **rows_per_sec**
+        or **None** if the export could not start
+    :rtype: dict
+    """
+    cfg = cfg_core
+    if not cfg_core:
+        cfg = get_cfg.get_cfg()
+    if not fmt:
+        fmt = "jsonl"
+        if output_path.endswith(".parquet"):
+            fmt = "parquet"
+    if fmt not in ["jsonl", "parquet"]:
+        log.error(f"unsupported export format={fmt}")
+        return None
+    all_fields = core_result_ai.CoreResultAI.fields
+    use_fields = list(fields or all_fields)
+    unknown = [f for f in use_fields if f not in all_fields]
+    if unknown:
+        log.error(f"unsupported export fields={unknown}")
+        return None
+    if not journal_path:
+        journal_path = f"{output_path}.journal"
+    jrnl = journal.Journal(journal_path)
+    checkpoint = None
+    if resume:
+        checkpoint = jrnl.load().get(CHECKPOINT_KEY, None)
+    else:
+        remove_paths([journal_path, output_path])
+    if checkpoint and (
+        checkpoint.get("fmt") != fmt
+        or checkpoint.get("fields") != use_fields
+    ):
+        log.error(
+            f"export journal={journal_path} was "
+            f"written with fmt={checkpoint.get('fmt')} "
+            f"fields={checkpoint.get('fields')} - please "
+            "use the same values or resume=False"
+        )
+        return None
+    if checkpoint and not has_output(
+        output_path, fmt, checkpoint
+    ):
+        log.warning(
+            f"export={output_path} is missing rows "
+            f"from journal={journal_path} - restarting "
+            "the export"
+        )
+        checkpoint = None
+        remove_paths([journal_path, output_path])
+    start_id = None
+    total_rows = 0
+    if checkpoint:
+        start_id = checkpoint.get("last_id", None)
+        total_rows = checkpoint.get("rows", 0)
+        if checkpoint.get("state") == "done":
+            log.info(
+                f"export={output_path} already "
+                f"finished rows={total_rows} - use "
+                "resume=False (or --restart) to "
+                "export again"
+            )
+            return {
+                "status": "done",
+                "rows": 0,
+                "total_rows": total_rows,
+                "last_id": start_id,
+                "seconds": 0.0,
+                "rows_per_sec": 0.0,
+            }
+        log.info(
+            f"resuming export={output_path} "
+            f"after id={start_id} rows={total_rows}"
+        )
+    if not user:
+        (username, password, email) = ask.get_user_creds(
+            cfg=cfg,
+            username=username,
+            password=password,
+            email=email,
+        )
+        user = auth.authenticate(
+            username=username,
+            email=email,
+            password=password,
+            cfg=cfg,
+        )
+        if not user:
+            log.error(
+                f"failed to login as user: {username}"
+            )
+            return None
+    if fmt == "parquet":
+        try:
+            writer = ParquetWriter(
+                path=output_path,
+                fields=use_fields,
+                checkpoint=checkpoint,
+                rows_per_file=rows_per_file,
+            )
+        except ImportError:
+            log.error(
+                "parquet export requires pyarrow - please "
+                "pip install llama-client-aic[parquet]"
+            )
+            return None
+    else:
+        writer = JsonlWriter(
+            path=output_path,
+            fields=use_fields,
+            checkpoint=checkpoint,
+        )
+
+    base_req = dict(data or {})
+    base_req["query"] = query
+    base_req["limit"] = page_size
+    base_req["order_by"] = "id"
+    if start_id is not None:
+        base_req["after_id"] = start_id
+
+    def fetch_page(page_idx):
+        req = dict(base_req)
+        req["offset"] = page_idx * page_size
+        return search_ai_results.search_ai_results(
+            user=user,
+            data=req,
+            cfg=cfg,
+            timeout=timeout,
+        )
+
+    # bounded so slow disks slow down the fetching
+    pages = queue.Queue(maxsize=concurrency)
+    writer_errors = []
+
+    def save_checkpoint(cur_cp):
+        jrnl.write(
+            CHECKPOINT_KEY,
+            "page",
+            fmt=fmt,
+            fields=use_fields,
+            **cur_cp,
+        )
+
+    def run_writer():
+        # keep reading after an error so the
+        # fetch loop never blocks on a full queue
+        while True:
+            item = pages.get()
+            if item is None:
+                break
+            if writer_errors:
+                continue
+            try:
+                cur_cp = writer.write(*item)
+                if cur_cp:
+                    save_checkpoint(cur_cp)
+            except Exception as e:
+                log.error(
+                    f"failed writing export={output_path} "
+                    f'with ex="{e}"'
+                )
+                writer_errors.append(e)
+        try:
+            cur_cp = writer.close()
+            if cur_cp and not writer_errors:
+                save_checkpoint(cur_cp)
+        except Exception as e:
+            log.error(
+                f"failed closing export={output_path} "
+                f'with ex="{e}"'
+            )
+            writer_errors.append(e)
+
+    writer_thread = threading.Thread(
+        target=run_writer,
+        name="ai-result-export-writer",
+        daemon=True,
+    )
+    writer_thread.start()
+    log.info(
+        f"starting export={output_path} fmt={fmt} "
+        f"query={query} page_size={page_size} "
+        f"concurrency={concurrency}"
+    )
+    status = "done"
+    num_rows = 0
+    last_id = start_id
+    start_time = time.monotonic()
+    progress_time = start_time
+    futures = {}
+    next_submit = 0
+    next_page = 0
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=concurrency,
+        thread_name_prefix="ai-result-export",
+    )
+    try:
+        while not writer_errors:
+            while next_submit < next_page + concurrency:
+                futures[next_submit] = executor.submit(
+                    fetch_page, next_submit
+                )
+                next_submit += 1
+            page = futures.pop(next_page).result()
+            if page is None:
+                log.error(
+                    f"failed export page={next_page} "
+                    f"after id={last_id}"
+                )
+                status = "failed"
+                break
+            page_rows = len(page.recs)
+            if page_rows:
+                ids = page.columns["id"]
+                if None in ids:
+                    log.error(
+                        f"stopping export - page={next_page} "
+                        f"after id={last_id} has results "
+                        "without an id so it cannot be "
+                        "checkpointed"
+                    )
+                    status = "failed"
+                    break
+                if (
+                    last_id is not None
+                    and ids[0] <= last_id
+                ):
+                    log.error(
+                        f"stopping export - page={next_page} "
+                        f"starts at id={ids[0]} after "
+                        f"id={last_id} so the api is not "
+                        "sorting or paging the results"
+                    )
+                    status = "failed"
+                    break
+                last_id = ids[-1]
+                num_rows += page_rows
+                pages.put((page, last_id))
+            if page_rows < page_size:
+                break
+            next_page += 1
+            now = time.monotonic()
+            if now - progress_time >= progress_secs:
+                progress_time = now
+                log.info(
+                    f"exported rows={num_rows} "
+                    f"rows_per_sec="
+                    f"{num_rows / (now - start_time):.1f} "
+                    f"last_id={last_id}"
+                )
+    finally:
+        for fut in futures.values():
+            fut.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+        pages.put(None)
+        writer_thread.join()
+    if writer_errors:
+        status = "failed"
+    if status == "done":
+        jrnl.write(
+            CHECKPOINT_KEY,
+            "done",
+            fmt=fmt,
+            fields=use_fields,
+            last_id=last_id,
+            rows=writer.rows,
+        )
+    jrnl.close()
+    seconds = time.monotonic() - start_time
+    rows_per_sec = 0.0
+    if seconds > 0:
+        rows_per_sec = num_rows / seconds
+    summary = {
+        "status": status,
+        "rows": num_rows,
+        "total_rows": total_rows + num_rows,
+        "last_id": last_id,
+        "seconds": seconds,
+        "rows_per_sec": rows_per_sec,
+    }
+    log.info(
+        f"finished export={output_path} "
+        f"status={status} rows={num_rows} "
+        f"total_rows={summary['total_rows']} "
+        f"rows_per_sec={rows_per_sec:.1f}"
+    )
+    return summary
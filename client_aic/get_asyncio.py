@@ -0,0 +1,24 @@
+"""
+get the asyncio module for code that only
+runs inside a coroutine
+"""
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+def get_asyncio():
+    """
+    get_asyncio
+
+    import **asyncio** on first use. asyncio is
+    already loaded when a coroutine runs so the
+    cli never pays for importing it at startup
+
+    :returns: **asyncio** module
+    :rtype: module
+    """
+    import asyncio
+
+    return asyncio
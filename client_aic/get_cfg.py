@@ -6,24 +6,93 @@ regularly-used values:
 - tls/mtls
 - auth creds
 
+the config is resolved from the environment
+variables once per process and shared as a
+read-only snapshot. call **reload** after
+changing the environment variables
+
 """
 import logging
+import threading
 import client_aic.config.core_config as core_config
+import client_aic.config.frozen_config as frozen_config
+import client_aic.config.get_routes as get_routes
 
 
 log = logging.getLogger(__name__)
 
+cfg_lock = threading.Lock()
+cfg_snapshot = None
+
+
+def build_cfg():
+    """
+    build_cfg
+
+    resolve the **CoreConfig** from the environment
+    variables and pre-resolve the values used on
+    every request:
+
+    - **urls** - full url for each rest api route
+    - **certs** - (**cert_file**, **key_file**) tuple
+    - **verify** - path to the CA file or **None**
+
+    :returns: read-only **FrozenConfig**
+    :rtype: FrozenConfig
+    """
+    values = dict(core_config.CoreConfig().get_cfg())
+    tls = values.get("tls", {})
+    values["urls"] = get_routes.get_urls(values["endpoint"])
+    values["certs"] = (
+        tls.get("cert", None),
+        tls.get("key", None),
+    )
+    values["verify"] = tls.get("ca", None)
+    return frozen_config.FrozenConfig(values)
+
 
 def get_cfg():
     """
     get_cfg
 
-    build a common configuration for
+    get the common configuration for
     all client requests and shared state
 
-    :returns: dictionary for the **CoreConfig**
-    :rtype: dict
+    the config is built once and then
+    reused by every call
+
+    :returns: read-only **FrozenConfig**
+        for the **CoreConfig**
+    :rtype: FrozenConfig
+    """
+    global cfg_snapshot
+    cfg = cfg_snapshot
+    if cfg is not None:
+        return cfg
+    with cfg_lock:
+        if cfg_snapshot is None:
+            cfg_snapshot = build_cfg()
+            log.debug(
+                f"using endpoint={cfg_snapshot['endpoint']}"
+            )
+        return cfg_snapshot
+
+
+def reload():
+    """
+    reload
+
+    resolve the config from the environment
+    variables again and replace the
+    shared snapshot
+
+    :returns: new read-only **FrozenConfig**
+    :rtype: FrozenConfig
     """
-    cfg = core_config.CoreConfig()
-    log.debug(f"using cfg={cfg.get_cfg()}")
-    return cfg.get_cfg()
+    global cfg_snapshot
+    with cfg_lock:
+        cfg_snapshot = build_cfg()
+        log.debug(
+            f"reloaded endpoint={cfg_snapshot['endpoint']}"
+        )
+        return cfg_snapshot
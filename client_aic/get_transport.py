@@ -0,0 +1,166 @@
+"""
+get the shared http transport that
+holds the keep-alive connection pool
+for all client requests
+"""
+import logging
+import threading
+import client_aic.config.get_pool as get_pool
+import client_aic.config.get_retry as get_retry
+import client_aic.config.get_breaker as get_breaker
+import client_aic.config.get_hedge as get_hedge
+import client_aic.config.get_rate_limits as get_rate_limits
+import client_aic.config.frozen_config as frozen_config
+import client_aic.rate_limiter as rate_limiter
+import client_aic.transport.core_transport as core_transport
+
+
+log = logging.getLogger(__name__)
+
+transport_lock = threading.Lock()
+transports = {}
+# FrozenConfig -> transport so a request with the
+# shared cfg does not rebuild the retry, breaker
+# and hedge settings to find its transport
+cfg_transports = {}
+
+
+# cfg key to the function for its default settings
+SETTINGS = {
+    "pool": get_pool.get_pool,
+    "retry": get_retry.get_retry,
+    "rate_limits": get_rate_limits.get_rate_limits,
+    "breaker": get_breaker.get_breaker,
+    "hedge": get_hedge.get_hedge,
+}
+
+
+def get_transport_key(cfg: dict = None):
+    """
+    get_transport_key
+
+    build the transport cache key from the
+    **cfg** settings (or their defaults) without
+    building the retry, breaker and hedge
+    policies that **get_transport_args** needs
+
+    :param cfg: optional **CoreConfig** dictionary
+
+    :returns: hashable key
+    :rtype: tuple
+    """
+    key = []
+    for name, get_default in SETTINGS.items():
+        value = None
+        if cfg:
+            value = cfg.get(name, None)
+        if value is None or (name == "pool" and not value):
+            value = get_default()
+        get_key = getattr(value, "get_key", None)
+        if get_key:
+            # a policy object from the caller
+            value = get_key()
+        key.append(frozen_config.freeze(value))
+    return tuple(key)
+
+
+def get_transport_args(cfg: dict = None):
+    """
+    get_transport_args
+
+    resolve the **CoreTransport** arguments for
+    the **cfg["pool"]**, **cfg["retry"]**,
+    **cfg["rate_limits"]**, **cfg["breaker"]** and
+    **cfg["hedge"]** settings
+
+    (please see **get_retry.get_retry_policy**,
+    **get_breaker.get_circuit_breakers** and
+    **get_hedge.get_hedge_policy**)
+
+    :param cfg: optional **CoreConfig** dictionary
+
+    :returns: dictionary of **CoreTransport**
+        arguments
+    :rtype: dict
+    """
+    pool = None
+    if cfg:
+        pool = cfg.get("pool", None)
+    if not pool:
+        pool = get_pool.get_pool()
+    return {
+        "pool_connections": pool.get("connections", 10),
+        "pool_maxsize": pool.get("maxsize", 10),
+        "pool_block": pool.get("block", False),
+        "retry": get_retry.get_retry_policy(cfg),
+        "limiter": rate_limiter.get_rate_limiter(cfg),
+        "breakers": get_breaker.get_circuit_breakers(cfg),
+        "hedge": get_hedge.get_hedge_policy(cfg),
+    }
+
+
+def build_transport(cfg: dict = None):
+    """
+    build_transport
+
+    create a new **CoreTransport** with its own
+    connection pool for a **CoreConfig**
+    dictionary (please see
+    **get_transport_args**)
+
+    :param cfg: optional **CoreConfig** dictionary
+
+    :returns: new **CoreTransport**
+    :rtype: CoreTransport
+    """
+    return core_transport.CoreTransport(
+        **get_transport_args(cfg)
+    )
+
+
+def get_transport(cfg: dict = None):
+    """
+    get_transport
+
+    get the **CoreTransport** for a
+    **CoreConfig** dictionary
+
+    use the **cfg["transport"]** if one
+    was set by the caller, otherwise reuse
+    the process-wide transport for the
+    **cfg["pool"]**, **cfg["retry"]** and
+    **cfg["rate_limits"]**, **cfg["breaker"]** and
+    **cfg["hedge"]** settings (please see
+    **get_transport_args**)
+
+    the transport for a read-only **FrozenConfig**
+    (from **get_cfg.get_cfg()**) is only resolved
+    on the first request with that config. other
+    dictionaries are looked up by their settings
+    (please see **get_transport_key**) and the
+    policies are only built for a new transport
+
+    :param cfg: optional **CoreConfig** dictionary
+
+    :returns: shared **CoreTransport**
+    :rtype: CoreTransport
+    """
+    frozen = False
+    if cfg:
+        transport = cfg.get("transport", None)
+        if transport:
+            return transport
+        frozen = isinstance(cfg, frozen_config.FrozenConfig)
+        if frozen:
+            transport = cfg_transports.get(cfg, None)
+            if transport:
+                return transport
+    key = get_transport_key(cfg)
+    with transport_lock:
+        transport = transports.get(key, None)
+        if not transport:
+            transport = build_transport(cfg)
+            transports[key] = transport
+        if frozen:
+            cfg_transports[cfg] = transport
+    return transport
@@ -0,0 +1,311 @@
+"""
+hedged requests for idempotent reads
+
+a read that has not answered after the route's
+recent **quantile** (p95 by default) latency is
+sent a second time and the first response
+wins so one slow connection does not stall a
+caller for a full read timeout
+
+hedged reads are off unless a **quantile**
+is set (please see **get_hedge.get_hedge**)
+"""
+import math
+import logging
+import threading
+import collections
+
+
+log = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    """HedgePolicy"""
+
+    def __init__(
+        self,
+        quantile: float = 0.95,
+        min_delay: float = 0.05,
+        max_delay: float = 2.0,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = 8,
+    ):
+        """
+        __init__
+
+        settings and per-route latency history
+        for hedging reads
+
+        at most about **1 - quantile** of the reads
+        on a route send a hedge so the extra
+        load stays small
+
+        :param quantile: latency quantile to wait
+            for before sending the hedge
+        :param min_delay: min seconds before
+            sending the hedge
+        :param max_delay: max seconds before
+            sending the hedge
+        :param min_samples: latencies to collect
+            for a route before it is hedged
+        :param window: latencies kept per route
+        :param max_workers: max hedged reads
+            and hedges in flight on the shared
+            worker threads
+        """
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = max(1, int(min_samples))
+        self.window = max(self.min_samples, int(window))
+        self.max_workers = max(2, int(max_workers))
+        self.lock = threading.Lock()
+        # a worker is only used with a free slot so
+        # a read never waits in the executor queue
+        self.slots = threading.BoundedSemaphore(
+            self.max_workers
+        )
+        self.executor = None
+        # route -> recent latencies
+        self.latencies = {}
+        # route -> cached delay (None to recompute)
+        self.delays = {}
+        self.num_hedges = 0
+        self.num_hedge_wins = 0
+
+    def get_key(self):
+        """
+        get_key
+
+        :returns: tuple of the settings for
+            sharing transports with the same policy
+        :rtype: tuple
+        """
+        return (
+            self.quantile,
+            self.min_delay,
+            self.max_delay,
+            self.min_samples,
+            self.window,
+            self.max_workers,
+        )
+
+    def record(
+        self,
+        route: str,
+        latency: float,
+    ):
+        """
+        record
+
+        add a response latency for the route
+
+        :param route: route name from **ROUTES**
+        :param latency: seconds until the
+            response arrived
+        """
+        with self.lock:
+            latencies = self.latencies.get(route, None)
+            if latencies is None:
+                latencies = collections.deque(
+                    maxlen=self.window
+                )
+                self.latencies[route] = latencies
+            latencies.append(latency)
+            self.delays[route] = None
+
+    def get_delay(
+        self,
+        route: str,
+    ):
+        """
+        get_delay
+
+        :param route: route name from **ROUTES**
+
+        :returns: seconds to wait before sending a
+            hedge or **None** if there are not
+            enough latencies for the route yet
+        :rtype: float or None
+        """
+        with self.lock:
+            delay = self.delays.get(route, None)
+            if delay is not None:
+                return delay
+            latencies = self.latencies.get(route, None)
+            if (
+                not latencies
+                or len(latencies) < self.min_samples
+            ):
+                return None
+            ordered = sorted(latencies)
+            index = min(
+                len(ordered) - 1,
+                max(
+                    0,
+                    math.ceil(self.quantile * len(ordered))
+                    - 1,
+                ),
+            )
+            delay = min(
+                self.max_delay,
+                max(self.min_delay, ordered[index]),
+            )
+            self.delays[route] = delay
+            return delay
+
+    def on_hedge(
+        self,
+        won: bool,
+    ):
+        """
+        on_hedge
+
+        count a hedge that was sent
+
+        :param won: **True** if the hedge
+            answered first
+        """
+        with self.lock:
+            self.num_hedges += 1
+            if won:
+                self.num_hedge_wins += 1
+
+    def submit(
+        self,
+        fn,
+        *args,
+        **kwargs,
+    ):
+        """
+        submit
+
+        run **fn** on a shared worker thread if
+        one of the **max_workers** is free
+
+        :param fn: function to run
+        :param args: positional arguments for **fn**
+        :param kwargs: keyword arguments for **fn**
+
+        :returns: **concurrent.futures.Future** for
+            the result or **None** if every worker
+            is busy
+        :rtype: concurrent.futures.Future or None
+        """
+        if not self.reserve():
+            return None
+        return self.submit_reserved(fn, *args, **kwargs)
+
+    def reserve(self):
+        """
+        reserve
+
+        hold a free worker slot for a later
+        **submit_reserved** (or **release_slot**)
+
+        :returns: **True** if a worker was free
+        :rtype: bool
+        """
+        return self.slots.acquire(blocking=False)
+
+    def submit_reserved(
+        self,
+        fn,
+        *args,
+        **kwargs,
+    ):
+        """
+        submit_reserved
+
+        run **fn** on the worker slot held
+        by **reserve**
+
+        :param fn: function to run
+        :param args: positional arguments for **fn**
+        :param kwargs: keyword arguments for **fn**
+
+        :returns: **concurrent.futures.Future**
+            for the result
+        :rtype: concurrent.futures.Future
+        """
+        try:
+            fut = self.get_executor().submit(
+                fn, *args, **kwargs
+            )
+        except BaseException:
+            self.slots.release()
+            raise
+        fut.add_done_callback(self.release_slot)
+        return fut
+
+    def release_slot(
+        self,
+        fut,
+    ):
+        """
+        release_slot
+
+        free the worker slot of a finished read
+
+        :param fut: finished future (or **None**
+            for an unused **reserve**)
+        """
+        self.slots.release()
+
+    def get_executor(self):
+        """
+        get_executor
+
+        get (or lazily build) the shared
+        worker threads
+
+        :returns: **ThreadPoolExecutor** with
+            **max_workers** threads
+        :rtype: concurrent.futures.ThreadPoolExecutor
+        """
+        if self.executor is None:
+            import concurrent.futures
+
+            with self.lock:
+                if self.executor is None:
+                    self.executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="hedge",
+                    )
+        return self.executor
+
+    def get_stats(self):
+        """
+        get_stats
+
+        :returns: dictionary with the **hedges**
+            and **wins** counts and the current
+            **delays** per route (**None** until a
+            route has **min_samples** latencies)
+        :rtype: dict
+        """
+        with self.lock:
+            routes = list(self.latencies)
+            stats = {
+                "hedges": self.num_hedges,
+                "wins": self.num_hedge_wins,
+            }
+        stats["delays"] = {
+            route: self.get_delay(route) for route in routes
+        }
+        return stats
+
+
+def close_response(fut):
+    """
+    close_response
+
+    release the connection of a hedged read
+    that lost the race
+
+    :param fut: finished future for
+        the response
+    """
+    if not fut.cancelled() and fut.exception() is None:
+        fut.result().close()
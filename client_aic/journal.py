@@ -0,0 +1,118 @@
+"""
+append-only json lines journal for
+tracking the state of long-running batches
+so they can resume after a crash
+"""
+import os
+import time
+import logging
+import threading
+import ujson as json
+
+
+log = logging.getLogger(__name__)
+
+
+class Journal:
+    """Journal"""
+
+    def __init__(
+        self,
+        path: str,
+        fsync: bool = True,
+    ):
+        """
+        __init__
+
+        each call to **Journal.write** appends
+        one json line to the **path** file and
+        the latest entry for a **key** wins
+        when the journal is loaded again
+
+        :param path: path to the journal file
+        :param fsync: flag to flush each entry to
+            disk before returning so a crash does not
+            lose entries (default **True**)
+        """
+        self.path = path
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.fp = None
+
+    def load(self):
+        """
+        load
+
+        read the journal and get the latest
+        entry for each key. a partially-written
+        last line (from a crash) is ignored
+
+        :returns: dictionary of **key** to the
+            latest entry dictionary
+        :rtype: dict
+        """
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, "r") as fp:
+            for line_no, line in enumerate(fp):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except Exception:
+                    log.error(
+                        f"skipping invalid journal "
+                        f"line={line_no + 1} in {self.path}"
+                    )
+                    continue
+                entries[entry.get("key")] = entry
+        return entries
+
+    def write(
+        self,
+        key,
+        state: str,
+        **values,
+    ):
+        """
+        write
+
+        append a new entry for the **key**
+
+        :param key: unique key for the tracked item
+        :param state: state of the item
+            (e.g. **submitted**, **done**, **failed**)
+        :param values: extra values to store
+            with the entry
+
+        :returns: the entry dictionary
+        :rtype: dict
+        """
+        entry = {
+            "key": key,
+            "state": state,
+            "ts": time.time(),
+        }
+        entry.update(values)
+        line = json.dumps(entry) + "\n"
+        with self.lock:
+            if self.fp is None:
+                self.fp = open(self.path, "a")
+            self.fp.write(line)
+            self.fp.flush()
+            if self.fsync:
+                os.fsync(self.fp.fileno())
+        return entry
+
+    def close(self):
+        """
+        close
+
+        close the journal file
+        """
+        with self.lock:
+            if self.fp is not None:
+                self.fp.close()
+                self.fp = None
@@ -0,0 +1,220 @@
+"""
+incremental json decoding for large rest api
+responses that yields the items of one array
+(like the search **recs**) one at a time
+without buffering the whole response
+"""
+import json
+import codecs
+import logging
+
+
+log = logging.getLogger(__name__)
+
+WHITESPACE = " \t\n\r"
+
+
+class JsonStream:
+    """JsonStream"""
+
+    def __init__(
+        self,
+        chunks,
+    ):
+        """
+        __init__
+
+        text buffer over an iterable of
+        **bytes** (or **str**) chunks that only
+        keeps the unparsed tail of the
+        response in memory
+
+        values are parsed with the standard
+        library **json.JSONDecoder.raw_decode**
+        because ujson can not decode a value
+        from the middle of a buffer
+
+        :param chunks: iterable of bytes or str
+            (like **requests.Response.iter_content**)
+        """
+        self.chunks = iter(chunks)
+        self.text_decoder = codecs.getincrementaldecoder(
+            "utf-8"
+        )()
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def read_more(self):
+        """
+        read_more
+
+        drop the parsed text and append
+        the next chunk to the buffer
+
+        :returns: **False** when there is
+            nothing left to read
+        :rtype: bool
+        """
+        if self.eof:
+            return False
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            chunk = self.text_decoder.decode(
+                b"", final=True
+            )
+            if not chunk:
+                return False
+        elif isinstance(chunk, bytes):
+            chunk = self.text_decoder.decode(chunk)
+        start = self.pos
+        self.buf = self.buf[start:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        peek
+
+        skip whitespace and return the
+        next character without consuming it
+
+        :returns: next character or an
+            empty string at the end
+        :rtype: str
+        """
+        while True:
+            buf = self.buf
+            num_chars = len(buf)
+            pos = self.pos
+            while (
+                pos < num_chars and buf[pos] in WHITESPACE
+            ):
+                pos += 1
+            self.pos = pos
+            if pos < num_chars:
+                return buf[pos]
+            if not self.read_more():
+                return ""
+
+    def expect(
+        self,
+        chars: str,
+    ):
+        """
+        expect
+
+        consume the next character and
+        check it is one of **chars**
+
+        :param chars: allowed characters
+
+        :returns: the consumed character
+        :rtype: str
+        """
+        cur_char = self.peek()
+        if not cur_char or cur_char not in chars:
+            raise ValueError(
+                f"expected one of {chars!r} but "
+                f"found {cur_char!r} in the response"
+            )
+        self.pos += 1
+        return cur_char
+
+    def value(self):
+        """
+        value
+
+        decode the next complete json value
+
+        a failed decode waits for the unparsed
+        text to double before trying again so a
+        large record split over many chunks is
+        parsed in linear time
+
+        :returns: decoded value
+        """
+        self.peek()
+        need = 0
+        while True:
+            pending = len(self.buf) - self.pos
+            if pending >= need or self.eof:
+                try:
+                    (
+                        cur_val,
+                        end,
+                    ) = self.decoder.raw_decode(
+                        self.buf, self.pos
+                    )
+                    # a number at the end of the buffer
+                    # may continue in the next chunk
+                    if end < len(self.buf) or self.eof:
+                        self.pos = end
+                        return cur_val
+                except json.JSONDecodeError:
+                    if self.eof:
+                        raise
+                need = 2 * pending + 1
+            # at the end the next pass decodes or raises
+            self.read_more()
+
+
+def iter_json_array(
+    chunks,
+    key: str = "recs",
+    meta: dict = None,
+):
+    """
+    iter_json_array
+
+    generator that yields each item of the
+    array under the top-level **key** of a
+    json object as soon as it is decoded
+
+    peak memory is one item plus one chunk
+    instead of the whole response body
+
+    ```python
+    meta = {}
+    for rec in iter_json_array(
+        r.iter_content(chunk_size=65536),
+        key="recs",
+        meta=meta,
+    ):
+        print(rec["id"])
+    print(meta.get("msg"))
+    ```
+
+    :param chunks: iterable of bytes or str
+    :param key: top-level key for the array
+    :param meta: optional - dictionary that
+        is filled with the other top-level
+        values (like **msg** and **sql_query**)
+
+    :returns: generator of decoded items
+    :rtype: generator
+    """
+    stream = JsonStream(chunks)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        cur_key = stream.value()
+        stream.expect(":")
+        if cur_key == key and stream.peek() == "[":
+            stream.pos += 1
+            if stream.peek() == "]":
+                stream.pos += 1
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.expect(",]") == "]":
+                        break
+        else:
+            cur_val = stream.value()
+            if meta is not None:
+                meta[cur_key] = cur_val
+        if stream.expect(",}") == "}":
+            return
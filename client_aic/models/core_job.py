@@ -1,6 +1,24 @@
+import client_aic.models.model_codec as model_codec
+
+
 class CoreJob:
     """## CoreJob"""
 
+    # rest api fields in the job schema
+    fields = (
+        "id",
+        "user_id",
+        "worker_id",
+        "state",
+        "status",
+        "job_type",
+        "data",
+        "msg",
+        "created_at",
+        "updated_at",
+    )
+    __slots__ = fields
+
     def __init__(
         self,
         id: int,
@@ -47,3 +65,6 @@ class CoreJob:
         self.msg = msg
         self.created_at = created_at
         self.updated_at = updated_at
+
+
+model_codec.add_codec(CoreJob)
@@ -1,5 +1,6 @@
 import logging
 import client_aic.ppj as ppj
+import client_aic.models.model_codec as model_codec
 
 
 log = logging.getLogger(__name__)
@@ -8,6 +9,50 @@ log = logging.getLogger(__name__)
 class CoreResultAI:
     """## CoreResultAI"""
 
+    # rest api fields in the ai_result schema
+    fields = (
+        "id",
+        "user_id",
+        "job_id",
+        "worker_id",
+        "state",
+        "question",
+        "answer",
+        "model_name",
+        "score",
+        "question_score",
+        "answer_score",
+        "match_source",
+        "match_page",
+        "match_content",
+        "summarized_question",
+        "summarized_answer",
+        "summarized_score",
+        "reviewed_answer",
+        "reviewed_score",
+        "reviewed_computed_score",
+        "reviewed_notes",
+        "collection",
+        "collection_notes",
+        "session_id",
+        "derived_session_id",
+        "embed_model_name",
+        "category",
+        "tags",
+        "latency",
+        "data",
+        "created_at",
+        "updated_at",
+    )
+    # response-only values from the rest api and
+    # the field values last loaded from the rest api
+    __slots__ = fields + (
+        "sql_query",
+        "msg",
+        "recs",
+        "loaded",
+    )
+
     def __init__(
         self,
         id: int = None,
@@ -193,76 +238,77 @@ class CoreResultAI:
         self.data = data
         self.created_at = created_at
         self.updated_at = updated_at
+        self.sql_query = None
+        self.msg = None
+        self.recs = None
+        # not loaded from the rest api so
+        # every field counts as changed
+        self.loaded = None
 
     def load_response_dict(
         self,
         rec_dict,
     ):
+        """
+        load_response_dict
+
+        load a rest api response dictionary
+        into this **CoreResultAI** object
+
+        :param rec_dict dict: response
+            dictionary from the rest api
+        """
+        for field in self.fields:
+            setattr(self, field, rec_dict.get(field, None))
         self.sql_query = rec_dict.get("sql_query", None)
         self.msg = rec_dict.get("msg", None)
-        self.recs = []
-        for rec in rec_dict.get("recs", []):
-            self.add_rec(rec)
-        self.id = rec_dict.get("id", None)
-        self.user_id = rec_dict.get("user_id", None)
-        self.job_id = rec_dict.get("job_id", None)
-        self.worker_id = rec_dict.get("worker_id", None)
-        self.state = rec_dict.get("state", None)
-        self.question = rec_dict.get("question", None)
-        self.answer = rec_dict.get("answer", None)
-        self.model_name = rec_dict.get("model_name", None)
-        self.score = rec_dict.get("score", None)
-        self.question_score = rec_dict.get(
-            "question_score", None
-        )
-        self.answer_score = rec_dict.get(
-            "answer_score", None
-        )
-        self.match_source = rec_dict.get(
-            "match_source", None
-        )
-        self.match_page = rec_dict.get("match_page", None)
-        self.match_content = rec_dict.get(
-            "match_content", None
-        )
-        self.summarized_question = rec_dict.get(
-            "summarized_question", None
-        )
-        self.summarized_answer = rec_dict.get(
-            "summarized_answer", None
-        )
-        self.summarized_score = rec_dict.get(
-            "summarized_score", None
-        )
-        self.reviewed_answer = rec_dict.get(
-            "reviewed_answer", None
-        )
-        self.reviewed_score = rec_dict.get(
-            "reviewed_score", None
-        )
-        self.reviewed_computed_score = rec_dict.get(
-            "reviewed_computed_score", None
-        )
-        self.reviewed_notes = rec_dict.get(
-            "reviewed_notes", None
-        )
-        self.collection = rec_dict.get("collection", None)
-        self.collection_notes = rec_dict.get(
-            "collection_notes", None
-        )
-        self.session_id = rec_dict.get("session_id", None)
-        self.derived_session_id = rec_dict.get(
-            "derived_session_id", None
-        )
-        self.embed_model_name = rec_dict.get(
-            "embed_model_name", None
+        from_dict = self.from_dict
+        self.recs = [
+            from_dict(rec)
+            for rec in rec_dict.get("recs", [])
+        ]
+        self.mark_clean()
+
+    def mark_clean(self):
+        """
+        mark_clean
+
+        remember the current field values as the
+        values saved in the rest api so only
+        fields changed after this call are
+        returned by **get_changes**
+        """
+        self.loaded = tuple(
+            model_codec.freeze(getattr(self, field))
+            for field in self.fields
         )
-        self.category = rec_dict.get("category", None)
-        self.tags = rec_dict.get("tags", None)
-        self.latency = rec_dict.get("latency", None)
-        self.data = rec_dict.get("data", None)
-        self.created_at = rec_dict.get("created_at", None)
-        self.updated_at = rec_dict.get("updated_at", None)
+
+    def get_changes(self):
+        """
+        get_changes
+
+        get the fields that changed since the
+        record was loaded from the rest api (or
+        since **mark_clean**)
+
+        **dict** and **list** values (like
+        **data**) are compared with a json
+        snapshot so in-place edits are found
+
+        :returns: dictionary of changed field
+            values or **None** if the record was
+            not loaded from the rest api (so every
+            field has to be sent)
+        :rtype: dict or None
+        """
+        if self.loaded is None:
+            return None
+        changes = {}
+        for field, old_val in zip(self.fields, self.loaded):
+            cur_val = getattr(self, field)
+            if model_codec.is_changed(old_val, cur_val):
+                changes[field] = cur_val
+        return changes
 
     def get_dict(self):
         """
@@ -274,40 +320,7 @@ class CoreResultAI:
         :returns: dictionary
         :rtype: dict
         """
-        return {
-            "id": self.id,
-            "user_id": self.user_id,
-            "job_id": self.job_id,
-            "worker_id": self.worker_id,
-            "state": self.state,
-            "question": self.question,
-            "answer": self.answer,
-            "model_name": self.model_name,
-            "score": self.score,
-            "question_score": self.question_score,
-            "answer_score": self.answer_score,
-            "match_source": self.match_source,
-            "match_page": self.match_page,
-            "match_content": self.match_content,
-            "summarized_question": self.summarized_question,
-            "summarized_answer": self.summarized_answer,
-            "summarized_score": self.summarized_score,
-            "reviewed_answer": self.reviewed_answer,
-            "reviewed_score": self.reviewed_score,
-            "reviewed_computed_score": self.reviewed_computed_score,
-            "reviewed_notes": self.reviewed_notes,
-            "collection": self.collection,
-            "collection_notes": self.collection_notes,
-            "session_id": self.session_id,
-            "derived_session_id": self.derived_session_id,
-            "embed_model_name": self.embed_model_name,
-            "category": self.category,
-            "latency": self.latency,
-            "tags": self.tags,
-            "data": self.data,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at,
-        }
+        return self.to_dict()
 
     def show(self):
         """
@@ -320,3 +333,10 @@ class CoreResultAI:
             f"CoreResultAI.id={self.id} values:\n"
             f"{ppj.ppj(self.get_dict())}"
         )
+
+
+model_codec.add_codec(
+    CoreResultAI,
+    defaults={"sql_query": None, "msg": None, "recs": None},
+    snapshot="loaded",
+)
@@ -1,6 +1,25 @@
+import client_aic.models.model_codec as model_codec
+
+
 class CoreResultJob:
     """## CoreResultJob"""
 
+    # rest api fields in the job_result schema
+    fields = (
+        "id",
+        "job_id",
+        "worker_id",
+        "job_type",
+        "user_id",
+        "state",
+        "data",
+        "msg",
+        "created_at",
+        "updated_at",
+    )
+    # client-side values
+    __slots__ = fields + ("num_polls",)
+
     def __init__(
         self,
         id: int = None,
@@ -13,6 +32,7 @@ class CoreResultJob:
         msg: str = None,
         created_at: str = None,
         updated_at: str = None,
+        num_polls: int = 0,
     ):
         """
         __init__
@@ -40,6 +60,9 @@ class CoreResultJob:
             creation date
         :param updated_at: utc timestamp
             last update
+        :param num_polls: client-side count of
+            how many polls it took to find
+            this result
         """
         self.id = id
         self.job_id = job_id
@@ -51,3 +74,10 @@ class CoreResultJob:
         self.msg = msg
         self.created_at = created_at
         self.updated_at = updated_at
+        self.num_polls = num_polls
+
+
+model_codec.add_codec(
+    CoreResultJob,
+    defaults={"num_polls": 0},
+)
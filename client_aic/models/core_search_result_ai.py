@@ -1,9 +1,230 @@
+import collections.abc
 import client_aic.models.core_result_ai as core_result_ai
+import client_aic.models.model_codec as model_codec
+
+
+# numeric CoreResultAI fields exported as
+# float64 numpy arrays (missing values are nan)
+NUMERIC_FIELDS = (
+    "id",
+    "user_id",
+    "job_id",
+    "worker_id",
+    "state",
+    "score",
+    "match_page",
+    "summarized_score",
+    "reviewed_score",
+    "reviewed_computed_score",
+    "latency",
+)
+
+
+def import_numpy(what: str):
+    """
+    import_numpy
+
+    import numpy for a column export
+
+    :param what: name of the export for
+        the error message
+
+    :returns: the numpy module
+    :raises ImportError: with the install
+        hint if numpy is not installed
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            f"{what} requires numpy - "
+            "please pip install "
+            "llama-client-aic[numpy]"
+        )
+    return np
+
+
+class ResultRow(core_result_ai.CoreResultAI):
+    """## ResultRow"""
+
+    # the **ResultRows** and index that are
+    # told when a field is assigned
+    __slots__ = ("owner", "row_idx")
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        owner = self.owner
+        if owner is not None:
+            owner.dirty.add(self.row_idx)
+
+
+# from_dict skips the __setattr__ hook
+model_codec.add_codec(
+    ResultRow,
+    defaults={
+        "sql_query": None,
+        "msg": None,
+        "recs": None,
+        "owner": None,
+        "row_idx": None,
+    },
+    snapshot="loaded",
+    raw_set=True,
+)
+
+
+class ResultRows(collections.abc.Sequence):
+    """## ResultRows"""
+
+    __slots__ = ("columns", "rows", "dirty", "untracked")
+
+    def __init__(
+        self,
+        columns: dict,
+        rows: list = None,
+    ):
+        """
+        __init__
+
+        list-like view over the columns of a
+        **CoreSearchResultAI** that only builds a
+        **CoreResultAI** when a row is accessed
+        (rows are built once and reused)
+
+        a built row can be edited like any
+        **CoreResultAI** and **sync()** writes the
+        fields of the rows that were assigned to
+        since the last sync back to the **columns**
+
+        :param columns: dictionary of
+            field name to list of values
+        :param rows: optional - list of already
+            built **CoreResultAI** rows (or
+            **None** for a row that is not
+            built yet)
+        """
+        self.columns = columns
+        if rows is None:
+            rows = [None] * len(columns["id"])
+        self.rows = rows
+        # indexes of the rows assigned to since
+        # the last sync
+        self.dirty = set()
+        # indexes of rows that were passed in
+        # (not a **ResultRow**) and are
+        # checked on every sync
+        self.untracked = []
+        for idx, cur_o in enumerate(rows):
+            if cur_o is not None:
+                self.track(idx, cur_o)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [
+                self[i]
+                for i in range(*idx.indices(len(self)))
+            ]
+        cur_o = self.rows[idx]
+        if cur_o is None:
+            if idx < 0:
+                idx += len(self.rows)
+            cur_o = ResultRow.from_dict(
+                {
+                    field: values[idx]
+                    for field, values in self.columns.items()
+                }
+            )
+            self.rows[idx] = cur_o
+            self.track(idx, cur_o)
+        return cur_o
+
+    def __iter__(self):
+        for idx in range(len(self.rows)):
+            yield self[idx]
+
+    def __repr__(self):
+        return f"ResultRows(len={len(self)})"
+
+    def track(
+        self,
+        idx: int,
+        cur_o,
+    ):
+        """
+        track
+
+        mark edits to a built row as dirty
+
+        :param idx: row index
+        :param cur_o: **CoreResultAI** row
+        """
+        if isinstance(cur_o, ResultRow):
+            object.__setattr__(cur_o, "row_idx", idx)
+            object.__setattr__(cur_o, "owner", self)
+        else:
+            self.untracked.append(idx)
+
+    def append(
+        self,
+        cur_o,
+    ):
+        """
+        append
+
+        add a **CoreResultAI** row
+        and its column values
+
+        :param cur_o: **CoreResultAI**
+        """
+        for field, values in self.columns.items():
+            values.append(getattr(cur_o, field))
+        self.rows.append(cur_o)
+        self.track(len(self.rows) - 1, cur_o)
+
+    def sync(self):
+        """
+        sync
+
+        write the fields of the dirty (and
+        untracked) rows back to the **columns**
+        so an edited row shows up in the
+        column exports
+
+        :returns: set of field names that changed
+        :rtype: set
+        """
+        changed = set()
+        if not self.dirty and not self.untracked:
+            return changed
+        idxs = self.dirty
+        self.dirty = set()
+        if self.untracked:
+            idxs = idxs.union(self.untracked)
+        for idx in idxs:
+            cur_o = self.rows[idx]
+            for field, values in self.columns.items():
+                value = getattr(cur_o, field)
+                if value is not values[idx]:
+                    values[idx] = value
+                    changed.add(field)
+        return changed
 
 
 class CoreSearchResultAI:
     """## CoreSearchResultAI"""
 
+    __slots__ = (
+        "query",
+        "sql_query",
+        "recs",
+        "msg",
+        "columns",
+        "arrays",
+    )
+
     def __init__(
         self,
         query: str = None,
@@ -19,6 +240,21 @@ class CoreSearchResultAI:
         **CoreResultAI** records in the
         **self.recs** member variable
 
+        the records are stored by column
+        in **self.columns** (one list per
+        **CoreResultAI** field) and
+        **self.recs** only builds a
+        **CoreResultAI** object when a
+        row is accessed. analytics should use
+        **column()** or **to_numpy()**:
+
+        ```python
+        scores = search_res.column("score")
+        low = search_res.to_numpy()["job_id"][
+            scores < 0.5
+        ]
+        ```
+
         :param query: logical name of the
             type of query to run (not
             a sql query from the frontend)
@@ -34,8 +270,15 @@ class CoreSearchResultAI:
         """
         self.query = query
         self.sql_query = sql_query
-        self.recs = recs
         self.msg = msg
+        self.columns = {
+            field: []
+            for field in core_result_ai.CoreResultAI.fields
+        }
+        self.arrays = {}
+        self.recs = ResultRows(self.columns, rows=[])
+        for cur_o in recs or []:
+            self.recs.append(cur_o)
 
     def load_response_dict(
         self,
@@ -52,9 +295,13 @@ class CoreSearchResultAI:
         """
         self.sql_query = rec_dict.get("sql_query", None)
         self.msg = rec_dict.get("msg", None)
-        self.recs = []
-        for rec in rec_dict.get("recs", []):
-            self.add_rec(rec)
+        recs = rec_dict.get("recs", None) or []
+        self.columns = {
+            field: [rec.get(field, None) for rec in recs]
+            for field in core_result_ai.CoreResultAI.fields
+        }
+        self.arrays = {}
+        self.recs = ResultRows(self.columns)
 
     def add_rec(
         self,
@@ -71,65 +318,121 @@ class CoreSearchResultAI:
             from the ai reinforcement learning
             database
         """
-        cur_o = core_result_ai.CoreResultAI(
-            id=rec_dict.get("id", None),
-            user_id=rec_dict.get("user_id", None),
-            job_id=rec_dict.get("job_id", None),
-            worker_id=rec_dict.get("worker_id", None),
-            state=rec_dict.get("state", None),
-            question=rec_dict.get("question", None),
-            answer=rec_dict.get("answer", None),
-            model_name=rec_dict.get("model_name", None),
-            score=rec_dict.get("score", None),
-            question_score=rec_dict.get(
-                "question_score", None
-            ),
-            answer_score=rec_dict.get("answer_score", None),
-            match_source=rec_dict.get("match_source", None),
-            match_page=rec_dict.get("match_page", None),
-            match_content=rec_dict.get(
-                "match_content", None
-            ),
-            summarized_question=rec_dict.get(
-                "summarized_question", None
-            ),
-            summarized_answer=rec_dict.get(
-                "summarized_answer", None
-            ),
-            summarized_score=rec_dict.get(
-                "summarized_score", None
-            ),
-            reviewed_answer=rec_dict.get(
-                "reviewed_answer", None
-            ),
-            reviewed_score=rec_dict.get(
-                "reviewed_score", None
-            ),
-            reviewed_computed_score=rec_dict.get(
-                "reviewed_computed_score", None
-            ),
-            reviewed_notes=rec_dict.get(
-                "reviewed_notes", None
-            ),
-            collection=rec_dict.get("collection", None),
-            collection_notes=rec_dict.get(
-                "collection_notes", None
-            ),
-            session_id=rec_dict.get("session_id", None),
-            derived_session_id=rec_dict.get(
-                "derived_session_id", None
-            ),
-            category=rec_dict.get("category", None),
-            tags=rec_dict.get("tags", None),
-            latency=rec_dict.get("latency", None),
-            data=rec_dict.get("data", None),
-            created_at=rec_dict.get("created_at", None),
-            updated_at=rec_dict.get("updated_at", None),
-        )
-        if not self.recs:
-            self.recs = [cur_o]
-        else:
-            self.recs.append(cur_o)
+        cur_o = ResultRow.from_dict(rec_dict)
+        self.recs.append(cur_o)
+        self.arrays = {}
+
+    def sync_rows(self):
+        """
+        sync_rows
+
+        write edited **self.recs** rows back to
+        the **columns** and drop the cached arrays
+        for the fields that changed
+        """
+        for field in self.recs.sync():
+            self.arrays.pop(field, None)
+
+    def column(
+        self,
+        field: str,
+    ):
+        """
+        column
+
+        get all values for one **CoreResultAI**
+        field. numeric fields are returned as
+        a cached, read-only **numpy** float64
+        array and all other fields are returned
+        as a new list
+
+        :param field: **CoreResultAI** field name
+
+        :returns: numpy array or list
+        :rtype: numpy.ndarray or list
+        :raises ImportError: for a numeric field
+            if numpy is not installed
+        """
+        self.sync_rows()
+        values = self.columns[field]
+        if field not in NUMERIC_FIELDS:
+            return list(values)
+        cur_arr = self.arrays.get(field, None)
+        if cur_arr is None:
+            np = import_numpy(f"column={field}")
+            cur_arr = np.array(
+                [
+                    float("nan") if v is None else v
+                    for v in values
+                ],
+                dtype=np.float64,
+            )
+            # the array is shared by every caller
+            cur_arr.flags.writeable = False
+            self.arrays[field] = cur_arr
+        return cur_arr
+
+    def to_numpy(
+        self,
+        fields: list = None,
+    ):
+        """
+        to_numpy
+
+        export the columns as **numpy** arrays
+        where numeric fields are cached, read-only
+        float64 arrays (missing values are nan)
+        and all other fields are object arrays
+
+        :param fields: optional - list of field
+            names (defaults to all fields)
+
+        :returns: dictionary of field name to
+            numpy array
+        :rtype: dict
+        :raises ImportError: if numpy is
+            not installed
+        """
+        np = import_numpy("to_numpy")
+        self.sync_rows()
+        res = {}
+        for field in fields or self.columns:
+            if field in NUMERIC_FIELDS:
+                res[field] = self.column(field)
+            else:
+                cur_arr = np.empty(
+                    len(self.recs), dtype=object
+                )
+                cur_arr[:] = self.columns[field]
+                res[field] = cur_arr
+        return res
+
+    def to_records(
+        self,
+        fields: list = None,
+    ):
+        """
+        to_records
+
+        export the rows as a list of
+        dictionaries without building
+        **CoreResultAI** objects
+
+        :param fields: optional - list of field
+            names (defaults to all fields)
+
+        :returns: list of dictionaries
+        :rtype: list
+        """
+        self.sync_rows()
+        use_fields = list(fields or self.columns)
+        values = [
+            self.columns[field] for field in use_fields
+        ]
+        return [
+            dict(zip(use_fields, row))
+            for row in zip(*values)
+        ]
 
     def get_dict(self):
         """
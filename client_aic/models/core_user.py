@@ -1,6 +1,7 @@
 import os
 import ujson as json
 import logging
+import client_aic.models.model_codec as model_codec
 
 
 log = logging.getLogger(__name__)
@@ -9,6 +10,26 @@ log = logging.getLogger(__name__)
 class CoreUser:
     """## CoreUser"""
 
+    # rest api fields in the user schema
+    fields = (
+        "id",
+        "email",
+        "state",
+        "verified",
+        "role",
+        "token",
+        "msg",
+        "created_at",
+        "updated_at",
+    )
+    # client-side values
+    __slots__ = fields + (
+        "auth_header",
+        "token_refresher",
+        "creds_dir",
+        "creds_path",
+    )
+
     def __init__(
         self,
         id: int,
@@ -49,11 +70,43 @@ class CoreUser:
         self.token = token
         self.msg = msg
         self.auth_header = None
+        # set by the TokenManager to log in again
+        # when the token expires or gets a 401
+        self.token_refresher = None
+        self.set_creds_path()
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_dict(
+        cls,
+        rec_dict: dict,
+    ):
+        """
+        from_dict
+
+        build a **CoreUser** from a rest api
+        response dictionary
+
+        :param rec_dict: user dictionary
+
+        :returns: **CoreUser**
+        :rtype: CoreUser
+        """
+        cur_o = decode_user(cls, rec_dict)
+        cur_o.set_creds_path()
+        return cur_o
+
+    def set_creds_path(self):
+        """
+        set_creds_path
+
+        set the default local credentials
+        path under the **HOME** directory
+        """
         home_dir = os.getenv("HOME", None)
         self.creds_dir = f"{home_dir}/.redten"
         self.creds_path = f"{self.creds_dir}/creds.json"
-        self.created_at = created_at
-        self.updated_at = updated_at
 
     def show(self):
         """
@@ -65,7 +118,7 @@ class CoreUser:
         :rtype: None
         """
         log.info(
-            f"name={self.name} email={self.email} "
+            f"id={self.id} email={self.email} "
             f"s={self.state} v={self.verified} "
             f"r={self.role} t={self.token} "
             f"m={self.msg}"
@@ -112,3 +165,14 @@ class CoreUser:
         with open(self.creds_path, "w") as fp:
             fp.write(json.dumps(config))
         log.debug(f"saved creds to: {self.creds_path}")
+
+
+decode_user = model_codec.build_from_dict(
+    name="CoreUser",
+    fields=CoreUser.fields,
+    defaults={"auth_header": None, "token_refresher": None},
+)
+CoreUser.to_dict = model_codec.build_to_dict(
+    name="CoreUser",
+    fields=CoreUser.fields,
+)
@@ -0,0 +1,272 @@
+"""
+generated decoders and encoders for the
+slotted api models
+
+each model lists its rest api fields once in
+a **fields** tuple and this module compiles a
+straight-line **from_dict** and **to_dict** for
+those fields so decoding 100k search records
+does not pay for keyword argument parsing or
+a per-record **__dict__**
+"""
+import logging
+import ujson as json
+
+
+log = logging.getLogger(__name__)
+
+# field values that can change in place and are
+# stored as a json encoding in a snapshot
+MUTABLE_TYPES = (dict, list)
+
+
+class FrozenValue:
+    """FrozenValue"""
+
+    __slots__ = ("text",)
+
+    def __init__(
+        self,
+        value,
+    ):
+        """
+        __init__
+
+        json encoding of a mutable field value
+        so a later in-place edit (like
+        **ai_result.data["x"] = 2**) still shows
+        up as a change
+
+        :param value: **dict** or **list**
+        """
+        self.text = json.dumps(value, sort_keys=True)
+
+    def matches(
+        self,
+        value,
+    ):
+        """
+        matches
+
+        :param value: current field value
+
+        :returns: **True** if the **value** has the
+            same json encoding
+        :rtype: bool
+        """
+        if not isinstance(value, MUTABLE_TYPES):
+            return False
+        try:
+            return (
+                json.dumps(value, sort_keys=True)
+                == self.text
+            )
+        except Exception:
+            return False
+
+
+def freeze(value):
+    """
+    freeze
+
+    :param value: field value
+
+    :returns: **FrozenValue** for a **dict** or
+        **list** and the same **value** otherwise
+    """
+    if isinstance(value, MUTABLE_TYPES):
+        return FrozenValue(value)
+    return value
+
+
+def is_changed(
+    old_val,
+    cur_val,
+):
+    """
+    is_changed
+
+    compare a field value with its snapshot
+    value from **freeze**
+
+    :param old_val: snapshot value
+    :param cur_val: current field value
+
+    :returns: **True** if the field changed
+    :rtype: bool
+    """
+    if isinstance(old_val, FrozenValue):
+        return not old_val.matches(cur_val)
+    return cur_val is not old_val and cur_val != old_val
+
+
+def build_from_dict(
+    name: str,
+    fields: tuple,
+    defaults: dict = None,
+    snapshot: str = None,
+    setters: dict = None,
+):
+    """
+    build_from_dict
+
+    compile a function that creates an object
+    without calling **__init__** and copies every
+    field from a rest api dictionary (missing
+    keys are set to **None**)
+
+    :param name: model class name for debugging
+    :param fields: tuple of field names
+    :param defaults: optional - dictionary of
+        extra slots to set to a constant value
+    :param snapshot: optional - slot name to
+        store a tuple of the decoded field values
+        in (for tracking changed fields). **dict**
+        and **list** values are stored with
+        **freeze**
+    :param setters: optional - dictionary of slot
+        name to the slot descriptor's **__set__**
+        used instead of assigning the attribute so
+        a model's own **__setattr__** hook does
+        not run while decoding
+
+    :returns: function(cls, rec_dict)
+    :rtype: function
+    """
+    lines = [
+        "def from_dict(cls, rec_dict):",
+        "    o = new(cls)",
+        "    get = rec_dict.get",
+    ]
+    for idx, field in enumerate(fields):
+        if setters:
+            lines.append(
+                f"    v{idx} = get({field!r}, None)"
+            )
+            lines.append(f"    set_{field}(o, v{idx})")
+        else:
+            lines.append(
+                f"    o.{field} = v{idx} = get({field!r}, None)"
+            )
+    use_defaults = defaults or {}
+    for field in use_defaults:
+        if setters:
+            lines.append(
+                f"    set_{field}(o, defaults[{field!r}])"
+            )
+        else:
+            lines.append(
+                f"    o.{field} = defaults[{field!r}]"
+            )
+    if snapshot:
+        values = ", ".join(
+            f"v{idx} if type(v{idx}) not in mutable "
+            f"else freeze(v{idx})"
+            for idx in range(len(fields))
+        )
+        if setters:
+            lines.append(
+                f"    set_{snapshot}(o, ({values},))"
+            )
+        else:
+            lines.append(f"    o.{snapshot} = ({values},)")
+    lines.append("    return o")
+    scope = {
+        "new": object.__new__,
+        "defaults": dict(use_defaults),
+        "mutable": frozenset(MUTABLE_TYPES),
+        "freeze": freeze,
+    }
+    for field, setter in (setters or {}).items():
+        scope[f"set_{field}"] = setter
+    exec(
+        compile(
+            "\n".join(lines),
+            f"<{name}.from_dict>",
+            "exec",
+        ),
+        scope,
+    )
+    return scope["from_dict"]
+
+
+def build_to_dict(
+    name: str,
+    fields: tuple,
+):
+    """
+    build_to_dict
+
+    compile a function that returns a new
+    dictionary with every field in **fields**
+
+    :param name: model class name for debugging
+    :param fields: tuple of field names
+
+    :returns: function(self)
+    :rtype: function
+    """
+    items = ", ".join(
+        f"{field!r}: self.{field}" for field in fields
+    )
+    scope = {}
+    exec(
+        compile(
+            f"def to_dict(self):\n    return {{{items}}}",
+            f"<{name}.to_dict>",
+            "exec",
+        ),
+        scope,
+    )
+    return scope["to_dict"]
+
+
+def add_codec(
+    cls,
+    defaults: dict = None,
+    snapshot: str = None,
+    raw_set: bool = False,
+):
+    """
+    add_codec
+
+    class decorator helper that sets the
+    generated **from_dict** classmethod
+    and **to_dict** method on a model
+    that defines a **fields** tuple
+
+    :param cls: model class
+    :param defaults: optional - dictionary of
+        extra slots to set in **from_dict**
+    :param snapshot: optional - slot name for
+        the decoded field values
+    :param raw_set: optional - flag to bypass
+        the model's **__setattr__** in
+        **from_dict**
+
+    :returns: the same class
+    """
+    setters = None
+    if raw_set:
+        setters = {
+            field: getattr(cls, field).__set__
+            for field in (
+                cls.fields
+                + tuple(defaults or ())
+                + ((snapshot,) if snapshot else ())
+            )
+        }
+    cls.from_dict = classmethod(
+        build_from_dict(
+            name=cls.__name__,
+            fields=cls.fields,
+            defaults=defaults,
+            snapshot=snapshot,
+            setters=setters,
+        )
+    )
+    cls.to_dict = build_to_dict(
+        name=cls.__name__,
+        fields=cls.fields,
+    )
+    return cls
@@ -0,0 +1,270 @@
+"""
+polling policy for waiting on llm jobs
+
+- fast first probe
+- exponential backoff with jitter
+- max interval between polls
+- overall deadline
+- cancellation
+
+"""
+import time
+import random
+import logging
+import client_aic.get_asyncio as get_asyncio
+
+
+log = logging.getLogger(__name__)
+
+
+class PollPolicy:
+    """PollPolicy"""
+
+    def __init__(
+        self,
+        first_interval: float = 0.25,
+        multiplier: float = 2.0,
+        max_interval: float = 10.0,
+        jitter: float = 0.2,
+        deadline: float = None,
+        cancel=None,
+    ):
+        """
+        __init__
+
+        shared settings for how often to poll
+        for a job result. one **PollPolicy** can
+        be shared by many jobs and each job tracks
+        its own progress with a **Poller** from
+        **PollPolicy.start()**
+
+        the delay before poll number **n** is
+        **first_interval * multiplier ** (n - 1)**
+        capped at **max_interval** and then randomized
+        by +/- **jitter** so many clients do not
+        poll in lockstep
+
+        :param first_interval: seconds to wait
+            before the first poll
+        :param multiplier: backoff growth per poll
+            (use **1.0** for a fixed interval)
+        :param max_interval: max seconds
+            between polls
+        :param jitter: fraction of the delay
+            to randomize (**0.2** = +/- 20%)
+        :param deadline: optional - max total
+            seconds to wait for a job
+            (**None** waits forever)
+        :param cancel: optional - **threading.Event**
+            that stops all waiting jobs when set
+        """
+        self.first_interval = first_interval
+        self.multiplier = multiplier
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.deadline = deadline
+        self.cancel = cancel
+
+    @classmethod
+    def fixed(
+        cls,
+        interval: float,
+        deadline: float = None,
+        cancel=None,
+    ):
+        """
+        fixed
+
+        build a policy that waits the same
+        **interval** before every poll
+
+        :param interval: seconds between polls
+        :param deadline: optional - max total
+            seconds to wait for a job
+        :param cancel: optional - **threading.Event**
+
+        :returns: **PollPolicy**
+        :rtype: PollPolicy
+        """
+        return cls(
+            first_interval=interval,
+            multiplier=1.0,
+            max_interval=interval,
+            jitter=0.0,
+            deadline=deadline,
+            cancel=cancel,
+        )
+
+    def get_interval(
+        self,
+        num_polls: int,
+    ):
+        """
+        get_interval
+
+        get the delay before the next poll
+
+        :param num_polls: number of polls
+            already sent for this job
+
+        :returns: seconds to wait
+        :rtype: float
+        """
+        interval = min(
+            self.first_interval
+            * (self.multiplier**num_polls),
+            self.max_interval,
+        )
+        if self.jitter:
+            interval *= random.uniform(
+                1.0 - self.jitter, 1.0 + self.jitter
+            )
+        return min(interval, self.max_interval)
+
+    def start(
+        self,
+        cancel=None,
+        deadline=None,
+    ):
+        """
+        start
+
+        start tracking a new job
+
+        :param cancel: optional - **threading.Event**
+            to stop waiting on only this job
+            (defaults to the policy's **cancel**)
+        :param deadline: optional - **Deadline** for
+            the caller that stops polling if it is
+            earlier than the policy's **deadline**
+
+        :returns: **Poller** for the job
+        :rtype: Poller
+        """
+        return Poller(
+            policy=self,
+            cancel=cancel or self.cancel,
+            deadline=deadline,
+        )
+
+
+class Poller:
+    """Poller"""
+
+    def __init__(
+        self,
+        policy: PollPolicy,
+        cancel=None,
+        deadline=None,
+    ):
+        """
+        __init__
+
+        per-job polling state for a **PollPolicy**
+
+        :param policy: shared **PollPolicy**
+        :param cancel: optional - **threading.Event**
+        :param deadline: optional - **Deadline**
+            for the caller
+        """
+        self.policy = policy
+        self.cancel = cancel
+        self.polls = 0
+        self.started_at = time.monotonic()
+        self.stop_at = None
+        if policy.deadline is not None:
+            self.stop_at = self.started_at + policy.deadline
+        if (
+            deadline is not None
+            and deadline.stop_at is not None
+        ):
+            if self.stop_at is None:
+                self.stop_at = deadline.stop_at
+            else:
+                self.stop_at = min(
+                    self.stop_at, deadline.stop_at
+                )
+
+    def remaining(self):
+        """
+        remaining
+
+        seconds left before the deadline
+
+        :returns: seconds left or **None**
+            if there is no deadline
+        :rtype: float or None
+        """
+        if self.stop_at is None:
+            return None
+        return max(0.0, self.stop_at - time.monotonic())
+
+    def is_cancelled(self):
+        """
+        is_cancelled
+
+        :returns: **True** if polling was cancelled
+        :rtype: bool
+        """
+        return bool(self.cancel and self.cancel.is_set())
+
+    def next_delay(self):
+        """
+        next_delay
+
+        reserve the next poll and get how
+        long to wait before sending it
+
+        :returns: seconds to wait before the next
+            poll or **None** if the job hit the
+            deadline or was cancelled
+        :rtype: float or None
+        """
+        if self.is_cancelled():
+            return None
+        delay = self.policy.get_interval(self.polls)
+        remaining = self.remaining()
+        if remaining is not None:
+            if remaining <= 0.0:
+                return None
+            delay = min(delay, remaining)
+        self.polls += 1
+        return delay
+
+    def wait(self):
+        """
+        wait
+
+        sleep until it is time to send the next poll
+
+        :returns: **True** when the caller should poll
+            or **False** if the job hit the deadline
+            or was cancelled
+        :rtype: bool
+        """
+        delay = self.next_delay()
+        if delay is None:
+            return False
+        if self.cancel:
+            if self.cancel.wait(delay):
+                return False
+        else:
+            time.sleep(delay)
+        return True
+
+    async def async_wait(self):
+        """
+        async_wait
+
+        **Poller.wait** for asyncio callers
+
+        :returns: **True** when the caller should poll
+            or **False** if the job hit the deadline
+            or was cancelled
+        :rtype: bool
+        """
+        delay = self.next_delay()
+        if delay is None:
+            return False
+        await get_asyncio.get_asyncio().sleep(delay)
+        return not self.is_cancelled()
@@ -0,0 +1,471 @@
+"""
+client-side token-bucket rate limiter for
+the rest api requests
+
+each route is in a route class (like **submit**,
+**poll**, **search** and **update**) with its own
+bucket of **rate** requests per second and a
+**burst** size. buckets are shared by all threads
+in a process and, with a **lock_dir**, by all
+processes on the same host through a small state
+file guarded by an exclusive file lock (**fcntl**)
+so a fleet of workers on one box stays under one
+aggregate budget without a central coordinator
+"""
+import os
+import time
+import struct
+import logging
+import threading
+import client_aic.get_asyncio as get_asyncio
+import client_aic.config.get_rate_limits as get_rate_limits
+
+
+log = logging.getLogger(__name__)
+
+# route name (from get_routes.ROUTES) to route class
+ROUTE_CLASSES = {
+    "login": "auth",
+    "user": "auth",
+    "user_by_id": "auth",
+    "job": "submit",
+    "job_result": "poll",
+    "ai_result_by_id": "poll",
+    "ai_result_search": "search",
+    "ai_result": "update",
+}
+
+# (tokens, updated_at) stored in a bucket state file
+STATE_FORMAT = "dd"
+STATE_SIZE = struct.calcsize(STATE_FORMAT)
+
+limiter_lock = threading.Lock()
+limiters = {}
+
+
+def get_wait(
+    tokens: float,
+    updated_at: float,
+    now: float,
+    rate: float,
+    burst: float,
+    max_wait: float = None,
+):
+    """
+    get_wait
+
+    refill a bucket and reserve one token
+
+    the reserved token can leave the bucket
+    negative so concurrent callers queue up
+    behind each other instead of all waking
+    up at the same time
+
+    :param tokens: tokens in the bucket at
+        **updated_at**
+    :param updated_at: time of the last update
+    :param now: current time
+    :param rate: tokens added per second
+    :param burst: max tokens in the bucket
+    :param max_wait: optional - max seconds to
+        wait for a token
+
+    :returns: tuple of (seconds to wait or
+        **None** if it is more than **max_wait**,
+        new **tokens**)
+    :rtype: tuple
+    """
+    tokens = min(
+        burst, tokens + max(0.0, now - updated_at) * rate
+    )
+    wait = 0.0
+    if tokens < 1.0:
+        wait = (1.0 - tokens) / rate
+    if max_wait is not None and wait > max_wait:
+        return (None, tokens)
+    return (wait, tokens - 1.0)
+
+
+class TokenBucket:
+    """TokenBucket"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = None,
+    ):
+        """
+        __init__
+
+        in-process token bucket shared by
+        all threads
+
+        :param rate: requests per second
+        :param burst: max requests sent back to
+            back after an idle period (defaults
+            to the **rate** with a min of **1**)
+        """
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        self.lock = threading.Lock()
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+
+    def reserve(
+        self,
+        max_wait: float = None,
+    ):
+        """
+        reserve
+
+        reserve one token
+
+        :param max_wait: optional - max seconds
+            to wait for a token
+
+        :returns: seconds to wait before sending
+            the request or **None** if the wait is
+            more than **max_wait** (nothing
+            is reserved)
+        :rtype: float or None
+        """
+        with self.lock:
+            now = time.monotonic()
+            (wait, tokens) = get_wait(
+                tokens=self.tokens,
+                updated_at=self.updated_at,
+                now=now,
+                rate=self.rate,
+                burst=self.burst,
+                max_wait=max_wait,
+            )
+            self.tokens = tokens
+            self.updated_at = now
+            return wait
+
+
+class FileTokenBucket:
+    """FileTokenBucket"""
+
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        burst: float = None,
+    ):
+        """
+        __init__
+
+        token bucket shared by every process on
+        the host that uses the same **path**. the
+        bucket state is a 16-byte file that is
+        read and updated under an exclusive
+        **fcntl.flock**
+
+        :param path: path to the bucket state file
+        :param rate: requests per second for
+            all processes
+        :param burst: max requests sent back to
+            back after an idle period (defaults
+            to the **rate** with a min of **1**)
+        """
+        self.path = path
+        self.rate = float(rate)
+        self.burst = float(burst or max(1.0, rate))
+        # flock does not exclude threads sharing
+        # the same open file
+        self.lock = threading.Lock()
+        self.fd = None
+        self.pid = None
+
+    def get_fd(self):
+        """
+        get_fd
+
+        open the state file once per process (a
+        forked child must not share the parent's
+        open file or its lock)
+
+        :returns: file descriptor
+        :rtype: int
+        """
+        if self.fd is None or self.pid != os.getpid():
+            os.makedirs(
+                os.path.dirname(self.path) or ".",
+                exist_ok=True,
+            )
+            self.fd = os.open(
+                self.path, os.O_RDWR | os.O_CREAT, 0o600
+            )
+            self.pid = os.getpid()
+        return self.fd
+
+    def reserve(
+        self,
+        max_wait: float = None,
+    ):
+        """
+        reserve
+
+        reserve one token from the shared bucket
+
+        :param max_wait: optional - max seconds
+            to wait for a token
+
+        :returns: seconds to wait before sending
+            the request or **None** if the wait is
+            more than **max_wait** (nothing
+            is reserved)
+        :rtype: float or None
+        """
+        import fcntl
+
+        with self.lock:
+            fd = self.get_fd()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                # wall clock time is shared
+                # by all processes
+                now = time.time()
+                data = os.pread(fd, STATE_SIZE, 0)
+                if len(data) == STATE_SIZE:
+                    (tokens, updated_at) = struct.unpack(
+                        STATE_FORMAT, data
+                    )
+                else:
+                    (tokens, updated_at) = (self.burst, now)
+                (wait, tokens) = get_wait(
+                    tokens=tokens,
+                    updated_at=min(updated_at, now),
+                    now=now,
+                    rate=self.rate,
+                    burst=self.burst,
+                    max_wait=max_wait,
+                )
+                os.pwrite(
+                    fd,
+                    struct.pack(STATE_FORMAT, tokens, now),
+                    0,
+                )
+                return wait
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class RateLimiter:
+    """RateLimiter"""
+
+    def __init__(
+        self,
+        limits: dict = None,
+        lock_dir: str = None,
+    ):
+        """
+        __init__
+
+        token buckets for each route class
+
+        ```python
+        limiter = RateLimiter(
+            limits={"submit": (5, 10), "poll": (20, 40)},
+            lock_dir="/tmp/ai-rate-limits",
+        )
+        ```
+
+        :param limits: dictionary of route class
+            (**auth**, **submit**, **poll**,
+            **search**, **update** or **default**
+            for the rest) to a (**rate**, **burst**)
+            tuple or a **rate**
+        :param lock_dir: optional - directory for
+            the bucket state files shared by all
+            processes on the host (defaults to
+            limiting each process on its own)
+        """
+        self.limits = dict(limits or {})
+        self.lock_dir = lock_dir
+        self.buckets = {}
+        for route_class, limit in self.limits.items():
+            if not isinstance(limit, (tuple, list)):
+                limit = (limit, None)
+            (rate, burst) = limit
+            if not rate or rate <= 0:
+                continue
+            if lock_dir:
+                self.buckets[route_class] = FileTokenBucket(
+                    path=os.path.join(
+                        lock_dir, f"{route_class}.bucket"
+                    ),
+                    rate=rate,
+                    burst=burst,
+                )
+            else:
+                self.buckets[route_class] = TokenBucket(
+                    rate=rate,
+                    burst=burst,
+                )
+
+    def get_bucket(
+        self,
+        route: str,
+    ):
+        """
+        get_bucket
+
+        :param route: route name from **ROUTES**
+
+        :returns: bucket for the route's class,
+            the **default** bucket or **None** if
+            the route is not limited
+        :rtype: TokenBucket or FileTokenBucket
+        """
+        route_class = ROUTE_CLASSES.get(route, "default")
+        bucket = self.buckets.get(route_class, None)
+        if bucket is None:
+            bucket = self.buckets.get("default", None)
+        return bucket
+
+    def reserve(
+        self,
+        route: str,
+        max_wait: float = None,
+    ):
+        """
+        reserve
+
+        reserve a token for one request
+
+        :param route: route name from **ROUTES**
+        :param max_wait: optional - max seconds
+            to wait for a token
+
+        :returns: seconds to wait before sending
+            the request or **None** if the wait is
+            more than **max_wait**
+        :rtype: float or None
+        """
+        bucket = self.get_bucket(route)
+        if bucket is None:
+            return 0.0
+        return bucket.reserve(max_wait=max_wait)
+
+    def acquire(
+        self,
+        route: str,
+        max_wait: float = None,
+    ):
+        """
+        acquire
+
+        wait until the route's bucket allows
+        another request
+
+        :param route: route name from **ROUTES**
+        :param max_wait: optional - max seconds
+            to wait for a token
+
+        :returns: **True** when the request can be
+            sent or **False** if it would wait more
+            than **max_wait**
+        :rtype: bool
+        """
+        wait = self.reserve(route, max_wait=max_wait)
+        if wait is None:
+            return False
+        if wait > 0.0:
+            log.debug(
+                f"rate limited route={route} wait={wait:.3f}s"
+            )
+            time.sleep(wait)
+        return True
+
+    async def async_acquire(
+        self,
+        route: str,
+        max_wait: float = None,
+    ):
+        """
+        async_acquire
+
+        **RateLimiter.acquire** for asyncio callers
+
+        a **FileTokenBucket** reserves in a worker
+        thread because the file lock can block the
+        event loop while another process holds it
+
+        :param route: route name from **ROUTES**
+        :param max_wait: optional - max seconds
+            to wait for a token
+
+        :returns: **True** when the request can be
+            sent or **False** if it would wait more
+            than **max_wait**
+        :rtype: bool
+        """
+        asyncio = get_asyncio.get_asyncio()
+        bucket = self.get_bucket(route)
+        if bucket is None:
+            return True
+        if isinstance(bucket, FileTokenBucket):
+            wait = await asyncio.to_thread(
+                bucket.reserve, max_wait=max_wait
+            )
+        else:
+            wait = bucket.reserve(max_wait=max_wait)
+        if wait is None:
+            return False
+        if wait > 0.0:
+            await asyncio.sleep(wait)
+        return True
+
+
+def get_rate_limiter(
+    cfg: dict = None,
+):
+    """
+    get_rate_limiter
+
+    get the process-wide **RateLimiter** for
+    the **cfg["rate_limits"]** settings (defaults
+    to **get_rate_limits.get_rate_limits()**)
+
+    :param cfg: optional **CoreConfig** dictionary
+
+    :returns: shared **RateLimiter** or **None**
+        if no route class is limited
+    :rtype: RateLimiter or None
+    """
+    settings = None
+    if cfg:
+        settings = cfg.get("rate_limits", None)
+    if settings is None:
+        settings = get_rate_limits.get_rate_limits()
+    if isinstance(settings, RateLimiter):
+        return settings
+    limits = settings.get("limits", None)
+    if not limits:
+        return None
+    lock_dir = settings.get("lock_dir", None)
+    key = (
+        tuple(
+            sorted(
+                (name, tuple(value))
+                if isinstance(value, (tuple, list))
+                else (name, (value,))
+                for name, value in limits.items()
+            )
+        ),
+        lock_dir,
+    )
+    limiter = limiters.get(key, None)
+    if limiter:
+        return limiter
+    with limiter_lock:
+        limiter = limiters.get(key, None)
+        if not limiter:
+            limiter = RateLimiter(
+                limits=limits,
+                lock_dir=lock_dir,
+            )
+            limiters[key] = limiter
+    return limiter
@@ -1,7 +1,11 @@
 import logging
-import requests
 import ujson as json
 import client_aic.get_cfg as get_cfg
+import client_aic.config.get_routes as get_routes
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.deadline as deadline_mod
+import client_aic.retry_policy as retry_policy
+import client_aic.get_transport as get_transport
 import client_aic.models.core_user as core_user
 import client_aic.models.core_result_ai as core_result_ai
 import client_aic.tls.utils as tls_utils
@@ -14,6 +18,8 @@ def create_ai_result(
     user: core_user.CoreUser,
     data: dict,
     cfg: dict = None,
+    deadline: deadline_mod.Deadline = None,
+    idempotency_key: str = None,
 ):
     """
     create_ai_result
@@ -33,29 +39,100 @@ def create_ai_result(
         ``data=CoreResultAI.get_dict()``
     :param cfg: optional **CoreConfig**
         dictionary
+    :param deadline: optional - **Deadline** for
+        the whole call chain (each attempt only
+        waits for the remaining budget)
+    :param idempotency_key: optional - client-generated
+        key for deduplicating a retried create. the
+        key is sent in the **Idempotency-Key** header
+        and the result's **data** so a POST that timed
+        out can be retried without creating a
+        duplicate result. reuse the same key when
+        uploading the same result again
 
     :returns: **CoreResultAI** on success
         **None** on non-success
     :rtype: CoreResultAI or None
     """
+    (cur_o, _) = post_ai_result(
+        user=user,
+        data=data,
+        cfg=cfg,
+        deadline=deadline,
+        idempotency_key=idempotency_key,
+    )
+    return cur_o
+
+
+def post_ai_result(
+    user: core_user.CoreUser,
+    data: dict,
+    cfg: dict = None,
+    deadline: deadline_mod.Deadline = None,
+    idempotency_key: str = None,
+):
+    """
+    post_ai_result
+
+    create an ai result and also return the
+    response status so a caller (like the
+    **ResultUploader**) can tell a rejected
+    result from a transient failure (please see
+    **create_ai_result** for the details)
+
+    :param CoreUser user: authenticated user
+        that is making this request
+    :param data: dictionary from
+        ``data=CoreResultAI.get_dict()``
+    :param cfg: optional **CoreConfig**
+        dictionary
+    :param deadline: optional - **Deadline** for
+        the whole call chain (each attempt only
+        waits for the remaining budget)
+    :param idempotency_key: optional - client-generated
+        key for deduplicating a retried create
+
+    :returns: (**CoreResultAI** or **None**,
+        response status code)
+    :rtype: (CoreResultAI, int)
+    """
     if not cfg:
         cfg = get_cfg.get_cfg()
-    url = f'https://{cfg["endpoint"]}/ai/result'
+    url = get_routes.get_url(cfg, "ai_result")
     (cert_file, key_file) = tls_utils.get_certs(cfg)
     verify = tls_utils.get_verify(cfg)
     debug = cfg.get("debug", False)
     log.debug(f"create ai result: {url}")
-    s = requests.Session()
-    s.headers.update({"Bearer": f"{user.token}"})
+    tr = get_transport.get_transport(cfg)
     data.pop("id", None)
-    r = s.post(
+    headers = None
+    if idempotency_key:
+        headers = {
+            retry_policy.IDEMPOTENCY_HEADER: idempotency_key,
+        }
+        use_data = data.get("data", None)
+        if isinstance(use_data, dict):
+            data["data"] = dict(
+                use_data, idempotency_key=idempotency_key
+            )
+        elif use_data is None:
+            data["data"] = {
+                "idempotency_key": idempotency_key
+            }
+    r = tr.post(
         url,
+        user=user,
         json=data,
+        headers=headers,
         verify=verify,
         cert=(cert_file, key_file),
-        timeout=5,
+        timeout=get_timeouts.get_timeout(cfg, "ai_result"),
+        route="ai_result",
+        deadline=deadline,
     )
-    if r.status_code != 201:
+    # a rest api that deduplicates a retried
+    # create can return the original result
+    if r.status_code not in (200, 201):
         log.error(
             "\n\n"
             "non-201 response:\n"
@@ -67,7 +144,7 @@ def create_ai_result(
             f"  text:\n"
             f"  {r.text}\n"
         )
-        return None
+        return (None, r.status_code)
     else:
         if debug:
             log.debug(
@@ -77,9 +154,9 @@ def create_ai_result(
             rec_dict = json.loads(r.text)
             cur_o = core_result_ai.CoreResultAI()
             cur_o.load_response_dict(rec_dict=rec_dict)
-            return cur_o
+            return (cur_o, r.status_code)
         except Exception as e:
             log.error(
                 f'failed to create ai result with ex="{e}"'
             )
-    return None
+    return (None, r.status_code)
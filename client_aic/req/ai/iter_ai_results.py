@@ -0,0 +1,275 @@
+"""
+walk large ai result searches page by page
+while the next page downloads in the background
+"""
+import logging
+import concurrent.futures
+import client_aic.get_cfg as get_cfg
+import client_aic.models.core_user as core_user
+import client_aic.req.ai.search_ai_results as search_ai_results
+
+
+log = logging.getLogger(__name__)
+
+
+class SearchPageError(RuntimeError):
+    """SearchPageError"""
+
+    def __init__(
+        self,
+        msg: str,
+        offset: int = None,
+        after_id: int = None,
+    ):
+        """
+        __init__
+
+        a search page failed before the end of
+        the results so the walk can be resumed
+        by passing **offset** (or **after_id**
+        for a keyset walk) back to
+        **iter_ai_result_pages**
+
+        :param msg: error message
+        :param offset: results already yielded
+            (the offset of the failed page)
+        :param after_id: last yielded
+            **CoreResultAI.id**
+        """
+        super().__init__(msg)
+        self.offset = offset
+        self.after_id = after_id
+
+
+def iter_ai_result_pages(
+    user: core_user.CoreUser,
+    query: str,
+    data: dict = None,
+    page_size: int = 500,
+    cfg: dict = None,
+    keyset: bool = True,
+    after_id: int = None,
+    prefetch: bool = True,
+    timeout: float = 30,
+    offset: int = 0,
+):
+    """
+    iter_ai_result_pages
+
+    generator that searches for ai results one
+    page at a time and yields each page as a
+    **CoreSearchResultAI**
+
+    while the caller processes a page the
+    next page is fetched on a background
+    thread so at most two pages are held in
+    memory regardless of the total number
+    of matching results
+
+    pages are requested with the search
+    api paging values:
+
+    - **limit** - the **page_size**
+    - **after_id** and **order_by=id** - keyset
+      paging from the last **CoreResultAI.id**
+      (the default)
+    - **offset** - when **keyset** is **False**
+
+    ```python
+    for page in iter_ai_result_pages(
+        user=user,
+        query="by_user_id",
+        data={"user_id": user.id},
+    ):
+        print(page.column("score").mean())
+    ```
+
+    the generator stops after the first
+    short page, and raises **SearchPageError**
+    if a page fails or the api does not
+    move past the previous page so a
+    truncated walk is never mistaken for
+    the end of the results
+
+    ```python
+    try:
+        for page in iter_ai_result_pages(...):
+            save(page)
+    except SearchPageError as e:
+        # resume later with after_id=e.after_id
+        # (or offset=e.offset for keyset=False)
+        log.error(f"{e} after_id={e.after_id}")
+    ```
+
+    :param user: authenticated **CoreUser**
+    :param query: logical name of the search
+        (like **by_job_id** or **by_user_id**)
+    :param data: optional - extra search
+        values dictionary
+    :param page_size: max results per page
+    :param cfg: optional **CoreConfig** dictionary
+    :param keyset: flag for paging with
+        **after_id** (**True**) or **offset**
+        (**False**)
+    :param after_id: optional - start after
+        this **CoreResultAI.id** (for resuming
+        a keyset walk)
+    :param prefetch: flag for fetching the next
+        page in the background
+    :param timeout: per-page request timeout
+        in seconds
+    :param offset: optional - start at this
+        offset (for resuming an **offset** walk)
+
+    :raises SearchPageError: when a page fails
+        or repeats the previous page
+
+    :returns: generator of **CoreSearchResultAI**
+    :rtype: generator
+    """
+    if not cfg:
+        cfg = get_cfg.get_cfg()
+    base_req = dict(data or {})
+    base_req["query"] = query
+    base_req["limit"] = page_size
+
+    def fetch_page(use_after_id, offset):
+        req = dict(base_req)
+        if keyset:
+            req["order_by"] = "id"
+            if use_after_id is not None:
+                req["after_id"] = use_after_id
+        else:
+            req["offset"] = offset
+        return search_ai_results.search_ai_results(
+            user=user,
+            data=req,
+            cfg=cfg,
+            timeout=timeout,
+        )
+
+    executor = None
+    if prefetch:
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="ai-result-page",
+        )
+    try:
+        first_id = None
+        page = fetch_page(after_id, offset)
+        while page is not None:
+            num_recs = len(page.recs)
+            if num_recs == 0:
+                return
+            ids = page.columns["id"]
+            if first_id is not None and ids[0] == first_id:
+                msg = (
+                    f"stopping search query={query} - "
+                    f"page at offset={offset} repeats "
+                    f"id={first_id} so the api is "
+                    "ignoring the paging values"
+                )
+                log.error(msg)
+                raise SearchPageError(
+                    msg, offset=offset, after_id=after_id
+                )
+            first_id = ids[0]
+            offset += num_recs
+            after_id = ids[-1]
+            next_page = None
+            has_more = num_recs >= page_size
+            if has_more and executor:
+                next_page = executor.submit(
+                    fetch_page, after_id, offset
+                )
+            yield page
+            if not has_more:
+                return
+            if next_page:
+                page = next_page.result()
+            else:
+                page = fetch_page(after_id, offset)
+        msg = (
+            f"failed search query={query} "
+            f"page at offset={offset} "
+            f"after_id={after_id}"
+        )
+        log.error(msg)
+        raise SearchPageError(
+            msg, offset=offset, after_id=after_id
+        )
+    finally:
+        if executor:
+            executor.shutdown(
+                wait=False, cancel_futures=True
+            )
+
+
+def iter_ai_results(
+    user: core_user.CoreUser,
+    query: str,
+    data: dict = None,
+    page_size: int = 500,
+    cfg: dict = None,
+    keyset: bool = True,
+    after_id: int = None,
+    prefetch: bool = True,
+    timeout: float = 30,
+    offset: int = 0,
+):
+    """
+    iter_ai_results
+
+    generator that yields every matching
+    **CoreResultAI** for a search one
+    at a time (please see
+    **iter_ai_result_pages** for the
+    paging and prefetch details)
+
+    ```python
+    for ai_result in iter_ai_results(
+        user=user,
+        query="by_user_id",
+        data={"user_id": user.id},
+        page_size=1000,
+    ):
+        print(ai_result.id, ai_result.score)
+    ```
+
+    :param user: authenticated **CoreUser**
+    :param query: logical name of the search
+    :param data: optional - extra search
+        values dictionary
+    :param page_size: max results per page
+    :param cfg: optional **CoreConfig** dictionary
+    :param keyset: flag for paging with
+        **after_id** (**True**) or **offset**
+        (**False**)
+    :param after_id: optional - start after
+        this **CoreResultAI.id**
+    :param prefetch: flag for fetching the next
+        page in the background
+    :param timeout: per-page request timeout
+        in seconds
+    :param offset: optional - start at this
+        offset (when **keyset** is **False**)
+
+    :raises SearchPageError: when a page fails
+        (please see **iter_ai_result_pages**)
+
+    :returns: generator of **CoreResultAI**
+    :rtype: generator
+    """
+    for page in iter_ai_result_pages(
+        user=user,
+        query=query,
+        data=data,
+        page_size=page_size,
+        cfg=cfg,
+        keyset=keyset,
+        after_id=after_id,
+        prefetch=prefetch,
+        timeout=timeout,
+        offset=offset,
+    ):
+        yield from page.recs
@@ -1,10 +1,14 @@
 import logging
 import uuid
 import ujson as json
-import requests
 import client_aic.ppj as ppj
 import client_aic.get_cfg as get_cfg
+import client_aic.config.get_routes as get_routes
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.deadline as deadline_mod
+import client_aic.get_transport as get_transport
 import client_aic.tls.utils as tls_utils
+import client_aic.retry_policy as retry_policy
 import client_aic.models.core_job as core_job
 import client_aic.models.core_user as core_user
 
@@ -12,6 +16,112 @@ import client_aic.models.core_user as core_user
 log = logging.getLogger(__name__)
 
 
+def build_job_ask_req(
+    question: str,
+    user: core_user.CoreUser = None,
+    session_id: str = None,
+    derived_session_id: str = None,
+    model_name: str = None,
+    collection_id: str = None,
+    collection_name: str = None,
+    embed_model_name: str = None,
+    tags: str = None,
+    max_tokens: int = 512,
+    n_ctx: int = 2048,
+    n_batch: int = 10,
+    match_docs: int = 3,
+    max_doc_scores: int = 3,
+    min_q_score: float = 0.3,
+    min_a_score: float = 0.3,
+    idempotency_key: str = None,
+):
+    """
+    build_job_ask_req
+
+    build the **POST /job** request body for
+    asking the llm a question
+
+    shared by **run_job_ask** and the async
+    client so both send the same payload
+
+    please see **run_job_ask** for
+    the parameter descriptions (the **user**
+    is optional so the **ask** payload can be
+    built before logging in)
+
+    the **idempotency_key** is sent in the
+    **ask.data** so the job (and its ai result)
+    can be matched back to the request that
+    created it
+
+    :returns: request body dictionary
+    :rtype: dict
+    """
+    use_model_name = "mistral-7b-instruct-v0.1.Q4_K_M.gguf"
+    use_embed_name = (
+        "sentence-transformers/all-MiniLM-L6-v2"
+    )
+    use_user_id = None
+    use_tags = None
+    use_session_id = None
+    use_derived_session_id = None
+    if user:
+        use_user_id = user.id
+    if model_name:
+        use_model_name = model_name
+    if embed_model_name:
+        use_embed_name = embed_model_name
+    if tags:
+        use_tags = tags
+    if session_id:
+        use_session_id = session_id
+    else:
+        session_id = str(uuid.uuid4()).replace("-", "")
+    if derived_session_id:
+        use_derived_session_id = derived_session_id
+    use_data = {}
+    if idempotency_key:
+        use_data["idempotency_key"] = idempotency_key
+
+    # src/requests/job/create_job.rs
+    use_req = {
+        "user_id": use_user_id,
+        # ask worker id = 1
+        # gen worker id = 2
+        "worker_id": 1,
+        # ready for work when state == 1
+        "state": 1,
+        # ask questions = 1
+        # gen answers = 2
+        "job_type": 1,
+        "ask": {
+            "msg": question,
+            "model_name": use_model_name,
+            "embed_model_name": use_embed_name,
+            "collection_id": collection_id,
+            "collection_name": collection_name,
+            "max_tokens": max_tokens,
+            "n_ctx": n_ctx,
+            "n_batch": n_batch,
+            "rag": {
+                "dirs": [],
+                "s3": [],
+                "caches": [],
+                "rss": [],
+                "match_docs": match_docs,
+                "max_doc_scores": max_doc_scores,
+                "min_q_score": min_q_score,
+                "min_a_score": min_a_score,
+            },
+            "data": use_data,
+            "tags": use_tags,
+            "session_id": use_session_id,
+            "derived_session_id": use_derived_session_id,
+        },
+    }
+    return use_req
+
+
 def run_job_ask(
     question: str,
     user: core_user.CoreUser,
@@ -30,6 +140,8 @@ def run_job_ask(
     max_doc_scores: int = 3,
     min_q_score: float = 0.3,
     min_a_score: float = 0.3,
+    idempotency_key: str = None,
+    deadline: deadline_mod.Deadline = None,
 ):
     """
     run_job_ask
@@ -86,6 +198,17 @@ def run_job_ask(
     :param min_a_score: minimum rag data source
         confidence score as a valid source for the llm
         to use with this answer
+    :param idempotency_key: optional - client-generated
+        key for deduplicating a retried submit
+        (defaults to a new uuid). the key is sent in
+        the **Idempotency-Key** header and the
+        **ask.data** so a POST that timed out can be
+        retried without paying for a duplicate job.
+        reuse the same key when submitting the
+        same question again after a restart
+    :param deadline: optional - **Deadline** for
+        the whole call chain (each attempt only
+        waits for the remaining budget)
 
     :returns: **CoreJob** on success
         **None** on non-success
@@ -93,82 +216,53 @@ def run_job_ask(
     """
     if not cfg:
         cfg = get_cfg.get_cfg()
-    url = f'https://{cfg["endpoint"]}/job'
+    url = get_routes.get_url(cfg, "job")
     (cert_file, key_file) = tls_utils.get_certs(cfg)
     verify = tls_utils.get_verify(cfg)
     log.debug(f'run job ask: {url} question="{question}"')
-    s = requests.Session()
-    s.headers.update({"Bearer": f"{user.token}"})
-
-    use_model_name = "mistral-7b-instruct-v0.1.Q4_K_M.gguf"
-    use_embed_name = (
-        "sentence-transformers/all-MiniLM-L6-v2"
+    tr = get_transport.get_transport(cfg)
+    if not idempotency_key:
+        idempotency_key = uuid.uuid4().hex
+    use_req = build_job_ask_req(
+        question=question,
+        user=user,
+        session_id=session_id,
+        derived_session_id=derived_session_id,
+        model_name=model_name,
+        collection_id=collection_id,
+        collection_name=collection_name,
+        embed_model_name=embed_model_name,
+        tags=tags,
+        max_tokens=max_tokens,
+        n_ctx=n_ctx,
+        n_batch=n_batch,
+        match_docs=match_docs,
+        max_doc_scores=max_doc_scores,
+        min_q_score=min_q_score,
+        min_a_score=min_a_score,
+        idempotency_key=idempotency_key,
     )
-    use_tags = None
-    use_session_id = None
-    use_derived_session_id = None
-    if model_name:
-        use_model_name = model_name
-    if embed_model_name:
-        use_embed_name = embed_model_name
-    if tags:
-        use_tags = tags
-    if session_id:
-        use_session_id = session_id
-    else:
-        session_id = str(uuid.uuid4()).replace("-", "")
-    if derived_session_id:
-        use_derived_session_id = derived_session_id
-
-    # src/requests/job/create_job.rs
-    use_req = {
-        "user_id": user.id,
-        # ask worker id = 1
-        # gen worker id = 2
-        "worker_id": 1,
-        # ready for work when state == 1
-        "state": 1,
-        # ask questions = 1
-        # gen answers = 2
-        "job_type": 1,
-        "ask": {
-            "msg": question,
-            "model_name": use_model_name,
-            "embed_model_name": use_embed_name,
-            "collection_id": collection_id,
-            "collection_name": collection_name,
-            "max_tokens": max_tokens,
-            "n_ctx": n_ctx,
-            "n_batch": n_batch,
-            "rag": {
-                "dirs": [],
-                "s3": [],
-                "caches": [],
-                "rss": [],
-                "match_docs": match_docs,
-                "max_doc_scores": max_doc_scores,
-                "min_q_score": min_q_score,
-                "min_a_score": min_a_score,
-            },
-            "data": {},
-            "tags": use_tags,
-            "session_id": use_session_id,
-            "derived_session_id": use_derived_session_id,
-        },
-    }
     log.debug(
         "starting ai job with config:"
         f"\n{ppj.ppj(use_req)}\n"
     )
     use_json = json.dumps(use_req)
-    r = s.post(
+    r = tr.post(
         url,
-        use_json,
+        user=user,
+        data=use_json,
+        headers={
+            retry_policy.IDEMPOTENCY_HEADER: idempotency_key,
+        },
         verify=verify,
         cert=(cert_file, key_file),
-        timeout=5,
+        timeout=get_timeouts.get_timeout(cfg, "job"),
+        route="job",
+        deadline=deadline,
     )
-    if r.status_code != 201:
+    # a rest api that deduplicates a retried
+    # submit can return the original job
+    if r.status_code not in (200, 201):
         log.error(
             "\n\n"
             "non-201 response:\n"
@@ -184,18 +278,7 @@ def run_job_ask(
     else:
         try:
             cur_json = json.loads(r.text)
-            cur_o = core_job.CoreJob(
-                id=cur_json.get("id", None),
-                user_id=cur_json.get("user_id", None),
-                worker_id=cur_json.get("worker_id", None),
-                job_type=cur_json.get("job_type", None),
-                state=cur_json.get("state", None),
-                status=cur_json.get("status", None),
-                data=cur_json.get("data", None),
-                msg=cur_json.get("msg", None),
-                created_at=cur_json.get("created_at", None),
-                updated_at=cur_json.get("updated_at", None),
-            )
+            cur_o = core_job.CoreJob.from_dict(cur_json)
             return cur_o
         except Exception as e:
             log.error(
@@ -1,8 +1,11 @@
 import logging
-import requests
 import ujson as json
 import client_aic.tls.utils as tls_utils
 import client_aic.get_cfg as get_cfg
+import client_aic.config.get_routes as get_routes
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.deadline as deadline_mod
+import client_aic.get_transport as get_transport
 import client_aic.models.core_search_result_ai as core_search_result_ai
 import client_aic.models.core_user as core_user
 
@@ -14,6 +17,8 @@ def search_ai_results(
     user: core_user.CoreUser,
     data: dict,
     cfg: dict = None,
+    timeout: float = None,
+    deadline: deadline_mod.Deadline = None,
 ):
     """
     search_ai_results
@@ -27,6 +32,12 @@ def search_ai_results(
         that is making this request
     :param data: request values dictionary
     :param cfg: optional **CoreConfig** dictionary
+    :param timeout: optional - request timeout
+        in seconds (defaults to the
+        **ai_result_search** timeout profile)
+    :param deadline: optional - **Deadline** for
+        the whole call chain (each attempt only
+        waits for the remaining budget)
 
     :returns: **CoreSearchResultAI** on success
         **None** on non-success
@@ -34,19 +45,26 @@ def search_ai_results(
     """
     if not cfg:
         cfg = get_cfg.get_cfg()
-    url = f'https://{cfg["endpoint"]}/ai/result/search'
+    url = get_routes.get_url(cfg, "ai_result_search")
     (cert_file, key_file) = tls_utils.get_certs(cfg)
     debug = cfg.get("debug", False)
     verify = tls_utils.get_verify(cfg)
     log.debug(f"search ai result: {url}")
-    s = requests.Session()
-    s.headers.update({"Bearer": f"{user.token}"})
-    r = s.post(
+    tr = get_transport.get_transport(cfg)
+    r = tr.post(
         url,
+        user=user,
         json=data,
         verify=verify,
         cert=(cert_file, key_file),
-        timeout=5,
+        timeout=timeout
+        or get_timeouts.get_timeout(
+            cfg, "ai_result_search"
+        ),
+        deadline=deadline,
+        route="ai_result_search",
+        # read-only search that is safe to retry
+        idempotent=True,
     )
     if r.status_code != 200:
         log.error(
@@ -0,0 +1,141 @@
+import logging
+import client_aic.tls.utils as tls_utils
+import client_aic.get_cfg as get_cfg
+import client_aic.json_stream as json_stream
+import client_aic.config.get_routes as get_routes
+import client_aic.get_transport as get_transport
+import client_aic.models.core_result_ai as core_result_ai
+import client_aic.models.core_user as core_user
+
+
+log = logging.getLogger(__name__)
+
+
+class StreamDecodeError(ValueError):
+    """StreamDecodeError"""
+
+    def __init__(
+        self,
+        msg: str,
+        num_recs: int = 0,
+    ):
+        """
+        __init__
+
+        the search response body was truncated
+        or corrupt so the stream ended early
+
+        :param msg: error message
+        :param num_recs: records yielded before
+            the decode failed
+        """
+        super().__init__(msg)
+        self.num_recs = num_recs
+
+
+def stream_ai_results(
+    user: core_user.CoreUser,
+    data: dict,
+    cfg: dict = None,
+    timeout: float = 30,
+    chunk_size: int = 65536,
+    meta: dict = None,
+):
+    """
+    stream_ai_results
+
+    search for ai results and yield each
+    **CoreResultAI** as soon as it is decoded
+    from the response body
+
+    unlike **search_ai_results** the response
+    is read from the socket in **chunk_size**
+    pieces and the **recs** array is decoded
+    one record at a time, so peak memory is
+    about one record (plus one chunk) even
+    when the search returns hundreds of MB
+    of **match_content**
+
+    ```python
+    meta = {}
+    for ai_result in stream_ai_results(
+        user=user,
+        data={"query": "by_user_id", "user_id": user.id},
+        meta=meta,
+    ):
+        print(ai_result.id, ai_result.score)
+    print(meta.get("msg"))
+    ```
+
+    :param CoreUser user: authenticated user
+        that is making this request
+    :param data: request values dictionary
+    :param cfg: optional **CoreConfig** dictionary
+    :param timeout: optional - seconds to wait
+        for the connection and between chunks
+    :param chunk_size: bytes to read from the
+        socket at a time
+    :param meta: optional - dictionary that is
+        filled with the other response values
+        (like **msg** and **sql_query**)
+
+    :raises StreamDecodeError: if the response
+        body is truncated or corrupt (after the
+        records before it were yielded)
+
+    :returns: generator of **CoreResultAI**
+    :rtype: generator
+    """
+    if not cfg:
+        cfg = get_cfg.get_cfg()
+    url = get_routes.get_url(cfg, "ai_result_search")
+    (cert_file, key_file) = tls_utils.get_certs(cfg)
+    verify = tls_utils.get_verify(cfg)
+    log.debug(f"stream ai results: {url}")
+    tr = get_transport.get_transport(cfg)
+    r = tr.post(
+        url,
+        user=user,
+        json=data,
+        verify=verify,
+        cert=(cert_file, key_file),
+        timeout=timeout,
+        stream=True,
+        route="ai_result_search",
+        # read-only search that is safe to retry
+        idempotent=True,
+    )
+    try:
+        if r.status_code != 200:
+            log.error(
+                "\n\n"
+                "non-200 response:\n"
+                f"  url: {url}\n"
+                f"  ca={verify}\n"
+                f"  response:\n"
+                f"  code: {r.status_code}\n"
+                f"  text:\n"
+                f"  {r.text}\n"
+            )
+            return
+        from_dict = core_result_ai.CoreResultAI.from_dict
+        num_recs = 0
+        try:
+            for rec in json_stream.iter_json_array(
+                r.iter_content(chunk_size=chunk_size),
+                key="recs",
+                meta=meta,
+            ):
+                num_recs += 1
+                yield from_dict(rec)
+        except ValueError as e:
+            msg = (
+                "failed to decode search response "
+                f'after recs={num_recs} with ex="{e}"'
+            )
+            log.error(msg)
+            raise StreamDecodeError(
+                msg, num_recs=num_recs
+            ) from e
+    finally:
+        r.close()
@@ -1,19 +1,222 @@
 import logging
-import requests
+import threading
 import ujson as json
 import client_aic.tls.utils as tls_utils
 import client_aic.get_cfg as get_cfg
+import client_aic.config.get_routes as get_routes
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.deadline as deadline_mod
+import client_aic.get_transport as get_transport
 import client_aic.models.core_result_ai as core_result_ai
 import client_aic.models.core_user as core_user
 
 
 log = logging.getLogger(__name__)
 
+# responses from an api without PATCH support
+# (a 404 is a missing record, not a missing method)
+PATCH_UNSUPPORTED_CODES = (405, 501)
+
+# urls that do not support PATCH so
+# updates go straight to a full PUT
+patch_unsupported = set()
+patch_lock = threading.Lock()
+
+
+def get_patch_data(
+    ai_result: core_result_ai.CoreResultAI,
+):
+    """
+    get_patch_data
+
+    build the PATCH body with only the
+    fields that changed since the
+    **ai_result** was loaded
+
+    :param ai_result: **CoreResultAI** to update
+
+    :returns: dictionary with the **id**,
+        **user_id** and changed fields, an empty
+        dictionary if nothing changed or **None**
+        when every field has to be sent with a
+        full PUT
+    :rtype: dict or None
+    """
+    if ai_result.id is None:
+        return None
+    changes = ai_result.get_changes()
+    if changes is None or not changes:
+        return changes
+    data = {"id": ai_result.id}
+    if ai_result.user_id is not None:
+        data["user_id"] = ai_result.user_id
+    data.update(changes)
+    return data
+
+
+def merge_patch_response(
+    ai_result: core_result_ai.CoreResultAI,
+    text: str,
+):
+    """
+    merge_patch_response
+
+    copy the fields in a PATCH response
+    (full or partial record) into the
+    **ai_result** and mark it clean
+
+    :param ai_result: **CoreResultAI** that
+        was updated
+    :param text: response body
+
+    :returns: the **ai_result**
+    :rtype: CoreResultAI
+    """
+    cur_json = {}
+    if text:
+        cur_json = json.loads(text)
+    if isinstance(cur_json, dict):
+        for field in ai_result.fields:
+            if field in cur_json:
+                setattr(ai_result, field, cur_json[field])
+    ai_result.mark_clean()
+    return ai_result
+
+
+def get_update_data(
+    url: str,
+    ai_result: core_result_ai.CoreResultAI,
+    partial: bool = True,
+):
+    """
+    get_update_data
+
+    decide how to send an update to the **url**
+
+    :param url: full url for the **ai_result** route
+    :param ai_result: **CoreResultAI** to update
+    :param partial: flag to only send the
+        changed fields
+
+    :returns: PATCH body dictionary, an empty
+        dictionary if nothing changed or **None**
+        to send a full PUT
+    :rtype: dict or None
+    """
+    if not partial or url in patch_unsupported:
+        return None
+    return get_patch_data(ai_result)
+
+
+def on_patch_response(
+    url: str,
+    ai_result: core_result_ai.CoreResultAI,
+    r,
+):
+    """
+    on_patch_response
+
+    handle a PATCH response and remember
+    a **url** without PATCH support
+
+    :param url: full url that was patched
+    :param ai_result: **CoreResultAI** that
+        was patched
+    :param r: response with a **status_code**
+        and **text**
+
+    :returns: (**done**, **CoreResultAI** or
+        **None**) where **done** is **False** when
+        the update has to be sent with a PUT
+    :rtype: (bool, CoreResultAI)
+    """
+    if r.status_code == 200:
+        log.debug(f"patch ai result success - {r.text}")
+        try:
+            return (
+                True,
+                merge_patch_response(ai_result, r.text),
+            )
+        except Exception as e:
+            log.error(
+                "failed to patch ai_result "
+                f'with ex="{e}"'
+            )
+            return (True, None)
+    if r.status_code not in PATCH_UNSUPPORTED_CODES:
+        log.error(
+            "\n\n"
+            "non-200 response:\n"
+            f"  url: {url}\n"
+            f"  ai_result.id: {ai_result.id}\n"
+            f"  response:\n"
+            f"  code: {r.status_code}\n"
+            f"  text:\n"
+            f"  {r.text}\n"
+        )
+        return (True, None)
+    log.info(
+        f"PATCH is not supported by {url} "
+        f"code={r.status_code} - using PUT"
+    )
+    with patch_lock:
+        patch_unsupported.add(url)
+    return (False, None)
+
+
+def on_put_response(
+    url: str,
+    ai_result: core_result_ai.CoreResultAI,
+    r,
+):
+    """
+    on_put_response
+
+    handle a PUT response
+
+    :param url: full url that was updated
+    :param ai_result: **CoreResultAI** that
+        was sent (marked clean on success)
+    :param r: response with a **status_code**
+        and **text**
+
+    :returns: updated **CoreResultAI** on success
+        **None** on non-success
+    :rtype: CoreResultAI or None
+    """
+    if r.status_code != 200:
+        log.error(
+            "\n\n"
+            "non-200 response:\n"
+            f"  url: {url}\n"
+            f"  ai_result.id: {ai_result.id}\n"
+            f"  response:\n"
+            f"  code: {r.status_code}\n"
+            f"  text:\n"
+            f"  {r.text}\n"
+        )
+        return None
+    log.debug(f"update ai result success - {r.text}")
+    try:
+        cur_json = json.loads(r.text)
+        cur_o = core_result_ai.CoreResultAI()
+        cur_o.load_response_dict(rec_dict=cur_json)
+        ai_result.mark_clean()
+        return cur_o
+    except Exception as e:
+        log.error(
+            f'failed to update ai_result with ex="{e}"'
+        )
+    return None
+
 
 def update_ai_result(
     user: core_user.CoreUser,
     ai_result: core_result_ai.CoreResultAI,
     cfg=None,
+    partial: bool = True,
+    deadline: deadline_mod.Deadline = None,
+    allow_put: bool = True,
 ):
     """
     update_ai_result
@@ -24,11 +227,29 @@ def update_ai_result(
     using human feedback with
     the **reviewed_answer** and **reviewed_score** fields
 
+    an **ai_result** loaded from the rest api
+    tracks its changed fields so only those
+    fields are sent with a PATCH (a review is a
+    few bytes instead of the whole **answer**
+    and **match_content**) and a concurrent edit
+    to another field is not overwritten. new
+    records, or an api without PATCH support,
+    use a full PUT of **ai_result.get_dict()**
+
     :param CoreUser user: authenticated user
         that is making this request
     :param ai_result: in-memory object with
         values to send to the database
     :param cfg: optional **CoreConfig** dictionary
+    :param partial: flag to only send the
+        changed fields (**False** always
+        sends a full PUT)
+    :param deadline: optional - **Deadline** for
+        the whole call chain (each attempt only
+        waits for the remaining budget)
+    :param allow_put: flag to fall back to a full
+        PUT (**False** for an **ai_result** that only
+        holds the **id** and the changed fields)
 
     :returns: **CoreResultAI** on success
         **None** on non-success
@@ -36,44 +257,54 @@ def update_ai_result(
     """
     if not cfg:
         cfg = get_cfg.get_cfg()
-    url = f'https://{cfg["endpoint"]}/ai/result'
+    url = get_routes.get_url(cfg, "ai_result")
     (cert_file, key_file) = tls_utils.get_certs(cfg)
     verify = tls_utils.get_verify(cfg)
-    debug = cfg.get("debug", False)
+    tr = get_transport.get_transport(cfg)
+    patch_data = get_update_data(url, ai_result, partial)
+    if patch_data == {}:
+        log.debug(
+            f"no changes to update ai_result.id={ai_result.id}"
+        )
+        return ai_result
+    if patch_data:
+        log.debug(
+            f"patch ai result: {url} "
+            f"fields={list(patch_data)}"
+        )
+        r = tr.patch(
+            url,
+            user=user,
+            json=patch_data,
+            verify=verify,
+            cert=(cert_file, key_file),
+            timeout=get_timeouts.get_timeout(
+                cfg, "ai_result"
+            ),
+            deadline=deadline,
+            route="ai_result",
+            # sets the same values on every attempt
+            idempotent=True,
+        )
+        (done, cur_o) = on_patch_response(url, ai_result, r)
+        if done:
+            return cur_o
+    if not allow_put:
+        log.error(
+            f"not updating ai_result.id={ai_result.id} "
+            f"with a full PUT - {url} does not "
+            "support PATCH"
+        )
+        return None
     log.debug(f"update ai result: {url}")
-    s = requests.Session()
-    s.headers.update({"Bearer": f"{user.token}"})
-    data = ai_result.get_dict()
-    r = s.put(
+    r = tr.put(
         url,
-        json=data,
+        user=user,
+        json=ai_result.get_dict(),
         verify=verify,
         cert=(cert_file, key_file),
-        timeout=5,
+        timeout=get_timeouts.get_timeout(cfg, "ai_result"),
+        route="ai_result",
+        deadline=deadline,
     )
-    if r.status_code != 200:
-        log.error(
-            "\n\n"
-            "non-200 response:\n"
-            f"  url: {url}\n"
-            f"  job_result.id: {id}\n"
-            f"  ca={verify}\n"
-            f"  response:\n"
-            f"  code: {r.status_code}\n"
-            f"  text:\n"
-            f"  {r.text}\n"
-        )
-        return None
-    else:
-        if debug:
-            log.info(f"update ai result success - {r.text}")
-        try:
-            cur_json = json.loads(r.text)
-            cur_o = core_result_ai.CoreResultAI()
-            cur_o.load_response_dict(rec_dict=cur_json)
-            return cur_o
-        except Exception as e:
-            log.error(
-                f'failed to update ai_result with ex="{e}"'
-            )
-    return None
+    return on_put_response(url, ai_result, r)
@@ -1,8 +1,11 @@
 import os
 import logging
 import ujson as json
-import requests
 import client_aic.get_cfg as get_cfg
+import client_aic.config.get_routes as get_routes
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.deadline as deadline_mod
+import client_aic.get_transport as get_transport
 import client_aic.models.core_user as core_user
 import client_aic.tls.utils as tls_utils
 
@@ -16,6 +19,7 @@ def login(
     cfg: dict = None,
     creds_file_path: str = None,
     force: bool = False,
+    deadline: deadline_mod.Deadline = None,
 ):
     """
     login
@@ -60,41 +64,27 @@ def login(
     :param force: flag for overwritting the
         **creds_file_path** like for
         when the **CoreUser**'s token expires
+    :param deadline: optional - **Deadline** for
+        the whole call chain (each attempt only
+        waits for the remaining budget)
 
     :returns: **CoreUser** on success
         **None** on non-success
     :rtype: CoreUser or None
     """
 
+    if not cfg:
+        cfg = get_cfg.get_cfg()
     # if no email/password
     # it's in the creds.json
     # or its not a valid api request
     # (env vars are loaded upstream
     # CoreConfig **cfg** dictionary)
     if not email and not password:
-        home_dir = os.getenv("HOME", None)
-        creds_dir = f"{home_dir}/.redten"
-        def_creds_path = f"{creds_dir}/creds.json"
-        creds_path = os.getenv(
-            "AI_CREDS_FILE",
-            cfg.get("ai_creds_file", def_creds_path),
+        user = get_saved_user(
+            cfg=cfg, creds_file_path=creds_file_path
         )
-        if creds_file_path:
-            creds_path = creds_file_path
-        if os.path.exists(creds_path):
-            user_json = {}
-            with open(creds_path, "r") as fp:
-                user_json = json.loads(fp.read())
-            user = core_user.CoreUser(
-                id=user_json.get("id", -2),
-                email=user_json.get("email", "not found"),
-                state=user_json.get("state", -2),
-                verified=user_json.get("verified", -2),
-                role=user_json.get("role", "not found"),
-                token=user_json.get("token", "not found"),
-                msg=user_json.get("msg", "not found"),
-            )
-            log.debug(f"using existing creds: {creds_path}")
+        if user:
             return user
 
     # by here the cfg was already parsed by the authenticate
@@ -104,15 +94,13 @@ def login(
             "invalid login - missing email and password"
         )
         return None
-    if not cfg:
-        cfg = get_cfg.get_cfg()
     if not email:
         log.error("invalid login - " "missing email")
         return None
     if not password:
         log.error("invalid login - " "missing password")
         return None
-    url = f'https://{cfg["endpoint"]}/login'
+    url = get_routes.get_url(cfg, "login")
     (cert_file, key_file) = tls_utils.get_certs(cfg)
     verify = tls_utils.get_verify(cfg)
     debug = cfg.get("debug", False)
@@ -121,22 +109,99 @@ def login(
         "password": password,
     }
     log.debug(f"login: {url} data={data} ca={verify}")
-    s = requests.Session()
-    r = s.post(
+    tr = get_transport.get_transport(cfg)
+    r = tr.post(
         url,
-        json.dumps(data),
+        data=json.dumps(data),
         verify=verify,
         cert=(cert_file, key_file),
-        timeout=10,
+        timeout=get_timeouts.get_timeout(cfg, "login"),
+        route="login",
+        deadline=deadline,
+        # a login only issues a new token
+        idempotent=True,
+    )
+    return load_login_response(
+        r, email=email, url=url, debug=debug
+    )
+
+
+def get_saved_user(
+    cfg: dict,
+    creds_file_path: str = None,
+):
+    """
+    get_saved_user
+
+    get the **CoreUser** saved by an earlier
+    login in the local credentials file
+
+    :param cfg: **CoreConfig** dictionary
+    :param creds_file_path: optional - path to the
+        credentials file (defaults to the
+        **AI_CREDS_FILE** environment variable)
+
+    :returns: **CoreUser** if the file exists
+        **None** if there is no saved user
+    :rtype: CoreUser or None
+    """
+    home_dir = os.getenv("HOME", None)
+    creds_dir = f"{home_dir}/.redten"
+    def_creds_path = f"{creds_dir}/creds.json"
+    creds_path = os.getenv(
+        "AI_CREDS_FILE",
+        cfg.get("ai_creds_file", def_creds_path),
+    )
+    if creds_file_path:
+        creds_path = creds_file_path
+    if not os.path.exists(creds_path):
+        return None
+    user_json = {}
+    with open(creds_path, "r") as fp:
+        user_json = json.loads(fp.read())
+    user = core_user.CoreUser(
+        id=user_json.get("id", -2),
+        email=user_json.get("email", "not found"),
+        state=user_json.get("state", -2),
+        verified=user_json.get("verified", -2),
+        role=user_json.get("role", "not found"),
+        token=user_json.get("token", "not found"),
+        msg=user_json.get("msg", "not found"),
     )
+    log.debug(f"using existing creds: {creds_path}")
+    return user
+
+
+def load_login_response(
+    r,
+    email: str,
+    url: str = None,
+    debug: bool = False,
+):
+    """
+    load_login_response
+
+    get the **CoreUser** from a login response
+    and save the credentials locally (unless
+    **DISABLE_CRED_CACHE=1**)
+
+    :param r: login response with a
+        **status_code** and **text**
+    :param email: user's email address
+    :param url: optional - login url for logging
+    :param debug: optional - flag to log the
+        failed response
+
+    :returns: **CoreUser** on success
+        **None** on non-success
+    :rtype: CoreUser or None
+    """
     if r.status_code != 201:
         if debug:
             log.error(
                 "\n\n"
                 "failed login:\n"
                 f"url: {url}\n"
-                f"data: {data}\n"
-                f"ca: {verify}\n"
                 f"response:\ncode: {r.status_code}\n"
                 f"text:\n{r.text}\n"
             )
@@ -155,25 +220,24 @@ def login(
                     f"response={r.text}"
                 )
         return None
-    else:
-        log.debug(f"login success - {r.text}")
-        try:
-            user_json = json.loads(r.text)
-            user = core_user.CoreUser(
-                id=user_json.get("user_id", -2),
-                email=user_json.get("email", "not found"),
-                state=user_json.get("state", -2),
-                verified=user_json.get("verified", -2),
-                role=user_json.get("role", "not found"),
-                token=user_json.get("token", "not found"),
-                msg=user_json.get("msg", "not found"),
-            )
-            # disable saving creds
-            # if the environment variable
-            # export DISABLE_CRED_CACHE=1
-            if os.getenv("DISABLE_CRED_CACHE", "0") == "0":
-                user.save_creds()
-            return user
-        except Exception as e:
-            log.error(f'failed to login with ex="{e}"')
-            return None
+    log.debug(f"login success - {r.text}")
+    try:
+        user_json = json.loads(r.text)
+        user = core_user.CoreUser(
+            id=user_json.get("user_id", -2),
+            email=user_json.get("email", "not found"),
+            state=user_json.get("state", -2),
+            verified=user_json.get("verified", -2),
+            role=user_json.get("role", "not found"),
+            token=user_json.get("token", "not found"),
+            msg=user_json.get("msg", "not found"),
+        )
+        # disable saving creds
+        # if the environment variable
+        # export DISABLE_CRED_CACHE=1
+        if os.getenv("DISABLE_CRED_CACHE", "0") == "0":
+            user.save_creds()
+        return user
+    except Exception as e:
+        log.error(f'failed to login with ex="{e}"')
+        return None
@@ -1,7 +1,10 @@
 import logging
 import ujson as json
-import requests
 import client_aic.get_cfg as get_cfg
+import client_aic.config.get_routes as get_routes
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.deadline as deadline_mod
+import client_aic.get_transport as get_transport
 import client_aic.models.core_result_job as core_result_job
 import client_aic.models.core_user as core_user
 import client_aic.tls.utils as tls_utils
@@ -14,6 +17,7 @@ def get_job_result(
     id: int,
     user: core_user.CoreUser,
     cfg: dict = None,
+    deadline: deadline_mod.Deadline = None,
 ):
     """
     get_job_result
@@ -27,6 +31,9 @@ def get_job_result(
     :param CoreUser user: authenticated user
         that is making this request
     :param cfg: optional - **CoreConfig** dictionary
+    :param deadline: optional - **Deadline** for
+        the whole call chain (each attempt only
+        waits for the remaining budget)
 
     :returns: **CoreResultJob** on success
         **None** on non-success
@@ -34,20 +41,23 @@ def get_job_result(
     """
     if not cfg:
         cfg = get_cfg.get_cfg()
-    url = f'https://{cfg["endpoint"]}/job/result/{id}'
+    url = get_routes.get_url(cfg, "job_result") + str(id)
     (cert_file, key_file) = tls_utils.get_certs(cfg)
     verify = tls_utils.get_verify(cfg)
     debug = cfg.get("debug", False)
     log.debug(f"get job result: {url}")
-    s = requests.Session()
-    s.headers.update({"Bearer": f"{user.token}"})
+    tr = get_transport.get_transport(cfg)
     data = {"user_id": user.id, "job_id": id}
-    r = s.get(
+    r = tr.get(
         url,
+        user=user,
         json=data,
         verify=verify,
         cert=(cert_file, key_file),
-        timeout=10,
+        timeout=get_timeouts.get_timeout(cfg, "job_result"),
+        route="job_result",
+        deadline=deadline,
+        hedge=True,
     )
     if r.status_code != 200:
         if debug:
@@ -66,17 +76,8 @@ def get_job_result(
     else:
         try:
             cur_json = json.loads(r.text)
-            cur_o = core_result_job.CoreResultJob(
-                id=cur_json.get("id", None),
-                job_id=cur_json.get("job_id", None),
-                worker_id=cur_json.get("worker_id", None),
-                job_type=cur_json.get("job_type", None),
-                user_id=cur_json.get("user_id", None),
-                state=cur_json.get("state", None),
-                data=cur_json.get("data", None),
-                msg=cur_json.get("msg", None),
-                created_at=cur_json.get("created_at", None),
-                updated_at=cur_json.get("updated_at", None),
+            cur_o = core_result_job.CoreResultJob.from_dict(
+                cur_json
             )
             return cur_o
         except Exception as e:
@@ -1,7 +1,10 @@
 import logging
 import ujson as json
-import requests
 import client_aic.get_cfg as get_cfg
+import client_aic.config.get_routes as get_routes
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.deadline as deadline_mod
+import client_aic.get_transport as get_transport
 import client_aic.models.core_user as core_user
 import client_aic.tls.utils as tls_utils
 
@@ -14,6 +17,7 @@ def create_user(
     email: str,
     password: str,
     cfg: dict = None,
+    deadline: deadline_mod.Deadline = None,
 ):
     """
     create_user
@@ -25,6 +29,9 @@ def create_user(
     :param email: user's email address
     :param password: user's password
     :param cfg: optional **CoreConfig** dictionary
+    :param deadline: optional - **Deadline** for
+        the whole call chain (each attempt only
+        waits for the remaining budget)
 
     :returns: **CoreUser** on success
         **None** on failure
@@ -32,23 +39,25 @@ def create_user(
     """
     if not cfg:
         cfg = get_cfg.get_cfg()
-    url = f'https://{cfg["endpoint"]}/user'
+    url = get_routes.get_url(cfg, "user")
     (cert_file, key_file) = tls_utils.get_certs(cfg)
     verify = tls_utils.get_verify(cfg)
     debug = cfg.get("debug", False)
     log.debug(f"create user: {url}")
-    s = requests.Session()
+    tr = get_transport.get_transport(cfg)
     data = {
         "username": username,
         "email": email,
         "password": password,
     }
-    r = s.post(
+    r = tr.post(
         url,
-        json.dumps(data),
+        data=json.dumps(data),
         verify=verify,
         cert=(cert_file, key_file),
-        timeout=5,
+        timeout=get_timeouts.get_timeout(cfg, "user"),
+        route="user",
+        deadline=deadline,
     )
     if r.status_code != 201:
         if debug:
@@ -67,20 +76,8 @@ def create_user(
             log.debug(f"found user={username} e={email}")
             try:
                 cur_json = json.loads(r.text)
-                cur_o = core_user.CoreUser(
-                    id=cur_json.get("id", None),
-                    email=cur_json.get("email", None),
-                    state=cur_json.get("state", None),
-                    verified=cur_json.get("verified", None),
-                    role=cur_json.get("role", None),
-                    token=cur_json.get("token", None),
-                    msg=cur_json.get("msg", None),
-                    created_at=cur_json.get(
-                        "created_at", None
-                    ),
-                    updated_at=cur_json.get(
-                        "updated_at", None
-                    ),
+                cur_o = core_user.CoreUser.from_dict(
+                    cur_json
                 )
                 return cur_o
             except Exception as e:
@@ -93,17 +90,7 @@ def create_user(
         log.debug(f"created user={username} e={email}")
         try:
             cur_json = json.loads(r.text)
-            cur_o = core_user.CoreUser(
-                id=cur_json.get("id", None),
-                email=cur_json.get("email", None),
-                state=cur_json.get("state", None),
-                verified=cur_json.get("verified", None),
-                role=cur_json.get("role", None),
-                token=cur_json.get("token", None),
-                msg=cur_json.get("msg", None),
-                created_at=cur_json.get("created_at", None),
-                updated_at=cur_json.get("updated_at", None),
-            )
+            cur_o = core_user.CoreUser.from_dict(cur_json)
             return cur_o
         except Exception as e:
             log.error(
@@ -4,8 +4,11 @@ get the user record from the db
 
 import logging
 import ujson as json
-import requests
 import client_aic.get_cfg as get_cfg
+import client_aic.config.get_routes as get_routes
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.deadline as deadline_mod
+import client_aic.get_transport as get_transport
 import client_aic.models.core_user as core_user
 import client_aic.tls.utils as tls_utils
 
@@ -17,6 +20,7 @@ def get_user(
     id: int,
     user: core_user.CoreUser,
     cfg: dict = None,
+    deadline: deadline_mod.Deadline = None,
 ):
     """
     get_user
@@ -28,6 +32,9 @@ def get_user(
     :param CoreUser user: authenticated user
         that is making this request
     :param cfg: optional - **CoreConfig** dictionary
+    :param deadline: optional - **Deadline** for
+        the whole call chain (each attempt only
+        waits for the remaining budget)
 
     :returns: **CoreUser** on success
         **None** on failure
@@ -35,18 +42,20 @@ def get_user(
     """
     if not cfg:
         cfg = get_cfg.get_cfg()
-    url = f'https://{cfg["endpoint"]}/user/{id}'
+    url = get_routes.get_url(cfg, "user_by_id") + str(id)
     (cert_file, key_file) = tls_utils.get_certs(cfg)
     verify = tls_utils.get_verify(cfg)
     debug = cfg.get("debug", False)
     log.debug(f"get user: {url}")
-    s = requests.Session()
-    s.headers.update({"Bearer": f"{user.token}"})
-    r = s.get(
+    tr = get_transport.get_transport(cfg)
+    r = tr.get(
         url,
+        user=user,
         verify=verify,
         cert=(cert_file, key_file),
-        timeout=5,
+        timeout=get_timeouts.get_timeout(cfg, "user_by_id"),
+        route="user_by_id",
+        deadline=deadline,
     )
     if r.status_code != 200:
         if debug:
@@ -66,17 +75,7 @@ def get_user(
         log.debug(f"got user.id={id}")
         try:
             cur_json = json.loads(r.text)
-            cur_o = core_user.CoreUser(
-                id=cur_json.get("id", None),
-                email=cur_json.get("email", None),
-                state=cur_json.get("state", None),
-                verified=cur_json.get("verified", None),
-                role=cur_json.get("role", None),
-                token=cur_json.get("token", None),
-                msg=cur_json.get("msg", None),
-                created_at=cur_json.get("created_at", None),
-                updated_at=cur_json.get("updated_at", None),
-            )
+            cur_o = core_user.CoreUser.from_dict(cur_json)
             return cur_o
         except Exception as e:
             log.error(
@@ -0,0 +1,544 @@
+"""
+buffered, concurrent uploader for remote
+llm workers that create many ai results
+
+producers hand **CoreResultAI** objects to
+**ResultUploader.put** which only waits when the
+bounded queue is full (backpressure). a background
+thread groups queued results into batches by size
+or time and creates them with concurrent
+requests. retries are left to the transport's
+**RetryPolicy** (the create sends an
+**Idempotency-Key** so it is retried like an
+idempotent request). results that still fail
+are spooled to a local json lines file and
+uploaded again the next time an uploader
+starts with the same **spool_dir**. a result
+the api rejects (a **4xx** other than
+**401**, **403**, **408** or **429**) is
+never retried and is written to
+**rejected.jsonl** instead
+
+each result gets one idempotency key that is
+stored with it in the spool so a retried or
+replayed create does not add a duplicate result
+"""
+import os
+import uuid
+import glob
+import time
+import queue
+import logging
+import threading
+import concurrent.futures
+import ujson as json
+import client_aic.get_cfg as get_cfg
+import client_aic.retry_policy as retry_policy
+import client_aic.models.core_user as core_user
+import client_aic.req.ai.create_ai_result as create_ai_result
+
+
+log = logging.getLogger(__name__)
+
+# queue markers for the flush thread
+FLUSH = object()
+STOP = object()
+
+# result dictionary key for the idempotency key
+# (stored in the spool and not sent as a field)
+IDEMPOTENCY_FIELD = "idempotency_key"
+
+# responses about the user and not the result
+AUTH_STATUSES = (401, 403)
+
+
+def is_rejected(status_code: int):
+    """
+    is_rejected
+
+    check if the api rejected the result itself
+    so sending it again can not succeed
+
+    :param status_code: create response status
+        or **None** if there was no response
+
+    :returns: **True** for a **4xx** that is not
+        an auth failure or a transient status
+    :rtype: bool
+    """
+    return (
+        status_code is not None
+        and 400 <= status_code < 500
+        and status_code not in AUTH_STATUSES
+        and status_code not in retry_policy.RETRY_STATUSES
+    )
+
+
+class ResultUploader:
+    """ResultUploader"""
+
+    def __init__(
+        self,
+        user: core_user.CoreUser,
+        cfg: dict = None,
+        max_queue: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+        concurrency: int = 4,
+        retries: int = 0,
+        backoff: float = 0.5,
+        spool_dir: str = None,
+        put_timeout: float = None,
+    ):
+        """
+        __init__
+
+        upload ai results in the background
+        without blocking the producer on the
+        https latency of each create request
+
+        ```python
+        uploader = ResultUploader(
+            user=user,
+            spool_dir="/data/ai-spool",
+        )
+        for ai_result in generate_results():
+            uploader.put(ai_result)
+        uploader.close()
+        ```
+
+        :param user: authenticated **CoreUser**
+        :param cfg: optional **CoreConfig** dictionary
+        :param max_queue: max results waiting to
+            be uploaded before **put** blocks
+        :param batch_size: send a batch once this
+            many results are queued
+        :param flush_interval: send a partial
+            batch after this many seconds
+        :param concurrency: max create requests
+            in flight at the same time
+        :param retries: optional - extra uploader
+            retries per result after a failed create.
+            the transport's **RetryPolicy** already
+            retries each create (see **AI_RETRY_***)
+            and these retries stack on top of it
+            (**(retries + 1) * attempts** requests)
+            so only set this when the policy
+            is disabled
+        :param backoff: seconds to wait before the
+            first uploader retry (doubles for
+            each retry)
+        :param spool_dir: optional - directory for
+            results that failed every retry (or did
+            not fit in a full queue) so they are
+            uploaded again on the next start
+            (without it they are dropped and logged)
+        :param put_timeout: optional - max seconds
+            **put** waits on a full queue before
+            spooling the result (defaults to waiting
+            until there is room)
+        """
+        if not cfg:
+            cfg = get_cfg.get_cfg()
+        self.user = user
+        self.cfg = cfg
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.spool_dir = spool_dir
+        self.put_timeout = put_timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+        # bounds the uploads in flight so a slow
+        # api backs up into the queue
+        self.slots = threading.Semaphore(concurrency * 2)
+        self.executor = (
+            concurrent.futures.ThreadPoolExecutor(
+                max_workers=concurrency,
+                thread_name_prefix="ai-result-upload",
+            )
+        )
+        self.lock = threading.Lock()
+        self.spool_fp = None
+        self.spool_path = None
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+            self.spool_path = os.path.join(
+                spool_dir, "spool.jsonl"
+            )
+        self.num_sent = 0
+        self.num_retries = 0
+        self.num_spooled = 0
+        self.num_dropped = 0
+        self.num_rejected = 0
+        self.rejected_path = None
+        if spool_dir:
+            self.rejected_path = os.path.join(
+                spool_dir, "rejected.jsonl"
+            )
+        self.closed = False
+        self.thread = threading.Thread(
+            target=self.run,
+            name="ai-result-uploader",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def put(
+        self,
+        ai_result,
+    ):
+        """
+        put
+
+        queue an ai result for uploading. this
+        only blocks while the queue is full
+
+        :param ai_result: **CoreResultAI** (or a
+            dictionary from **CoreResultAI.get_dict**)
+
+        :returns: **True** if the result was
+            queued or spooled and **False** if
+            it was dropped
+        :rtype: bool
+        """
+        if self.closed:
+            log.error("uploader is closed")
+            return False
+        if isinstance(ai_result, dict):
+            data = dict(ai_result)
+        else:
+            data = ai_result.get_dict()
+        try:
+            self.queue.put(data, timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            log.debug(
+                f"upload queue is full after "
+                f"{self.put_timeout}s - spooling"
+            )
+            return self.spool(data)
+
+    def run(self):
+        """
+        run
+
+        background thread that uploads spooled
+        results and then sends queued batches
+        """
+        self.replay_spool()
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                timeout = None
+                if deadline is not None:
+                    timeout = max(
+                        0.0, deadline - time.monotonic()
+                    )
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is FLUSH:
+                    self.queue.task_done()
+                    break
+                if item is STOP:
+                    self.queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = (
+                        time.monotonic()
+                        + self.flush_interval
+                    )
+            if batch:
+                self.send_batch(batch)
+
+    def send_batch(
+        self,
+        batch: list,
+        from_queue: bool = True,
+    ):
+        """
+        send_batch
+
+        create each result in the batch with
+        concurrent requests
+
+        :param batch: list of result dictionaries
+        :param from_queue: flag to mark the
+            queued items done after each upload
+
+        :returns: list of futures for the uploads
+        :rtype: list
+        """
+        log.debug(f"uploading batch={len(batch)}")
+        futures = []
+        for data in batch:
+            self.slots.acquire()
+            fut = self.executor.submit(self.upload, data)
+            fut.add_done_callback(
+                lambda _, done=from_queue: self.finish(done)
+            )
+            futures.append(fut)
+        return futures
+
+    def finish(
+        self,
+        from_queue: bool,
+    ):
+        self.slots.release()
+        if from_queue:
+            self.queue.task_done()
+
+    def upload(
+        self,
+        data: dict,
+    ):
+        """
+        upload
+
+        create one ai result (with the optional
+        uploader **retries**) and spool it if it
+        still failed. a result the api rejected is
+        written to **rejected.jsonl** instead
+
+        every attempt (and a later replay of the
+        spooled result) sends the same idempotency
+        key so the api can drop a duplicate create
+
+        :param data: result dictionary
+
+        :returns: **True** on success
+        :rtype: bool
+        """
+        status_code = None
+        if not data.get(IDEMPOTENCY_FIELD, None):
+            data[IDEMPOTENCY_FIELD] = uuid.uuid4().hex
+        use_data = dict(data)
+        idempotency_key = use_data.pop(IDEMPOTENCY_FIELD)
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self.lock:
+                    self.num_retries += 1
+                time.sleep(
+                    self.backoff * (2 ** (attempt - 1))
+                )
+            try:
+                (
+                    res,
+                    status_code,
+                ) = create_ai_result.post_ai_result(
+                    user=self.user,
+                    data=dict(use_data),
+                    cfg=self.cfg,
+                    idempotency_key=idempotency_key,
+                )
+            except Exception as e:
+                log.error(
+                    f'failed to create ai result with ex="{e}"'
+                )
+                (res, status_code) = (None, None)
+            if res:
+                with self.lock:
+                    self.num_sent += 1
+                return True
+            if is_rejected(status_code):
+                self.reject(data, status_code)
+                return False
+        self.spool(data)
+        return False
+
+    def reject(
+        self,
+        data: dict,
+        status_code: int,
+    ):
+        """
+        reject
+
+        write a result the api rejected to
+        **rejected.jsonl** in the **spool_dir**
+        (it is never uploaded again)
+
+        :param data: result dictionary
+        :param status_code: create response status
+        """
+        log.error(
+            f"api rejected ai result with "
+            f"status={status_code} - not retrying"
+        )
+        with self.lock:
+            self.num_rejected += 1
+        if self.rejected_path:
+            self.append_line(
+                self.rejected_path,
+                dict(data, rejected_status=status_code),
+            )
+
+    def spool(
+        self,
+        data: dict,
+    ):
+        """
+        spool
+
+        append a result to the local spool file
+        so it is uploaded on the next start
+
+        :param data: result dictionary
+
+        :returns: **True** if the result was
+            spooled and **False** if it was dropped
+        :rtype: bool
+        """
+        if not self.spool_path:
+            log.error(
+                "dropping ai result after failed "
+                "uploads - please set a spool_dir"
+            )
+            with self.lock:
+                self.num_dropped += 1
+            return False
+        with self.lock:
+            if self.spool_fp is None:
+                self.spool_fp = open(self.spool_path, "a")
+            self.spool_fp.write(json.dumps(data) + "\n")
+            self.spool_fp.flush()
+            os.fsync(self.spool_fp.fileno())
+            self.num_spooled += 1
+        return True
+
+    def append_line(
+        self,
+        path: str,
+        data: dict,
+    ):
+        """
+        append_line
+
+        append one json line to a file and
+        sync it to disk
+
+        :param path: file path
+        :param data: dictionary to write
+        """
+        with self.lock:
+            with open(path, "a") as fp:
+                fp.write(json.dumps(data) + "\n")
+                fp.flush()
+                os.fsync(fp.fileno())
+
+    def replay_spool(self):
+        """
+        replay_spool
+
+        upload the results spooled by an earlier
+        uploader. results that fail again are
+        spooled again (or written to
+        **rejected.jsonl** if the api rejects
+        them) and a spool file is only
+        removed after every result in it was
+        uploaded or spooled again (so a crash
+        can send a result twice with the same
+        idempotency key but never loses one)
+        """
+        if not self.spool_dir:
+            return
+        with self.lock:
+            if os.path.exists(self.spool_path):
+                replay_path = os.path.join(
+                    self.spool_dir,
+                    f"spool-{time.time_ns()}.replay",
+                )
+                os.replace(self.spool_path, replay_path)
+        replay_paths = sorted(
+            glob.glob(
+                os.path.join(self.spool_dir, "*.replay")
+            )
+        )
+        for replay_path in replay_paths:
+            batch = []
+            with open(replay_path, "r") as fp:
+                for line in fp:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        batch.append(json.loads(line))
+                    except Exception:
+                        log.error(
+                            "skipping invalid spooled "
+                            f"result in {replay_path}"
+                        )
+            log.info(
+                f"uploading spooled results={len(batch)} "
+                f"from {replay_path}"
+            )
+            futures = self.send_batch(
+                batch, from_queue=False
+            )
+            concurrent.futures.wait(futures)
+            os.remove(replay_path)
+
+    def flush(self):
+        """
+        flush
+
+        send any partial batch and wait until
+        every queued result is uploaded
+        (or spooled)
+        """
+        self.queue.put(FLUSH)
+        self.queue.join()
+
+    def get_stats(self):
+        """
+        get_stats
+
+        :returns: dictionary with the **sent**,
+            **retries**, **spooled**, **dropped**,
+            **rejected** and **queued** counts
+        :rtype: dict
+        """
+        with self.lock:
+            return {
+                "sent": self.num_sent,
+                "retries": self.num_retries,
+                "spooled": self.num_spooled,
+                "dropped": self.num_dropped,
+                "rejected": self.num_rejected,
+                "queued": self.queue.qsize(),
+            }
+
+    def close(self):
+        """
+        close
+
+        upload everything that is queued and
+        stop the background thread
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(STOP)
+        self.queue.join()
+        self.thread.join()
+        self.executor.shutdown(wait=True)
+        with self.lock:
+            if self.spool_fp is not None:
+                self.spool_fp.close()
+                self.spool_fp = None
+        log.info(
+            f"closed uploader stats={self.get_stats()}"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
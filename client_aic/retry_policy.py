@@ -0,0 +1,243 @@
+"""
+retry policy for rest api requests
+
+- configurable number of attempts
+- exponential backoff with jitter
+- honors the **Retry-After** header
+- retries connection errors, timeouts and
+  transient status codes
+- only retries idempotent requests (or
+  requests with an **Idempotency-Key** header)
+
+"""
+import sys
+import random
+import logging
+
+
+log = logging.getLogger(__name__)
+
+# header for deduplicating retried
+# non-idempotent requests (like POST /job)
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# transient responses that are safe to retry
+RETRY_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+# methods that do not change state
+# on a repeated request
+IDEMPOTENT_METHODS = (
+    "GET",
+    "HEAD",
+    "OPTIONS",
+    "PUT",
+    "DELETE",
+)
+
+
+def get_retry_errors():
+    """
+    get_retry_errors
+
+    get the exception types for a request
+    that failed before a response was read
+    (the http libraries are only checked if
+    they were already imported)
+
+    :returns: tuple of exception types
+    :rtype: tuple
+    """
+    errors = [ConnectionError, TimeoutError]
+    requests_exceptions = sys.modules.get(
+        "requests.exceptions", None
+    )
+    if requests_exceptions:
+        errors.append(requests_exceptions.ConnectionError)
+        errors.append(requests_exceptions.Timeout)
+        errors.append(
+            requests_exceptions.ChunkedEncodingError
+        )
+    httpx = sys.modules.get("httpx", None)
+    if httpx:
+        errors.append(httpx.TransportError)
+    return tuple(errors)
+
+
+class RetryPolicy:
+    """RetryPolicy"""
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.25,
+        multiplier: float = 2.0,
+        max_backoff: float = 5.0,
+        jitter: float = 0.2,
+        statuses: tuple = RETRY_STATUSES,
+        methods: tuple = IDEMPOTENT_METHODS,
+    ):
+        """
+        __init__
+
+        shared settings for retrying failed
+        requests. a request is retried when it
+        hit a connection error or a timeout, or
+        the response status is in **statuses**, and
+        either the **method** is in **methods** or
+        the request has an **Idempotency-Key**
+        header so the rest api can deduplicate it
+
+        the delay before retry number **n** is
+        **backoff * multiplier ** (n - 1)** capped
+        at **max_backoff** and then randomized by
+        +/- **jitter**. a **Retry-After** header
+        (in seconds) replaces the delay
+
+        :param attempts: max attempts per request
+            including the first one (**1**
+            disables retries)
+        :param backoff: seconds to wait before
+            the first retry
+        :param multiplier: backoff growth per retry
+        :param max_backoff: max seconds
+            between attempts
+        :param jitter: fraction of the delay
+            to randomize (**0.2** = +/- 20%)
+        :param statuses: response status codes
+            to retry
+        :param methods: http methods that
+            are safe to retry
+        """
+        self.attempts = max(1, int(attempts))
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = tuple(statuses)
+        self.methods = tuple(m.upper() for m in methods)
+
+    @classmethod
+    def disabled(cls):
+        """
+        disabled
+
+        build a policy that sends every
+        request only once
+
+        :returns: **RetryPolicy**
+        :rtype: RetryPolicy
+        """
+        return cls(attempts=1)
+
+    def get_key(self):
+        """
+        get_key
+
+        :returns: tuple of the settings for
+            sharing transports with the same policy
+        :rtype: tuple
+        """
+        return (
+            self.attempts,
+            self.backoff,
+            self.multiplier,
+            self.max_backoff,
+            self.jitter,
+            self.statuses,
+            self.methods,
+        )
+
+    def is_idempotent(
+        self,
+        method: str,
+        headers: dict = None,
+    ):
+        """
+        is_idempotent
+
+        :param method: http method
+        :param headers: optional - request headers
+
+        :returns: **True** if the request is safe
+            to send again
+        :rtype: bool
+        """
+        if method.upper() in self.methods:
+            return True
+        return bool(
+            headers
+            and headers.get(IDEMPOTENCY_HEADER, None)
+        )
+
+    def should_retry(
+        self,
+        attempt: int,
+        idempotent: bool,
+        response=None,
+        error: Exception = None,
+    ):
+        """
+        should_retry
+
+        check if a failed attempt can be retried
+
+        :param attempt: number of attempts
+            already sent (starting at **1**)
+        :param idempotent: flag from **is_idempotent**
+        :param response: optional - response
+            for the attempt
+        :param error: optional - exception raised
+            by the attempt
+
+        :returns: **True** to retry the request
+        :rtype: bool
+        """
+        if attempt >= self.attempts or not idempotent:
+            return False
+        if error is not None:
+            return isinstance(error, get_retry_errors())
+        if response is not None:
+            return response.status_code in self.statuses
+        return False
+
+    def get_delay(
+        self,
+        attempt: int,
+        response=None,
+    ):
+        """
+        get_delay
+
+        get the delay before the next attempt
+
+        :param attempt: number of attempts
+            already sent (starting at **1**)
+        :param response: optional - response with
+            a **Retry-After** header
+
+        :returns: seconds to wait
+        :rtype: float
+        """
+        if response is not None:
+            retry_after = response.headers.get(
+                "Retry-After", None
+            )
+            if retry_after:
+                try:
+                    return min(
+                        max(0.0, float(retry_after)),
+                        self.max_backoff,
+                    )
+                except ValueError:
+                    # http-date values use the backoff
+                    pass
+        delay = min(
+            self.backoff
+            * (self.multiplier ** (attempt - 1)),
+            self.max_backoff,
+        )
+        if self.jitter:
+            delay *= random.uniform(
+                1.0 - self.jitter, 1.0 + self.jitter
+            )
+        return min(delay, self.max_backoff)
@@ -0,0 +1,543 @@
+"""
+durable, resumable bulk review runner for
+submitting subject matter expert reviews
+(rlhf) from a json lines or csv file
+
+each review has a **job_id** (or an
+**ai_result_id**), a **reviewed_answer**, a
+**reviewed_score** between **0.00** and
+**100.00** and optional **reviewed_notes**:
+
+```json
+{"job_id": 201, "reviewed_answer": "use bounds checks", "reviewed_score": 95.0}
+{"ai_result_id": 340, "reviewed_answer": "free once", "reviewed_score": 80}
+```
+
+```text
+job_id,reviewed_answer,reviewed_score,reviewed_notes
+201,use bounds checks,95.0,checked the length
+```
+
+every review's state is appended to a journal
+(defaults to **INPUT_FILE.journal**) so a restarted
+run skips the reviews it already applied
+"""
+import csv
+import math
+import time
+import hashlib
+import logging
+import concurrent.futures
+import ujson as json
+import client_aic.get_cfg as get_cfg
+import client_aic.ask as ask
+import client_aic.authenticate as auth
+import client_aic.journal as journal
+import client_aic.models.core_result_ai as core_result_ai
+import client_aic.req.ai.get_ai_result as get_ai_result
+import client_aic.req.ai.update_ai_result as update_ai_result
+
+
+log = logging.getLogger(__name__)
+
+
+def parse_review(
+    values: dict,
+):
+    """
+    parse_review
+
+    validate one review and convert
+    its values
+
+    :param values: dictionary from a json
+        line or a csv row
+
+    :returns: tuple of (review dictionary,
+        **None**) on success or (**None**,
+        error string) when the review is invalid
+    :rtype: tuple
+    """
+    review = {}
+    for key in ["job_id", "ai_result_id"]:
+        cur_val = values.get(key, None)
+        if cur_val in [None, ""]:
+            continue
+        try:
+            review[key] = int(cur_val)
+        except Exception:
+            return (None, f"invalid {key}={cur_val}")
+        if review[key] < 1:
+            return (None, f"invalid {key}={cur_val}")
+    if not review:
+        return (None, "missing job_id or ai_result_id")
+    answer = values.get("reviewed_answer", None)
+    if not answer:
+        return (None, "missing reviewed_answer")
+    review["reviewed_answer"] = answer
+    score = values.get("reviewed_score", None)
+    try:
+        # limiting resolution per answer
+        score = float(f"{float(score):.8f}")
+    except Exception:
+        return (None, f"invalid reviewed_score={score}")
+    # nan passes every comparison below
+    if (
+        not math.isfinite(score)
+        or score < 0.00
+        or score > 100.00
+    ):
+        return (
+            None,
+            f"reviewed_score={score} is not "
+            "between 0.00 and 100.00",
+        )
+    review["reviewed_score"] = score
+    notes = values.get("reviewed_notes", None)
+    if notes not in [None, ""]:
+        review["reviewed_notes"] = notes
+    return (review, None)
+
+
+def read_rows(
+    input_path: str,
+):
+    """
+    read_rows
+
+    read a json lines or csv file (by the
+    **.csv** extension)
+
+    :param input_path: path to the input file
+
+    :returns: generator of (**line_no**, raw
+        line or row string, values dictionary
+        or **None** for invalid json)
+    :rtype: generator
+    """
+    with open(input_path, "r", newline="") as fp:
+        if input_path.endswith(".csv"):
+            reader = csv.DictReader(fp)
+            for row in reader:
+                raw = json.dumps(row, sort_keys=True)
+                yield (reader.line_num, raw, row)
+            return
+        for line_no, line in enumerate(fp, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                values = json.loads(line)
+            except Exception:
+                values = None
+            yield (line_no, line, values)
+
+
+def read_reviews(
+    input_path: str,
+    entries: dict,
+    retry_failed: bool = False,
+    summary: dict = None,
+    digests: dict = None,
+):
+    """
+    read_reviews
+
+    read the input file and build the
+    (**key**, **review**, **error**) items
+    skipping reviews the journal already applied
+
+    :param input_path: path to the json lines
+        or csv file
+    :param entries: latest journal entry per line
+        from **Journal.load**
+    :param retry_failed: flag to retry reviews
+        that failed in an earlier run
+    :param summary: optional - counters dictionary
+        to update with skipped reviews
+    :param digests: optional - dictionary to fill
+        with each line's sha1 digest for
+        detecting input files that changed
+        between runs
+
+    :returns: generator of (**key**, **review**
+        dictionary or **None**, error string
+        or **None**) tuples
+    :rtype: generator
+    """
+    if summary is None:
+        summary = {}
+    if digests is None:
+        digests = {}
+    for line_no, raw, values in read_rows(input_path):
+        digest = hashlib.sha1(
+            raw.encode("utf-8")
+        ).hexdigest()
+        digests[line_no] = digest
+        entry = entries.get(line_no, None)
+        if entry and entry.get("sha1") != digest:
+            log.error(
+                f"line={line_no} changed since it "
+                "was journaled - please only append "
+                f"to the input file={input_path}"
+            )
+        state = None
+        if entry:
+            state = entry.get("state", None)
+        if state == "done" or (
+            state == "failed" and not retry_failed
+        ):
+            summary["skipped"] = (
+                summary.get("skipped", 0) + 1
+            )
+            continue
+        if values is None:
+            yield (line_no, None, "invalid json")
+            continue
+        (review, error) = parse_review(values)
+        yield (line_no, review, error)
+
+
+def write_failures(
+    input_path: str,
+    journal_path: str,
+    failures_path: str,
+):
+    """
+    write_failures
+
+    rebuild the failures file from every line
+    whose latest journal entry is **failed** so
+    reviews that failed in an earlier run (and
+    were not retried) stay in the file
+
+    :param input_path: path to the json lines
+        or csv file
+    :param journal_path: path to the journal file
+    :param failures_path: path to the failures
+        json lines file
+
+    :returns: number of failed reviews written
+    :rtype: int
+    """
+    entries = journal.Journal(journal_path).load()
+    num_failed = 0
+    with open(failures_path, "w") as fp:
+        for line_no, _, values in read_rows(input_path):
+            entry = entries.get(line_no, None)
+            if not entry or entry.get("state") != "failed":
+                continue
+            failure = {
+                "line": line_no,
+                "error": entry.get("error", None),
+            }
+            if values is not None:
+                (review, _) = parse_review(values)
+                if review:
+                    failure.update(review)
+            fp.write(json.dumps(failure) + "\n")
+            num_failed += 1
+    return num_failed
+
+
+def find_ai_result(
+    user,
+    review: dict,
+    cfg: dict,
+):
+    """
+    find_ai_result
+
+    get the **CoreResultAI** to review by the
+    **job_id**. a review with an **ai_result_id**
+    does not need a lookup because the PATCH
+    only sends the **id** and the review fields,
+    so it gets a **CoreResultAI** with just
+    the **id** and **user_id**
+
+    :param user: authenticated **CoreUser**
+    :param review: review dictionary
+    :param cfg: **CoreConfig** dictionary
+
+    :returns: **CoreResultAI** or **None**
+    :rtype: CoreResultAI
+    """
+    job_id = review.get("job_id", None)
+    if job_id:
+        return get_ai_result.get_ai_result(
+            id=job_id,
+            user=user,
+            cfg=cfg,
+        )
+    return core_result_ai.CoreResultAI.from_dict(
+        {
+            "id": review["ai_result_id"],
+            "user_id": user.id,
+        }
+    )
+
+
+def apply_review(
+    user,
+    review: dict,
+    cfg: dict,
+    retries: int = 2,
+    backoff: float = 0.5,
+):
+    """
+    apply_review
+
+    get the ai result and update it with
+    the review, retrying a failed update with
+    exponential backoff. a missing ai result
+    fails on the first attempt (the transport
+    already retried the request)
+
+    :param user: authenticated **CoreUser**
+    :param review: review dictionary
+    :param cfg: **CoreConfig** dictionary
+    :param retries: number of update retries
+        after the first attempt
+    :param backoff: seconds to wait before the
+        first retry (doubles for each retry)
+
+    :returns: tuple of (updated **CoreResultAI**
+        or **None**, error string or **None**,
+        number of attempts)
+    :rtype: tuple
+    """
+    error = None
+    attempt = 0
+    for attempt in range(1, retries + 2):
+        if attempt > 1:
+            time.sleep(backoff * (2 ** (attempt - 2)))
+        ai_result = find_ai_result(
+            user=user,
+            review=review,
+            cfg=cfg,
+        )
+        if not ai_result:
+            return (None, "ai result not found", attempt)
+        ai_result.reviewed_answer = review[
+            "reviewed_answer"
+        ]
+        ai_result.reviewed_score = review["reviewed_score"]
+        if "reviewed_notes" in review:
+            ai_result.reviewed_notes = review[
+                "reviewed_notes"
+            ]
+        updated = update_ai_result.update_ai_result(
+            user=user,
+            ai_result=ai_result,
+            cfg=cfg,
+            # an ai result with only the id must
+            # not replace the whole record
+            allow_put=bool(review.get("job_id", None)),
+        )
+        if updated:
+            return (updated, None, attempt)
+        error = "update failed"
+    return (None, error, attempt)
+
+
+def run_reviews(
+    input_path: str,
+    journal_path: str = None,
+    failures_path: str = None,
+    email: str = None,
+    password: str = None,
+    username: str = None,
+    cfg_core: dict = None,
+    concurrency: int = 10,
+    retries: int = 2,
+    backoff: float = 0.5,
+    retry_failed: bool = False,
+):
+    """
+    run_reviews
+
+    apply every review in the **input_path**
+    json lines or csv file with at most
+    **concurrency** reviews in flight and
+    journal each line's state:
+
+    - **done** - the ai result was updated
+      (with the **ai_result_id**)
+    - **failed** - the review was invalid or
+      still failed after the **retries**
+      (with the **error**)
+
+    re-running the same file resumes from the
+    journal and skips applied reviews. every
+    review that is still failed in the journal
+    (from this or an earlier run) is written with
+    its **error** to **failures_path** (defaults
+    to **INPUT_FILE.failures.jsonl**) which can be
+    fixed and used as a new input file
+
+    :param input_path: path to the json lines
+        or csv file
+    :param journal_path: optional - path to the
+        journal file (defaults to
+        **INPUT_FILE.journal**)
+    :param failures_path: optional - path to the
+        failures json lines file
+    :param email: optional - user email for the rest api
+    :param password: optional - user password for the rest api
+    :param username: optional - username for the rest api
+    :param cfg_core: optional - **CoreConfig** dictionary
+    :param concurrency: max number of reviews
+        in flight at the same time
+    :param retries: retries per review after
+        a failed update
+    :param backoff: seconds before the first
+        retry (doubles for each retry)
+    :param retry_failed: flag to retry reviews
+        that failed in an earlier run
+
+    :returns: summary dictionary with the
+        **done**, **failed**, **skipped** counts,
+        the **failures** list for this run, the
+        **failures_path** and the **total_failed**
+        count in it or **None** if the login failed
+    :rtype: dict
+    """
+    cfg = cfg_core
+    if not cfg_core:
+        cfg = get_cfg.get_cfg()
+    if not journal_path:
+        journal_path = f"{input_path}.journal"
+    if not failures_path:
+        failures_path = f"{input_path}.failures.jsonl"
+    (username, password, email) = ask.get_user_creds(
+        cfg=cfg,
+        username=username,
+        password=password,
+        email=email,
+    )
+    user = auth.authenticate(
+        username=username,
+        email=email,
+        password=password,
+        cfg=cfg,
+    )
+    if not user:
+        log.error(f"failed to login as user: {username}")
+        return None
+    jrnl = journal.Journal(journal_path)
+    entries = jrnl.load()
+    summary = {
+        "done": 0,
+        "failed": 0,
+        "skipped": 0,
+        "failures": [],
+        "failures_path": failures_path,
+    }
+    digests = {}
+
+    def on_failed(key, review, error, attempts=0):
+        summary["failed"] += 1
+        failure = {"line": key, "error": error}
+        if review:
+            failure.update(review)
+        summary["failures"].append(failure)
+        jrnl.write(
+            key,
+            "failed",
+            error=error,
+            attempts=attempts,
+            sha1=digests.get(key, None),
+        )
+
+    log.info(
+        f"starting reviews={input_path} "
+        f"journal={journal_path} "
+        f"concurrency={concurrency}"
+    )
+    reviews = read_reviews(
+        input_path=input_path,
+        entries=entries,
+        retry_failed=retry_failed,
+        summary=summary,
+        digests=digests,
+    )
+    start_time = time.monotonic()
+    pending = {}
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=concurrency,
+        thread_name_prefix="ai-review",
+    )
+
+    def finish(fut):
+        (key, review) = pending.pop(fut)
+        try:
+            (updated, error, attempts) = fut.result()
+        except Exception as e:
+            (updated, error, attempts) = (None, str(e), 0)
+        if updated:
+            summary["done"] += 1
+            jrnl.write(
+                key,
+                "done",
+                ai_result_id=updated.id,
+                job_id=updated.job_id,
+                attempts=attempts,
+                sha1=digests.get(key, None),
+            )
+        else:
+            log.error(
+                f"failed review line={key} "
+                f"after attempts={attempts} "
+                f"with error={error}"
+            )
+            on_failed(key, review, error, attempts)
+
+    try:
+        for key, review, error in reviews:
+            if error:
+                log.error(
+                    f"invalid review line={key} error={error}"
+                )
+                on_failed(key, review, error)
+                continue
+            # bound the queued reviews so large
+            # files are not read into memory
+            while len(pending) >= concurrency * 2:
+                (done, _) = concurrent.futures.wait(
+                    list(pending),
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for fut in done:
+                    finish(fut)
+            fut = executor.submit(
+                apply_review,
+                user=user,
+                review=review,
+                cfg=cfg,
+                retries=retries,
+                backoff=backoff,
+            )
+            pending[fut] = (key, review)
+        for fut in concurrent.futures.as_completed(
+            list(pending)
+        ):
+            finish(fut)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        jrnl.close()
+    summary["total_failed"] = write_failures(
+        input_path=input_path,
+        journal_path=journal_path,
+        failures_path=failures_path,
+    )
+    seconds = time.monotonic() - start_time
+    log.info(
+        f"finished reviews={input_path} "
+        f"done={summary['done']} "
+        f"failed={summary['failed']} "
+        f"skipped={summary['skipped']} "
+        f"total_failed={summary['total_failed']} "
+        f"seconds={seconds:.1f} "
+        f"failures={failures_path}"
+    )
+    return summary
@@ -0,0 +1,159 @@
+"""
+single-flight request coalescing so concurrent
+identical calls share one in-flight call and
+all get the same result
+"""
+import logging
+import threading
+import concurrent.futures
+import client_aic.get_asyncio as get_asyncio
+
+
+log = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """SingleFlight"""
+
+    def __init__(self):
+        """
+        __init__
+
+        thread-safe single-flight group where
+        the first caller for a **key** runs the
+        function and concurrent callers with the same
+        **key** wait for the first caller's result
+
+        ```python
+        import client_aic.single_flight as single_flight
+
+        flights = single_flight.SingleFlight()
+        (res_ai, shared) = flights.do(
+            key, get_ai_result.get_ai_result, id=job_id
+        )
+        ```
+        """
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(
+        self,
+        key,
+        fn,
+        *args,
+        **kwargs,
+    ):
+        """
+        do
+
+        run **fn** once for all concurrent
+        callers with the same **key**
+
+        :param key: hashable key for the call
+        :param fn: function to run
+        :param args: positional arguments for **fn**
+        :param kwargs: keyword arguments for **fn**
+
+        :returns: (result, shared) where **shared**
+            is **True** if the result came
+            from another caller's call. an exception
+            raised by **fn** is raised for every caller
+        :rtype: tuple
+        """
+        with self.lock:
+            fut = self.calls.get(key, None)
+            leader = fut is None
+            if leader:
+                fut = concurrent.futures.Future()
+                self.calls[key] = fut
+        if not leader:
+            return (fut.result(), True)
+        try:
+            res = fn(*args, **kwargs)
+        except BaseException as e:
+            with self.lock:
+                del self.calls[key]
+            fut.set_exception(e)
+            raise
+        with self.lock:
+            del self.calls[key]
+        fut.set_result(res)
+        return (res, False)
+
+    def num_in_flight(self):
+        """
+        num_in_flight
+
+        get the number of keys with a call in flight
+
+        :returns: number of in-flight calls
+        :rtype: int
+        """
+        with self.lock:
+            return len(self.calls)
+
+
+class AsyncSingleFlight:
+    """AsyncSingleFlight"""
+
+    def __init__(self):
+        """
+        __init__
+
+        single-flight group for coroutines on one
+        event loop where concurrent callers with the
+        same **key** await the same task
+        """
+        self.calls = {}
+
+    async def do(
+        self,
+        key,
+        fn,
+        *args,
+        **kwargs,
+    ):
+        """
+        do
+
+        run the coroutine function **fn** once
+        for all concurrent callers with the
+        same **key**. a cancelled caller does not
+        cancel the shared task for the other callers
+
+        :param key: hashable key for the call
+        :param fn: coroutine function to run
+        :param args: positional arguments for **fn**
+        :param kwargs: keyword arguments for **fn**
+
+        :returns: (result, shared) where **shared**
+            is **True** if the result came
+            from another caller's call
+        :rtype: tuple
+        """
+        asyncio = get_asyncio.get_asyncio()
+        task = self.calls.get(key, None)
+        shared = task is not None
+        if not shared:
+            task = asyncio.ensure_future(
+                fn(*args, **kwargs)
+            )
+            self.calls[key] = task
+
+            def on_done(done_task):
+                if self.calls.get(key, None) is done_task:
+                    del self.calls[key]
+
+            task.add_done_callback(on_done)
+        return (await asyncio.shield(task), shared)
+
+    def num_in_flight(self):
+        """
+        num_in_flight
+
+        get the number of keys with a call in flight
+
+        :returns: number of in-flight calls
+        :rtype: int
+        """
+        return len(self.calls)
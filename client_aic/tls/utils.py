@@ -29,13 +29,18 @@ def get_certs(cfg: dict):
     """
     get_certs
 
-    :param cfg: existing config dict
+    :param cfg: existing config dict (uses the
+        pre-resolved **certs** from **get_cfg**
+        when set)
 
     :returns: tuple where (
         **cert_file**, **key_file**
         ) for the client key/certificate files
     :rtype: tuple
     """
+    certs = cfg.get("certs", None)
+    if certs:
+        return certs
     cert_file = cfg["tls"]["cert"]
     key_file = cfg["tls"]["key"]
     return (cert_file, key_file)
@@ -45,12 +50,16 @@ def get_verify(cfg: dict):
     """
     get_verify
 
-    :param cfg: existing config dict
+    :param cfg: existing config dict (uses the
+        pre-resolved **verify** from **get_cfg**
+        when set)
 
     :returns: path to certificate authority
         file
     :rtype: tuple
     """
+    if "verify" in cfg:
+        return cfg["verify"]
     verify = cfg["tls"].get("ca", None)
     if not verify:
         log.debug(
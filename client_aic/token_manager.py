@@ -0,0 +1,442 @@
+"""
+keep each user's **CoreUser** token in memory,
+log in again before the token expires and
+refresh it after a **401** response
+"""
+import time
+import base64
+import logging
+import threading
+import functools
+import ujson as json
+import client_aic.config.get_token as get_token
+import client_aic.authenticate as auth
+
+
+log = logging.getLogger(__name__)
+
+manager_lock = threading.Lock()
+managers = {}
+
+
+def get_token_expiry(
+    token: str,
+    ttl: float,
+):
+    """
+    get_token_expiry
+
+    get when a token expires using the jwt
+    **exp** claim or the **ttl** if the token
+    is not a jwt
+
+    :param token: auth token
+    :param ttl: seconds the token is valid
+        without an **exp** claim
+
+    :returns: epoch time the token expires
+    :rtype: float
+    """
+    now = time.time()
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(
+            base64.urlsafe_b64decode(
+                payload.encode("ascii")
+            )
+        )
+        exp = claims.get("exp", None)
+        if exp:
+            return float(exp)
+    except Exception:
+        log.debug("token has no exp claim")
+    return now + ttl
+
+
+class CachedToken:
+    """CachedToken"""
+
+    def __init__(
+        self,
+        key: tuple,
+        username: str = None,
+        email: str = None,
+        password: str = None,
+        auto_create: bool = True,
+        cfg: dict = None,
+    ):
+        """
+        __init__
+
+        one user's credentials and the
+        in-memory **CoreUser**
+
+        :param key: (endpoint, email) key
+        :param username: optional username
+        :param email: optional email
+        :param password: optional password
+        :param auto_create: optional flag for
+            creating a user on the first login
+        :param cfg: **CoreConfig** dictionary
+        """
+        self.key = key
+        self.username = username
+        self.email = email
+        self.password = password
+        self.auto_create = auto_create
+        self.cfg = cfg
+        self.user = None
+        self.expires_at = 0.0
+        self.refresh_at = 0.0
+        self.lock = threading.Lock()
+
+
+class TokenManager:
+    """TokenManager"""
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        refresh_margin: float = 60.0,
+    ):
+        """
+        __init__
+
+        thread-safe in-memory token cache keyed
+        by (endpoint, email)
+
+        the first **get_user** call logs in and
+        validates the token once. later calls return
+        the same **CoreUser** without any network
+        round trips until the token is within
+        **refresh_margin** seconds of expiring. a
+        refresh updates the **CoreUser.token** in
+        place so objects holding the user pick up the
+        new token, and the **CoreTransport** retries a
+        request once after refreshing on a **401**
+
+        :param ttl: seconds a token is valid when
+            the token has no jwt **exp** claim
+        :param refresh_margin: seconds before the
+            token expires to log in again
+        """
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get_user(
+        self,
+        username: str = None,
+        email: str = None,
+        password: str = None,
+        auto_create: bool = True,
+        cfg: dict = None,
+        deadline=None,
+    ):
+        """
+        get_user
+
+        get the in-memory **CoreUser** and log in
+        only if there is no token or it is
+        about to expire
+
+        :param username: optional username
+        :param email: optional email
+        :param password: optional password
+        :param auto_create: optional flag for
+            creating a user if they do not exist
+            already and the default is **True**
+        :param cfg: **CoreConfig** dictionary
+        :param deadline: optional - **Deadline**
+            for logging in
+
+        :returns: **CoreUser** if success
+            **None** if non-success
+        :rtype: CoreUser
+        """
+        cfg_user = cfg.get("user", {})
+        use_email = email or cfg_user.get("e", None)
+        key = (cfg.get("endpoint", None), use_email)
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is None:
+                entry = CachedToken(
+                    key=key,
+                    username=username,
+                    email=email,
+                    password=password,
+                    auto_create=auto_create,
+                    cfg=cfg,
+                )
+                self.entries[key] = entry
+        if password and password != entry.password:
+            # check the new credentials before they
+            # replace the ones other threads log in with
+            new_user = auth.login_user(
+                username=username,
+                email=entry.email,
+                password=password,
+                auto_create=(
+                    auto_create and entry.user is None
+                ),
+                cfg=entry.cfg,
+                force=True,
+                deadline=deadline,
+            )
+            if not new_user:
+                return None
+            with entry.lock:
+                entry.username = username
+                entry.password = password
+                self.set_user(entry, new_user)
+            return entry.user
+        if not self.refresh(entry, deadline=deadline):
+            return None
+        return entry.user
+
+    def is_fresh(
+        self,
+        entry: CachedToken,
+    ):
+        """
+        is_fresh
+
+        check if the entry's token is not within
+        the **refresh_margin** (or half of the
+        token's lifetime) of expiring
+
+        :param entry: **CachedToken**
+
+        :returns: **True** if the token can be used
+        :rtype: bool
+        """
+        return (
+            entry.user is not None
+            and time.time() < entry.refresh_at
+        )
+
+    def refresh(
+        self,
+        entry: CachedToken,
+        stale_token: str = None,
+        deadline=None,
+    ):
+        """
+        refresh
+
+        log in again if the token is missing, about
+        to expire or was rejected. concurrent callers
+        wait for one login
+
+        :param entry: **CachedToken**
+        :param stale_token: optional - token that got
+            a **401** and must not be reused
+        :param deadline: optional - **Deadline**
+            for logging in
+
+        :returns: **True** if the entry has a
+            usable token
+        :rtype: bool
+        """
+        if stale_token is None and self.is_fresh(entry):
+            return True
+        with entry.lock:
+            if self.is_fresh(entry) and (
+                stale_token is None
+                or entry.user.token != stale_token
+            ):
+                # another thread already logged in
+                return True
+            first_login = entry.user is None
+            if not first_login and not (
+                entry.email and entry.password
+            ):
+                # the saved credentials file holds the
+                # same token so logging in needs the
+                # email and password
+                cfg_user = entry.cfg.get("user", {})
+                if not (
+                    cfg_user.get("e", None)
+                    and cfg_user.get("p", None)
+                ):
+                    log.error(
+                        "token expired - please set the "
+                        "AI_EMAIL and AI_PASSWORD "
+                        "environment variables to "
+                        "log in again"
+                    )
+                    return False
+            log.debug(
+                f"logging in email={entry.email} "
+                f"first_login={first_login}"
+            )
+            new_user = auth.login_user(
+                username=entry.username,
+                email=entry.email,
+                password=entry.password,
+                auto_create=(
+                    entry.auto_create and first_login
+                ),
+                cfg=entry.cfg,
+                force=not first_login,
+                deadline=deadline,
+            )
+            if new_user and first_login:
+                # the first login can return the token
+                # saved in the credentials file
+                (_, refresh_at) = self.get_refresh_at(
+                    new_user.token
+                )
+                if refresh_at <= time.time():
+                    log.debug(
+                        "saved token expired - "
+                        f"logging in email={entry.email}"
+                    )
+                    new_user = auth.login_user(
+                        username=entry.username,
+                        email=entry.email,
+                        password=entry.password,
+                        auto_create=False,
+                        cfg=entry.cfg,
+                        force=True,
+                        deadline=deadline,
+                    )
+            if not new_user:
+                return False
+            self.set_user(entry, new_user)
+            return True
+
+    def get_refresh_at(
+        self,
+        token: str,
+    ):
+        """
+        get_refresh_at
+
+        get when a token expires and when
+        to log in again
+
+        :param token: auth token
+
+        :returns: (expires_at, refresh_at)
+            epoch times
+        :rtype: tuple
+        """
+        expires_at = get_token_expiry(token, self.ttl)
+        # short-lived tokens refresh halfway
+        # through instead of on every call
+        lifetime = expires_at - time.time()
+        refresh_at = expires_at - min(
+            self.refresh_margin, lifetime / 2
+        )
+        return (expires_at, refresh_at)
+
+    def set_user(
+        self,
+        entry: CachedToken,
+        new_user,
+    ):
+        """
+        set_user
+
+        store a logged-in user's token on the
+        entry (the caller holds **entry.lock**)
+
+        the first user is kept as the shared
+        **CoreUser** and later logins update its
+        token in place
+
+        :param entry: **CachedToken**
+        :param new_user: logged-in **CoreUser**
+        """
+        if entry.user is None:
+            new_user.token_refresher = functools.partial(
+                self.refresh_user, entry.key
+            )
+            entry.user = new_user
+        else:
+            entry.user.id = new_user.id
+            entry.user.token = new_user.token
+            entry.user.auth_header = None
+        (
+            entry.expires_at,
+            entry.refresh_at,
+        ) = self.get_refresh_at(entry.user.token)
+
+    def refresh_user(
+        self,
+        key: tuple,
+        stale_token: str = None,
+        check: bool = False,
+    ):
+        """
+        refresh_user
+
+        hook stored on each **CoreUser** as
+        **token_refresher** that the transports call
+        before a request and after a **401**
+
+        :param key: (endpoint, email) key
+        :param stale_token: optional - token that got
+            a **401** and must not be reused
+        :param check: optional - flag to only check
+            if the token is fresh without logging in
+            (so an event loop can skip a thread hop
+            for a fresh token)
+
+        :returns: **True** if the user has a
+            usable token
+        :rtype: bool
+        """
+        entry = self.entries.get(key, None)
+        if entry is None:
+            return False
+        if check:
+            return self.is_fresh(entry)
+        return self.refresh(entry, stale_token=stale_token)
+
+    def clear(self):
+        """
+        clear
+
+        forget all in-memory tokens
+        """
+        with self.lock:
+            self.entries = {}
+
+
+def get_token_manager(cfg: dict = None):
+    """
+    get_token_manager
+
+    get the process-wide **TokenManager** for
+    the **cfg["token"]** settings
+
+    :param cfg: optional **CoreConfig** dictionary
+
+    :returns: shared **TokenManager**
+    :rtype: TokenManager
+    """
+    settings = None
+    if cfg:
+        settings = cfg.get("token", None)
+    if not settings:
+        settings = get_token.get_token()
+    key = (
+        settings.get("ttl", 3600.0),
+        settings.get("refresh_margin", 60.0),
+    )
+    manager = managers.get(key, None)
+    if manager:
+        return manager
+    with manager_lock:
+        manager = managers.get(key, None)
+        if not manager:
+            manager = TokenManager(
+                ttl=key[0],
+                refresh_margin=key[1],
+            )
+            managers[key] = manager
+    return manager
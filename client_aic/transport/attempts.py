@@ -0,0 +1,212 @@
+"""
+retry, deadline, rate limit and circuit breaker
+decisions for one request that are shared by
+the **CoreTransport** and the **AsyncClient**
+so both only own the sending and sleeping
+"""
+import logging
+import client_aic.retry_policy as retry_policy
+import client_aic.deadline as deadline_mod
+import client_aic.circuit_breaker as circuit_breaker
+
+
+log = logging.getLogger(__name__)
+
+
+class Attempts:
+    """Attempts"""
+
+    def __init__(
+        self,
+        retry: retry_policy.RetryPolicy,
+        idempotent: bool,
+        breaker: circuit_breaker.CircuitBreaker = None,
+        deadline: deadline_mod.Deadline = None,
+    ):
+        """
+        __init__
+
+        track the attempts of one request
+
+        ```python
+        attempts = Attempts(retry, idempotent)
+        while True:
+            use_timeout = attempts.start(timeout)
+            try:
+                r = send(timeout=use_timeout)
+            except Exception as e:
+                delay = attempts.on_error(e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            delay = attempts.on_response(r)
+            if delay is None:
+                return r
+            time.sleep(delay)
+        ```
+
+        :param retry: **RetryPolicy** for the request
+        :param idempotent: flag if the request is
+            safe to send again
+        :param breaker: optional - **CircuitBreaker**
+            for the endpoint
+        :param deadline: optional - **Deadline** that
+            caps every attempt's timeout and the
+            retry backoff
+        """
+        self.retry = retry
+        self.idempotent = idempotent
+        self.breaker = breaker
+        self.deadline = deadline
+        self.attempt = 0
+
+    def get_max_wait(self):
+        """
+        get_max_wait
+
+        get the longest wait for a rate
+        limit token
+
+        :returns: remaining **deadline** seconds
+            or **None** to wait without a limit
+        :rtype: float
+        """
+        if self.deadline is None:
+            return None
+        return self.deadline.remaining()
+
+    def on_rate_limited(
+        self,
+        route: str,
+    ):
+        """
+        on_rate_limited
+
+        fail an attempt that could not get a
+        rate limit token within **get_max_wait**
+
+        :param route: route name from **ROUTES**
+
+        :raises DeadlineExceeded: always
+        """
+        raise deadline_mod.DeadlineExceeded(
+            f"rate limit for route={route} "
+            "would pass the deadline"
+        )
+
+    def start(
+        self,
+        timeout=None,
+    ):
+        """
+        start
+
+        start the next attempt
+
+        :param timeout: seconds or a (**connect**,
+            **read**) tuple for the request
+
+        :returns: **timeout** capped by
+            the **deadline**
+        :raises DeadlineExceeded: if the **deadline**
+            already passed
+        :raises CircuitOpen: if the endpoint's
+            circuit is open
+        """
+        self.attempt += 1
+        use_timeout = timeout
+        if self.deadline is not None:
+            use_timeout = self.deadline.get_timeout(timeout)
+        breaker = self.breaker
+        if breaker is not None and not breaker.allow():
+            raise circuit_breaker.CircuitOpen(
+                f"circuit is open for {breaker.name}"
+            )
+        return use_timeout
+
+    def on_error(
+        self,
+        error: Exception,
+    ):
+        """
+        on_error
+
+        count a failed attempt against the
+        endpoint and decide if it is retried
+
+        a timeout cut short by the **deadline**
+        says nothing about the endpoint and
+        only releases the breaker's probe
+
+        :param error: exception from sending
+
+        :returns: seconds to wait before the next
+            attempt or **None** to raise the **error**
+        :rtype: float
+        """
+        breaker = self.breaker
+        if breaker is not None:
+            if isinstance(
+                error, retry_policy.get_retry_errors()
+            ) and not (
+                self.deadline is not None
+                and self.deadline.expired()
+            ):
+                breaker.on_failure()
+            else:
+                breaker.release()
+        if not self.retry.should_retry(
+            self.attempt, self.idempotent, error=error
+        ):
+            return None
+        return self.get_delay()
+
+    def on_response(
+        self,
+        r,
+    ):
+        """
+        on_response
+
+        record the response status on the
+        endpoint and decide if it is retried
+
+        :param r: response with a **status_code**
+            and **headers**
+
+        :returns: seconds to wait before the next
+            attempt or **None** to return the **r**
+        :rtype: float
+        """
+        if self.breaker is not None:
+            self.breaker.on_response(r.status_code)
+        if not self.retry.should_retry(
+            self.attempt, self.idempotent, response=r
+        ):
+            return None
+        return self.get_delay(response=r)
+
+    def get_delay(
+        self,
+        response=None,
+    ):
+        """
+        get_delay
+
+        :param response: optional - response
+            with a **Retry-After** header
+
+        :returns: backoff seconds or **None** when
+            the **deadline** has no budget for it
+        :rtype: float
+        """
+        delay = self.retry.get_delay(
+            self.attempt, response=response
+        )
+        if (
+            self.deadline is not None
+            and not self.deadline.has_budget(delay)
+        ):
+            return None
+        return delay
@@ -0,0 +1,547 @@
+"""
+shared, pooled http transport
+for all client api requests
+"""
+import time
+import logging
+import threading
+import client_aic.retry_policy as retry_policy
+import client_aic.deadline as deadline_mod
+import client_aic.circuit_breaker as circuit_breaker
+import client_aic.hedging as hedging
+import client_aic.transport.attempts as attempts
+
+
+log = logging.getLogger(__name__)
+
+
+class CoreTransport:
+    """CoreTransport"""
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        retry: retry_policy.RetryPolicy = None,
+        limiter=None,
+        breakers: circuit_breaker.CircuitBreakers = None,
+        hedge: hedging.HedgePolicy = None,
+    ):
+        """
+        __init__
+
+        keep-alive connection pool that is
+        reused by all rest api requests so
+        polling a job does not pay for a new
+        tcp connection and a full mtls
+        handshake on every request
+
+        the underlying **requests.Session** is
+        created once (on first use) and is safe to
+        share across threads because no per-request
+        state (like the user's token) is stored
+        on the session
+
+        :param pool_connections: number of endpoint
+            (host) connection pools to cache
+        :param pool_maxsize: max keep-alive
+            connections to keep open per endpoint
+        :param pool_block: when **True** wait for a
+            free pooled connection instead of
+            opening a throwaway connection
+        :param retry: optional - **RetryPolicy** for
+            every request (defaults to sending
+            each request once)
+        :param limiter: optional - **RateLimiter**
+            for requests with a **route**
+        :param breakers: optional - **CircuitBreakers**
+            that fail fast while an endpoint is down
+        :param hedge: optional - **HedgePolicy** for
+            requests sent with **hedge=True**
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        if retry is None:
+            retry = retry_policy.RetryPolicy.disabled()
+        self.retry = retry
+        self.limiter = limiter
+        self.breakers = breakers
+        self.hedge = hedge
+        self.lock = threading.Lock()
+        self.session = None
+
+    def get_session(self):
+        """
+        get_session
+
+        get (or lazily build) the shared session
+
+        :returns: shared **requests.Session**
+        :rtype: requests.Session
+        """
+        if self.session is None:
+            with self.lock:
+                if self.session is None:
+                    self.session = self.build_session()
+        return self.session
+
+    def build_session(self):
+        """
+        build_session
+
+        create a session with a keep-alive
+        connection pool mounted for http and https
+
+        :returns: new **requests.Session**
+        :rtype: requests.Session
+        """
+        # requests is imported on the first request
+        # to keep the cli startup fast
+        import requests
+        import requests.adapters
+
+        log.debug(
+            "building transport "
+            f"connections={self.pool_connections} "
+            f"maxsize={self.pool_maxsize} "
+            f"block={self.pool_block}"
+        )
+        s = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        return s
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        user=None,
+        headers: dict = None,
+        retry: retry_policy.RetryPolicy = None,
+        idempotent: bool = None,
+        deadline: deadline_mod.Deadline = None,
+        route: str = None,
+        hedge: bool = False,
+        **kwargs,
+    ):
+        """
+        request
+
+        send a request over the shared
+        connection pool
+
+        a **user** with a **token_refresher** (from
+        the **TokenManager**) gets a new token before
+        it expires and the request is retried
+        once after a **401** response
+
+        connection errors, timeouts and transient
+        responses (like **503**) are retried with
+        the **retry** policy when the request is
+        idempotent. a POST is only retried with an
+        **Idempotency-Key** header (or
+        **idempotent=True** for a read-only POST
+        like a search)
+
+        with **breakers**, a request to an endpoint
+        with an open circuit fails fast with
+        **CircuitOpen** (a failure after the
+        **deadline** passed is not counted against
+        the endpoint). with a **hedge** policy, an
+        idempotent read sent with **hedge=True** is
+        sent a second time if it has not answered
+        after the route's recent p95 latency and the
+        first response wins
+
+        :param method: http method
+        :param url: full url for the request
+        :param user: optional - authenticated
+            **CoreUser** to send the token for
+        :param headers: optional - extra headers
+        :param retry: optional - **RetryPolicy**
+            for this request (defaults to the
+            transport's policy)
+        :param idempotent: optional - flag to
+            override if the request is safe to
+            send again
+        :param deadline: optional - **Deadline** that
+            caps the **timeout** of every attempt
+            and stops retrying when there is no
+            budget left for the backoff
+        :param route: optional - route name from
+            **ROUTES** for the **limiter** (every
+            attempt waits for a token from the
+            route class's bucket)
+        :param hedge: optional - flag to hedge this
+            idempotent read (requires a **route**)
+        :param kwargs: passed to
+            **requests.Session.request** (e.g.
+            **json**, **data**, **verify**, **cert**
+            and **timeout**)
+
+        :returns: **requests.Response**
+        :rtype: requests.Response
+        :raises DeadlineExceeded: if the **deadline**
+            passed before an attempt was sent
+        :raises CircuitOpen: if the endpoint's
+            circuit is open
+        """
+        timeout = kwargs.pop("timeout", None)
+        if retry is None:
+            retry = self.retry
+        if idempotent is None:
+            idempotent = retry.is_idempotent(
+                method, headers
+            )
+        breaker = None
+        if self.breakers is not None:
+            breaker = self.breakers.get(url, route=route)
+        hedge = hedge and self.hedge is not None and route
+        tries = attempts.Attempts(
+            retry=retry,
+            idempotent=idempotent,
+            breaker=breaker,
+            deadline=deadline,
+        )
+        while True:
+            if self.limiter is not None and route:
+                self.wait_for_limiter(route, tries)
+            use_timeout = tries.start(timeout)
+            try:
+                if hedge:
+                    r = self.send_hedged(
+                        method,
+                        url,
+                        route=route,
+                        breaker=breaker,
+                        deadline=deadline,
+                        user=user,
+                        headers=headers,
+                        timeout=use_timeout,
+                        **kwargs,
+                    )
+                else:
+                    r = self.send(
+                        method,
+                        url,
+                        user=user,
+                        headers=headers,
+                        timeout=use_timeout,
+                        **kwargs,
+                    )
+            except Exception as e:
+                delay = tries.on_error(e)
+                if delay is None:
+                    raise
+                log.debug(
+                    f"retrying {method} {url} "
+                    f"attempt={tries.attempt} "
+                    f"in {delay:.2f}s after ex={e}"
+                )
+                time.sleep(delay)
+                continue
+            delay = tries.on_response(r)
+            if delay is None:
+                return r
+            log.debug(
+                f"retrying {method} {url} "
+                f"attempt={tries.attempt} in {delay:.2f}s "
+                f"after code={r.status_code}"
+            )
+            r.close()
+            time.sleep(delay)
+
+    def wait_for_limiter(
+        self,
+        route: str,
+        tries: attempts.Attempts,
+    ):
+        """
+        wait_for_limiter
+
+        wait for a token from the **limiter**
+        for one request on the **route**
+
+        :param route: route name from **ROUTES**
+        :param tries: **Attempts** with the
+            **deadline** that bounds the wait
+
+        :raises DeadlineExceeded: if the wait is
+            longer than the remaining budget
+        """
+        if not self.limiter.acquire(
+            route, max_wait=tries.get_max_wait()
+        ):
+            tries.on_rate_limited(route)
+
+    def send_hedged(
+        self,
+        method: str,
+        url: str,
+        route: str,
+        breaker: circuit_breaker.CircuitBreaker = None,
+        deadline: deadline_mod.Deadline = None,
+        **kwargs,
+    ):
+        """
+        send_hedged
+
+        send one attempt of an idempotent read and
+        send it again if there is no response after
+        the **hedge** delay for the route. the first
+        response wins and the other one is closed
+        when it arrives
+
+        both attempts run on the **hedge** policy's
+        bounded workers. the read is sent once on the
+        calling thread when there is no free worker,
+        and a hedge is skipped while the endpoint's
+        circuit is not closed, when the **limiter**
+        has no token ready, when there is no free
+        worker or when the **deadline** has no
+        budget for the delay
+
+        :param method: http method
+        :param url: full url for the request
+        :param route: route name from **ROUTES**
+        :param breaker: optional - **CircuitBreaker**
+            for the endpoint
+        :param deadline: optional - **Deadline**
+            for the request
+        :param kwargs: see **CoreTransport.send**
+
+        :returns: **requests.Response**
+        :rtype: requests.Response
+        """
+        import concurrent.futures
+
+        delay = self.hedge.get_delay(route)
+        first = None
+        if delay is not None and (
+            deadline is None or deadline.has_budget(delay)
+        ):
+            first = self.hedge.submit(
+                self.send_timed,
+                method,
+                url,
+                route=route,
+                **kwargs,
+            )
+        if first is None:
+            return self.send_timed(
+                method, url, route=route, **kwargs
+            )
+        (done, _) = concurrent.futures.wait(
+            [first], timeout=delay
+        )
+        if (
+            done
+            or (
+                breaker is not None
+                and not breaker.is_closed()
+            )
+            or not self.hedge.reserve()
+        ):
+            return first.result()
+        # only take a rate limit token once a
+        # worker is free to send the hedge
+        if self.limiter is not None and not (
+            self.limiter.acquire(route, max_wait=0.0)
+        ):
+            self.hedge.release_slot(None)
+            return first.result()
+        second = self.hedge.submit_reserved(
+            self.send_timed,
+            method,
+            url,
+            route=route,
+            **kwargs,
+        )
+        log.debug(
+            f"hedging {method} {url} after {delay:.3f}s"
+        )
+        pending = {first, second}
+        error = None
+        while pending:
+            (done, pending) = concurrent.futures.wait(
+                pending,
+                return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for fut in done:
+                if fut.exception() is None:
+                    for other in pending:
+                        other.add_done_callback(
+                            hedging.close_response
+                        )
+                    self.hedge.on_hedge(won=fut is second)
+                    return fut.result()
+                error = fut.exception()
+        self.hedge.on_hedge(won=False)
+        raise error
+
+    def send_timed(
+        self,
+        method: str,
+        url: str,
+        route: str,
+        **kwargs,
+    ):
+        """
+        send_timed
+
+        send one attempt of a request and add its
+        latency to the **hedge** history for the
+        route (5xx responses are not added)
+
+        :param method: http method
+        :param url: full url for the request
+        :param route: route name from **ROUTES**
+        :param kwargs: see **CoreTransport.send**
+
+        :returns: **requests.Response**
+        :rtype: requests.Response
+        """
+        started_at = time.monotonic()
+        r = self.send(method, url, **kwargs)
+        if r.status_code < 500:
+            self.hedge.record(
+                route, time.monotonic() - started_at
+            )
+        return r
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        user=None,
+        headers: dict = None,
+        **kwargs,
+    ):
+        """
+        send
+
+        send one attempt of a request and retry
+        once with a new token after a **401**
+        response
+
+        :param method: http method
+        :param url: full url for the request
+        :param user: optional - authenticated
+            **CoreUser** to send the token for
+        :param headers: optional - extra headers
+        :param kwargs: see **CoreTransport.request**
+
+        :returns: **requests.Response**
+        :rtype: requests.Response
+        """
+        token_refresher = None
+        if user:
+            token_refresher = user.token_refresher
+        if token_refresher:
+            # log in again if the token is about to expire
+            token_refresher()
+        use_headers = {}
+        if user:
+            use_headers["Bearer"] = f"{user.token}"
+        if headers:
+            use_headers.update(headers)
+        r = self.get_session().request(
+            method,
+            url,
+            headers=use_headers,
+            **kwargs,
+        )
+        if (
+            r.status_code == 401
+            and token_refresher
+            and token_refresher(
+                stale_token=use_headers["Bearer"]
+            )
+        ):
+            log.debug(
+                f"retrying after refreshing token: {url}"
+            )
+            use_headers["Bearer"] = f"{user.token}"
+            r = self.get_session().request(
+                method,
+                url,
+                headers=use_headers,
+                **kwargs,
+            )
+        return r
+
+    def get(self, url: str, **kwargs):
+        """
+        get
+
+        send a GET request
+
+        :param url: full url for the request
+        :param kwargs: see **CoreTransport.request**
+
+        :returns: **requests.Response**
+        :rtype: requests.Response
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        """
+        post
+
+        send a POST request
+
+        :param url: full url for the request
+        :param kwargs: see **CoreTransport.request**
+
+        :returns: **requests.Response**
+        :rtype: requests.Response
+        """
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        """
+        put
+
+        send a PUT request
+
+        :param url: full url for the request
+        :param kwargs: see **CoreTransport.request**
+
+        :returns: **requests.Response**
+        :rtype: requests.Response
+        """
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs):
+        """
+        patch
+
+        send a PATCH request
+
+        :param url: full url for the request
+        :param kwargs: see **CoreTransport.request**
+
+        :returns: **requests.Response**
+        :rtype: requests.Response
+        """
+        return self.request("PATCH", url, **kwargs)
+
+    def close(self):
+        """
+        close
+
+        close all pooled connections. the
+        transport can still be used afterwards
+        and will reconnect on the next request
+        """
+        with self.lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+"""
+## Export AI Results
+
+dump every ai result that matches a search
+(like all results for a user, collection or
+session) to a json lines file or a parquet
+dataset for offline analysis
+
+pages are fetched concurrently and written in
+order by a background thread. progress is
+checkpointed in **OUTPUT.journal** so re-running
+the same command after a crash continues after
+the last written row.
+
+## Examples
+
+export all of the user's results to json lines:
+
+```bash
+./examples/export-ai-results.py \
+    -q by_user_id \
+    -o results.jsonl
+```
+
+export a few fields for a collection to parquet
+(requires ``pip install llama-client-aic[parquet]``):
+
+```bash
+./examples/export-ai-results.py \
+    -q by_collection \
+    -d '{"collection": "embed-security"}' \
+    -f id,job_id,question,answer,score \
+    -o results.parquet \
+    -n 8
+```
+
+## Debugging
+
+increase logging by
+exporting this env variable before starting
+
+```bash
+export LOG=debug
+```
+
+"""
+
+import os
+import logging
+import argparse
+import ujson as json
+import client_aic.exporter as exporter
+
+
+level = logging.INFO
+log_level = os.getenv("LOG", "info")
+if log_level == "debug":
+    level = logging.DEBUG
+
+logging.basicConfig(
+    level=level,
+    format=(
+        "%(asctime)s.%(msecs)03d %(levelname)s "
+        "%(funcName)s - %(message)s"
+    ),
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+log = logging.getLogger(__name__)
+
+
+def export_ai_results():
+    """
+    export_ai_results
+
+    export the ai results for a search
+    to json lines or parquet
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "export ai results to json lines or "
+            "parquet and resume after a restart"
+        )
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help=(
+            "string - output json lines file or "
+            "parquet directory (ending in .parquet)"
+        ),
+        required=True,
+        dest="output_path",
+    )
+    parser.add_argument(
+        "-q",
+        "--query",
+        help=(
+            "string - logical search name "
+            "and defaults to by_user_id"
+        ),
+        default="by_user_id",
+        dest="query",
+    )
+    parser.add_argument(
+        "-d",
+        "--data",
+        help=(
+            "string - json dictionary of extra "
+            "search values"
+        ),
+        dest="data",
+    )
+    parser.add_argument(
+        "-f",
+        "--fields",
+        help=(
+            "string - comma-delimited CoreResultAI "
+            "fields and defaults to all fields"
+        ),
+        dest="fields",
+    )
+    parser.add_argument(
+        "-t",
+        "--format",
+        help=(
+            "string - jsonl or parquet and defaults "
+            "to the output file extension"
+        ),
+        dest="fmt",
+    )
+    parser.add_argument(
+        "-s",
+        "--page-size",
+        help="int - results per page and defaults to 1000",
+        default=1000,
+        type=int,
+        dest="page_size",
+    )
+    parser.add_argument(
+        "-n",
+        "--concurrency",
+        help=(
+            "int - max pages fetched at the "
+            "same time and defaults to 4"
+        ),
+        default=4,
+        type=int,
+        dest="concurrency",
+    )
+    parser.add_argument(
+        "-x",
+        "--restart",
+        help=(
+            "flag - ignore the journal and replace "
+            "the output instead of resuming"
+        ),
+        action="store_true",
+        dest="restart",
+    )
+    parser.add_argument(
+        "-e",
+        "--email",
+        help=(
+            "string - user email "
+            "and defaults to the AI_EMAIL env variable"
+        ),
+        dest="email",
+    )
+    parser.add_argument(
+        "-p",
+        "--password",
+        help=(
+            "string - user password "
+            "and defaults to the AI_PASSWORD env variable"
+        ),
+        dest="password",
+    )
+    args = parser.parse_args()
+
+    data = None
+    if args.data:
+        try:
+            data = json.loads(args.data)
+        except Exception as e:
+            log.error(f'invalid --data json with ex="{e}"')
+            return
+    fields = None
+    if args.fields:
+        fields = [
+            f.strip() for f in args.fields.split(",") if f
+        ]
+    summary = exporter.export_ai_results(
+        output_path=args.output_path,
+        query=args.query,
+        data=data,
+        fmt=args.fmt,
+        fields=fields,
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+        resume=not args.restart,
+        email=args.email,
+        password=args.password,
+    )
+    if not summary:
+        log.error("failed to export ai results")
+        return
+    log.info(
+        f"export status={summary['status']} "
+        f"rows={summary['rows']} "
+        f"total_rows={summary['total_rows']} "
+        f"seconds={summary['seconds']:.1f} "
+        f"rows_per_sec={summary['rows_per_sec']:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    export_ai_results()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+"""
+## Submit a Batch of Expert Reviews
+
+apply subject matter expert reviews (rlhf) from a
+json lines or csv file where each review has a
+**job_id** (or **ai_result_id**), **reviewed_answer**,
+**reviewed_score** (0.00 - 100.00) and optional
+**reviewed_notes**:
+
+```json
+{"job_id": 201, "reviewed_answer": "use bounds checks", "reviewed_score": 95.0}
+```
+
+each review's progress is saved in an append-only
+journal (**INPUT_FILE.journal** by default) so
+re-running the same command skips reviews that
+were already applied. failed reviews are written
+to **INPUT_FILE.failures.jsonl** with the error.
+
+## Examples
+
+```bash
+./examples/review-answers.py \
+    -i reviews.jsonl \
+    -n 20
+```
+
+```bash
+./examples/review-answers.py \
+    -i reviews.csv \
+    -r
+```
+
+## Debugging
+
+increase logging by
+exporting this env variable before starting
+
+```bash
+export LOG=debug
+```
+
+"""
+
+import os
+import logging
+import argparse
+import client_aic.review_runner as review_runner
+
+
+level = logging.INFO
+log_level = os.getenv("LOG", "info")
+if log_level == "debug":
+    level = logging.DEBUG
+
+logging.basicConfig(
+    level=level,
+    format=(
+        "%(asctime)s.%(msecs)03d %(levelname)s "
+        "%(funcName)s - %(message)s"
+    ),
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+log = logging.getLogger(__name__)
+
+
+def review_answers():
+    """
+    review_answers
+
+    apply every expert review in a json lines
+    or csv file and journal the progress
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "apply expert reviews from a json lines "
+            "or csv file and resume after a restart"
+        )
+    )
+    parser.add_argument(
+        "-i",
+        "--input",
+        help=(
+            "string - path to the json lines or "
+            "csv file with one review per line"
+        ),
+        required=True,
+        dest="input_path",
+    )
+    parser.add_argument(
+        "-j",
+        "--journal",
+        help=(
+            "string - path to the journal file "
+            "and defaults to INPUT_FILE.journal"
+        ),
+        dest="journal_path",
+    )
+    parser.add_argument(
+        "-f",
+        "--failures",
+        help=(
+            "string - path for the failed reviews "
+            "and defaults to INPUT_FILE.failures.jsonl"
+        ),
+        dest="failures_path",
+    )
+    parser.add_argument(
+        "-n",
+        "--concurrency",
+        help=(
+            "int - max reviews in flight "
+            "and defaults to 10"
+        ),
+        default=10,
+        type=int,
+        dest="concurrency",
+    )
+    parser.add_argument(
+        "-t",
+        "--retries",
+        help=(
+            "int - retries per failed review "
+            "and defaults to 2"
+        ),
+        default=2,
+        type=int,
+        dest="retries",
+    )
+    parser.add_argument(
+        "-e",
+        "--email",
+        help=(
+            "string - user email "
+            "and defaults to the AI_EMAIL env variable"
+        ),
+        dest="email",
+    )
+    parser.add_argument(
+        "-p",
+        "--password",
+        help=(
+            "string - user password "
+            "and defaults to the AI_PASSWORD env variable"
+        ),
+        dest="password",
+    )
+    parser.add_argument(
+        "-r",
+        "--retry-failed",
+        help=(
+            "flag - retry reviews that failed "
+            "in an earlier run"
+        ),
+        action="store_true",
+        dest="retry_failed",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_path):
+        log.error(f"missing input file: {args.input_path}")
+        return
+    summary = review_runner.run_reviews(
+        input_path=args.input_path,
+        journal_path=args.journal_path,
+        failures_path=args.failures_path,
+        email=args.email,
+        password=args.password,
+        concurrency=args.concurrency,
+        retries=args.retries,
+        retry_failed=args.retry_failed,
+    )
+    if not summary:
+        log.error("failed to run reviews")
+        return
+    for failure in summary["failures"][:20]:
+        log.error(
+            f"failed line={failure['line']} "
+            f"job_id={failure.get('job_id')} "
+            f"ai_result_id={failure.get('ai_result_id')} "
+            f"error={failure['error']}"
+        )
+    log.info(
+        f"reviews done={summary['done']} "
+        f"failed={summary['failed']} "
+        f"skipped={summary['skipped']} "
+        f"failures={summary['failures_path']}"
+    )
+
+
+if __name__ == "__main__":
+    review_answers()
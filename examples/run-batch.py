@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+"""
+## Run a Batch of Questions
+
+ask the llm every question in a json lines file
+where each line is a dictionary of
+**run_job_ask** arguments:
+
+```json
+{"question": "what is a buffer overflow?"}
+{"question": "what is a use after free?", "max_tokens": 1024}
+```
+
+each line's progress is saved in an append-only
+journal (**INPUT_FILE.journal** by default). re-run
+the same command after a crash or deploy to resume
+without resubmitting jobs that were already created.
+
+## Examples
+
+```bash
+./examples/run-batch.py \
+    -c "${AI_COLLECTION_ID}" \
+    -i questions.jsonl \
+    -n 20
+```
+
+## Debugging
+
+increase logging by
+exporting this env variable before starting
+
+```bash
+export LOG=debug
+```
+
+"""
+
+import os
+import logging
+import argparse
+import client_aic.batch_runner as batch_runner
+import client_aic.concurrency_limiter as concurrency_limiter
+
+
+level = logging.INFO
+log_level = os.getenv("LOG", "info")
+if log_level == "debug":
+    level = logging.DEBUG
+
+logging.basicConfig(
+    level=level,
+    format=(
+        "%(asctime)s.%(msecs)03d %(levelname)s "
+        "%(funcName)s - %(message)s"
+    ),
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+log = logging.getLogger(__name__)
+
+
+def run_batch():
+    """
+    run_batch
+
+    ask every question in a json lines file
+    and journal the progress
+    """
+    collection_id = os.getenv(
+        "AI_COLLECTION_ID", "embed-security"
+    )
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "ask every question in a json lines file "
+            "and resume after a restart"
+        )
+    )
+    parser.add_argument(
+        "-i",
+        "--input",
+        help=(
+            "string - path to the json lines file "
+            "with one run_job_ask dictionary per line"
+        ),
+        required=True,
+        dest="input_path",
+    )
+    parser.add_argument(
+        "-j",
+        "--journal",
+        help=(
+            "string - path to the journal file "
+            "and defaults to INPUT_FILE.journal"
+        ),
+        dest="journal_path",
+    )
+    parser.add_argument(
+        "-c",
+        "--collection-id",
+        help=(
+            "string - embedding collection id alias "
+            "for lines without a collection_id "
+            f"and defaults to the {collection_id}"
+        ),
+        dest="collection_id",
+    )
+    parser.add_argument(
+        "-n",
+        "--concurrency",
+        help=(
+            "int - max jobs in flight and defaults to 10"
+        ),
+        default=10,
+        type=int,
+        dest="concurrency",
+    )
+    parser.add_argument(
+        "-a",
+        "--adaptive",
+        help=(
+            "flag - adjust the jobs in flight from "
+            "the submit latency, queue time and errors "
+            "with the concurrency as the max"
+        ),
+        action="store_true",
+        dest="adaptive",
+    )
+    parser.add_argument(
+        "-e",
+        "--email",
+        help=(
+            "string - user email "
+            "and defaults to the AI_EMAIL env variable"
+        ),
+        dest="email",
+    )
+    parser.add_argument(
+        "-p",
+        "--password",
+        help=(
+            "string - user password "
+            "and defaults to the AI_PASSWORD env variable"
+        ),
+        dest="password",
+    )
+    parser.add_argument(
+        "-r",
+        "--retry-failed",
+        help=(
+            "flag - retry lines that failed "
+            "in an earlier run"
+        ),
+        action="store_true",
+        dest="retry_failed",
+    )
+    args = parser.parse_args()
+
+    if args.collection_id:
+        collection_id = args.collection_id
+    if not os.path.exists(args.input_path):
+        log.error(f"missing input file: {args.input_path}")
+        return
+    limiter = None
+    if args.adaptive:
+        limiter = concurrency_limiter.AdaptiveLimiter(
+            max_limit=args.concurrency
+        )
+    summary = batch_runner.run_batch(
+        input_path=args.input_path,
+        journal_path=args.journal_path,
+        collection_id=collection_id,
+        email=args.email,
+        password=args.password,
+        concurrency=args.concurrency,
+        retry_failed=args.retry_failed,
+        limiter=limiter,
+    )
+    if not summary:
+        log.error("failed to run batch")
+        return
+    log.info(
+        f"batch done={summary['done']} "
+        f"failed={summary['failed']} "
+        f"skipped={summary['skipped']}"
+    )
+
+
+if __name__ == "__main__":
+    run_batch()
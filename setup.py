@@ -10,6 +10,7 @@ setup(
     name="llama-client-aic",
     packages=[
         "client_aic",
+        "client_aic.cache",
         "client_aic.config",
         "client_aic.models",
         "client_aic.req",
@@ -18,11 +19,15 @@ setup(
         "client_aic.req.job",
         "client_aic.req.user",
         "client_aic.tls",
+        "client_aic.transport",
     ],
     scripts=[
         "examples/ask-llm.py",
+        "examples/export-ai-results.py",
         "examples/get-ai-result.py",
         "examples/review-answer.py",
+        "examples/review-answers.py",
+        "examples/run-batch.py",
     ],
     version="1.0.8",
     license="Apache 2.0",
@@ -48,6 +53,11 @@ setup(
         "human feedback",
     ],
     install_requires=requirements,
+    extras_require={
+        "async": ["httpx"],
+        "numpy": ["numpy"],
+        "parquet": ["pyarrow"],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
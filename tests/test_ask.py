@@ -0,0 +1,133 @@
+import client_aic.ask as ask
+import client_aic.client as client_aic
+import client_aic.get_cfg as get_cfg
+import client_aic.cache.result_cache as result_cache
+import client_aic.cache.similarity_index as similarity_index
+import client_aic.models.core_user as core_user
+import client_aic.models.core_result_ai as core_result_ai
+import client_aic.models.core_result_job as core_result_job
+
+QUESTION = "Is this code safe? strcpy(b, p);"
+
+
+def get_user():
+    return core_user.CoreUser(
+        id=2,
+        email="a@b.c",
+        state=0,
+        verified=1,
+        role="user",
+        token="t",
+        msg=None,
+    )
+
+
+def fake_submit(calls):
+    def submit_and_wait(
+        question, user, cfg, job_params, **kwargs
+    ):
+        calls.append((question, job_params))
+        return (
+            core_result_job.CoreResultJob(
+                job_id=5, user_id=2
+            ),
+            core_result_ai.CoreResultAI(
+                id=len(calls), job_id=5, user_id=2
+            ),
+        )
+
+    return submit_and_wait
+
+
+def test_client_ask_stores_and_reuses_answers(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        ask, "submit_and_wait", fake_submit(calls)
+    )
+    cache = result_cache.ResultCache()
+    with client_aic.Client(
+        email="a@b.c",
+        password="x",
+        collection_id="embed-security",
+        cfg=get_cfg.build_cfg(),
+        cache=cache,
+    ) as client:
+        client.user = get_user()
+        (user, _, res_ai) = client.ask(QUESTION)
+        assert user is client.user
+        assert res_ai.id == 1
+        (user, _, res_ai) = client.ask(QUESTION)
+        assert user.msg == "cached"
+        assert res_ai.id == 1
+    assert calls == [
+        (QUESTION, {"collection_id": "embed-security"})
+    ]
+
+
+def test_ask_as_user_matches_client_ask(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        ask, "submit_and_wait", fake_submit(calls)
+    )
+    cache = result_cache.ResultCache()
+    job_params = {"collection_id": "embed-security"}
+    (_, res_ai) = ask.ask_as_user(
+        question=QUESTION,
+        user=get_user(),
+        cfg=get_cfg.build_cfg(),
+        job_params=job_params,
+        cache=cache,
+    )
+    (user, _, cached) = ask.get_prior_reply(
+        question=QUESTION,
+        job_params=job_params,
+        cache=cache,
+    )
+    assert cached.id == res_ai.id
+    assert user.token is None
+    assert (
+        ask.get_prior_reply(
+            question=QUESTION.replace("p", "q"),
+            job_params=job_params,
+            cache=cache,
+        )
+        is None
+    )
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_expired_answer_is_not_reused(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache, "time", clock)
+    monkeypatch.setattr(similarity_index, "time", clock)
+    cache = result_cache.ResultCache(ttl=60.0)
+    similar = similarity_index.SimilarityIndex(ttl=60.0)
+    res_ai = core_result_ai.CoreResultAI(
+        id=1, job_id=5, user_id=2
+    )
+    job_params = {"collection_id": "embed-security"}
+    cache.put(
+        result_cache.build_key(QUESTION, **job_params),
+        res_ai,
+    )
+    similar.add(QUESTION, res_ai, **job_params)
+    assert ask.get_prior_reply(
+        QUESTION, job_params, cache=cache, similar=similar
+    )
+    clock.now += 61.0
+    assert (
+        ask.get_prior_reply(
+            QUESTION,
+            job_params,
+            cache=cache,
+            similar=similar,
+        )
+        is None
+    )
@@ -0,0 +1,67 @@
+import types
+import client_aic.ask_many as ask_many
+import client_aic.get_cfg as get_cfg
+import client_aic.cache.result_cache as result_cache
+import client_aic.poll_policy as poll_policy
+import client_aic.models.core_user as core_user
+import client_aic.models.core_result_ai as core_result_ai
+import client_aic.models.core_result_job as core_result_job
+import client_aic.req.ai.run_job_ask as run_job_ask
+import client_aic.req.ai.get_ai_result as get_ai_result
+import client_aic.req.job.get_job_result as get_job_result
+
+
+def test_duplicate_questions_are_separate_jobs(monkeypatch):
+    job_ids = []
+
+    def submit(question, **kwargs):
+        job_ids.append(len(job_ids) + 1)
+        return types.SimpleNamespace(
+            id=job_ids[-1], state=1
+        )
+
+    def get_job(id, **kwargs):
+        return core_result_job.CoreResultJob(
+            id=id, job_id=id
+        )
+
+    def get_ai(id, **kwargs):
+        return core_result_ai.CoreResultAI(id=id, job_id=id)
+
+    monkeypatch.setattr(run_job_ask, "run_job_ask", submit)
+    monkeypatch.setattr(
+        get_job_result, "get_job_result", get_job
+    )
+    monkeypatch.setattr(
+        get_ai_result, "get_ai_result", get_ai
+    )
+    cache = result_cache.ResultCache()
+    questions = ["what is a buffer overflow?"] * 3
+    results = list(
+        ask_many.run_questions(
+            questions=questions,
+            user=core_user.CoreUser(
+                id=2,
+                email="a@b.c",
+                state=0,
+                verified=1,
+                role="user",
+                token="t",
+                msg=None,
+            ),
+            cfg=get_cfg.build_cfg(),
+            job_params={"collection_id": "embed-security"},
+            concurrency=3,
+            policy=poll_policy.PollPolicy.fixed(0.0),
+            cache=cache,
+        )
+    )
+    assert len(results) == 3
+    assert sorted(
+        res_ai.id for (_, _, res_ai) in results
+    ) == [
+        1,
+        2,
+        3,
+    ]
+    assert {q for (q, _, _) in results} == set(questions)
@@ -0,0 +1,165 @@
+import time
+import asyncio
+import threading
+import ujson as json
+import client_aic.get_cfg as get_cfg
+import client_aic.async_client as async_client
+import client_aic.models.core_user as core_user
+import client_aic.models.core_result_ai as core_result_ai
+import client_aic.req.ai.update_ai_result as update_ai_result
+
+
+class Response:
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self.text = json.dumps(body or {})
+        self.headers = {}
+
+
+class HttpClient:
+    """fake rest api that records each request"""
+
+    def __init__(self, users=("a@b.c",), stale=("old",)):
+        self.users = set(users)
+        self.stale = set(stale)
+        self.requests = []
+        self.threads = []
+        self.num_logins = 0
+
+    async def request(
+        self,
+        method,
+        path,
+        headers=None,
+        content=None,
+        **kwargs,
+    ):
+        self.threads.append(threading.current_thread())
+        token = headers.get("Bearer", None)
+        self.requests.append((method, path, token))
+        if path == "/login":
+            email = json.loads(content)["email"]
+            if email not in self.users:
+                msg = f"user does not exist with email={email}"
+                return Response(400, {"msg": msg})
+            self.num_logins += 1
+            return Response(
+                201,
+                {
+                    "user_id": 2,
+                    "email": email,
+                    "token": f"new{self.num_logins}",
+                },
+            )
+        if path == "/user" and method == "POST":
+            self.users.add(json.loads(content)["email"])
+            return Response(201, {"id": 2})
+        if token in self.stale:
+            return Response(401)
+        if method == "PATCH":
+            return Response(405)
+        return Response(200, {"id": 2})
+
+
+def get_client(monkeypatch, http=None, refresh_at=0.0):
+    monkeypatch.setenv("DISABLE_CRED_CACHE", "1")
+    client = async_client.AsyncClient(
+        email="a@b.c", password="x", cfg=get_cfg.build_cfg()
+    )
+    client.limiter = None
+    client.breakers = None
+    client.user = core_user.CoreUser(
+        id=2,
+        email="a@b.c",
+        state=0,
+        verified=1,
+        role="user",
+        token="old",
+        msg=None,
+    )
+    client.refresh_at = refresh_at
+    client.client = http or HttpClient()
+    return client
+
+
+def test_expiring_token_is_refreshed_before_the_request(
+    monkeypatch,
+):
+    client = get_client(monkeypatch)
+    user = client.user
+    asyncio.run(client.send("GET", "/ai"))
+    assert client.client.requests == [
+        ("POST", "/login", None),
+        ("GET", "/ai", "new1"),
+    ]
+    # the login ran on the event loop
+    assert set(client.client.threads) == {
+        threading.current_thread()
+    }
+    assert client.user is user
+    assert user.token == "new1"
+    assert client.refresh_at > time.time()
+
+
+def test_fresh_token_is_not_refreshed(monkeypatch):
+    client = get_client(
+        monkeypatch,
+        HttpClient(stale=()),
+        refresh_at=time.time() + 60,
+    )
+    asyncio.run(client.send("GET", "/ai"))
+    assert client.client.requests == [("GET", "/ai", "old")]
+
+
+def test_rejected_token_is_refreshed_once(monkeypatch):
+    client = get_client(
+        monkeypatch, refresh_at=time.time() + 60
+    )
+    r = asyncio.run(client.send("GET", "/ai"))
+    assert r.status_code == 200
+    assert client.client.requests == [
+        ("GET", "/ai", "old"),
+        ("POST", "/login", None),
+        ("GET", "/ai", "new1"),
+    ]
+
+
+def test_first_login_creates_the_user(monkeypatch):
+    client = get_client(monkeypatch, HttpClient(users=()))
+    client.user = None
+    user = asyncio.run(client.login())
+    assert user.token == "new1"
+    assert [
+        (method, path)
+        for (method, path, _) in client.client.requests
+    ] == [
+        ("POST", "/login"),
+        ("POST", "/user"),
+        ("POST", "/login"),
+        ("GET", "/user/2"),
+    ]
+    assert client.client.requests[-1][2] == "new1"
+
+
+def test_update_falls_back_to_put(monkeypatch):
+    client = get_client(
+        monkeypatch,
+        HttpClient(stale=()),
+        refresh_at=time.time() + 60,
+    )
+    monkeypatch.setattr(
+        update_ai_result, "patch_unsupported", set()
+    )
+    ai_result = core_result_ai.CoreResultAI.from_dict(
+        {"id": 2, "user_id": 2}
+    )
+    ai_result.reviewed_score = 1.0
+    cur_o = asyncio.run(client.update_ai_result(ai_result))
+    assert cur_o.id == 2
+    assert [
+        method for (method, _, _) in client.client.requests
+    ] == ["PATCH", "PUT"]
+    assert ai_result.get_changes() == {}
+    assert update_ai_result.patch_unsupported == {
+        f"{client.base_url}/ai/result"
+    }
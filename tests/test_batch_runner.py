@@ -0,0 +1,113 @@
+import hashlib
+import ujson as json
+import client_aic.batch_runner as batch_runner
+
+LINES = [
+    {"question": "what is a buffer overflow?"},
+    {"question": "what is a use after free?"},
+    {"question": "what is a race condition?"},
+    {"question": "what is a format string bug?"},
+]
+
+
+def get_input(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    path.write_text(
+        "".join(json.dumps(line) + "\n" for line in LINES)
+    )
+    return str(path)
+
+
+def get_entry(line_no, state, **kwargs):
+    line = json.dumps(LINES[line_no - 1])
+    entry = {
+        "state": state,
+        "sha1": hashlib.sha1(
+            line.encode("utf-8")
+        ).hexdigest(),
+    }
+    entry.update(kwargs)
+    return entry
+
+
+def get_entries():
+    return {
+        1: get_entry(1, "done", job_id=11),
+        2: get_entry(2, "submitting", idempotency_key="k2"),
+        3: get_entry(
+            3, "submitted", job_id=13, idempotency_key="k3"
+        ),
+        4: get_entry(4, "failed", idempotency_key="k4"),
+    }
+
+
+def test_resume_polls_submitted_and_resends_submitting(
+    tmp_path,
+):
+    summary = {}
+    jobs = list(
+        batch_runner.read_jobs(
+            get_input(tmp_path),
+            get_entries(),
+            collection_id="embed-security",
+            summary=summary,
+        )
+    )
+    assert [(key, job_id) for key, _, job_id in jobs] == [
+        (2, None),
+        (3, 13),
+    ]
+    # an interrupted submit reuses its journaled key
+    job_params = jobs[0][1]
+    assert job_params["idempotency_key"] == "k2"
+    assert job_params["collection_id"] == "embed-security"
+    # a submitted job is polled, not submitted again
+    assert jobs[1][1] == {}
+    # done and failed lines are skipped
+    assert summary == {"skipped": 2}
+
+
+def test_retry_failed_resends_with_the_same_key(tmp_path):
+    entries = get_entries()
+    summary = {}
+    jobs = list(
+        batch_runner.read_jobs(
+            get_input(tmp_path),
+            entries,
+            retry_failed=True,
+            summary=summary,
+        )
+    )
+    assert [key for key, _, _ in jobs] == [2, 3, 4]
+    assert jobs[2][1]["idempotency_key"] == "k4"
+    assert jobs[2][2] is None
+    assert summary == {"skipped": 1}
+    # a failed line with a job is polled again
+    entries[4]["job_id"] = 14
+    jobs = list(
+        batch_runner.read_jobs(
+            get_input(tmp_path),
+            entries,
+            retry_failed=True,
+        )
+    )
+    assert jobs[2] == (4, {}, 14)
+
+
+def test_new_lines_get_a_key_and_a_digest(tmp_path):
+    digests = {}
+    jobs = list(
+        batch_runner.read_jobs(
+            get_input(tmp_path), {}, digests=digests
+        )
+    )
+    assert [job_id for _, _, job_id in jobs] == [None] * 4
+    keys = {
+        job_params["idempotency_key"]
+        for _, job_params, _ in jobs
+    }
+    assert len(keys) == 4
+    assert digests == {
+        line_no: entry["sha1"]
+        for line_no, entry in get_entries().items()
+    }
@@ -0,0 +1,51 @@
+import random
+
+import client_aic.concurrency_limiter as concurrency_limiter
+
+
+def get_limiter():
+    return concurrency_limiter.AdaptiveLimiter(
+        initial=16,
+        cooldown=0.0,
+    )
+
+
+def run_stationary(limiter, rnd, num_jobs):
+    for _ in range(num_jobs):
+        limiter.on_submit(
+            latency=rnd.uniform(0.05, 0.15), ok=True
+        )
+        limiter.on_complete(duration=rnd.uniform(5.0, 30.0))
+
+
+def test_limit_holds_under_stationary_load():
+    for seed in range(20):
+        limiter = get_limiter()
+        run_stationary(limiter, random.Random(seed), 2000)
+        stats = limiter.get_stats()
+        assert stats["decreases"] == 0, (seed, stats)
+        assert stats["limit"] >= 16
+
+
+def test_rising_queue_time_cuts_the_limit():
+    rnd = random.Random(1)
+    limiter = get_limiter()
+    run_stationary(limiter, rnd, 500)
+    limit = limiter.get_limit()
+    for _ in range(30):
+        limiter.on_submit(latency=0.1, ok=True)
+        limiter.on_complete(
+            duration=rnd.uniform(50.0, 90.0)
+        )
+    stats = limiter.get_stats()
+    assert stats["reasons"].get("queue_time", 0) > 0
+    assert limiter.get_limit() < limit
+
+
+def test_failed_submit_cuts_the_limit():
+    limiter = get_limiter()
+    limiter.on_submit(latency=0.1, ok=False)
+    assert limiter.get_limit() == 8
+    assert limiter.get_stats()["last_reason"] == (
+        "submit_failed"
+    )
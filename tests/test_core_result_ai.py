@@ -0,0 +1,67 @@
+import client_aic.models.core_result_ai as core_result_ai
+
+
+def get_loaded(**kwargs):
+    rec = {
+        "id": 1,
+        "user_id": 2,
+        "answer": "a buffer overflow is ...",
+        "reviewed_score": None,
+        "data": {"x": 1, "tags": ["a"]},
+    }
+    rec.update(kwargs)
+    return core_result_ai.CoreResultAI.from_dict(rec)
+
+
+def test_new_record_has_no_snapshot():
+    assert (
+        core_result_ai.CoreResultAI().get_changes() is None
+    )
+
+
+def test_loaded_record_has_no_changes():
+    assert get_loaded().get_changes() == {}
+
+
+def test_assigned_field_is_a_change():
+    ai_result = get_loaded()
+    ai_result.reviewed_score = 90
+    assert ai_result.get_changes() == {"reviewed_score": 90}
+
+
+def test_in_place_dict_edit_is_a_change():
+    ai_result = get_loaded()
+    ai_result.data["x"] = 2
+    assert ai_result.get_changes() == {
+        "data": {"x": 2, "tags": ["a"]}
+    }
+
+
+def test_in_place_nested_list_edit_is_a_change():
+    ai_result = get_loaded()
+    ai_result.data["tags"].append("b")
+    assert list(ai_result.get_changes()) == ["data"]
+
+
+def test_equal_new_dict_is_not_a_change():
+    ai_result = get_loaded()
+    ai_result.data = {"tags": ["a"], "x": 1}
+    assert ai_result.get_changes() == {}
+
+
+def test_mark_clean_snapshots_in_place_edits():
+    ai_result = get_loaded()
+    ai_result.data["x"] = 2
+    ai_result.mark_clean()
+    assert ai_result.get_changes() == {}
+    ai_result.data["x"] = 3
+    assert list(ai_result.get_changes()) == ["data"]
+
+
+def test_load_response_dict_marks_clean():
+    ai_result = core_result_ai.CoreResultAI()
+    ai_result.load_response_dict(
+        {"id": 1, "data": {"x": 1}}
+    )
+    ai_result.data["x"] = 2
+    assert ai_result.get_changes() == {"data": {"x": 2}}
@@ -0,0 +1,84 @@
+import sys
+
+import pytest
+
+import client_aic.models.core_search_result_ai as core_search_result_ai
+
+
+def get_search_res():
+    search_res = core_search_result_ai.CoreSearchResultAI()
+    search_res.load_response_dict(
+        {
+            "recs": [
+                {"id": 1, "score": 0.2, "answer": "a"},
+                {"id": 2, "score": 0.9, "answer": "b"},
+            ]
+        }
+    )
+    return search_res
+
+
+def test_row_edit_is_written_back():
+    search_res = get_search_res()
+    assert list(search_res.column("score")) == [0.2, 0.9]
+    search_res.recs[1].score = 0.5
+    search_res.recs[0].answer = "c"
+    assert list(search_res.column("score")) == [0.2, 0.5]
+    assert search_res.column("answer") == ["c", "b"]
+    assert search_res.to_records(["id", "score"]) == [
+        {"id": 1, "score": 0.2},
+        {"id": 2, "score": 0.5},
+    ]
+    assert list(
+        search_res.to_numpy(["score"])["score"]
+    ) == [
+        0.2,
+        0.5,
+    ]
+
+
+def test_column_values_are_copies():
+    search_res = get_search_res()
+    search_res.column("answer").append("x")
+    with pytest.raises(ValueError):
+        search_res.column("score")[0] = 1.0
+    assert search_res.to_records(["answer"]) == [
+        {"answer": "a"},
+        {"answer": "b"},
+    ]
+
+
+def test_added_row_is_in_the_columns():
+    search_res = get_search_res()
+    search_res.column("id")
+    search_res.add_rec({"id": 3, "score": 0.1})
+    search_res.recs[2].score = 0.3
+    assert list(search_res.column("score")) == [
+        0.2,
+        0.9,
+        0.3,
+    ]
+
+
+def test_only_edited_rows_are_synced():
+    search_res = get_search_res()
+    rows = list(search_res.recs)
+    assert not search_res.recs.dirty
+    search_res.column("score")
+    # a row held across a sync is still tracked
+    rows[1].score = 0.7
+    assert search_res.recs.dirty == {1}
+    assert list(search_res.column("score")) == [0.2, 0.7]
+    assert not search_res.recs.dirty
+
+
+def test_numpy_exports_need_numpy(monkeypatch):
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    search_res = get_search_res()
+    for export in (
+        lambda: search_res.column("score"),
+        lambda: search_res.to_numpy(["answer"]),
+    ):
+        with pytest.raises(ImportError) as e:
+            export()
+        assert "llama-client-aic[numpy]" in str(e.value)
@@ -0,0 +1,184 @@
+import time
+import threading
+
+import client_aic.deadline as deadline_mod
+import client_aic.circuit_breaker as circuit_breaker
+import client_aic.hedging as hedging
+import client_aic.transport.core_transport as core_transport
+
+URL = "https://api.test/ai/job/result"
+
+
+class Response:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Session:
+    def __init__(self, send):
+        self.send = send
+        self.threads = []
+
+    def request(self, method, url, headers=None, **kwargs):
+        self.threads.append(threading.current_thread())
+        return self.send(len(self.threads), **kwargs)
+
+
+def get_transport(send, **kwargs):
+    transport = core_transport.CoreTransport(**kwargs)
+    transport.session = Session(send)
+    return transport
+
+
+def timed_out(num, timeout=None, **kwargs):
+    raise TimeoutError("read timed out")
+
+
+def test_timeout_counts_against_the_endpoint():
+    breakers = circuit_breaker.CircuitBreakers(failures=1)
+    transport = get_transport(timed_out, breakers=breakers)
+    try:
+        transport.get(URL)
+    except TimeoutError:
+        pass
+    assert not breakers.get(URL).is_closed()
+
+
+def test_deadline_timeout_does_not_count():
+    breakers = circuit_breaker.CircuitBreakers(failures=1)
+
+    def send(num, timeout=None, **kwargs):
+        time.sleep(timeout[1])
+        raise TimeoutError("read timed out")
+
+    transport = get_transport(send, breakers=breakers)
+    try:
+        transport.get(
+            URL,
+            timeout=(1.0, 5.0),
+            deadline=deadline_mod.Deadline(0.05),
+        )
+    except TimeoutError:
+        pass
+    assert breakers.get(URL).is_closed()
+
+
+def get_hedge(**kwargs):
+    hedge = hedging.HedgePolicy(
+        min_samples=1, min_delay=0.01, **kwargs
+    )
+    hedge.record("job_result", 0.01)
+    return hedge
+
+
+def test_hedge_answers_a_slow_read():
+    def send(num, **kwargs):
+        if num == 1:
+            time.sleep(0.5)
+        return Response(200 + num)
+
+    hedge = get_hedge()
+    transport = get_transport(send, hedge=hedge)
+    r = transport.get(URL, route="job_result", hedge=True)
+    assert r.status_code == 202
+    assert hedge.get_stats()["wins"] == 1
+
+
+def test_hedged_reads_reuse_the_workers():
+    hedge = get_hedge(max_workers=2)
+    transport = get_transport(
+        lambda num, **kwargs: Response(), hedge=hedge
+    )
+    for _ in range(50):
+        transport.get(URL, route="job_result", hedge=True)
+    workers = {
+        t
+        for t in transport.session.threads
+        if t.name.startswith("hedge")
+    }
+    assert 0 < len(workers) <= 2
+
+
+def test_read_runs_on_the_caller_without_a_worker():
+    hedge = get_hedge(max_workers=2)
+    for _ in range(hedge.max_workers):
+        assert hedge.slots.acquire(blocking=False)
+    transport = get_transport(
+        lambda num, **kwargs: Response(), hedge=hedge
+    )
+    transport.get(URL, route="job_result", hedge=True)
+    assert transport.session.threads == [
+        threading.current_thread()
+    ]
+
+
+def test_breakers_are_kept_per_route_class():
+    breakers = circuit_breaker.CircuitBreakers(failures=1)
+    transport = get_transport(
+        lambda num, **kwargs: Response(503),
+        breakers=breakers,
+    )
+    transport.post(URL, route="job")
+    assert not breakers.get(URL, route="job").is_closed()
+    # logins and polls still reach the endpoint
+    assert breakers.get(URL, route="login").is_closed()
+    assert transport.get(URL, route="job_result")
+    try:
+        transport.post(URL, route="job")
+        assert False, "the submit circuit is open"
+    except circuit_breaker.CircuitOpen:
+        pass
+
+
+class Limiter:
+    def __init__(self, ready):
+        self.ready = ready
+        self.num_tokens = 0
+
+    def acquire(self, route, max_wait=None):
+        if max_wait == 0.0 and not self.ready:
+            return False
+        self.num_tokens += 1
+        return True
+
+
+def test_hedge_takes_no_token_without_a_worker():
+    hedge = get_hedge(max_workers=2)
+    limiter = Limiter(ready=True)
+
+    def send(num, **kwargs):
+        time.sleep(0.2)
+        return Response()
+
+    transport = get_transport(
+        send, hedge=hedge, limiter=limiter
+    )
+    # the first read holds one worker and
+    # the other one is busy
+    assert hedge.slots.acquire(blocking=False)
+    transport.get(URL, route="job_result", hedge=True)
+    assert limiter.num_tokens == 1
+    assert len(transport.session.threads) == 1
+    hedge.slots.release()
+
+
+def test_hedge_frees_the_worker_without_a_token():
+    hedge = get_hedge(max_workers=2)
+    limiter = Limiter(ready=False)
+
+    def send(num, **kwargs):
+        time.sleep(0.1)
+        return Response()
+
+    transport = get_transport(
+        send, hedge=hedge, limiter=limiter
+    )
+    transport.get(URL, route="job_result", hedge=True)
+    assert len(transport.session.threads) == 1
+    # the first read frees its worker when it ends
+    for _ in range(hedge.max_workers):
+        assert hedge.slots.acquire(timeout=1.0)
@@ -0,0 +1,101 @@
+import pytest
+
+import client_aic.deadline as deadline_mod
+import client_aic.retry_policy as retry_policy
+import client_aic.config.get_timeouts as get_timeouts
+import client_aic.transport.core_transport as core_transport
+
+URL = "https://api.test/ai/job/result"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def get_deadline(monkeypatch, seconds):
+    clock = Clock()
+    monkeypatch.setattr(deadline_mod, "time", clock)
+    return (deadline_mod.Deadline(seconds), clock)
+
+
+def test_route_timeouts_are_capped_by_the_budget(
+    monkeypatch,
+):
+    monkeypatch.delenv("AI_TIMEOUTS", raising=False)
+    monkeypatch.delenv("AI_READ_TIMEOUT", raising=False)
+    monkeypatch.delenv("AI_CONNECT_TIMEOUT", raising=False)
+    cfg = {"timeouts": get_timeouts.get_timeouts()}
+    (budget, clock) = get_deadline(monkeypatch, 8.0)
+    # the budget is longer than the default read
+    assert budget.get_timeout(
+        get_timeouts.get_timeout(cfg, "ai_result")
+    ) == (3.05, 5.0)
+    # and shorter than the slow poll read
+    assert budget.get_timeout(
+        get_timeouts.get_timeout(cfg, "job_result")
+    ) == (3.05, 8.0)
+    clock.now += 6.0
+    assert budget.get_timeout(
+        get_timeouts.get_timeout(cfg, "login")
+    ) == (2.0, 2.0)
+    assert budget.get_timeout(None) == (2.0, 2.0)
+    assert budget.get_timeout(4.0) == (2.0, 2.0)
+    clock.now += 2.0
+    assert budget.expired()
+    with pytest.raises(deadline_mod.DeadlineExceeded):
+        budget.get_timeout((3.05, 5.0))
+
+
+def test_no_deadline_keeps_the_route_timeout(monkeypatch):
+    (budget, clock) = get_deadline(monkeypatch, None)
+    clock.now += 1e6
+    assert budget.get_timeout((3.05, 10.0)) == (3.05, 10.0)
+    assert not budget.expired()
+    assert budget.has_budget(1e6)
+
+
+class Session:
+    def __init__(self):
+        self.timeouts = []
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        raise TimeoutError("read timed out")
+
+
+def test_each_attempt_sends_the_remaining_budget(
+    monkeypatch,
+):
+    (budget, clock) = get_deadline(monkeypatch, 12.0)
+    monkeypatch.setattr(core_transport, "time", clock)
+    transport = core_transport.CoreTransport(
+        retry=retry_policy.RetryPolicy(
+            attempts=3,
+            backoff=4.0,
+            multiplier=1.0,
+            jitter=0.0,
+        )
+    )
+    transport.session = Session()
+    with pytest.raises(TimeoutError):
+        transport.get(
+            URL,
+            timeout=(3.05, 10.0),
+            deadline=budget,
+            route="job_result",
+        )
+    assert transport.session.timeouts == [
+        (3.05, 10.0),
+        (3.05, 8.0),
+        (3.05, 4.0),
+    ]
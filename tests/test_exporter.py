@@ -0,0 +1,140 @@
+import os
+
+import ujson as json
+
+import client_aic.exporter as exporter
+import client_aic.models.core_search_result_ai as core_search_result_ai
+
+
+def get_page(recs):
+    page = core_search_result_ai.CoreSearchResultAI()
+    page.load_response_dict({"recs": recs})
+    return page
+
+
+class Server:
+    def __init__(self, num_recs, fail_offsets=()):
+        self.ids = list(range(1, num_recs + 1))
+        self.fail_offsets = set(fail_offsets)
+        self.requests = []
+
+    def search(self, user, data, cfg, timeout):
+        self.requests.append(data)
+        if data["offset"] in self.fail_offsets:
+            return None
+        after_id = data.get("after_id", 0)
+        ids = [i for i in self.ids if i > after_id]
+        start = data["offset"]
+        ids = ids[start:][: data["limit"]]
+        return get_page(
+            [{"id": i, "question": f"q{i}"} for i in ids]
+        )
+
+
+def run_export(monkeypatch, server, output_path, **kwargs):
+    monkeypatch.setattr(
+        exporter.search_ai_results,
+        "search_ai_results",
+        server.search,
+    )
+    return exporter.export_ai_results(
+        output_path=str(output_path),
+        query="by_user_id",
+        fields=["id", "question"],
+        page_size=2,
+        concurrency=1,
+        user=object(),
+        cfg_core={"endpoint": "api.test"},
+        **kwargs,
+    )
+
+
+def read_ids(output_path):
+    with open(output_path, "r") as fp:
+        return [json.loads(line)["id"] for line in fp]
+
+
+def test_resume_continues_after_the_checkpoint(
+    monkeypatch, tmp_path
+):
+    output_path = tmp_path / "results.jsonl"
+    server = Server(num_recs=7, fail_offsets=[4])
+    summary = run_export(monkeypatch, server, output_path)
+    assert summary["status"] == "failed"
+    assert read_ids(output_path) == [1, 2, 3, 4]
+
+    server = Server(num_recs=7)
+    summary = run_export(monkeypatch, server, output_path)
+    assert summary["status"] == "done"
+    assert summary["rows"] == 3
+    assert summary["total_rows"] == 7
+    assert server.requests[0]["after_id"] == 4
+    assert read_ids(output_path) == list(range(1, 8))
+
+
+def test_resume_drops_rows_after_the_checkpoint(
+    monkeypatch, tmp_path
+):
+    output_path = tmp_path / "results.jsonl"
+    server = Server(num_recs=7, fail_offsets=[4])
+    run_export(monkeypatch, server, output_path)
+    # a crash between writing a page and
+    # checkpointing it
+    with open(output_path, "a") as fp:
+        fp.write('{"id": 5, "question": "q5"}\n{"id"')
+    run_export(monkeypatch, Server(num_recs=7), output_path)
+    assert read_ids(output_path) == list(range(1, 8))
+
+
+def test_missing_output_restarts_the_export(
+    monkeypatch, tmp_path
+):
+    output_path = tmp_path / "results.jsonl"
+    server = Server(num_recs=7, fail_offsets=[4])
+    run_export(monkeypatch, server, output_path)
+    os.remove(output_path)
+
+    server = Server(num_recs=7)
+    summary = run_export(monkeypatch, server, output_path)
+    assert summary["status"] == "done"
+    assert summary["total_rows"] == 7
+    assert "after_id" not in server.requests[0]
+    assert read_ids(output_path) == list(range(1, 8))
+
+
+def test_finished_export_needs_a_restart(
+    monkeypatch, tmp_path
+):
+    output_path = tmp_path / "results.jsonl"
+    run_export(monkeypatch, Server(num_recs=3), output_path)
+
+    server = Server(num_recs=5)
+    summary = run_export(monkeypatch, server, output_path)
+    assert summary["rows"] == 0
+    assert summary["total_rows"] == 3
+    assert server.requests == []
+
+    summary = run_export(
+        monkeypatch, server, output_path, resume=False
+    )
+    assert summary["status"] == "done"
+    assert summary["total_rows"] == 5
+    assert read_ids(output_path) == list(range(1, 6))
+
+
+def test_missing_id_fails_the_export(monkeypatch, tmp_path):
+    output_path = tmp_path / "results.jsonl"
+    server = Server(num_recs=4)
+    search = server.search
+
+    def search_without_ids(user, data, cfg, timeout):
+        page = search(user, data, cfg, timeout)
+        if data["offset"]:
+            return get_page([{"id": None, "question": "q"}])
+        return page
+
+    server.search = search_without_ids
+    summary = run_export(monkeypatch, server, output_path)
+    assert summary["status"] == "failed"
+    assert summary["last_id"] == 2
+    assert read_ids(output_path) == [1, 2]
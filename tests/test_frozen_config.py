@@ -0,0 +1,65 @@
+import pytest
+
+import client_aic.get_cfg as get_cfg
+import client_aic.config.frozen_config as frozen_config
+
+
+def get_values():
+    return {
+        "endpoint": "https://api.test",
+        "tls": {"ca": None, "cert": None, "key": None},
+        "retry": {"attempts": 3, "statuses": [502, 503]},
+    }
+
+
+def test_config_cannot_be_changed():
+    cfg = frozen_config.FrozenConfig(get_values())
+    with pytest.raises(TypeError):
+        cfg["endpoint"] = "https://other.test"
+    with pytest.raises(TypeError):
+        del cfg["endpoint"]
+    with pytest.raises(TypeError):
+        cfg["tls"]["ca"] = "/tmp/ca.pem"
+    with pytest.raises(AttributeError):
+        cfg["retry"]["statuses"].append(504)
+    with pytest.raises(TypeError):
+        cfg.data = {}
+    assert isinstance(
+        cfg["tls"], frozen_config.FrozenConfig
+    )
+    assert cfg["retry"]["statuses"] == (502, 503)
+
+
+def test_config_is_a_snapshot():
+    values = get_values()
+    cfg = frozen_config.FrozenConfig(values)
+    values["endpoint"] = "https://other.test"
+    values["tls"]["ca"] = "/tmp/ca.pem"
+    assert cfg["endpoint"] == "https://api.test"
+    assert cfg["tls"]["ca"] is None
+    # a changed copy leaves the snapshot alone
+    changed = dict(cfg, endpoint="https://other.test")
+    assert changed["endpoint"] == "https://other.test"
+    assert cfg["endpoint"] == "https://api.test"
+
+
+def test_equal_configs_share_a_hash():
+    first = frozen_config.FrozenConfig(get_values())
+    second = frozen_config.freeze(get_values())
+    assert first == second
+    assert hash(first) == hash(second)
+    assert {first: "transport"}[second] == "transport"
+    assert frozen_config.freeze(first) is first
+
+
+def test_get_cfg_reuses_one_snapshot(monkeypatch):
+    monkeypatch.setattr(get_cfg, "cfg_snapshot", None)
+    cfg = get_cfg.get_cfg()
+    assert isinstance(cfg, frozen_config.FrozenConfig)
+    assert get_cfg.get_cfg() is cfg
+    with pytest.raises(TypeError):
+        cfg["endpoint"] = "https://other.test"
+    reloaded = get_cfg.reload()
+    assert reloaded is not cfg
+    assert get_cfg.get_cfg() is reloaded
+    assert reloaded == cfg
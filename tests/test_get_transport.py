@@ -0,0 +1,94 @@
+import client_aic.get_cfg as get_cfg
+import client_aic.get_transport as get_transport
+import client_aic.config.get_retry as get_retry
+import client_aic.config.get_hedge as get_hedge
+import client_aic.config.get_breaker as get_breaker
+
+
+def test_frozen_cfg_resolves_the_transport_once(
+    monkeypatch,
+):
+    cfg = get_cfg.build_cfg()
+    for key in ("retry", "breaker", "hedge"):
+        assert key in cfg
+    transport = get_transport.get_transport(cfg)
+
+    def fail(cfg=None):
+        raise AssertionError(
+            "resolved the retry policy again"
+        )
+
+    monkeypatch.setattr(get_retry, "get_retry_policy", fail)
+    assert get_transport.get_transport(cfg) is transport
+
+
+def test_dict_cfg_finds_its_transport_by_value(
+    monkeypatch,
+):
+    cfg = dict(get_cfg.build_cfg())
+    transport = get_transport.get_transport(cfg)
+
+    def fail(cfg=None):
+        raise AssertionError(
+            "built a policy for a cache hit"
+        )
+
+    for mod, name in (
+        (get_retry, "get_retry_policy"),
+        (get_breaker, "get_circuit_breakers"),
+        (get_hedge, "get_hedge_policy"),
+    ):
+        monkeypatch.setattr(mod, name, fail)
+    assert (
+        get_transport.get_transport(dict(cfg)) is transport
+    )
+    changed = dict(
+        cfg, retry=dict(cfg["retry"], attempts=9)
+    )
+    monkeypatch.undo()
+    other = get_transport.get_transport(changed)
+    assert other is not transport
+    assert other.retry.attempts == 9
+
+
+def test_equal_settings_share_a_transport():
+    cfg = get_cfg.build_cfg()
+    assert get_transport.get_transport(
+        dict(cfg)
+    ) is get_transport.get_transport(cfg)
+
+
+def test_cfg_transport_is_used():
+    transport = object()
+    assert (
+        get_transport.get_transport(
+            {"transport": transport}
+        )
+        is transport
+    )
+
+
+def test_hedging_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("AI_HEDGE_QUANTILE", raising=False)
+    assert get_hedge.get_hedge_policy() is None
+    monkeypatch.setenv("AI_HEDGE_QUANTILE", "0.95")
+    assert get_hedge.get_hedge_policy() is not None
+
+
+def test_client_transport_has_the_cfg_settings():
+    import client_aic.client as client_aic
+
+    cfg = dict(
+        get_cfg.build_cfg(),
+        breaker={"failures": 3},
+        hedge={"quantile": 0.9},
+    )
+    with client_aic.Client(
+        email="a@b.c", password="x", cfg=cfg
+    ) as client:
+        transport = client.transport
+        assert transport.breakers.failures == 3
+        assert transport.hedge.quantile == 0.9
+        assert transport is not get_transport.get_transport(
+            cfg
+        )
@@ -0,0 +1,86 @@
+import pytest
+
+import client_aic.models.core_search_result_ai as core_search_result_ai
+import client_aic.req.ai.iter_ai_results as iter_ai_results
+
+
+def get_page(ids):
+    page = core_search_result_ai.CoreSearchResultAI()
+    page.load_response_dict(
+        {"recs": [{"id": rec_id} for rec_id in ids]}
+    )
+    return page
+
+
+def patch_search(monkeypatch, pages):
+    requests = []
+
+    def search(user, data, cfg, timeout):
+        requests.append(data)
+        return pages[len(requests) - 1]
+
+    monkeypatch.setattr(
+        iter_ai_results.search_ai_results,
+        "search_ai_results",
+        search,
+    )
+    return requests
+
+
+def walk(**kwargs):
+    return [
+        ai_result.id
+        for ai_result in iter_ai_results.iter_ai_results(
+            user=None,
+            query="by_user_id",
+            page_size=2,
+            cfg={"endpoint": "api.test"},
+            prefetch=False,
+            **kwargs,
+        )
+    ]
+
+
+def test_short_page_ends_the_walk(monkeypatch):
+    requests = patch_search(
+        monkeypatch, [get_page([1, 2]), get_page([3])]
+    )
+    assert walk() == [1, 2, 3]
+    assert requests[1]["after_id"] == 2
+
+
+def test_failed_page_raises_with_the_resume_point(
+    monkeypatch,
+):
+    patch_search(monkeypatch, [get_page([1, 2]), None])
+    seen = []
+    with pytest.raises(
+        iter_ai_results.SearchPageError
+    ) as e:
+        for ai_result in iter_ai_results.iter_ai_results(
+            user=None,
+            query="by_user_id",
+            page_size=2,
+            cfg={"endpoint": "api.test"},
+        ):
+            seen.append(ai_result.id)
+    assert seen == [1, 2]
+    assert e.value.after_id == 2
+    assert e.value.offset == 2
+
+
+def test_repeated_page_raises(monkeypatch):
+    patch_search(
+        monkeypatch, [get_page([1, 2]), get_page([1, 2])]
+    )
+    with pytest.raises(
+        iter_ai_results.SearchPageError
+    ) as e:
+        walk(keyset=False)
+    assert e.value.offset == 2
+
+
+def test_offset_resumes_the_walk(monkeypatch):
+    requests = patch_search(monkeypatch, [get_page([5])])
+    assert walk(keyset=False, offset=4) == [5]
+    assert requests[0]["offset"] == 4
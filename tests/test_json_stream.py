@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+import client_aic.json_stream as json_stream
+import client_aic.req.ai.stream_ai_results as stream_ai_results
+
+
+BODY = json.dumps(
+    {
+        "msg": "ok",
+        "recs": [
+            {"id": 1, "answer": "café ✓", "score": 12.5},
+            {
+                "id": 22,
+                "answer": "\U0001f600",
+                "score": -3e2,
+            },
+            {"id": 333, "answer": 'a"b', "score": 0},
+        ],
+        "sql_query": "select",
+    },
+    ensure_ascii=False,
+).encode("utf-8")
+
+
+def split(body, size):
+    return [
+        body[idx:][:size]
+        for idx in range(0, len(body), size)
+    ]
+
+
+def decode(chunks):
+    meta = {}
+    recs = list(
+        json_stream.iter_json_array(
+            chunks, key="recs", meta=meta
+        )
+    )
+    return (recs, meta)
+
+
+def test_every_chunk_size_decodes_the_same():
+    expected = json.loads(BODY)
+    for size in range(1, len(BODY) + 1):
+        (recs, meta) = decode(split(BODY, size))
+        assert recs == expected["recs"], size
+        assert meta == {"msg": "ok", "sql_query": "select"}
+
+
+def test_split_utf8_character():
+    # split inside the 4-byte emoji
+    idx = BODY.index("\U0001f600".encode("utf-8")) + 2
+    (recs, _) = decode([BODY[:idx], BODY[idx:]])
+    assert recs[1]["answer"] == "\U0001f600"
+
+
+def test_split_number_token():
+    # "333" split after the first digit must not
+    # decode as the number 3
+    idx = BODY.index(b"333") + 1
+    (recs, _) = decode([BODY[:idx], BODY[idx:]])
+    assert recs[2]["id"] == 333
+
+
+def test_split_literal_and_escape():
+    body = b'{"recs": [true, "a\\"b\\\\", null]}'
+    for idx in range(1, len(body)):
+        (recs, _) = decode([body[:idx], body[idx:]])
+        assert recs == [True, 'a"b\\', None], idx
+
+
+def test_empty_array():
+    (recs, meta) = decode([b'{"recs": [], "msg": "x"}'])
+    assert recs == []
+    assert meta == {"msg": "x"}
+
+
+def test_truncated_body_raises():
+    with pytest.raises(ValueError):
+        decode(split(BODY[:-20], 7))
+
+
+class Response:
+    status_code = 200
+
+    def __init__(self, body):
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        return split(self.body, chunk_size)
+
+    def close(self):
+        pass
+
+
+class Transport:
+    def __init__(self, body):
+        self.body = body
+
+    def post(self, url, **kwargs):
+        return Response(self.body)
+
+
+def test_truncated_stream_is_not_complete():
+    cut = BODY.index(b'{"id": 333')
+    seen = []
+    with pytest.raises(
+        stream_ai_results.StreamDecodeError
+    ) as e:
+        for (
+            ai_result
+        ) in stream_ai_results.stream_ai_results(
+            user=None,
+            data={"query": "by_user_id"},
+            cfg={
+                "endpoint": "api.test",
+                "certs": (None, None),
+                "verify": False,
+                "transport": Transport(BODY[:cut]),
+            },
+            chunk_size=16,
+        ):
+            seen.append(ai_result.id)
+    assert seen == [1, 22]
+    assert e.value.num_recs == 2
@@ -0,0 +1,116 @@
+import ujson as json
+import client_aic.models.core_job as core_job
+import client_aic.models.core_user as core_user
+import client_aic.models.core_result_ai as core_result_ai
+import client_aic.models.core_result_job as core_result_job
+import client_aic.models.core_search_result_ai as core_search
+
+# the keyword arguments of the hand-written models
+# before the fields tuples (num_polls is client-side)
+OLD_FIELDS = {
+    core_result_ai.CoreResultAI: (
+        "id user_id job_id worker_id state question "
+        "answer model_name score question_score "
+        "answer_score match_source match_page "
+        "match_content summarized_question "
+        "summarized_answer summarized_score "
+        "reviewed_answer reviewed_score "
+        "reviewed_computed_score reviewed_notes "
+        "collection collection_notes session_id "
+        "derived_session_id embed_model_name category "
+        "tags latency data created_at updated_at"
+    ),
+    core_result_job.CoreResultJob: (
+        "id job_id worker_id job_type user_id state "
+        "data msg created_at updated_at"
+    ),
+    core_job.CoreJob: (
+        "id user_id worker_id state status job_type "
+        "data msg created_at updated_at"
+    ),
+    core_user.CoreUser: (
+        "id email state verified role token msg "
+        "created_at updated_at"
+    ),
+}
+
+
+def get_rec(fields):
+    rec = {}
+    for idx, field in enumerate(fields.split()):
+        rec[field] = f"{field}-{idx}"
+    if "data" in rec:
+        rec["data"] = {"x": 1, "tags": ["a", "b"]}
+    return rec
+
+
+def test_fields_match_the_old_models():
+    for model, fields in OLD_FIELDS.items():
+        assert model.fields == tuple(fields.split())
+
+
+def test_from_dict_matches_the_old_constructor(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for model, fields in OLD_FIELDS.items():
+        rec = get_rec(fields)
+        cur_o = model.from_dict(rec)
+        assert cur_o.to_dict() == model(**rec).to_dict()
+        assert cur_o.to_dict() == rec
+        # the rest api sends json
+        assert (
+            model.from_dict(
+                json.loads(json.dumps(rec))
+            ).to_dict()
+            == rec
+        )
+
+
+def test_missing_keys_are_none_and_extra_keys_ignored(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for model, fields in OLD_FIELDS.items():
+        cur_o = model.from_dict({"id": 7, "unknown": "x"})
+        res = cur_o.to_dict()
+        assert list(res) == fields.split()
+        assert res["id"] == 7
+        assert all(
+            res[field] is None
+            for field in fields.split()[1:]
+        )
+    job_res = core_result_job.CoreResultJob.from_dict({})
+    assert job_res.num_polls == 0
+
+
+def test_ai_result_get_dict_is_to_dict():
+    rec = get_rec(OLD_FIELDS[core_result_ai.CoreResultAI])
+    ai_result = core_result_ai.CoreResultAI.from_dict(rec)
+    assert ai_result.get_dict() == rec
+    ai_result.load_response_dict(dict(rec, answer="new"))
+    assert ai_result.get_dict() == dict(rec, answer="new")
+
+
+def test_search_rows_round_trip():
+    recs = [
+        dict(
+            get_rec(
+                OLD_FIELDS[core_result_ai.CoreResultAI]
+            ),
+            id=idx,
+        )
+        for idx in range(3)
+    ]
+    search_res = core_search.CoreSearchResultAI()
+    search_res.load_response_dict(
+        {"sql_query": "select", "msg": "ok", "recs": recs}
+    )
+    assert [
+        cur_o.to_dict() for cur_o in search_res.recs
+    ] == recs
+    assert search_res.to_records() == recs
+    search_res.add_rec(dict(recs[0], id=3))
+    assert search_res.recs[3].to_dict() == dict(
+        recs[0], id=3
+    )
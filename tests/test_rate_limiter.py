@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import multiprocessing
+
+import pytest
+
+import client_aic.rate_limiter as rate_limiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+def test_token_bucket_refills_at_the_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    bucket = rate_limiter.TokenBucket(rate=2.0, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # the next callers queue up behind each other
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+    assert bucket.reserve(max_wait=1.0) is None
+    # 2 reserved tokens are owed
+    clock.now += 1.5
+    assert bucket.reserve() == 0.0
+    # an idle bucket only refills up to the burst
+    clock.now += 60.0
+    assert [bucket.reserve() for _ in range(3)] == [
+        0.0,
+        0.0,
+        0.5,
+    ]
+
+
+def reserve_in_child(path, results):
+    bucket = rate_limiter.FileTokenBucket(
+        path=path, rate=0.01, burst=3
+    )
+    results.put([bucket.reserve(), bucket.reserve()])
+
+
+def test_file_bucket_is_shared_by_processes(tmp_path):
+    if (
+        "fork"
+        not in multiprocessing.get_all_start_methods()
+    ):
+        pytest.skip("needs fork")
+    ctx = multiprocessing.get_context("fork")
+    path = str(tmp_path / "submit.bucket")
+    bucket = rate_limiter.FileTokenBucket(
+        path=path, rate=0.01, burst=3
+    )
+    assert bucket.reserve() == 0.0
+    results = ctx.Queue()
+    child = ctx.Process(
+        target=reserve_in_child, args=(path, results)
+    )
+    child.start()
+    child_waits = results.get(timeout=10)
+    child.join(timeout=10)
+    assert child_waits == [0.0, 0.0]
+    # the child used the rest of the burst
+    assert bucket.reserve(max_wait=1.0) is None
+    assert bucket.reserve() > 90.0
+
+
+def test_async_acquire_reserves_file_tokens_off_the_loop(
+    tmp_path,
+):
+    limiter = rate_limiter.RateLimiter(
+        limits={"submit": (100, 10)},
+        lock_dir=str(tmp_path),
+    )
+    bucket = limiter.get_bucket("job")
+    reserve = bucket.reserve
+    threads = []
+
+    def record_reserve(max_wait=None):
+        threads.append(threading.current_thread())
+        return reserve(max_wait=max_wait)
+
+    bucket.reserve = record_reserve
+    assert asyncio.run(limiter.async_acquire("job"))
+    assert threads
+    assert threads[0] is not threading.current_thread()
+    # unlimited routes do not reserve anything
+    assert asyncio.run(limiter.async_acquire("job_result"))
+    assert len(threads) == 1
@@ -0,0 +1,18 @@
+import client_aic.cache.result_cache as result_cache
+import client_aic.models.core_result_ai as core_result_ai
+
+
+def test_replaced_key_is_counted_once(tmp_path):
+    cache = result_cache.ResultCache(
+        db_path=str(tmp_path / "cache.db"),
+        max_db_entries=10,
+    )
+    for answer in ("a", "b", "c"):
+        cache.put(
+            "k1", core_result_ai.CoreResultAI(answer=answer)
+        )
+    cache.put("k2", core_result_ai.CoreResultAI(answer="d"))
+    assert cache.get_stats()["db_entries"] == 2
+    cache.memory.clear()
+    assert cache.get("k1").answer == "c"
+    assert cache.get("k2").answer == "d"
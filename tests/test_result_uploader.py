@@ -0,0 +1,114 @@
+import os
+import ujson as json
+import client_aic.models.core_user as core_user
+import client_aic.result_uploader as result_uploader
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.text = json.dumps(body or {})
+
+
+class Transport:
+    """records each create and returns the given status"""
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.requests = []
+
+    def post(self, url, json=None, headers=None, **kwargs):
+        self.requests.append((headers, json))
+        return Response(self.status_code, {"id": 9})
+
+
+def get_uploader(transport, spool_dir):
+    return result_uploader.ResultUploader(
+        user=core_user.CoreUser(
+            id=2,
+            email="user@test",
+            state=0,
+            verified=1,
+            role="user",
+            token="t",
+            msg=None,
+        ),
+        cfg={
+            "endpoint": "api.test",
+            "certs": (None, None),
+            "verify": False,
+            "transport": transport,
+        },
+        retries=2,
+        backoff=0.0,
+        spool_dir=spool_dir,
+    )
+
+
+def get_keys(transport):
+    return [
+        headers["Idempotency-Key"]
+        for (headers, _) in transport.requests
+    ]
+
+
+def test_retries_and_replay_reuse_the_key(tmp_path):
+    spool_dir = str(tmp_path)
+    failing = Transport(503)
+    with get_uploader(failing, spool_dir) as uploader:
+        uploader.put({"answer": "a", "data": {"x": 1}})
+    keys = get_keys(failing)
+    assert len(keys) == 3
+    assert len(set(keys)) == 1
+    (_, sent) = failing.requests[0]
+    assert sent["data"] == {
+        "x": 1,
+        "idempotency_key": keys[0],
+    }
+    assert "idempotency_key" not in sent
+
+    working = Transport(201)
+    with get_uploader(working, spool_dir) as uploader:
+        uploader.flush()
+    assert get_keys(working) == keys[:1]
+    assert uploader.get_stats()["sent"] == 1
+    assert not os.listdir(spool_dir)
+
+
+def test_each_result_gets_its_own_key(tmp_path):
+    working = Transport(201)
+    with get_uploader(working, str(tmp_path)) as uploader:
+        uploader.put({"answer": "a"})
+        uploader.put({"answer": "a"})
+    assert len(set(get_keys(working))) == 2
+
+
+def test_rejected_result_is_not_spooled(tmp_path):
+    spool_dir = str(tmp_path)
+    rejecting = Transport(422)
+    with get_uploader(rejecting, spool_dir) as uploader:
+        uploader.put({"answer": "a"})
+    assert len(rejecting.requests) == 1
+    stats = uploader.get_stats()
+    assert stats["rejected"] == 1
+    assert stats["spooled"] == 0
+    assert sorted(os.listdir(spool_dir)) == [
+        "rejected.jsonl"
+    ]
+    with open(
+        os.path.join(spool_dir, "rejected.jsonl")
+    ) as fp:
+        rejected = json.loads(fp.read())
+    assert rejected["rejected_status"] == 422
+    # nothing is replayed on the next start
+    working = Transport(201)
+    with get_uploader(working, spool_dir) as uploader:
+        uploader.flush()
+    assert not working.requests
+
+
+def test_auth_failure_is_spooled(tmp_path):
+    failing = Transport(401)
+    with get_uploader(failing, str(tmp_path)) as uploader:
+        uploader.put({"answer": "a"})
+    assert uploader.get_stats()["spooled"] == 1
@@ -0,0 +1,162 @@
+import ujson as json
+import client_aic.journal as journal
+import client_aic.review_runner as review_runner
+import client_aic.models.core_user as core_user
+import client_aic.req.ai.update_ai_result as update_ai_result
+
+
+def test_failures_file_keeps_earlier_failures(tmp_path):
+    input_path = str(tmp_path / "reviews.jsonl")
+    journal_path = f"{input_path}.journal"
+    failures_path = f"{input_path}.failures.jsonl"
+    with open(input_path, "w") as fp:
+        for job_id in (1, 2, 3):
+            review = {
+                "job_id": job_id,
+                "reviewed_answer": "ok",
+                "reviewed_score": 90,
+            }
+            fp.write(json.dumps(review) + "\n")
+    jrnl = journal.Journal(journal_path, fsync=False)
+    # an earlier run failed lines 1 and 2 and a
+    # later run only retried and fixed line 2
+    jrnl.write(1, "failed", error="update failed")
+    jrnl.write(2, "failed", error="update failed")
+    jrnl.write(3, "done")
+    jrnl.write(2, "done")
+    jrnl.close()
+    assert (
+        review_runner.write_failures(
+            input_path=input_path,
+            journal_path=journal_path,
+            failures_path=failures_path,
+        )
+        == 1
+    )
+    with open(failures_path) as fp:
+        failures = [json.loads(line) for line in fp]
+    assert failures == [
+        {
+            "line": 1,
+            "error": "update failed",
+            "job_id": 1,
+            "reviewed_answer": "ok",
+            "reviewed_score": 90.0,
+        }
+    ]
+
+
+def test_nan_score_is_invalid():
+    for score in ("nan", float("nan"), "inf", 101, -1):
+        (review, error) = review_runner.parse_review(
+            {
+                "job_id": 1,
+                "reviewed_answer": "ok",
+                "reviewed_score": score,
+            }
+        )
+        assert review is None
+        assert "reviewed_score" in error
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.text = json.dumps(body or {})
+
+
+class Transport:
+    """records each request and returns the next response"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def send(self, method, url, json=None, **kwargs):
+        self.requests.append((method, url, json))
+        return self.responses.pop(0)
+
+    def get(self, url, **kwargs):
+        return self.send("GET", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.send("PATCH", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.send("PUT", url, **kwargs)
+
+
+def get_cfg(transport):
+    return {
+        "endpoint": "api.test",
+        "certs": (None, None),
+        "verify": False,
+        "transport": transport,
+    }
+
+
+def get_user():
+    return core_user.CoreUser(
+        id=2,
+        email="a@b.c",
+        state=0,
+        verified=1,
+        role="user",
+        token="t",
+        msg=None,
+    )
+
+
+REVIEW = {"reviewed_answer": "ok", "reviewed_score": 90.0}
+
+
+def test_missing_ai_result_fails_on_the_first_attempt():
+    tr = Transport(Response(404))
+    (updated, error, attempts) = review_runner.apply_review(
+        user=get_user(),
+        review=dict(REVIEW, job_id=5),
+        cfg=get_cfg(tr),
+    )
+    assert (updated, error, attempts) == (
+        None,
+        "ai result not found",
+        1,
+    )
+    assert [m for (m, _, _) in tr.requests] == ["GET"]
+
+
+def test_ai_result_id_review_only_patches(monkeypatch):
+    monkeypatch.setattr(
+        update_ai_result, "patch_unsupported", set()
+    )
+    tr = Transport(Response(200, {"id": 7}))
+    (updated, error, _) = review_runner.apply_review(
+        user=get_user(),
+        review=dict(REVIEW, ai_result_id=7),
+        cfg=get_cfg(tr),
+    )
+    assert error is None
+    assert updated.id == 7
+    assert tr.requests == [
+        (
+            "PATCH",
+            "https://api.test/ai/result",
+            dict(REVIEW, id=7, user_id=2),
+        )
+    ]
+
+
+def test_ai_result_id_review_is_never_put(monkeypatch):
+    monkeypatch.setattr(
+        update_ai_result, "patch_unsupported", set()
+    )
+    tr = Transport(Response(405))
+    (updated, error, _) = review_runner.apply_review(
+        user=get_user(),
+        review=dict(REVIEW, ai_result_id=7),
+        cfg=get_cfg(tr),
+        retries=0,
+    )
+    assert updated is None
+    assert error == "update failed"
+    assert [m for (m, _, _) in tr.requests] == ["PATCH"]
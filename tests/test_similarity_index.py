@@ -0,0 +1,168 @@
+import client_aic.cache.similarity_index as similarity_index
+import client_aic.models.core_result_ai as core_result_ai
+
+
+BASE = "Is this code safe?\nstrcpy(b,p);\nfree(b);"
+
+
+def get_jaccard(a, b):
+    a = similarity_index.get_shingles(a)
+    b = similarity_index.get_shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def test_renamed_locals_match():
+    assert (
+        get_jaccard(
+            BASE,
+            "Is this code safe?\nstrcpy(buf,src);\nfree(buf);",
+        )
+        == 1.0
+    )
+
+
+def test_whitespace_and_comments_match():
+    assert (
+        get_jaccard(
+            BASE,
+            "Is this code   safe?\n"
+            "  strcpy(b, p); // copy\n"
+            "free( b );",
+        )
+        == 1.0
+    )
+
+
+def test_different_callees_do_not_match():
+    assert (
+        get_jaccard(
+            BASE,
+            "Is this code safe?\nmemset(b,p);\nputs(b);",
+        )
+        < 0.8
+    )
+
+
+def test_repeated_line_does_not_match():
+    assert get_jaccard(BASE, BASE + "\nfree(b);") < 0.8
+
+
+def test_prose_is_kept():
+    shingles = similarity_index.get_shingles(BASE)
+    assert "~this ~code ~safe" in shingles
+    assert "=strcpy ( v0 , v1 ) ;" in shingles
+
+
+def test_index_query():
+    index = similarity_index.SimilarityIndex()
+    index.add(BASE, core_result_ai.CoreResultAI(id=1))
+    (res_ai, _) = index.query(
+        "Is this code safe?\nstrcpy(buf,src);\nfree(buf);"
+    )
+    assert res_ai.id == 1
+    (res_ai, _) = index.query(
+        "Is this code safe?\nmemset(b,p);\nputs(b);"
+    )
+    assert res_ai is None
+    (res_ai, _) = index.query(BASE + "\nfree(b);")
+    assert res_ai is None
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_near_duplicate_is_not_added_again():
+    index = similarity_index.SimilarityIndex()
+    assert (
+        index.add(BASE, core_result_ai.CoreResultAI(id=1))
+        == 0
+    )
+    assert (
+        index.add(
+            "Is this code safe?\nstrcpy(buf,src);\nfree(buf);",
+            core_result_ai.CoreResultAI(id=2),
+        )
+        == 0
+    )
+    assert len(index) == 1
+
+
+def test_expired_answer_does_not_match(
+    monkeypatch, tmp_path
+):
+    clock = Clock()
+    monkeypatch.setattr(similarity_index, "time", clock)
+    db_path = str(tmp_path / "similar.db")
+    index = similarity_index.SimilarityIndex(
+        ttl=60.0, db_path=db_path
+    )
+    index.add(BASE, core_result_ai.CoreResultAI(id=1))
+    clock.now += 30.0
+    assert index.query(BASE)[0].id == 1
+    clock.now += 31.0
+    assert index.query(BASE) == (None, 0.0)
+    # an expired entry is replaced by a new answer
+    index.add(BASE, core_result_ai.CoreResultAI(id=2))
+    assert len(index) == 1
+    assert index.query(BASE)[0].id == 2
+    index.close()
+    clock.now += 61.0
+    index = similarity_index.SimilarityIndex(
+        ttl=60.0, db_path=db_path
+    )
+    assert len(index) == 0
+    assert index.db.execute(
+        "SELECT COUNT(*) FROM similarity_index"
+    ).fetchone() == (0,)
+
+
+def test_oldest_entries_are_evicted(tmp_path):
+    db_path = str(tmp_path / "similar.db")
+    index = similarity_index.SimilarityIndex(
+        max_entries=2, db_path=db_path
+    )
+    questions = [
+        "what is the capital of france?",
+        "which mountain is the tallest in nepal?",
+        "how long is the river through cairo?",
+    ]
+    for num, question in enumerate(questions):
+        index.add(
+            question, core_result_ai.CoreResultAI(id=num)
+        )
+    assert len(index) == 2
+    assert index.query(questions[0])[0] is None
+    assert index.query(questions[2])[0].id == 2
+    index.close()
+    index = similarity_index.SimilarityIndex(
+        max_entries=2, db_path=db_path
+    )
+    assert len(index) == 2
+    assert index.query(questions[1])[0].id == 1
+
+
+def test_index_query_without_numpy(monkeypatch):
+    monkeypatch.setattr(similarity_index, "np", None)
+    test_index_query()
+
+
+def test_evicted_slots_are_compacted():
+    index = similarity_index.SimilarityIndex(max_entries=5)
+    questions = [
+        f"w{num} x{num * 7} y{num * 13} z{num * 31}"
+        for num in range(1100)
+    ]
+    for num, question in enumerate(questions):
+        index.add(
+            question, core_result_ai.CoreResultAI(id=num)
+        )
+    assert len(index) == 5
+    assert index.base > 0
+    assert len(index.values) < 1100
+    assert index.query(questions[-1])[0].id == 1099
+    assert index.query(questions[0])[0] is None
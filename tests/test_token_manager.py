@@ -0,0 +1,120 @@
+import time
+import base64
+
+import ujson as json
+
+import client_aic.token_manager as token_manager
+import client_aic.models.core_user as core_user
+
+CFG = {"endpoint": "api.test", "user": {}}
+
+
+def get_jwt(exp):
+    payload = base64.urlsafe_b64encode(
+        json.dumps({"exp": exp}).encode("ascii")
+    )
+    return f"h.{payload.decode('ascii').rstrip('=')}.s"
+
+
+def get_core_user(token):
+    return core_user.CoreUser(
+        id=2,
+        email="a@b.c",
+        state=0,
+        verified=1,
+        role="user",
+        token=token,
+        msg=None,
+    )
+
+
+class Server:
+    """fake login_user with one valid password"""
+
+    def __init__(self, password, saved_token=None):
+        self.password = password
+        self.saved_token = saved_token
+        self.logins = []
+
+    def __call__(
+        self,
+        email=None,
+        password=None,
+        force=False,
+        **kwargs,
+    ):
+        self.logins.append((password, force))
+        if not force and self.saved_token:
+            return get_core_user(self.saved_token)
+        if password != self.password:
+            return None
+        return get_core_user(get_jwt(time.time() + 3600))
+
+
+def test_wrong_password_keeps_the_working_token(
+    monkeypatch,
+):
+    server = Server("good")
+    monkeypatch.setattr(
+        token_manager.auth, "login_user", server
+    )
+    manager = token_manager.TokenManager()
+    user = manager.get_user(
+        email="a@b.c", password="good", cfg=CFG
+    )
+    token = user.token
+    assert (
+        manager.get_user(
+            email="a@b.c", password="bad", cfg=CFG
+        )
+        is None
+    )
+    entry = manager.entries[("api.test", "a@b.c")]
+    assert entry.password == "good"
+    assert manager.is_fresh(entry)
+    assert user.token_refresher()
+    assert user.token == token
+    # the new password is used once it works
+    server.password = "new"
+    assert (
+        manager.get_user(
+            email="a@b.c", password="new", cfg=CFG
+        )
+        is user
+    )
+    assert entry.password == "new"
+
+
+def test_expired_saved_token_logs_in_again(monkeypatch):
+    server = Server(
+        "good", saved_token=get_jwt(time.time() - 10)
+    )
+    monkeypatch.setattr(
+        token_manager.auth, "login_user", server
+    )
+    manager = token_manager.TokenManager()
+    user = manager.get_user(
+        email="a@b.c", password="good", cfg=CFG
+    )
+    assert server.logins == [
+        ("good", False),
+        ("good", True),
+    ]
+    assert (
+        token_manager.get_token_expiry(user.token, 0)
+        > time.time()
+    )
+
+
+def test_fresh_saved_token_is_reused(monkeypatch):
+    saved_token = get_jwt(time.time() + 3600)
+    server = Server("good", saved_token=saved_token)
+    monkeypatch.setattr(
+        token_manager.auth, "login_user", server
+    )
+    manager = token_manager.TokenManager()
+    user = manager.get_user(
+        email="a@b.c", password="good", cfg=CFG
+    )
+    assert user.token == saved_token
+    assert len(server.logins) == 1
@@ -0,0 +1,144 @@
+import ujson as json
+import pytest
+import client_aic.models.core_user as core_user
+import client_aic.models.core_result_ai as core_result_ai
+import client_aic.req.ai.update_ai_result as update_ai_result
+
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.text = json.dumps(body or {})
+
+
+class Transport:
+    """records each request and returns the next response"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def send(self, method, url, json=None, **kwargs):
+        self.requests.append((method, json))
+        return self.responses.pop(0)
+
+    def patch(self, url, **kwargs):
+        return self.send("PATCH", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.send("PUT", url, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def reset_patch_support():
+    update_ai_result.patch_unsupported.clear()
+    yield
+    update_ai_result.patch_unsupported.clear()
+
+
+def get_cfg(transport):
+    return {
+        "endpoint": "api.test",
+        "certs": (None, None),
+        "verify": False,
+        "transport": transport,
+    }
+
+
+def get_loaded():
+    return core_result_ai.CoreResultAI.from_dict(
+        {
+            "id": 7,
+            "user_id": 2,
+            "answer": "a long answer",
+            "data": {"x": 1},
+        }
+    )
+
+
+def update(transport, ai_result):
+    return update_ai_result.update_ai_result(
+        user=core_user.CoreUser(
+            id=2,
+            email="user@test",
+            state=0,
+            verified=1,
+            role="user",
+            token="t",
+            msg=None,
+        ),
+        ai_result=ai_result,
+        cfg=get_cfg(transport),
+    )
+
+
+def test_patch_sends_only_changed_fields():
+    tr = Transport(
+        Response(200, {"id": 7, "reviewed_score": 90})
+    )
+    ai_result = get_loaded()
+    ai_result.reviewed_score = 90
+    assert update(tr, ai_result) is ai_result
+    assert tr.requests == [
+        (
+            "PATCH",
+            {"id": 7, "user_id": 2, "reviewed_score": 90},
+        )
+    ]
+    assert ai_result.get_changes() == {}
+
+
+def test_in_place_edit_is_patched():
+    tr = Transport(Response(200))
+    ai_result = get_loaded()
+    ai_result.data["x"] = 2
+    assert update(tr, ai_result) is ai_result
+    assert tr.requests == [
+        ("PATCH", {"id": 7, "user_id": 2, "data": {"x": 2}})
+    ]
+
+
+def test_no_changes_sends_nothing():
+    tr = Transport()
+    ai_result = get_loaded()
+    assert update(tr, ai_result) is ai_result
+    assert tr.requests == []
+
+
+def test_unsupported_patch_falls_back_to_put():
+    tr = Transport(
+        Response(405),
+        Response(200, {"id": 7, "reviewed_score": 90}),
+        Response(200, {"id": 7, "reviewed_score": 80}),
+    )
+    ai_result = get_loaded()
+    ai_result.reviewed_score = 90
+    res = update(tr, ai_result)
+    assert res.reviewed_score == 90
+    assert [method for method, _ in tr.requests] == [
+        "PATCH",
+        "PUT",
+    ]
+    assert tr.requests[1][1]["answer"] == "a long answer"
+    # later updates go straight to a full PUT
+    ai_result.reviewed_score = 80
+    update(tr, ai_result)
+    assert tr.requests[2][0] == "PUT"
+
+
+def test_missing_record_does_not_disable_patch():
+    tr = Transport(Response(404), Response(200))
+    ai_result = get_loaded()
+    ai_result.reviewed_score = 90
+    assert update(tr, ai_result) is None
+    assert tr.requests == [
+        (
+            "PATCH",
+            {"id": 7, "user_id": 2, "reviewed_score": 90},
+        )
+    ]
+    assert not update_ai_result.patch_unsupported
+    other = get_loaded()
+    other.reviewed_score = 70
+    assert update(tr, other) is other
+    assert tr.requests[1][0] == "PATCH"